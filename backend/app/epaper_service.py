@@ -18,10 +18,11 @@ import xml.etree.ElementTree as ET
 from datetime import datetime, date, timedelta
 from email.utils import parsedate_to_datetime
 from typing import List, Dict, Optional
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from . import http_client, provider_health
+
 logger = logging.getLogger(__name__)
 
 _ENV_PATH = os.path.join(os.path.dirname(__file__), "..", ".env")
@@ -90,7 +91,7 @@ def _fetch_section_articles(section_path: str, section_name: str, max_pages: int
             url = f"{_BL_BASE}/{section_path}/?page={page_num}"
 
         try:
-            resp = requests.get(url, headers=_HEADERS, timeout=15)
+            resp = provider_health.call("businessline", http_client.get, url, headers=_HEADERS, timeout=15)
             if resp.status_code != 200:
                 break
             soup = BeautifulSoup(resp.text, "html.parser")
@@ -142,7 +143,7 @@ def _fetch_bl_rss_articles(section_path: str, section_name: str, lookback_days:
     """Fetch articles from Business Line RSS feed for a section (past N days)."""
     url = f"{_BL_BASE}/{section_path}/feeder/default.rss"
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("businessline", http_client.get, url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             return []
 
@@ -199,7 +200,7 @@ def _fetch_bl_rss_articles(section_path: str, section_name: str, lookback_days:
 def _fetch_article_body(url: str) -> str:
     """Fetch full article text from a BL article URL."""
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("businessline", http_client.get, url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             logger.warning(f"[EPaper] Body fetch HTTP {resp.status_code}: {url[-50:]}")
             return ""
@@ -238,7 +239,7 @@ def _fetch_th_rss_articles(section_path: str, section_name: str, lookback_days:
     """Fetch articles from The Hindu RSS feed for a section (past N days)."""
     url = f"{_TH_BASE}/{section_path}/feeder/default.rss"
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("thehindu", http_client.get, url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             logger.error(f"[TheHindu] RSS {section_name} failed: {resp.status_code}")
             return []
@@ -296,7 +297,7 @@ def _fetch_th_rss_articles(section_path: str, section_name: str, lookback_days:
 def _fetch_th_article_body(url: str) -> str:
     """Fetch full article text from a The Hindu article URL."""
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("thehindu", http_client.get, url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             logger.warning(f"[TheHindu] Body fetch HTTP {resp.status_code}: {url[-50:]}")
             return ""
@@ -334,7 +335,7 @@ def _fetch_gn_rss_articles(query: str, section_name: str, lookback_days: int = 7
     """Fetch articles from Google News RSS search (past N days)."""
     url = f"{_GN_BASE}/rss/search?q={query}&hl=en-IN&gl=IN&ceid=IN:en"
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("google_news", http_client.get, url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             logger.error(f"[GoogleNews] RSS {section_name} failed: {resp.status_code}")
             return []
@@ -407,7 +408,7 @@ def _fetch_gn_rss_articles(query: str, section_name: str, lookback_days: int = 7
 def _fetch_gn_article_body(url: str) -> str:
     """Fetch article body from a Google News redirect URL (generic scraper)."""
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15, allow_redirects=True)
+        resp = provider_health.call("news_sites", http_client.get, url, headers=_HEADERS, timeout=15, allow_redirects=True)
         if resp.status_code != 200:
             return ""
 
@@ -450,7 +451,7 @@ def _fetch_gn_article_body(url: str) -> str:
 def _fetch_mc_rss_articles(feed_url: str, section_name: str, lookback_days: int = 7) -> List[dict]:
     """Fetch articles from Moneycontrol RSS feed (past N days)."""
     try:
-        resp = requests.get(feed_url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("moneycontrol", http_client.get, feed_url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             logger.error(f"[Moneycontrol] RSS {section_name} failed: {resp.status_code}")
             return []
@@ -508,7 +509,7 @@ def _fetch_mc_rss_articles(feed_url: str, section_name: str, lookback_days: int
 def _fetch_mc_article_body(url: str) -> str:
     """Fetch full article text from a Moneycontrol article URL."""
     try:
-        resp = requests.get(url, headers=_HEADERS, timeout=15)
+        resp = provider_health.call("moneycontrol", http_client.get, url, headers=_HEADERS, timeout=15)
         if resp.status_code != 200:
             logger.warning(f"[Moneycontrol] Body fetch HTTP {resp.status_code}: {url[-50:]}")
             return ""
@@ -659,7 +660,8 @@ def _call_claude(system_prompt: str, user_message: str, max_tokens: int = 4096)
     if not _ANTHROPIC_API_KEY:
         return ""
     try:
-        resp = requests.post(
+        resp = provider_health.call(
+            "anthropic", http_client.post,
             "https://api.anthropic.com/v1/messages",
             headers={
                 "x-api-key": _ANTHROPIC_API_KEY,
@@ -881,7 +883,8 @@ Guidelines:
     messages.append({"role": "user", "content": message})
 
     try:
-        resp = requests.post(
+        resp = provider_health.call(
+            "anthropic", http_client.post,
             "https://api.anthropic.com/v1/messages",
             headers={
                 "x-api-key": _ANTHROPIC_API_KEY,
@@ -0,0 +1,229 @@
+"""
+Concurrent, rate-limited fetching across an ordered chain of providers.
+
+stock_service's Yahoo → Google Finance fallback used to walk missing symbols
+one at a time with a random sleep between calls, so a refresh without
+Zerodha took minutes for a large portfolio.  fetch_chain() instead:
+
+  - splits the items into batches per provider and runs them on a shared
+    worker pool, each call submitted only once a token from that provider's
+    TokenBucket is due (so a throttled provider never parks pool workers
+    and concurrency never exceeds its rate limit);
+  - sends an item to the next provider as soon as the previous one misses
+    it, or — hedging — once the previous call has been running longer
+    than *hedge_after* seconds;
+  - reports every item the moment a provider resolves it (on_result), so
+    callers can publish partial results while slower calls are running.
+
+Precedence is kept: a provider is only tried after every earlier one has
+missed the item or overrun the hedge budget.  The first answer wins; a late
+answer from an earlier provider for an already-resolved item is dropped.
+
+Tuning via environment:
+  FETCH_WORKERS      worker threads shared by all chains (default 8)
+  FETCH_HEDGE_AFTER  seconds before hedging to the next provider (default 8)
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(0.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+WORKERS = max(1, int(_env_float("FETCH_WORKERS", 8)))
+HEDGE_AFTER = _env_float("FETCH_HEDGE_AFTER", 8.0)
+
+
+# ═══════════════════════════════════════════════════════════
+#  RATE LIMITING
+# ═══════════════════════════════════════════════════════════
+
+class TokenBucket:
+    """Allows *rate* calls per second on average, bursts of up to *burst*.
+
+    acquire() reserves the next token and sleeps until it is due, so
+    waiting callers are served in arrival order.  rate 0 = unlimited.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._stamp = clock()
+
+    def reserve(self) -> float:
+        """Take a token; returns how long to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            self._sleep(delay)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(name: str, rate: float, burst: float = 1.0) -> TokenBucket:
+    """The process-wide bucket for provider *name* (created on first use)."""
+    with _limiters_lock:
+        bucket = _limiters.get(name)
+        if bucket is None:
+            bucket = _limiters[name] = TokenBucket(rate, burst)
+        return bucket
+
+
+# ═══════════════════════════════════════════════════════════
+#  PROVIDER CHAIN
+# ═══════════════════════════════════════════════════════════
+
+class Provider:
+    """One source in a chain.
+
+    *fetch(items)* returns {item: value} for the items it found; anything
+    missing (or an exception) sends those items on to the next provider.
+    """
+
+    def __init__(self, name: str, fetch: Callable[[List[Hashable]], Dict[Hashable, object]],
+                 batch_size: int = 1, bucket: Optional[TokenBucket] = None):
+        self.name = name
+        self.fetch = fetch
+        self.batch_size = max(1, batch_size)
+        self.bucket = bucket
+
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="fetch")
+
+
+def _call(provider: Provider, batch: List[Hashable], state: list):
+    t0 = state[2] = time.monotonic()
+    try:
+        found = provider.fetch(batch) or {}
+    except Exception as e:
+        logger.error(f"[FetchScheduler] {provider.name} failed for {len(batch)} items: {e}")
+        found = {}
+    return found, time.monotonic() - t0
+
+
+def fetch_chain(items: Sequence[Hashable], providers: Sequence[Provider],
+                on_result: Optional[Callable[[Hashable, str, object], None]] = None,
+                hedge_after: Optional[float] = None,
+                timings: Optional[Dict[str, float]] = None,
+                deadline: Optional[float] = None) -> Dict[Hashable, tuple]:
+    """Resolve *items* through *providers* (in precedence order).
+
+    Returns {item: (provider name, value)} for the items some provider
+    found.  *on_result(item, provider, value)* is called from this thread
+    as each item resolves.  *timings* receives seconds per provider
+    (summed over calls, so it can exceed wall time).  *deadline* (seconds)
+    stops waiting on calls still in flight.
+    """
+    hedge_after = HEDGE_AFTER if hedge_after is None else hedge_after
+    results: Dict[Hashable, tuple] = {}
+    # Highest provider index each item has been sent to
+    level: Dict[Hashable, int] = {item: -1 for item in items}
+    # future → [provider index, batch, call started at (None while queued), hedged yet]
+    pending: Dict = {}
+    # (token due at, tiebreak, provider index, batch) not yet submitted
+    scheduled: List[tuple] = []
+    seq = itertools.count()
+    started = time.monotonic()
+
+    def submit(index: int, chunk: List[Hashable]):
+        state = [index, chunk, None, False]
+        pending[_pool.submit(_call, providers[index], chunk, state)] = state
+
+    def escalate(batch: List[Hashable], index: int):
+        todo = [item for item in batch if item not in results and level[item] < index]
+        if not todo or index >= len(providers):
+            return
+        for item in todo:
+            level[item] = index
+        provider = providers[index]
+        for i in range(0, len(todo), provider.batch_size):
+            chunk = todo[i:i + provider.batch_size]
+            delay = provider.bucket.reserve() if provider.bucket is not None else 0.0
+            if delay > 0:
+                heapq.heappush(scheduled, (time.monotonic() + delay, next(seq), index, chunk))
+            else:
+                submit(index, chunk)
+
+    escalate(list(level), 0)
+    while (pending or scheduled) and len(results) < len(level):
+        now = time.monotonic()
+        if deadline is not None and now - started >= deadline:
+            logger.warning(f"[FetchScheduler] Deadline hit with {len(pending)} calls in flight, "
+                           f"{len(scheduled)} waiting for a token")
+            break
+        while scheduled and scheduled[0][0] <= now:
+            _, _, index, chunk = heapq.heappop(scheduled)
+            if any(item not in results for item in chunk):
+                submit(index, chunk)
+        due = [s[2] + hedge_after for s in pending.values()
+               if s[2] is not None and not s[3] and s[0] + 1 < len(providers)]
+        if scheduled:
+            due.append(scheduled[0][0])
+        # A call still queued on the pool can't be hedged before now + hedge_after
+        if any(s[2] is None and s[0] + 1 < len(providers) for s in pending.values()):
+            due.append(now + hedge_after)
+        timeout = max(0.0, min(due) - now) if due else None
+        if deadline is not None:
+            left = max(0.0, started + deadline - now)
+            timeout = left if timeout is None else min(timeout, left)
+        if not pending:
+            time.sleep(timeout)
+            continue
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            index, batch, _, _ = pending.pop(future)
+            found, elapsed = future.result()
+            name = providers[index].name
+            if timings is not None:
+                timings[name] = round(timings.get(name, 0.0) + elapsed, 3)
+            for item in batch:
+                if item in results or item not in found:
+                    continue
+                results[item] = (name, found[item])
+                if on_result is not None:
+                    on_result(item, name, found[item])
+            escalate(batch, index + 1)
+
+        now = time.monotonic()
+        for state in list(pending.values()):
+            index, batch, began, hedged = state
+            if began is not None and not hedged and now - began >= hedge_after:
+                state[3] = True
+                escalate(batch, index + 1)
+    # Calls still queued on the pool are dropped; running ones finish there
+    # and their answers are ignored
+    for future in pending:
+        future.cancel()
+    return results
@@ -0,0 +1,86 @@
+"""
+Array-backed FIFO matching for large ledgers.
+
+The dict-based matchers (xlsx_database.fifo_match, mf_xlsx_database.
+fifo_match_mf) rescan the lot list from the start for every sell, which is
+O(buys × sells) for high-churn symbols.  Here the same allocation is done
+on integer quantity arrays with cumulative sums: lot i covers
+[B[i-1], B[i]) and sell j covers [S[j-1], S[j]) on one number line, and
+every matched pair is one segment between consecutive breakpoints.
+That is O((buys + sells) log) and never touches a dict.
+
+Quantities are integers — whole shares, or MF units scaled to micro-units
+(the loop rounds to 6 decimals anyway) — so the sums are exact and the
+result is identical to the loops, not just close.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Below this many rows (buys + sells) the plain loop is faster than
+# setting up arrays; see scripts/bench_fifo.py
+VECTOR_MIN_ROWS = 128
+
+# fifo_match_mf works in units rounded to 6 decimals
+MF_SCALE = 10 ** 6
+
+
+def to_fixed(values: Sequence[float], scale: int) -> Optional[np.ndarray]:
+    """*values* × *scale* as int64, or None if any isn't exactly representable.
+
+    Exact means value == k / scale for the float the loop would compute, so
+    results converted back with k / scale are bit-identical.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    fixed = np.rint(arr * scale)
+    if not np.array_equal(fixed / scale, arr):
+        return None
+    return fixed.astype(np.int64)
+
+
+def allocate(buy_qty: Sequence[int], sell_qty: Sequence[int], min_qty: int = 0
+             ) -> Optional[Tuple[List[int], List[int], List[int], List[int]]]:
+    """FIFO-allocate sells (in order) against lots (in order).
+
+    Returns (lot_idx, sell_idx, matched, remaining): one entry per matched
+    pair in the loops' order (by sell, then lot), and the unmatched quantity
+    left on every lot.  Sell quantity beyond all lots is dropped.
+
+    min_qty mirrors the loops' "<= threshold means empty" checks (0 for
+    shares, 100 micro-units for MF).  When a quantity or a lot/sell
+    boundary falls within min_qty of zero — where the loop would skip or
+    drop the crumb — None is returned and the caller runs the loop.
+    Negative quantities also return None.
+    """
+    bq = np.asarray(buy_qty, dtype=np.int64)
+    sq = np.asarray(sell_qty, dtype=np.int64)
+    if (bq < 0).any() or (sq < 0).any():
+        return None
+    if min_qty and (((bq > 0) & (bq <= min_qty)).any() or ((sq > 0) & (sq <= min_qty)).any()):
+        return None
+
+    B = np.cumsum(bq)
+    S = np.cumsum(sq)
+    if not len(B) or not len(S):
+        return [], [], [], bq.tolist()
+
+    if min_qty:
+        # Distance from every sell end to the nearest lot end
+        at = np.searchsorted(B, S)
+        gap_up = np.abs(B[np.minimum(at, len(B) - 1)] - S)
+        gap_down = np.abs(S - B[np.maximum(at - 1, 0)])
+        gap = np.minimum(gap_up, gap_down)
+        if ((gap > 0) & (gap <= min_qty)).any():
+            return None
+
+    sold_total = min(int(S[-1]), int(B[-1]))
+    ends = np.union1d(B, S)
+    ends = ends[(ends > 0) & (ends <= sold_total)]
+    starts = np.concatenate(([0], ends[:-1])).astype(np.int64)
+    lot_idx = np.searchsorted(B, starts, side="right")
+    sell_idx = np.searchsorted(S, starts, side="right")
+    matched = ends - starts
+
+    consumed = np.clip(np.minimum(B, sold_total) - (B - bq), 0, bq)
+    return lot_idx.tolist(), sell_idx.tolist(), matched.tolist(), (bq - consumed).tolist()
@@ -0,0 +1,309 @@
+"""
+Filesystem watcher for a user's dumps tree.
+
+Drive desktop sync drops and rewrites workbooks under dumps/ at arbitrary
+times.  Instead of stat()-ing files on every read, the portfolio classes
+subscribe their directory here and are told which paths changed; a cache
+entry then stays valid until an event says otherwise.
+
+Backends:
+  inotify — Linux, via ctypes (no extra dependency), one watch per directory
+  poll    — everywhere else, or when inotify is unavailable (e.g. the
+            per-user watch limit is exhausted): a thread diffs the tree's
+            (size, mtime) every POLL_INTERVAL seconds
+
+Changed paths are batched for DEBOUNCE seconds (a sync or a save usually
+fires several events per file) and delivered per subscriber.  A batch
+containing the subscribed directory itself means "anything may have
+changed" (inotify queue overflow) and the subscriber should rescan.
+
+Opt-in via DUMPS_WATCH:
+  unset / 0 → off (default; reads stat() as before)
+  1 / auto  → inotify, falling back to polling
+  poll      → polling only
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_watch_mode() -> str:
+    raw = os.getenv("DUMPS_WATCH", "").strip().lower()
+    if raw in ("", "0", "false", "no", "off"):
+        return ""
+    return "poll" if raw == "poll" else "auto"
+
+
+WATCH_MODE = _env_watch_mode()
+POLL_INTERVAL = 5.0
+DEBOUNCE = 0.5
+
+# inotify(7) constants
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_MASK = (_IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+            | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def _tree_listing(root: Path) -> Dict[Path, Tuple[int, int]]:
+    """(size, mtime_ns) of every file under *root*."""
+    listing = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            fp = Path(dirpath) / name
+            try:
+                st = fp.stat()
+            except OSError:
+                continue
+            listing[fp] = (st.st_size, st.st_mtime_ns)
+    return listing
+
+
+class _Inotify:
+    """Minimal recursive inotify reader (Linux only)."""
+
+    def __init__(self, root: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux-only")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        try:
+            self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, top: Path) -> List[Path]:
+        """Watch *top* and every directory below it; returns files found."""
+        files = []
+        for dirpath, _, filenames in os.walk(top):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), _IN_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {dirpath}")
+            self._dirs[wd] = Path(dirpath)
+            files.extend(Path(dirpath) / name for name in filenames)
+        return files
+
+    def read(self, root: Path) -> Set[Path]:
+        """Drain pending events into a set of changed paths."""
+        changed: Set[Path] = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            if not buf:
+                return changed
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buf, pos)
+                name = buf[pos + _EVENT_HEADER.size:pos + _EVENT_HEADER.size + length].rstrip(b"\0")
+                pos += _EVENT_HEADER.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    changed.add(root)
+                    continue
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                parent = self._dirs.get(wd)
+                if parent is None:
+                    continue
+                path = parent / os.fsdecode(name) if name else parent
+                changed.add(path)
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # A new directory: watch it and report what's already inside
+                    try:
+                        changed.update(self.add_tree(path))
+                    except OSError as e:
+                        logger.warning(f"[FsWatch] Cannot watch {path}: {e}")
+                        changed.add(root)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class DumpsWatcher:
+    """Watch one dumps tree and fan changed paths out to subscribers."""
+
+    def __init__(self, root: str | Path, mode: str = "auto"):
+        self.root = Path(root)
+        self.mode = mode
+        self.backend: Optional[str] = None
+        # (resolved dir, dir as given, callback)
+        self._subscribers: List[Tuple[Path, Path, Callable[[Set[Path]], None]]] = []
+        self._lock = threading.Lock()
+        self._pending: Set[Path] = set()
+        self._dispatch_timer: Optional[threading.Timer] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+        self._wake_r, self._wake_w = -1, -1
+
+    # ── Subscriptions ─────────────────────────────────────
+
+    def subscribe(self, directory: str | Path, callback: Callable[[Set[Path]], None]):
+        """Call *callback(paths)* with changed paths under *directory*.
+
+        Paths are passed relative to *directory* as given (not resolved),
+        so they compare equal to the subscriber's own file paths.
+        """
+        with self._lock:
+            self._subscribers.append((Path(directory).resolve(), Path(directory), callback))
+
+    def unsubscribe(self, callback: Callable[[Set[Path]], None]):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[2] != callback]
+
+    # ── Lifecycle ─────────────────────────────────────────
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.mode != "poll":
+            try:
+                self._inotify = _Inotify(self.root)
+                self._wake_r, self._wake_w = os.pipe()
+                self.backend = "inotify"
+            except (OSError, AttributeError) as e:
+                logger.warning(f"[FsWatch] inotify unavailable for {self.root} ({e}), polling instead")
+        if self._inotify is None:
+            self.backend = "poll"
+            self._listing = _tree_listing(self.root)
+        target = self._run_inotify if self._inotify is not None else self._run_poll
+        self._thread = threading.Thread(target=target, name=f"fswatch-{self.root.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"[FsWatch] Watching {self.root} ({self.backend})")
+
+    def stop(self):
+        self._stop.set()
+        if self._wake_w >= 0:
+            os.write(self._wake_w, b"x")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            if self._dispatch_timer is not None:
+                self._dispatch_timer.cancel()
+                self._dispatch_timer = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._wake_r = self._wake_w = -1
+
+    # ── Backends ──────────────────────────────────────────
+
+    def _run_inotify(self):
+        while not self._stop.is_set():
+            try:
+                ready, _, _ = select.select([self._inotify.fd, self._wake_r], [], [])
+            except (OSError, ValueError):
+                return
+            if self._stop.is_set():
+                return
+            if self._inotify.fd in ready:
+                self._queue(self._inotify.read(self.root))
+
+    def _run_poll(self):
+        while not self._stop.wait(POLL_INTERVAL):
+            self.poll()
+
+    def poll(self):
+        """Diff the tree against the previous listing (poll backend)."""
+        listing = _tree_listing(self.root)
+        old = self._listing
+        changed = {fp for fp, sig in listing.items() if old.get(fp) != sig}
+        changed.update(fp for fp in old if fp not in listing)
+        self._listing = listing
+        self._queue(changed)
+
+    # ── Dispatch ──────────────────────────────────────────
+
+    def _queue(self, paths: Set[Path]):
+        if not paths:
+            return
+        with self._lock:
+            self._pending |= paths
+            if self._dispatch_timer is None:
+                timer = threading.Timer(DEBOUNCE, self._dispatch)
+                timer.daemon = True
+                self._dispatch_timer = timer
+                timer.start()
+
+    def _dispatch(self):
+        with self._lock:
+            paths, self._pending = self._pending, set()
+            self._dispatch_timer = None
+            subscribers = list(self._subscribers)
+        for resolved, directory, callback in subscribers:
+            if self.root in paths:
+                mine = {directory}
+            else:
+                mine = {directory / p.relative_to(resolved) for p in paths
+                        if p == resolved or resolved in p.parents}
+            if not mine:
+                continue
+            try:
+                callback(mine)
+            except Exception as e:
+                logger.error(f"[FsWatch] Subscriber for {directory} failed: {e}")
+
+
+# ── Shared watchers (one per dumps tree) ──────────────────
+
+_watchers: Dict[Path, DumpsWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def watcher_for(root: str | Path, mode: Optional[str] = None) -> Optional[DumpsWatcher]:
+    """The started watcher for *root*, or None when watching is off.
+
+    mode defaults to DUMPS_WATCH; every portfolio under the same dumps tree
+    shares one watcher.
+    """
+    mode = WATCH_MODE if mode is None else mode
+    if not mode:
+        return None
+    root = Path(root).resolve()
+    with _watchers_lock:
+        watcher = _watchers.get(root)
+        if watcher is None:
+            watcher = DumpsWatcher(root, mode)
+            watcher.start()
+            _watchers[root] = watcher
+        return watcher
+
+
+def stop_all():
+    """Stop every shared watcher (app shutdown)."""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
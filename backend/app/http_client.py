@@ -0,0 +1,177 @@
+"""
+Shared keep-alive HTTP client for outbound calls.
+
+The services used to call the module-level requests.get / requests.post
+(or urllib.request.urlopen), which opens a new connection (DNS lookup,
+TCP and TLS handshake) for every request and closes it again.  A price
+refresh or news sweep makes hundreds of calls to a handful of hosts, so
+most of each call was connection setup.
+
+get() / post() here go through one process-wide session instead:
+
+  - one connection pool per host, with up to POOL_SIZE idle connections
+    kept alive for reuse (thread-safe, shared by the fetch workers);
+  - a default (connect, read) timeout for every call, so nothing can hang
+    on a silent server; a scalar timeout= is the read timeout, with the
+    connect timeout capped to it;
+  - no cookie persistence, so calls stay as stateless as the module-level
+    functions they replace;
+  - optionally HTTP/2 through httpx (HTTP2=1, needs the h2 package), which
+    multiplexes concurrent calls to a host over one connection.
+
+Both backends return responses with the requests API the services use
+(status_code, text, content, json(), raise_for_status()).  Wrap calls in
+provider_health as before:
+
+    resp = provider_health.call("amfi", http_client.get, url, timeout=15)
+
+Tuning via environment:
+  HTTP_POOL_SIZE        idle connections kept per host (default 10)
+  HTTP_CONNECT_TIMEOUT  default connect timeout in seconds (default 5)
+  HTTP_READ_TIMEOUT     default read timeout in seconds (default 15)
+  HTTP2                 1 = use httpx with HTTP/2 (default 0)
+"""
+
+import http.cookiejar
+import logging
+import os
+import threading
+from typing import Tuple, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(0.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+POOL_SIZE = max(1, int(_env_float("HTTP_POOL_SIZE", 10)))
+POOL_HOSTS = 32         # per-host pools kept before the least recent is dropped
+CONNECT_TIMEOUT = _env_float("HTTP_CONNECT_TIMEOUT", 5.0)
+READ_TIMEOUT = _env_float("HTTP_READ_TIMEOUT", 15.0)
+HTTP2 = os.getenv("HTTP2", "").strip().lower() in ("1", "true", "yes")
+
+# Transport errors from either backend (catch instead of
+# requests.exceptions.RequestException)
+RequestError = (requests.exceptions.RequestException, httpx.HTTPError)
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+
+def _timeout(timeout: Timeout) -> Tuple[float, float]:
+    """(connect, read) seconds for a call's timeout= argument."""
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return tuple(timeout)
+
+
+# Rejects every Set-Cookie
+_NO_COOKIES = http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+
+
+# ═══════════════════════════════════════════════════════════
+#  BACKENDS
+# ═══════════════════════════════════════════════════════════
+
+class _RequestsBackend:
+    """requests.Session over urllib3's per-host pools (HTTP/1.1 keep-alive)."""
+
+    name = "requests"
+
+    def __init__(self, pool_size: int = POOL_SIZE):
+        self.session = requests.Session()
+        self.session.cookies.set_policy(_NO_COOKIES)
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, url: str, timeout: Tuple[float, float], **kwargs):
+        return self.session.request(method, url, timeout=timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class _HttpxBackend:
+    """httpx.Client with HTTP/2 (one multiplexed connection per host)."""
+
+    name = "httpx"
+
+    def __init__(self, pool_size: int = POOL_SIZE, http2: bool = True):
+        self.client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=pool_size * POOL_HOSTS),
+            cookies=http.cookiejar.CookieJar(_NO_COOKIES),
+        )
+
+    def request(self, method: str, url: str, timeout: Tuple[float, float],
+                allow_redirects: bool = True, **kwargs):
+        connect, read = timeout
+        return self.client.request(method, url, timeout=httpx.Timeout(read, connect=connect),
+                                   follow_redirects=allow_redirects, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+def _make_backend():
+    if HTTP2:
+        try:
+            import h2  # noqa: F401
+            return _HttpxBackend()
+        except ImportError:
+            logger.warning("[HTTP] HTTP2=1 but the h2 package is not installed — using HTTP/1.1")
+    return _RequestsBackend()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _make_backend()
+    return _backend
+
+
+# ═══════════════════════════════════════════════════════════
+#  API
+# ═══════════════════════════════════════════════════════════
+
+def request(method: str, url: str, timeout: Timeout = None, **kwargs):
+    """*method* *url* on the shared pooled session (requests-style kwargs)."""
+    return _get_backend().request(method, url, timeout=_timeout(timeout), **kwargs)
+
+
+def get(url: str, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def backend_name() -> str:
+    return _get_backend().name
+
+
+def close():
+    """Close pooled connections; the next call opens a fresh session."""
+    global _backend
+    with _backend_lock:
+        backend, _backend = _backend, None
+    if backend is not None:
+        backend.close()
@@ -0,0 +1,132 @@
+"""
+Versioned change feed for live prices, NAVs and market tickers.
+
+The price cache (stock_service), the NAV cache (mf_xlsx_database) and the
+market-ticker refresh publish one event per entry whose value actually
+changed.  Every event gets the next version number and is kept in a
+bounded ring, so a client that reconnects with the last version it saw
+(SSE Last-Event-ID) gets exactly what it missed — or a "reset" event when
+that has already been dropped and it has to reload.
+
+publish() is called from worker threads; subscribers are async generators
+on the server's event loop, woken with call_soon_threadsafe.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CAPACITY = 4096         # events kept for resuming clients
+HEARTBEAT = 15.0        # seconds between keep-alive comments on an idle stream
+RETRY_MS = 3000         # client reconnect delay (SSE "retry:")
+
+# (version, kind, key, data)
+Event = Tuple[int, str, str, dict]
+
+
+def format_sse(event: str, version: int, payload: dict) -> str:
+    """One Server-Sent Events message."""
+    return f"id: {version}\nevent: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+class ChangeFeed:
+    """Bounded, versioned log of (kind, key, data) changes."""
+
+    def __init__(self, capacity: int = CAPACITY):
+        self._lock = threading.Lock()
+        self._events: Deque[Event] = deque(maxlen=capacity)
+        self.version = 0
+        # (loop, asyncio.Event) per connected stream
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._waiters)
+
+    def publish(self, kind: str, key: str, data: dict) -> int:
+        """Append a change and wake every stream; returns its version."""
+        with self._lock:
+            self.version += 1
+            version = self.version
+            self._events.append((version, kind, key, data))
+            waiters = list(self._waiters)
+        for loop, wake in waiters:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                # Loop already closed (server shutting down)
+                pass
+        return version
+
+    def since(self, version: int) -> Optional[List[Event]]:
+        """Events after *version*, oldest first.
+
+        None when some of them were already dropped from the ring (or
+        *version* is from before a restart) — the caller must reload.
+        """
+        with self._lock:
+            if version == self.version:
+                return []
+            if version > self.version:
+                return None
+            first = self._events[0][0] if self._events else self.version + 1
+            if version + 1 < first:
+                return None
+            return list(itertools.islice(self._events, version + 1 - first, None))
+
+    async def stream(self, since: Optional[int] = None,
+                     accept: Optional[Callable[[str, str], bool]] = None,
+                     heartbeat: float = HEARTBEAT) -> AsyncIterator[str]:
+        """SSE text for every change after *since* (None → from now on).
+
+        *accept(kind, key)* filters what this client is sent; skipped
+        events still advance its position.
+        """
+        wake = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), wake)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if since is None:
+                since = self.version
+                yield format_sse("hello", since, {"version": since})
+            while True:
+                wake.clear()
+                batch = self.since(since)
+                if batch is None:
+                    since = self.version
+                    yield format_sse("reset", since, {"version": since})
+                    continue
+                for version, kind, key, data in batch:
+                    since = version
+                    if accept is None or accept(kind, key):
+                        yield format_sse(kind, version, {"key": key, **data})
+                if batch:
+                    continue
+                try:
+                    await asyncio.wait_for(wake.wait(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+# Process-wide feed shared by all price sources and streams
+feed = ChangeFeed()
+
+
+def publish(kind: str, key: str, data: dict) -> int:
+    """Publish to the shared feed (never raises — callers hold cache locks)."""
+    try:
+        return feed.publish(kind, key, data)
+    except Exception as e:
+        logger.error(f"[LiveFeed] Publish {kind} {key} failed: {e}")
+        return feed.version
@@ -1,19 +1,23 @@
 """
 Stock Portfolio Dashboard - FastAPI Backend
 """
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from fastapi.encoders import jsonable_encoder
 from typing import List, Dict, Optional
 from datetime import date, datetime, timedelta
 import os
 import json
+import hashlib
 import uuid
 import time
 import threading
 import traceback
 import contextvars
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
 from .models import (
     AddStockRequest, SellStockRequest, AddDividendRequest, ManualPriceRequest,
@@ -29,8 +33,11 @@ from .models import (
     CDSLCASUpload, MFImportPayload,
     DividendStatementUpload,
 )
-from .xlsx_database import xlsx_db as db, XlsxPortfolio
-from .mf_xlsx_database import mf_db, clear_nav_cache as clear_mf_nav_cache, MFXlsxPortfolio
+from .xlsx_database import xlsx_db as db, XlsxPortfolio, dividend_transaction
+from .mf_xlsx_database import (
+    mf_db, clear_nav_cache as clear_mf_nav_cache, fetch_live_navs as fetch_mf_live_navs,
+    nav_version as mf_nav_version, MFXlsxPortfolio,
+)
 from .config import get_users, save_users, get_user_dumps_dir, get_user_email, get_users_for_email
 from . import stock_service
 from . import zerodha_service
@@ -40,11 +47,19 @@ from . import epaper_service
 from . import notification_service
 from . import alert_service
 from . import expiry_rules
+from . import fs_watcher
+from . import live_feed
+from . import provider_health
+from . import refresh_jobs
+from . import request_memo
+from . import stock_summary
 from . import user_settings
+from . import user_db_cache
+from . import http_client
 from . import auth as auth_module
 from pydantic import BaseModel
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 import logging
 from uvicorn.logging import DefaultFormatter
 
@@ -162,6 +177,15 @@ def on_shutdown():  # pragma: no cover
     _stop_ticker_bg_refresh()
     alert_service.stop_alert_bg_thread()
     logger.info("[App] Background refreshes stopped")
+    # Apply journaled stock writes now rather than on the next startup
+    stock_dbs = [db] + [dbs["stocks"] for dbs in _user_dbs.values()]
+    for stocks in stock_dbs:
+        try:
+            stocks.flush_journal()
+        except Exception as e:
+            logger.error(f"[App] Journal flush on shutdown failed: {e}")
+    fs_watcher.stop_all()
+    http_client.close()
 
 # CORS for React dev server
 app.add_middleware(
@@ -223,6 +247,11 @@ async def user_context_middleware(request: Request, call_next):
     user_id = request.headers.get("x-user-id", "")
     token = _current_user_id.set(user_id)
     try:
+        if request.method in ("GET", "HEAD"):
+            # Reads validate each portfolio once per request, however many
+            # accessors the handler calls (writes always see fresh data).
+            with request_memo.request_scope():
+                return await call_next(request)
         response = await call_next(request)
         return response
     finally:
@@ -237,9 +266,11 @@ async def user_context_middleware(request: Request, call_next):
 _current_user_id: contextvars.ContextVar[str] = contextvars.ContextVar('_current_user_id', default='')
 _current_email: contextvars.ContextVar[str] = contextvars.ContextVar('_current_email', default='')
 
-# Per-user DB instances: {(user_id, email): {"stocks": XlsxPortfolio, "mf": MFXlsxPortfolio}}
-_user_dbs: Dict[tuple, dict] = {}
-_user_dbs_lock = threading.Lock()
+# Per-user DB instances: {(user_id, email): {"stocks": XlsxPortfolio, "mf": MFXlsxPortfolio}},
+# bounded by size and idle time (see user_db_cache)
+_user_dbs = user_db_cache.UserDBCache()
+_user_dbs_create_locks: Dict[tuple, threading.Lock] = {}
+_user_dbs_create_guard = threading.Lock()
 
 
 def _get_default_user_id() -> str:
@@ -256,36 +287,59 @@ def _resolve_email() -> str:
     return _current_email.get() or ""
 
 
+def _user_cache_key(user_id: str) -> tuple:
+    return (user_id, _resolve_email() or get_user_email(user_id) or "")
+
+
 def _get_user_dbs(user_id: str) -> dict:
     """Get or create DB instances for a user."""
-    email = _resolve_email() or get_user_email(user_id) or ""
-    cache_key = (user_id, email)
-    with _user_dbs_lock:
-        if cache_key in _user_dbs:
-            return _user_dbs[cache_key]
-    # Outside lock — create instances (I/O)
-    dumps = get_user_dumps_dir(user_id, email=email or None)
-    from .mf_xlsx_database import MFXlsxPortfolio
-    dbs = {
-        "stocks": XlsxPortfolio(dumps / "Stocks"),
-        "mf": MFXlsxPortfolio(dumps / "Mutual Funds"),
-        "dumps_dir": dumps,
-    }
-    with _user_dbs_lock:
-        _user_dbs[cache_key] = dbs
-    return dbs
+    cache_key = _user_cache_key(user_id)
+    dbs = _user_dbs.get(cache_key)
+    if dbs is not None:
+        return dbs
+    # Not cached (first use or evicted) — create instances (I/O; warm
+    # from the on-disk parse cache).  One creator per user, so two
+    # instances never replay the same write journal.
+    with _user_dbs_create_guard:
+        create_lock = _user_dbs_create_locks.setdefault(cache_key, threading.Lock())
+    with create_lock:
+        dbs = _user_dbs.get(cache_key)
+        if dbs is not None:
+            return dbs
+        user_id, email = cache_key
+        dumps = get_user_dumps_dir(user_id, email=email or None)
+        from .mf_xlsx_database import MFXlsxPortfolio
+        dbs = {
+            "stocks": XlsxPortfolio(dumps / "Stocks"),
+            "mf": MFXlsxPortfolio(dumps / "Mutual Funds"),
+            "dumps_dir": dumps,
+        }
+        return _user_dbs.put(cache_key, dbs)
+
+
+def _current_user_cache_key() -> Optional[tuple]:
+    """The _user_dbs key serving this request, or None for the default DBs."""
+    uid = _resolve_user_id()
+    if uid == _default_user_id() and not _resolve_email():
+        return None
+    return _user_cache_key(uid)
+
+
+def _default_user_id() -> str:
+    """_get_default_user_id(), read from users.json once per request."""
+    return request_memo.memoized("default_user_id", _get_default_user_id)
 
 
 def _resolve_user_id() -> str:
     """Get the current request's user ID from contextvar."""
     uid = _current_user_id.get()
-    return uid or _get_default_user_id()
+    return uid or _default_user_id()
 
 
 def udb():
     """Get stock DB for the current request's user."""
     uid = _resolve_user_id()
-    if uid == _get_default_user_id() and not _resolve_email():
+    if uid == _default_user_id() and not _resolve_email():
         return db
     return _get_user_dbs(uid)["stocks"]
 
@@ -293,7 +347,7 @@ def udb():
 def umf():
     """Get MF DB for the current request's user."""
     uid = _resolve_user_id()
-    if uid == _get_default_user_id() and not _resolve_email():
+    if uid == _default_user_id() and not _resolve_email():
         return mf_db
     return _get_user_dbs(uid)["mf"]
 
@@ -301,8 +355,36 @@ def umf():
 def user_dumps_dir():
     """Get dumps dir for the current request's user."""
     uid = _resolve_user_id()
-    email = _resolve_email() or get_user_email(uid)
-    return get_user_dumps_dir(uid, email=email)
+
+    def resolve():
+        email = _resolve_email() or get_user_email(uid)
+        return get_user_dumps_dir(uid, email=email)
+    return request_memo.memoized(("dumps_dir", uid), resolve)
+
+
+# ══════════════════════════════════════════════════════════
+#  CONDITIONAL GET (ETag / If-None-Match)
+# ══════════════════════════════════════════════════════════
+
+# Version counters restart with the process, so tags carry a boot id too
+_ETAG_BOOT = uuid.uuid4().hex
+
+
+def _not_modified(request: Request, response: Response, *versions) -> Optional[Response]:
+    """Tag *response* with a strong ETag over *versions*.
+
+    Returns a bare 304 to send instead when the client's If-None-Match
+    already has that tag — call this before building the body.
+    """
+    raw = repr((_ETAG_BOOT, request.url.path, request.url.query) + versions)
+    etag = '"' + hashlib.blake2b(raw.encode(), digest_size=12).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*"
+                          or etag in (t.strip() for t in if_none_match.split(","))):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
 
 
 def _auto_provision_user(email: str, google_name: str):
@@ -568,8 +650,11 @@ def drive_sync_now():
 # ══════════════════════════════════════════════════════════
 
 @app.get("/api/portfolio", response_model=List[HoldingWithLive])
-def get_portfolio():
+def get_portfolio(request: Request, response: Response):
     """Get all holdings with cached price data (instant, no network calls)."""
+    cached = _not_modified(request, response, udb().data_version, stock_service.cache_version())
+    if cached is not None:
+        return cached
     holdings = udb().get_all_holdings()
     if not holdings:
         return []
@@ -645,8 +730,8 @@ def track_stocks(symbols: List[Dict]):
             continue
         filepath = db._create_stock_file(symbol, exchange, name)
         added.append({"symbol": symbol, "exchange": exchange, "name": name})
-    # Rebuild file map so new files are indexed
-    db._build_file_map()
+    # Incremental reindex so new files are indexed
+    db.reindex()
     # Pre-fetch prices so they're in cache immediately
     if added:
         stock_service.fetch_multiple([(s["symbol"], s["exchange"]) for s in added])
@@ -860,6 +945,8 @@ def import_dividends_confirmed(req: dict):
 
     # Cache fingerprints per symbol for batch dedup
     _fp_cache: dict = {}
+    # Rows queued per symbol, written with one workbook load/save per stock
+    pending: Dict[str, list] = {}
 
     for div in dividends:
         symbol = (div.get("symbol") or "").upper()
@@ -882,22 +969,22 @@ def import_dividends_confirmed(req: dict):
             skipped_dups += 1
             continue
 
+        pending.setdefault(symbol, []).append(
+            dividend_transaction(amount, div_date, div.get("remarks", "DIVIDEND")))
+        # Update in-memory cache
+        _fp_cache[symbol].add(fp)
+
+    for symbol, txs in pending.items():
         try:
-            udb().add_dividend(
-                symbol=symbol,
-                exchange="NSE",
-                amount=amount,
-                dividend_date=div_date,
-                remarks=div.get("remarks", "DIVIDEND"),
-            )
-            imported += 1
-            details.append({"symbol": symbol, "date": div_date, "amount": amount})
-            # Update in-memory cache
-            _fp_cache[symbol].add(fp)
+            udb().insert_transactions(symbol, txs)
         except FileNotFoundError:
-            errors.append(f"{symbol}: No xlsx file found")
+            errors.extend(f"{symbol}: No xlsx file found" for _ in txs)
+            continue
         except Exception as e:
-            errors.append(f"{symbol}: {str(e)[:100]}")
+            errors.extend(f"{symbol}: {str(e)[:100]}" for _ in txs)
+            continue
+        imported += len(txs)
+        details.extend({"symbol": symbol, "date": t.date, "amount": t.price} for t in txs)
 
     if imported > 0:
         udb().reindex()
@@ -945,6 +1032,26 @@ def _decode_and_parse_pdf(req: ContractNoteUpload) -> dict:
         raise HTTPException(status_code=500, detail=f"Failed to parse PDF: {str(e)[:200]}")
 
 
+def _write_import_batches(pending: Dict[str, list], imported_buys: list,
+                          imported_sells: list, errors: list):
+    """Write queued contract-note rows, one workbook load/save per stock.
+
+    pending maps symbol → [Transaction] in contract-note order.  If a stock's
+    batch fails, its rows move from the imported lists to errors.
+    """
+    for symbol, txs in pending.items():
+        try:
+            udb().insert_transactions(symbol, txs)
+        except Exception as e:
+            for t in txs:
+                error_msg = f"{t.action} {symbol}: {str(e)[:100]}"
+                errors.append(error_msg)
+                logger.error(f"[Import] Error: {error_msg}")
+            logger.error(traceback.format_exc())
+            imported_buys[:] = [b for b in imported_buys if b["symbol"] != symbol]
+            imported_sells[:] = [x for x in imported_sells if x["symbol"] != symbol]
+
+
 @app.post("/api/portfolio/parse-contract-note")
 def parse_contract_note_preview(req: ContractNoteUpload):
     """Parse a contract note PDF and return a preview — no data is written.
@@ -1047,6 +1154,7 @@ def import_contract_note(req: ContractNoteUpload):
     imported_buys = []
     imported_sells = []
     errors = []
+    pending: Dict[str, list] = {}  # symbol -> [Transaction], written after the loop
 
     for tx in transactions:
         try:
@@ -1103,7 +1211,7 @@ def import_contract_note(req: ContractNoteUpload):
                     notes=remark,
                 )
 
-                # Use _insert_transaction directly for precise cost control
+                # Build the row directly (not via add_holding) for precise cost control
                 filepath = udb()._find_file_for_symbol(tx["symbol"])
                 if filepath is None:
                     filepath = udb()._create_stock_file(
@@ -1121,8 +1229,7 @@ def import_contract_note(req: ContractNoteUpload):
                     stt=tx["stt"],
                     add_chrg=tx["add_charges"],
                 )
-                udb()._insert_transaction(filepath, buy_tx)
-                udb()._invalidate_symbol(tx["symbol"])
+                pending.setdefault(tx["symbol"], []).append(buy_tx)
 
                 imported_buys.append({
                     "symbol": tx["symbol"],
@@ -1154,8 +1261,7 @@ def import_contract_note(req: ContractNoteUpload):
                     stt=tx["stt"],
                     add_chrg=tx["add_charges"],
                 )
-                udb()._insert_transaction(filepath, sell_tx)
-                udb()._invalidate_symbol(tx["symbol"])
+                pending.setdefault(tx["symbol"], []).append(sell_tx)
 
                 imported_sells.append({
                     "symbol": tx["symbol"],
@@ -1172,6 +1278,8 @@ def import_contract_note(req: ContractNoteUpload):
             logger.error(f"[Import] Error: {error_msg}")
             logger.error(traceback.format_exc())
 
+    _write_import_batches(pending, imported_buys, imported_sells, errors)
+
     # Reindex to pick up any new files
     udb().reindex()
 
@@ -1231,6 +1339,7 @@ def import_contract_note_confirmed(req: ConfirmedImportPayload):
     imported_buys = []
     imported_sells = []
     errors = []
+    pending: Dict[str, list] = {}  # symbol -> [Transaction], written after the loop
 
     for tx in transactions:
         try:
@@ -1285,8 +1394,7 @@ def import_contract_note_confirmed(req: ConfirmedImportPayload):
                     stt=tx.get("stt", 0),
                     add_chrg=tx.get("add_charges", 0),
                 )
-                udb()._insert_transaction(filepath, buy_tx)
-                udb()._invalidate_symbol(tx["symbol"])
+                pending.setdefault(tx["symbol"], []).append(buy_tx)
 
                 imported_buys.append({
                     "symbol": tx["symbol"],
@@ -1313,8 +1421,7 @@ def import_contract_note_confirmed(req: ConfirmedImportPayload):
                     stt=tx.get("stt", 0),
                     add_chrg=tx.get("add_charges", 0),
                 )
-                udb()._insert_transaction(filepath, sell_tx)
-                udb()._invalidate_symbol(tx["symbol"])
+                pending.setdefault(tx["symbol"], []).append(sell_tx)
 
                 imported_sells.append({
                     "symbol": tx["symbol"],
@@ -1334,6 +1441,7 @@ def import_contract_note_confirmed(req: ConfirmedImportPayload):
             logger.error(f"[Import] Error: {error_msg}")
             logger.error(traceback.format_exc())
 
+    _write_import_batches(pending, imported_buys, imported_sells, errors)
     udb().reindex()
 
     if skipped_dups > 0:
@@ -1363,286 +1471,86 @@ def import_contract_note_confirmed(req: ConfirmedImportPayload):
 # ══════════════════════════════════════════════════════════
 
 @app.get("/api/portfolio/stock-summary", response_model=List[StockSummaryItem])
-def get_stock_summary():
-    """Get per-stock aggregated data showing held + sold quantities."""
+def get_stock_summary(request: Request, response: Response):
+    """Get per-stock aggregated data showing held + sold quantities.
+
+    Price-independent totals come from the materialized per-symbol table
+    (see stock_summary); only the live-price fields are computed here.
+    """
     db = udb()
-    holdings, sold_positions, dividends_by_symbol = db.get_all_data()
+    cached = _not_modified(request, response, db.data_version,
+                           stock_service.cache_version(), date.today())
+    if cached is not None:
+        return cached
+    snap = db.snapshot()
+    rows = stock_summary.table_for(db).rows(snap)
 
-    # Collect all symbols: held + sold + watchlist (files with 0 transactions)
-    base_symbols = set((h.symbol, h.exchange) for h in holdings)
-    for s in sold_positions:
-        base_symbols.add((s.symbol, s.exchange))
-    # Add watchlist-only stocks from file map (no xlsx I/O — use cached instrument names)
-    held_syms = {h.symbol for h in holdings}
-    sold_syms = {s.symbol for s in sold_positions}
-    _watchlist_meta = {}
-    for sym in db._file_map:
-        if sym not in held_syms and sym not in sold_syms:
-            exch = "NSE"
-            name_val = zerodha_service.lookup_instrument_name(sym, exch) or sym
-            base_symbols.add((sym, exch))
-            _watchlist_meta[sym] = {"exchange": exch, "name": name_val}
+    # All symbols: held + sold + watchlist (files with 0 transactions)
+    symbols = set(rows) | set(db._file_map)
 
     # Use cached prices (fast, consistent — background refresh keeps them fresh)
-    symbols_with_alt = set(base_symbols)
-    for sym, exch in base_symbols:
-        alt = "NSE" if exch == "BSE" else "BSE"
-        symbols_with_alt.add((sym, alt))
-    live_data = stock_service.get_cached_prices(list(symbols_with_alt)) if base_symbols else {}
-
-    # Group holdings by symbol
-    held_by_symbol: dict = {}
-    for h in holdings:
-        key = h.symbol
-        if key not in held_by_symbol:
-            held_by_symbol[key] = {"lots": [], "exchange": h.exchange, "name": h.name}
-        held_by_symbol[key]["lots"].append(h)
-
-    # Group sold positions by symbol
-    sold_by_symbol: dict = {}
-    for s in sold_positions:
-        key = s.symbol
-        if key not in sold_by_symbol:
-            sold_by_symbol[key] = {"lots": [], "exchange": s.exchange, "name": s.name}
-        sold_by_symbol[key]["lots"].append(s)
-
-    # Add watchlist stocks to held_by_symbol (with empty lots)
-    for sym, meta in _watchlist_meta.items():
-        if sym not in held_by_symbol:
-            held_by_symbol[sym] = {"lots": [], "exchange": meta["exchange"], "name": meta["name"]}
-
-    # Combine all symbols
-    all_symbols = set(list(held_by_symbol.keys()) + list(sold_by_symbol.keys()))
+    wanted = set()
+    for sym in symbols:
+        wanted.update(stock_summary.price_keys(sym, rows.get(sym)))
+    live_data = stock_service.get_cached_prices(list(wanted)) if wanted else {}
 
     result = []
-    for sym in all_symbols:
-        try:
-            held_info = held_by_symbol.get(sym, {"lots": [], "exchange": "NSE", "name": sym})
-            sold_info = sold_by_symbol.get(sym, {"lots": [], "exchange": "NSE", "name": sym})
-
-            held_lots = held_info["lots"]
-            sold_lots = sold_info["lots"]
-            exchange = held_info["exchange"] if held_lots else sold_info["exchange"]
-            name = held_info["name"] if held_lots else sold_info["name"]
-
-            # If name is just the symbol (no proper company name), resolve it
-            if not name or name == sym:
-                resolved = zerodha_service.lookup_instrument_name(sym, exchange)
-                if resolved:
-                    name = resolved
-
-            total_held_qty = sum(h.quantity for h in held_lots)
-            total_sold_qty = sum(s.quantity for s in sold_lots)
-            # total_invested = sum of column F (COST) for held lots
-            total_invested = sum(
-                h.buy_cost if h.buy_cost > 0 else (h.buy_price * h.quantity)
-                for h in held_lots
-            )
-            avg_buy_price = (total_invested / total_held_qty) if total_held_qty > 0 else 0
-            # avg_price = weighted average of raw transaction price (column E)
-            avg_price = (
-                sum(h.price * h.quantity for h in held_lots) / total_held_qty
-            ) if total_held_qty > 0 else 0
-            realized_pl = sum(s.realized_pl for s in sold_lots)
-            total_sold_cost = sum(s.buy_price * s.quantity for s in sold_lots)
-            realized_pl_pct = (realized_pl / total_sold_cost * 100) if total_sold_cost > 0 else 0
-            # Split realized P&L by holding period (LTCG vs STCG)
-            ltcg_realized_pl = 0.0
-            stcg_realized_pl = 0.0
-            ltcg_sold_qty = 0
-            stcg_sold_qty = 0
-            ltcg_sold_cost = 0.0
-            stcg_sold_cost = 0.0
-            ltcg_sold_earliest_buy = ""
-            ltcg_sold_latest_sell = ""
-            stcg_sold_earliest_buy = ""
-            stcg_sold_latest_sell = ""
-            for s in sold_lots:
-                try:
-                    b_dt = datetime.strptime(s.buy_date, "%Y-%m-%d").date()
-                    s_dt = datetime.strptime(s.sell_date, "%Y-%m-%d").date()
-                    is_lt = (s_dt - b_dt).days > 365
-                except Exception:
-                    is_lt = False
-                if is_lt:
-                    ltcg_realized_pl += s.realized_pl
-                    ltcg_sold_qty += s.quantity
-                    ltcg_sold_cost += s.buy_price * s.quantity
-                    if not ltcg_sold_earliest_buy or s.buy_date < ltcg_sold_earliest_buy:
-                        ltcg_sold_earliest_buy = s.buy_date
-                    if not ltcg_sold_latest_sell or s.sell_date > ltcg_sold_latest_sell:
-                        ltcg_sold_latest_sell = s.sell_date
-                else:
-                    stcg_realized_pl += s.realized_pl
-                    stcg_sold_qty += s.quantity
-                    stcg_sold_cost += s.buy_price * s.quantity
-                    if not stcg_sold_earliest_buy or s.buy_date < stcg_sold_earliest_buy:
-                        stcg_sold_earliest_buy = s.buy_date
-                    if not stcg_sold_latest_sell or s.sell_date > stcg_sold_latest_sell:
-                        stcg_sold_latest_sell = s.sell_date
-
-            # Live data — try primary exchange, fall back to alternate (BSE↔NSE)
-            live_key = f"{sym}.{exchange}"
-            live = live_data.get(live_key)
-            if not live or (live.current_price or 0) <= 0:
-                alt_exchange = "NSE" if exchange == "BSE" else "BSE"
-                alt_key = f"{sym}.{alt_exchange}"
-                alt_live = live_data.get(alt_key)
-                if alt_live and (alt_live.current_price or 0) > 0:
-                    live = alt_live
-            current_price = live.current_price if live else 0
-            current_value = current_price * total_held_qty
-            unrealized_pl = current_value - total_invested
-            unrealized_pl_pct = (unrealized_pl / total_invested * 100) if total_invested > 0 else 0
-
-            # Per-lot profitability: split into profitable vs loss lots AND LTCG vs STCG
-            profitable_qty = 0
-            loss_qty = 0
-            unrealized_profit = 0.0  # P&L sum from lots where current > buy
-            unrealized_loss = 0.0    # P&L sum from lots where current <= buy
-            ltcg_unrealized_profit = 0.0
-            stcg_unrealized_profit = 0.0
-            ltcg_unrealized_loss = 0.0
-            stcg_unrealized_loss = 0.0
-            ltcg_profitable_qty = 0
-            stcg_profitable_qty = 0
-            ltcg_loss_qty = 0
-            stcg_loss_qty = 0
-            ltcg_invested = 0.0
-            stcg_invested = 0.0
-            ltcg_earliest_date = ""
-            stcg_earliest_date = ""
-            today = date.today()
-            if current_price > 0:
-                for h in held_lots:
-                    lot_pl = (current_price - h.buy_price) * h.quantity
-                    lot_cost = h.buy_cost if h.buy_cost > 0 else (h.buy_price * h.quantity)
-                    # Determine LTCG vs STCG (India: >365 days = long-term)
-                    try:
-                        buy_dt = datetime.strptime(h.buy_date, "%Y-%m-%d").date()
-                        is_ltcg = (today - buy_dt).days > 365
-                    except Exception:
-                        is_ltcg = False
-                    # Track per-category invested & earliest date
-                    if is_ltcg:
-                        ltcg_invested += lot_cost
-                        if not ltcg_earliest_date or h.buy_date < ltcg_earliest_date:
-                            ltcg_earliest_date = h.buy_date
-                    else:
-                        stcg_invested += lot_cost
-                        if not stcg_earliest_date or h.buy_date < stcg_earliest_date:
-                            stcg_earliest_date = h.buy_date
-                    if current_price > h.buy_price:
-                        profitable_qty += h.quantity
-                        unrealized_profit += lot_pl
-                        if is_ltcg:
-                            ltcg_unrealized_profit += lot_pl
-                            ltcg_profitable_qty += h.quantity
-                        else:
-                            stcg_unrealized_profit += lot_pl
-                            stcg_profitable_qty += h.quantity
-                    else:
-                        loss_qty += h.quantity
-                        unrealized_loss += lot_pl
-                        if is_ltcg:
-                            ltcg_unrealized_loss += lot_pl
-                            ltcg_loss_qty += h.quantity
-                        else:
-                            stcg_unrealized_loss += lot_pl
-                            stcg_loss_qty += h.quantity
-
-            price_error = ""
-            if total_held_qty > 0 and (not live or current_price <= 0):
-                price_error = f"Price unavailable for {sym}.{exchange}"
-
-            result.append(StockSummaryItem(
-                symbol=sym,
-                exchange=exchange,
-                name=name,
-                total_held_qty=total_held_qty,
-                total_sold_qty=total_sold_qty,
-                avg_price=round(avg_price, 2),
-                avg_buy_price=round(avg_buy_price, 2),
-                total_invested=round(total_invested, 2),
-                current_value=round(current_value, 2),
-                unrealized_pl=round(unrealized_pl, 2),
-                unrealized_pl_pct=round(unrealized_pl_pct, 2),
-                unrealized_profit=round(unrealized_profit, 2),
-                unrealized_loss=round(unrealized_loss, 2),
-                realized_pl=round(realized_pl, 2),
-                realized_pl_pct=round(realized_pl_pct, 2),
-                ltcg_unrealized_profit=round(ltcg_unrealized_profit, 2),
-                stcg_unrealized_profit=round(stcg_unrealized_profit, 2),
-                ltcg_unrealized_loss=round(ltcg_unrealized_loss, 2),
-                stcg_unrealized_loss=round(stcg_unrealized_loss, 2),
-                ltcg_realized_pl=round(ltcg_realized_pl, 2),
-                stcg_realized_pl=round(stcg_realized_pl, 2),
-                ltcg_profitable_qty=ltcg_profitable_qty,
-                stcg_profitable_qty=stcg_profitable_qty,
-                ltcg_loss_qty=ltcg_loss_qty,
-                stcg_loss_qty=stcg_loss_qty,
-                ltcg_invested=round(ltcg_invested, 2),
-                stcg_invested=round(stcg_invested, 2),
-                ltcg_earliest_date=ltcg_earliest_date,
-                stcg_earliest_date=stcg_earliest_date,
-                ltcg_sold_qty=ltcg_sold_qty,
-                stcg_sold_qty=stcg_sold_qty,
-                ltcg_sold_cost=round(ltcg_sold_cost, 2),
-                stcg_sold_cost=round(stcg_sold_cost, 2),
-                ltcg_sold_earliest_buy=ltcg_sold_earliest_buy,
-                ltcg_sold_latest_sell=ltcg_sold_latest_sell,
-                stcg_sold_earliest_buy=stcg_sold_earliest_buy,
-                stcg_sold_latest_sell=stcg_sold_latest_sell,
-                total_dividend=round(dividends_by_symbol.get(sym, {}).get("amount", 0), 2),
-                dividend_count=dividends_by_symbol.get(sym, {}).get("count", 0),
-                dividend_units=dividends_by_symbol.get(sym, {}).get("units", 0),
-                last_tx_date=(max(
-                    [(h.buy_date, "Buy") for h in held_lots] +
-                    [(s.sell_date, "Sell") for s in sold_lots],
-                    default=("", "")
-                ))[0],
-                last_tx_type=(max(
-                    [(h.buy_date, "Buy") for h in held_lots] +
-                    [(s.sell_date, "Sell") for s in sold_lots],
-                    default=("", "")
-                ))[1],
-                num_held_lots=len(held_lots),
-                num_sold_lots=len(sold_lots),
-                profitable_qty=profitable_qty,
-                loss_qty=loss_qty,
-                live=live,
-                is_above_avg_buy=current_price > avg_buy_price if current_price > 0 and avg_buy_price > 0 else False,
-                price_error=price_error,
-            ))
-        except Exception as e:
-            # Per-stock error: log and continue with remaining stocks
-            logger.error(f"[StockSummary] Error processing {sym}: {e}")
-            exchange = held_by_symbol.get(sym, sold_by_symbol.get(sym, {})).get("exchange", "NSE")
-            result.append(StockSummaryItem(
-                symbol=sym, exchange=exchange, name=sym,
-                price_error=f"Error: {str(e)[:100]}",
-            ))
+    for sym in symbols:
+        result.append(_stock_summary_item(sym, rows.get(sym), live_data, snap.dividends))
 
     # Sort: stocks with held shares first, then by unrealized P&L
     result.sort(key=lambda x: (-x.total_held_qty, -abs(x.unrealized_pl)))
     return result
 
 
+def _stock_summary_item(sym: str, agg, live_data: dict, dividends: dict) -> StockSummaryItem:
+    try:
+        return stock_summary.summary_item(sym, agg, live_data, dividends,
+                                          zerodha_service.lookup_instrument_name)
+    except Exception as e:
+        # Per-stock error: log and continue with remaining stocks
+        logger.error(f"[StockSummary] Error processing {sym}: {e}")
+        return StockSummaryItem(
+            symbol=sym, exchange=agg.exchange if agg is not None else "NSE", name=sym,
+            price_error=f"Error: {str(e)[:100]}",
+        )
+
+
 @app.get("/api/portfolio/stock-summary/{symbol}")
 def get_stock_summary_single(symbol: str):
-    """Get stock summary for a SINGLE symbol. Lightweight alternative to the full list."""
+    """Get stock summary for a SINGLE symbol. Reads one row of the summary table."""
     sym = symbol.upper()
-    all_items = get_stock_summary()
-    for item in all_items:
-        if item.symbol == sym:
-            return item
-    raise HTTPException(status_code=404, detail=f"Stock {sym} not found in portfolio")
+    db = udb()
+    snap = db.snapshot()
+    if sym not in snap.by_symbol and sym not in db._file_map:
+        raise HTTPException(status_code=404, detail=f"Stock {sym} not found in portfolio")
+    agg = stock_summary.table_for(db).row(snap, sym)
+    live_data = stock_service.get_cached_prices(stock_summary.price_keys(sym, agg))
+    return _stock_summary_item(sym, agg, live_data, snap.dividends)
 
 
 # ══════════════════════════════════════════════════════════
 #  DIAGNOSTICS
 # ══════════════════════════════════════════════════════════
 
+@app.get("/api/diagnostics/user-dbs")
+def get_user_db_cache_stats():
+    """Per-user DB cache: hits, misses, evictions and approximate sizes."""
+    return _user_dbs.stats()
+
+
+@app.get("/api/diagnostics/providers")
+def get_provider_health():
+    """Circuit state, error rate and latency per upstream provider."""
+    return {"providers": provider_health.snapshot()}
+
+
+@app.get("/api/diagnostics/journal")
+def get_journal_status():
+    """Pending stock writes and any that failed to apply (dead letters)."""
+    return udb().journal_status()
+
+
 @app.get("/api/diagnostics/symbol-map")
 def get_symbol_map():
     """Diagnostic endpoint: show how each xlsx file is mapped to symbols.
@@ -1683,8 +1591,11 @@ def get_symbol_map():
 # ══════════════════════════════════════════════════════════
 
 @app.get("/api/transactions", response_model=List[SoldPosition])
-def get_transactions():
+def get_transactions(request: Request, response: Response):
     """Get all sold positions / transaction history."""
+    cached = _not_modified(request, response, udb().data_version)
+    if cached is not None:
+        return cached
     return udb().get_all_sold()
 
 
@@ -1719,7 +1630,7 @@ def lookup_stock_name(symbol: str, exchange: str = "NSE"):
     # Try Zerodha instrument cache first
     name = zerodha_service.lookup_instrument_name(sym, exch)
     if not name:
-        # Fallback: check saved stock_prices.json (has "name" field)
+        # Fallback: check saved prices (have a "name" field)
         saved = stock_service._load_prices_file()
         key = f"{sym}.{exch}"
         info = saved.get(key)
@@ -1791,67 +1702,55 @@ def get_price_status():
     return stock_service.get_refresh_status()
 
 
-def _do_price_refresh():
-    """Worker: reindex xlsx files then fetch live prices (including watchlist)."""
-    try:
-        # Auto-login if session expired
-        if zerodha_service.is_configured() and not zerodha_service.validate_session():
-            if zerodha_service.can_auto_login():
-                logger.info("[PriceRefresh] Session expired — attempting auto-login...")
-                if zerodha_service.auto_login():
-                    logger.info("[PriceRefresh] Auto-login successful — clearing 52W cache")
-                    zerodha_service.clear_52w_cache()
+def _price_symbols(db: XlsxPortfolio) -> List[tuple]:
+    """(symbol, exchange) for every held, sold and watchlist stock."""
+    holdings, sold, _ = db.get_all_data()
+    held_syms = {h.symbol for h in holdings}
+    sold_syms = {s.symbol for s in sold}
+    return list(set(
+        [(h.symbol, h.exchange) for h in holdings] +
+        [(s.symbol, s.exchange) for s in sold] +
+        [(sym, "NSE") for sym in db._file_map if sym not in held_syms and sym not in sold_syms]
+    ))
 
-        db = udb()
-        db.reindex()
-        stock_service.clear_cache()
-        stock_service._reset_circuit()
-        holdings, sold, _ = db.get_all_data()
-        held_syms = {h.symbol for h in holdings}
-        sold_syms = {s.symbol for s in sold}
-        symbols = list(set(
-            [(h.symbol, h.exchange) for h in holdings] +
-            [(s.symbol, s.exchange) for s in sold] +
-            [(sym, "NSE") for sym in db._file_map if sym not in held_syms and sym not in sold_syms]
-        ))
-        if not symbols:
-            return
-        res = stock_service.fetch_multiple(symbols)
-        live = sum(1 for v in res.values() if not v.is_manual)
-        logger.info(f"[PriceRefresh] Done: {live} live, {len(res)-live} fallback / {len(symbols)} stocks")
-    except Exception as e:
-        logger.error(f"[PriceRefresh] Error: {e}")
 
+_refresh_jobs = refresh_jobs.RefreshCoordinator(prefix="prices")
+_REFRESH_WAIT_TIMEOUT = 300
 
-@app.post("/api/prices/refresh")
-def trigger_price_refresh():
-    """Trigger an immediate price refresh (BLOCKING — waits for fresh prices).
-    Re-scans dumps/ for new xlsx files, then fetches live prices synchronously."""
+
+def _run_price_refresh(job: refresh_jobs.RefreshJob, db: XlsxPortfolio) -> dict:
+    """The refresh pipeline: auto-login, reindex, cache expiry, live fetch."""
     t0 = time.time()
     try:
         # Auto-login if session expired
+        job.set_stage("login")
         if zerodha_service.is_configured() and not zerodha_service.validate_session():
             if zerodha_service.can_auto_login():
+                logger.info("[PriceRefresh] Session expired — attempting auto-login...")
                 if zerodha_service.auto_login():
+                    logger.info("[PriceRefresh] Auto-login successful — clearing 52W cache")
                     zerodha_service.clear_52w_cache()
 
-        db = udb()
+        job.set_stage("reindex")
         reindex_result = db.reindex()
-        stock_service.clear_cache()
+        symbols = _price_symbols(db)
+        # Expire rather than clear: readers keep getting the last price
+        # (marked stale) until the fetch below overwrites it
+        stock_service.expire_cache([f"{sym}.{exch}" for sym, exch in symbols])
         stock_service._reset_circuit()
-        holdings, sold, _ = db.get_all_data()
-        held_syms = {h.symbol for h in holdings}
-        sold_syms = {s.symbol for s in sold}
-        symbols = list(set(
-            [(h.symbol, h.exchange) for h in holdings] +
-            [(s.symbol, s.exchange) for s in sold] +
-            [(sym, "NSE") for sym in db._file_map if sym not in held_syms and sym not in sold_syms]
-        ))
+        job.progress["stocks"] = len(symbols)
         if not symbols:
             return {"message": "No holdings found", "stocks": 0, "reindex": reindex_result}
-        res = stock_service.fetch_multiple(symbols)
+        job.set_stage("fetch")
+        job.progress["fetched"] = 0
+
+        def fetched(key, data):
+            job.progress["fetched"] += 1
+
+        res = stock_service.fetch_multiple(symbols, timings=job.timings, on_result=fetched)
         live = sum(1 for v in res.values() if not v.is_manual)
         fb = sum(1 for v in res.values() if v.is_manual)
+        job.progress.update(live=live, fallback=fb)
         elapsed = round(time.time() - t0, 1)
         logger.info(f"[PriceRefresh] Done in {elapsed}s: {live} live, {fb} fallback / {len(symbols)} stocks")
         return {
@@ -1865,10 +1764,47 @@ def trigger_price_refresh():
     except Exception as e:
         logger.error(f"[PriceRefresh] Error: {e}")
         logger.error(traceback.format_exc())
-        return {
-            "message": f"Refresh error: {str(e)[:200]}",
-            "stocks": 0,
-        }
+        raise  # the job is marked "error" with this message
+
+
+def _submit_price_refresh(db: XlsxPortfolio):
+    """Start a refresh for *db*, or join the one already running for it."""
+    return _refresh_jobs.submit(("prices", id(db)), lambda job: _run_price_refresh(job, db))
+
+
+def _do_price_refresh():
+    """Worker: reindex xlsx files then fetch live prices (including watchlist)."""
+    try:
+        job, _ = _submit_price_refresh(udb())
+        job.wait(_REFRESH_WAIT_TIMEOUT)
+    except Exception as e:
+        logger.error(f"[PriceRefresh] Error: {e}")
+
+
+@app.post("/api/prices/refresh")
+def trigger_price_refresh(wait: bool = True):
+    """Trigger a price refresh for the caller's portfolio.
+
+    Concurrent calls share one job.  With wait=false the job is returned
+    immediately (202) — poll GET /api/prices/refresh/{job_id}; otherwise
+    the call blocks until fresh prices are in and returns the summary.
+    """
+    job, attached = _submit_price_refresh(udb())
+    if not wait:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    if not job.wait(_REFRESH_WAIT_TIMEOUT) or job.result is None:
+        return {"message": f"Refresh {job.status}: {job.error or job.stage}", "stocks": 0,
+                **job.to_dict()}
+    return {**job.result, "job_id": job.id, "attached": attached, "timings": dict(job.timings)}
+
+
+@app.get("/api/prices/refresh/{job_id}")
+def get_price_refresh_job(job_id: str):
+    """Progress, per-stage / per-source timings and result of a refresh job."""
+    job = _refresh_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Refresh job {job_id} not found")
+    return job.to_dict()
 
 
 @app.post("/api/prices/clear-cache")
@@ -2036,11 +1972,12 @@ def validate_zerodha():
 # ══════════════════════════════════════════════════════════
 
 @app.get("/api/dashboard/summary", response_model=PortfolioSummary)
-def get_dashboard_summary():
+def get_dashboard_summary(request: Request, response: Response):
     """Get aggregated portfolio summary for the dashboard."""
-    holdings = udb().get_all_holdings()
-    sold_positions = udb().get_all_sold()
-    dividends_map = udb().get_dividends_by_symbol()
+    cached = _not_modified(request, response, udb().data_version, stock_service.cache_version())
+    if cached is not None:
+        return cached
+    holdings, sold_positions, dividends_map = udb().get_all_data()
 
     if not holdings and not sold_positions:
         return PortfolioSummary(
@@ -2288,7 +2225,7 @@ def _refresh_tickers_once():
             reason = "token expired — visit /api/zerodha/login"
         elif not zerodha_service._access_token:
             reason = "no access token set"
-        elif zerodha_service._conn_failed:
+        elif zerodha_service._conn_failed or provider_health.is_open("zerodha"):
             reason = "connection failed, retrying in 60s"
         else:
             reason = "not configured"
@@ -2362,12 +2299,22 @@ def _refresh_tickers_once():
     _enrich_ticker_changes(results)
     _save_ticker_file(results)
     with _ticker_lock:
+        previous = _ticker_cache
         _ticker_cache = results
         _ticker_cache_time = time.time()
+    _publish_ticker_changes(previous, results)
 
     return results
 
 
+def _publish_ticker_changes(old: List[dict], new: List[dict]):
+    """Push tickers that differ from the previous cache to live streams."""
+    old_map = {t.get("key"): t for t in old}
+    for t in new:
+        if old_map.get(t.get("key")) != t:
+            live_feed.publish("ticker", t.get("key", ""), t)
+
+
 def _ticker_bg_loop():
     """Background loop: refresh market tickers every REFRESH_INTERVAL seconds."""
     global _ticker_cache, _ticker_cache_time
@@ -2408,11 +2355,14 @@ def _stop_ticker_bg_refresh():
 
 
 @app.get("/api/market-ticker")
-def get_market_ticker():
+def get_market_ticker(request: Request, response: Response):
     """Get market indices, forex rates, and commodity prices.
     Data is refreshed automatically every 60 seconds by background thread."""
     with _ticker_lock:
         if _ticker_cache:
+            cached = _not_modified(request, response, _ticker_cache_time)
+            if cached is not None:
+                return cached
             return {
                 "tickers": _ticker_cache,
                 "last_updated": datetime.fromtimestamp(_ticker_cache_time).astimezone().isoformat() if _ticker_cache_time else None,
@@ -2447,6 +2397,7 @@ def update_market_ticker(tickers: List[dict]):
     _save_ticker_file(pushed)
     # Update cache: merge pushed into current cache
     with _ticker_lock:
+        previous = _ticker_cache
         cache_map = {t["key"]: t for t in _ticker_cache}
         for p in pushed:
             if p["price"] > 0:
@@ -2456,17 +2407,138 @@ def update_market_ticker(tickers: List[dict]):
                          "price": 0, "change": 0, "change_pct": 0})
                          for m in MARKET_TICKER_SYMBOLS]
         _ticker_cache_time = time.time()
+    _publish_ticker_changes(previous, _ticker_cache)
     logger.info(f"[MarketTicker] Manual update: {len(pushed)} tickers")
     return {"updated": len(pushed)}
 
 
+# ══════════════════════════════════════════════════════════
+#  LIVE STREAM  (Server-Sent Events: price / NAV / ticker deltas)
+# ══════════════════════════════════════════════════════════
+# While at least one stream is open, a single background thread refreshes
+# prices and NAVs for the union of the connected users' portfolios, so N
+# open browsers cost one upstream fetch; the resulting per-key changes
+# reach every stream through live_feed.  Tickers already refresh in their
+# own background loop.
+
+# A stream on a per-user DB leases its _user_dbs entry for as long as it
+# is open, so the cache never evicts (and a later request never re-creates)
+# the instance the stream is serving.
+
+_stream_dbs: Dict[int, list] = {}   # id(stocks db) → [stocks db, mf db, open streams]
+_stream_lock = threading.Lock()
+_live_refresh_thread: Optional[threading.Thread] = None
+
+
+def _stream_attach(stocks: XlsxPortfolio, mf: MFXlsxPortfolio, cache_key: Optional[tuple] = None):
+    global _live_refresh_thread
+    if cache_key is not None:
+        _user_dbs.acquire(cache_key)
+    with _stream_lock:
+        entry = _stream_dbs.setdefault(id(stocks), [stocks, mf, 0])
+        entry[2] += 1
+        if _live_refresh_thread is None or not _live_refresh_thread.is_alive():
+            _live_refresh_thread = threading.Thread(target=_live_refresh_loop,
+                                                    name="live-refresh", daemon=True)
+            _live_refresh_thread.start()
+
+
+def _stream_detach(stocks: XlsxPortfolio, cache_key: Optional[tuple] = None):
+    with _stream_lock:
+        entry = _stream_dbs.get(id(stocks))
+        if entry is not None:
+            entry[2] -= 1
+            if entry[2] <= 0:
+                del _stream_dbs[id(stocks)]
+    if cache_key is not None:
+        _user_dbs.release(cache_key)
+
+
+def _live_refresh_once():
+    """One shared refresh cycle for every portfolio with an open stream."""
+    with _stream_lock:
+        portfolios = [(e[0], e[1]) for e in _stream_dbs.values()]
+    if not portfolios:
+        return
+    symbols, fund_codes = set(), set()
+    for stocks, mf in portfolios:
+        try:
+            symbols.update(_price_symbols(stocks))
+            fund_codes.update(mf._file_map)
+        except Exception as e:
+            logger.error(f"[LiveStream] Reading portfolio failed: {e}")
+    if symbols:
+        stock_service.expire_cache([f"{sym}.{exch}" for sym, exch in symbols])
+        stock_service._reset_circuit()
+        stock_service.fetch_multiple(list(symbols))
+    if fund_codes:
+        clear_mf_nav_cache()
+        fetch_mf_live_navs(list(fund_codes))
+    logger.info(f"[LiveStream] Refreshed {len(symbols)} stocks, {len(fund_codes)} funds "
+                f"for {len(portfolios)} portfolio(s)")
+
+
+def _live_refresh_loop():
+    """Refresh every REFRESH_INTERVAL seconds until the last stream closes."""
+    while True:
+        with _stream_lock:
+            if not _stream_dbs:
+                return
+        try:
+            _live_refresh_once()
+        except Exception as e:
+            logger.error(f"[LiveStream] Refresh error: {e}")
+        for _ in range(int(stock_service.REFRESH_INTERVAL)):
+            time.sleep(1)
+            with _stream_lock:
+                if not _stream_dbs:
+                    return
+
+
+@app.get("/api/stream")
+def live_stream(request: Request, since: Optional[int] = None):
+    """Stream price / NAV / ticker changes as Server-Sent Events.
+
+    Reconnect with the Last-Event-ID header (or ?since=) to resume; a
+    "reset" event means the gap is too old and the client should reload.
+    Only the caller's own stocks and funds are sent, plus all tickers.
+    """
+    last_id = request.headers.get("last-event-id", "")
+    if last_id.isdigit():
+        since = int(last_id)
+    stocks, mf = udb(), umf()
+    cache_key = _current_user_cache_key()
+
+    def accept(kind: str, key: str) -> bool:
+        if kind == "price":
+            return key.rsplit(".", 1)[0] in stocks._file_map
+        if kind == "nav":
+            return key in mf._file_map
+        return True
+
+    async def events():
+        _stream_attach(stocks, mf, cache_key)
+        try:
+            async for chunk in live_feed.feed.stream(since, accept):
+                yield chunk
+        finally:
+            _stream_detach(stocks, cache_key)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # ══════════════════════════════════════════════════════════
 #  MUTUAL FUNDS
 # ══════════════════════════════════════════════════════════
 
 @app.get("/api/mutual-funds/summary")
-def get_mf_summary():
+def get_mf_summary(request: Request, response: Response):
     """Get per-fund aggregated summary with held/sold lots."""
+    cached = _not_modified(request, response, umf().data_version,
+                           mf_nav_version(), date.today())
+    if cached is not None:
+        return cached
     return umf().get_fund_summary()
 
 
@@ -2482,8 +2554,12 @@ def set_mf_sip_flag(fund_code: str, req: dict):
 
 
 @app.get("/api/mutual-funds/dashboard")
-def get_mf_dashboard():
+def get_mf_dashboard(request: Request, response: Response):
     """Get aggregated MF portfolio summary for the dashboard."""
+    cached = _not_modified(request, response, umf().data_version,
+                           mf_nav_version(), date.today())
+    if cached is not None:
+        return cached
     return umf().get_dashboard_summary()
 
 
@@ -3394,6 +3470,85 @@ def save_user_settings(updates: dict):
     return user_settings.save_settings(uid, email, updates)
 
 
+# ══════════════════════════════════════════════════════════
+#  BOOTSTRAP (every tab's initial data in one response)
+# ══════════════════════════════════════════════════════════
+
+_BOOTSTRAP_WORKERS = 4      # asset classes computed at once, across all requests
+_bootstrap_pool = ThreadPoolExecutor(max_workers=_BOOTSTRAP_WORKERS, thread_name_prefix="bootstrap")
+
+# section → [(part, handler, needs_request)] — the calls each frontend loader makes
+_BOOTSTRAP_SECTIONS = {
+    "stocks": [
+        ("portfolio", get_portfolio, True),
+        ("summary", get_dashboard_summary, True),
+        ("transactions", get_transactions, True),
+        ("stock_summary", get_stock_summary, True),
+    ],
+    "global": [
+        ("market_ticker", get_market_ticker, True),
+        ("zerodha_status", get_zerodha_status, False),
+        ("user_settings", get_user_settings, False),
+    ],
+    "mutual_funds": [
+        ("summary", get_mf_summary, True),
+        ("dashboard", get_mf_dashboard, True),
+        ("sip_configs", get_sip_configs, False),
+    ],
+    "fd": [("summary", get_fd_summary, False), ("dashboard", get_fd_dashboard, False)],
+    "rd": [("summary", get_rd_summary, False), ("dashboard", get_rd_dashboard, False)],
+    "insurance": [("summary", get_insurance_summary, False),
+                  ("dashboard", get_insurance_dashboard, False)],
+    "ppf": [("summary", get_ppf_summary, False), ("dashboard", get_ppf_dashboard, False)],
+    "nps": [("summary", get_nps_summary, False), ("dashboard", get_nps_dashboard, False)],
+    "si": [("summary", get_si_summary, False), ("dashboard", get_si_dashboard, False)],
+}
+
+
+def _bootstrap_section(name: str, request: Request) -> dict:
+    """Run one section's handlers; a failing part is reported, not raised."""
+    t0 = time.time()
+    data, errors = {}, {}
+    for part, handler, needs_request in _BOOTSTRAP_SECTIONS[name]:
+        try:
+            result = handler(request, Response()) if needs_request else handler()
+            data[part] = jsonable_encoder(result)
+        except Exception as e:
+            logger.error(f"[Bootstrap] {name}.{part} failed: {e}")
+            errors[part] = getattr(e, "detail", None) or str(e)[:200]
+    out = {"section": name, "data": data, "elapsed": round(time.time() - t0, 3)}
+    if errors:
+        out["errors"] = errors
+    return out
+
+
+@app.get("/api/bootstrap")
+def bootstrap(request: Request):
+    """Initial data for every tab, streamed as NDJSON — one line per section.
+
+    Sections (stocks, global, mutual_funds, fd, rd, insurance, ppf, nps, si)
+    are computed concurrently on a small shared pool and each line is sent
+    as soon as its section is ready, so a slow asset class does not hold up
+    the others.  The user, their dumps folder and DBs are resolved once and
+    shared by all sections through the request memo.  The last line is
+    {"done": true, ...}.
+    """
+    t0 = time.time()
+    user_dumps_dir(), udb(), umf()
+    ctx = contextvars.copy_context()
+
+    async def lines():
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(_bootstrap_pool, ctx.copy().run, _bootstrap_section, name, request)
+                   for name in _BOOTSTRAP_SECTIONS]
+        for fut in asyncio.as_completed(futures):
+            yield json.dumps(await fut, default=str) + "\n"
+        yield json.dumps({"done": True, "elapsed": round(time.time() - t0, 3)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+
+
 # ══════════════════════════════════════════════════════════
 #  LEGAL PAGES (Privacy Policy & Terms of Service)
 # ══════════════════════════════════════════════════════════
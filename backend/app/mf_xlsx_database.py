@@ -14,6 +14,7 @@ Key differences from stock xlsx:
 """
 
 import hashlib
+import itertools
 import logging
 import re
 import threading
@@ -21,14 +22,19 @@ import time
 import random
 from datetime import datetime, date
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
-import requests as _requests
 import openpyxl
 
 from .models import MFHolding, MFSoldPosition
+from . import fifo_engine
+from . import fs_watcher
+from . import live_feed
+from . import http_client, provider_health
+from . import request_memo
+from .user_db_cache import approx_sizeof
 
 
 def _sync_to_drive(filepath):
@@ -56,6 +62,25 @@ _GOOGLE_HEADERS = {
 
 _nav_cache: Dict[str, float] = {}
 _nav_cache_lock = threading.Lock()
+# NAVs dropped by clear_nav_cache(), kept until re-fetched so that an
+# unchanged NAV doesn't count as a change (see nav_version)
+_nav_cleared: Dict[str, float] = {}
+_nav_version = 0
+
+
+def _nav_cache_set(code: str, nav: float):
+    """Cache a NAV (caller holds _nav_cache_lock); changes go to live_feed."""
+    global _nav_version
+    previous = _nav_cleared.pop(code, None)
+    if _nav_cache.get(code, previous) != nav:
+        _nav_version += 1
+        live_feed.publish("nav", code, {"nav": nav})
+    _nav_cache[code] = nav
+
+
+def nav_version() -> int:
+    """Changes whenever a cached NAV or NAV change does (for HTTP ETags)."""
+    return _nav_version
 
 # AMFI NAV data (ISIN → NAV mapping from amfiindia.com)
 _amfi_isin_nav: Dict[str, float] = {}
@@ -77,7 +102,7 @@ def _fetch_amfi_navs() -> Dict[str, float]:
         return _amfi_isin_nav
 
     try:
-        resp = _requests.get(_AMFI_NAV_URL, timeout=15)
+        resp = provider_health.call("amfi", http_client.get, _AMFI_NAV_URL, timeout=15)
         if resp.status_code != 200:
             return _amfi_isin_nav
 
@@ -122,13 +147,16 @@ def _fetch_nav_google_finance(fund_code: str) -> Optional[float]:
     url = f"https://www.google.com/finance/quote/{gf_symbol}"
     for attempt in range(2):
         try:
-            resp = _requests.get(url, headers=_GOOGLE_HEADERS, timeout=10)
+            resp = provider_health.call("google_finance", http_client.get, url,
+                                        headers=_GOOGLE_HEADERS, timeout=10)
             if resp.status_code == 200:
                 match = re.search(r'data-last-price="([\d,.]+)"', resp.text)
                 if match:
                     price = float(match.group(1).replace(",", ""))
                     if price > 0:
                         return price
+        except provider_health.CircuitOpenError:
+            return None
         except Exception:
             pass
         if attempt < 1:
@@ -159,7 +187,7 @@ def fetch_live_navs(fund_codes: List[str]) -> Dict[str, float]:
             nav = amfi_navs.get(code)
             if nav and nav > 0:
                 with _nav_cache_lock:
-                    _nav_cache[code] = nav
+                    _nav_cache_set(code, nav)
                 results[code] = nav
 
     # Fetch Google Finance NAVs one-by-one
@@ -171,16 +199,23 @@ def fetch_live_navs(fund_codes: List[str]) -> Dict[str, float]:
         nav = _fetch_nav_google_finance(code)
         if nav and nav > 0:
             with _nav_cache_lock:
-                _nav_cache[code] = nav
+                _nav_cache_set(code, nav)
             results[code] = nav
         time.sleep(random.uniform(0.3, 0.8))
 
+    # Cleared NAVs that could not be re-fetched are a change too
+    global _nav_version
+    with _nav_cache_lock:
+        lost = [c for c in fund_codes if c not in results and _nav_cleared.pop(c, None) is not None]
+        if lost:
+            _nav_version += 1
     return results
 
 
 def clear_nav_cache():
     """Clear the NAV cache to force fresh fetches."""
     with _nav_cache_lock:
+        _nav_cleared.update(_nav_cache)
         _nav_cache.clear()
 
 
@@ -199,6 +234,16 @@ _nav_change_cache_lock = threading.Lock()
 _NAV_CHANGE_CACHE_TTL = 6 * 3600  # 6 hours
 
 
+def _nav_change_cache_set(fund_code: str, entry: dict):
+    """Cache NAV changes (caller holds _nav_change_cache_lock)."""
+    global _nav_version
+    old = _nav_change_cache.get(fund_code)
+    if old is None or {k: v for k, v in old.items() if k != "fetched_at"} != \
+            {k: v for k, v in entry.items() if k != "fetched_at"}:
+        _nav_version += 1
+    _nav_change_cache[fund_code] = entry
+
+
 # Hardcoded ISIN → AMFI scheme code overrides for funds where the fuzzy
 # search picks the wrong scheme (e.g. "HDFC Mid-Cap" → "HDFC Large & Mid Cap").
 # These are verified manually against mfapi.in NAV data.
@@ -253,7 +298,8 @@ def _search_mfapi_scheme(fund_name: str) -> Optional[int]:
         words = q.split()[:word_count]
         search_q = " ".join(words)
         try:
-            resp = _requests.get(
+            resp = provider_health.call(
+                "mfapi", http_client.get,
                 f"https://api.mfapi.in/mf/search?q={search_q}",
                 timeout=30,
             )
@@ -272,6 +318,9 @@ def _search_mfapi_scheme(fund_name: str) -> Optional[int]:
                             return int(r["schemeCode"])
                     # Fall back to first result
                     return int(results[0]["schemeCode"])
+        except provider_health.CircuitOpenError as e:
+            logger.warning(f"[MF-MFAPI] Search skipped: {e}")
+            return None
         except Exception as e:
             logger.error(f"[MF-MFAPI] Search error for '{search_q}': {e}")
     return None
@@ -281,7 +330,8 @@ def _fetch_nav_history_mfapi(scheme_code: int) -> Optional[list]:
     """Fetch NAV history from mfapi.in for a scheme.
     Returns list of {date: DD-MM-YYYY, nav: str} or None."""
     try:
-        resp = _requests.get(
+        resp = provider_health.call(
+            "mfapi", http_client.get,
             f"https://api.mfapi.in/mf/{scheme_code}",
             timeout=15,
         )
@@ -336,10 +386,10 @@ def compute_nav_changes(fund_code: str, fund_name: str, current_nav: float) -> D
             logger.warning(f"[MF-MFAPI] No scheme found for {fund_name[:40]}")
             # Cache the miss so we don't retry every call
             with _nav_change_cache_lock:
-                _nav_change_cache[fund_code] = {
+                _nav_change_cache_set(fund_code, {
                     "day_change": 0.0, "day_change_pct": 0.0, "week_change_pct": 0.0, "month_change_pct": 0.0,
                     "fetched_at": now,
-                }
+                })
             return result
 
     # Fetch historical NAV data
@@ -455,7 +505,7 @@ def compute_nav_changes(fund_code: str, fund_name: str, current_nav: float) -> D
 
     # Cache result
     with _nav_change_cache_lock:
-        _nav_change_cache[fund_code] = {
+        _nav_change_cache_set(fund_code, {
             "day_change": result["day_change"],
             "day_change_pct": result["day_change_pct"],
             "week_change_pct": result["week_change_pct"],
@@ -471,7 +521,7 @@ def compute_nav_changes(fund_code: str, fund_name: str, current_nav: float) -> D
             "cagr_3y": result["cagr_3y"],
             "cagr_5y": result["cagr_5y"],
             "fetched_at": now,
-        }
+        })
 
     return result
 
@@ -626,17 +676,28 @@ def fifo_match_mf(buys: list, sells: list):
     buys_sorted = sorted(buys, key=lambda x: x["date"])
     sells_sorted = sorted(sells, key=lambda x: x["date"])
 
-    buy_lots = [{**b, "remaining": b["units"]} for b in buys_sorted]
+    if len(buys_sorted) + len(sells_sorted) >= fifo_engine.VECTOR_MIN_ROWS:
+        matched = _fifo_match_mf_vectorized(buys_sorted, sells_sorted)
+        if matched is not None:
+            return matched
+
+    # Units left per lot, parallel to buys_sorted — lots are only copied
+    # (with "remaining") once they're known to be held at the end
+    left = [b["units"] for b in buys_sorted]
+    head = 0  # lots before this one are used up
     sold_positions = []
 
     for sell in sells_sorted:
         sell_units = sell["units"]
-        for lot in buy_lots:
+        for i in range(head, len(buys_sorted)):
             if sell_units <= 0.0001:
                 break
-            if lot["remaining"] <= 0.0001:
+            if left[i] <= 0.0001:
+                if i == head:
+                    head += 1
                 continue
-            matched = min(lot["remaining"], sell_units)
+            lot = buys_sorted[i]
+            matched = min(left[i], sell_units)
             realized_pl = (sell["nav"] - lot["nav"]) * matched
             sold_positions.append({
                 "buy_nav": lot["nav"],
@@ -648,10 +709,42 @@ def fifo_match_mf(buys: list, sells: list):
                 "row_idx": lot.get("row_idx", 0),
                 "sell_row_idx": sell.get("row_idx", 0),
             })
-            lot["remaining"] = round(lot["remaining"] - matched, 6)
+            left[i] = round(left[i] - matched, 6)
             sell_units = round(sell_units - matched, 6)
 
-    remaining = [l for l in buy_lots if l["remaining"] > 0.0001]
+    remaining = [{**b, "remaining": r} for b, r in zip(buys_sorted, left) if r > 0.0001]
+    return remaining, sold_positions
+
+
+def _fifo_match_mf_vectorized(buys_sorted: list, sells_sorted: list):
+    """fifo_match_mf on the array engine (micro-units); None → use the loop."""
+    scale = fifo_engine.MF_SCALE
+    buy_units = fifo_engine.to_fixed([b["units"] for b in buys_sorted], scale)
+    sell_units = fifo_engine.to_fixed([s["units"] for s in sells_sorted], scale)
+    if buy_units is None or sell_units is None:
+        return None
+    # 0.0001 units: the loop treats anything at or below it as empty
+    alloc = fifo_engine.allocate(buy_units, sell_units, min_qty=scale // 10000)
+    if alloc is None:
+        return None
+    lot_idx, sell_idx, matched, left = alloc
+
+    sold_positions = []
+    for i, j, qty in zip(lot_idx, sell_idx, matched):
+        lot, sell = buys_sorted[i], sells_sorted[j]
+        units = qty / scale
+        sold_positions.append({
+            "buy_nav": lot["nav"],
+            "buy_date": lot["date"],
+            "sell_nav": sell["nav"],
+            "sell_date": sell["date"],
+            "units": round(units, 6),
+            "realized_pl": round((sell["nav"] - lot["nav"]) * units, 2),
+            "row_idx": lot.get("row_idx", 0),
+            "sell_row_idx": sell.get("row_idx", 0),
+        })
+    remaining = [{**b, "remaining": b["units"] if r == q else r / scale}
+                 for b, r, q in zip(buys_sorted, left, buy_units.tolist()) if r > scale // 10000]
     return remaining, sold_positions
 
 
@@ -797,10 +890,14 @@ def _parse_mf_trading_history(wb) -> Tuple[list, list]:
 #  MAIN CLASS
 # ═══════════════════════════════════════════════════════════
 
+# Distinguishes portfolio instances in data_version
+_instance_serials = itertools.count(1)
+
+
 class MFXlsxPortfolio:
     """File-per-fund xlsx database with FIFO-derived holdings."""
 
-    def __init__(self, mf_dir: str | Path):
+    def __init__(self, mf_dir: str | Path, watcher: Optional[fs_watcher.DumpsWatcher] = None):
         self.mf_dir = Path(mf_dir)
         if not self.mf_dir.exists():
             logger.warning(f"[MF-XlsxDB] Mutual Funds directory not found: {self.mf_dir}")
@@ -814,8 +911,21 @@ class MFXlsxPortfolio:
         # fund_code → fund name (from filename)
         self._name_map: Dict[str, str] = {}
 
+        # Filesystem watcher (None → stat() on every read); fund codes in
+        # _fresh are served from _cache until a change event for their file
+        self._watcher = watcher if watcher is not None else fs_watcher.watcher_for(self.mf_dir.parent)
+        self._fresh: Set[str] = set()
+        self._fs_epoch = 0
+        self._memo_key = ("mf", id(self))
+        # Bumped on every (re)parse, invalidation and reindex
+        self._serial = next(_instance_serials)
+        self._version = 0
+
         self._build_file_map()
 
+        if self._watcher is not None:
+            self._watcher.subscribe(self.mf_dir, self._on_fs_change)
+
     def _build_file_map(self):
         """Scan xlsx files and build fund_code ↔ filepath map."""
         count = 0
@@ -850,6 +960,9 @@ class MFXlsxPortfolio:
             old_codes = set(self._file_map.keys())
             self._file_map.clear()
             self._name_map.clear()
+            request_memo.forget(self._memo_key)
+            self._version += 1
+            self._fresh.clear()
             self._cache.clear()
             self._build_file_map()
             new_codes = set(self._file_map.keys())
@@ -863,6 +976,46 @@ class MFXlsxPortfolio:
                     parts.append(f"-{len(removed)}")
                 logger.info(f"[MF-XlsxDB] Reindex: {len(new_codes)} funds ({', '.join(parts)} changed)")
 
+    def _on_fs_change(self, paths: Set[Path]):
+        """Watcher callback: drop and re-parse only the funds whose file changed.
+
+        A file whose mtime matches its cache entry was already re-read after
+        one of our own writes and is left alone; new or removed files (or
+        lost events) trigger a reindex.
+        """
+        self._fs_epoch += 1
+        if self.mf_dir in paths:
+            self.reindex()
+            return
+
+        code_for = {fp: code for code, fp in self._file_map.items()}
+        changed: Set[str] = set()
+        rescan = False
+        for fp in paths:
+            if fp.suffix != ".xlsx" or fp.name.startswith(("~", ".")):
+                continue
+            code = code_for.get(fp)
+            try:
+                mtime = fp.stat().st_mtime
+            except OSError:
+                mtime = None
+            if code is None or mtime is None:
+                rescan = True
+                continue
+            cached = self._cache.get(code)
+            if cached is not None and cached[0] == mtime:
+                continue
+            self._invalidate_fund(code)
+            changed.add(code)
+
+        if rescan:
+            self.reindex()
+        for code in changed:
+            try:
+                self._get_fund_data(code)
+            except Exception as e:
+                logger.error(f"[MF-XlsxDB] Re-parse after change failed for {code}: {e}")
+
     # ── Cache Layer ───────────────────────────────────────
 
     def _get_fund_data(self, fund_code: str) -> Tuple[List[MFHolding], List[MFSoldPosition], dict]:
@@ -871,20 +1024,43 @@ class MFXlsxPortfolio:
         if not fp:
             return [], [], {}
 
+        if fund_code in self._fresh:
+            cached = self._cache.get(fund_code)
+            if cached is not None:
+                return cached[1], cached[2], cached[3]
+        epoch = self._fs_epoch
+
         try:
             mtime = fp.stat().st_mtime
         except OSError:
+            if self._cache.pop(fund_code, None) is not None:
+                self._version += 1
             return [], [], {}
 
         if fund_code in self._cache:
             cached_mtime, cached_h, cached_s, cached_idx = self._cache[fund_code]
             if cached_mtime == mtime:
+                self._mark_fresh(fund_code, epoch)
                 return cached_h, cached_s, cached_idx
 
         holdings, sold, idx_data = self._parse_and_match_fund(fund_code, fp)
         self._cache[fund_code] = (mtime, holdings, sold, idx_data)
+        self._version += 1
+        self._mark_fresh(fund_code, epoch)
         return holdings, sold, idx_data
 
+    def _invalidate_fund(self, fund_code: str):
+        """Drop a fund's cached parse (after a write or a change on disk)."""
+        request_memo.forget(self._memo_key)
+        self._version += 1
+        self._fresh.discard(fund_code)
+        self._cache.pop(fund_code, None)
+
+    def _mark_fresh(self, fund_code: str, epoch: int):
+        """Serve *fund_code* from _cache without stat() until the next change event."""
+        if self._watcher is not None and self._fs_epoch == epoch:
+            self._fresh.add(fund_code)
+
     def _parse_and_match_fund(self, fund_code: str, filepath: Path):
         """Parse a fund's xlsx file and FIFO-match sells."""
         name = self._name_map.get(fund_code, fund_code)
@@ -911,14 +1087,16 @@ class MFXlsxPortfolio:
                   "row_idx": s["row_idx"]} for s in sell_rows],
             )
 
-            # Build held lots from remaining
+            # Build held lots from remaining; original buy lot (first per
+            # row) gives the cost
+            by_row: Dict[int, dict] = {}
+            for b in buy_lots:
+                by_row.setdefault(b["row_idx"], b)
             holdings = []
             for r in remaining:
                 if r["remaining"] <= 0.0001:
                     continue
-                # Find original buy lot to get cost
-                orig = next((b for b in buy_lots
-                             if b["row_idx"] == r["row_idx"]), None)
+                orig = by_row.get(r["row_idx"])
                 cost = round(r["nav"] * r["remaining"], 2) if not orig else round(
                     orig["cost"] * r["remaining"] / orig["units"], 2)
                 h_id = _gen_mf_id(fund_code, r["date"], r["nav"], r["row_idx"])
@@ -972,26 +1150,38 @@ class MFXlsxPortfolio:
 
     # ── Public READ API ───────────────────────────────────
 
-    def get_all_holdings(self) -> List[MFHolding]:
-        """Get all current MF holdings across every fund file."""
-        all_holdings: List[MFHolding] = []
+    @property
+    def data_version(self) -> Tuple[int, int]:
+        """(instance, version) — changes whenever any fund's holdings or
+        redemptions do, so it can key HTTP ETags."""
+        self._all_fund_data()
+        return self._serial, self._version
+
+    def _all_fund_data(self) -> Dict[str, tuple]:
+        """fund_code → (holdings, sold, index data), validated once per request."""
+        return request_memo.memoized(self._memo_key, self._read_all_funds)
+
+    def _read_all_funds(self) -> Dict[str, tuple]:
+        data = {}
         for fund_code in list(self._file_map.keys()):
             try:
-                holdings, _, _ = self._get_fund_data(fund_code)
-                all_holdings.extend(holdings)
+                data[fund_code] = self._get_fund_data(fund_code)
             except Exception as e:
                 logger.error(f"[MF-XlsxDB] Error reading {fund_code}: {e}")
+        return data
+
+    def get_all_holdings(self) -> List[MFHolding]:
+        """Get all current MF holdings across every fund file."""
+        all_holdings: List[MFHolding] = []
+        for holdings, _, _ in self._all_fund_data().values():
+            all_holdings.extend(holdings)
         return all_holdings
 
     def get_all_sold(self) -> List[MFSoldPosition]:
         """Get all redeemed positions across every fund."""
         all_sold: List[MFSoldPosition] = []
-        for fund_code in list(self._file_map.keys()):
-            try:
-                _, sold, _ = self._get_fund_data(fund_code)
-                all_sold.extend(sold)
-            except Exception as e:
-                logger.error(f"[MF-XlsxDB] Error reading sold for {fund_code}: {e}")
+        for _, sold, _ in self._all_fund_data().values():
+            all_sold.extend(sold)
         return all_sold
 
     def set_sip_flag(self, fund_code: str, has_sip: bool):
@@ -1030,12 +1220,11 @@ class MFXlsxPortfolio:
         # Record today's NAVs for 7d/30d tracking
         record_nav_history(live_navs)
 
+        fund_data = self._all_fund_data()
         for fund_code in all_codes:
-            try:
-                holdings, sold, idx_data = self._get_fund_data(fund_code)
-            except Exception as e:
-                logger.error(f"[MF-XlsxDB] Error for {fund_code}: {e}")
+            if fund_code not in fund_data:
                 continue
+            holdings, sold, idx_data = fund_data[fund_code]
 
             name = self._name_map.get(fund_code, fund_code)
             # Prefer live NAV, fall back to xlsx Index sheet value
@@ -1320,7 +1509,7 @@ class MFXlsxPortfolio:
             _sync_to_drive(filepath)
 
             # Invalidate cache to force re-parse
-            self._cache.pop(fund_code, None)
+            self._invalidate_fund(fund_code)
 
             logger.info(f"[MF-XlsxDB] Added Buy: {units:.4f} units of {fund_name} @ NAV {nav:.4f}")
 
@@ -1391,7 +1580,7 @@ class MFXlsxPortfolio:
             _sync_to_drive(filepath)
 
             # Invalidate cache and re-parse to get FIFO-matched realized P&L
-            self._cache.pop(fund_code, None)
+            self._invalidate_fund(fund_code)
 
             # Re-read to compute realized P&L via FIFO
             new_holdings, sold_positions, _ = self._get_fund_data(fund_code)
@@ -1460,7 +1649,7 @@ class MFXlsxPortfolio:
 
                     wb.save(filepath)
                     _sync_to_drive(filepath)
-                    self._cache.pop(fund_code, None)
+                    self._invalidate_fund(fund_code)
                     return True
 
             wb.close()
@@ -1500,7 +1689,7 @@ class MFXlsxPortfolio:
 
             wb.save(filepath)
             _sync_to_drive(filepath)
-            self._cache.pop(fund_code, None)
+            self._invalidate_fund(fund_code)
             return True
         except Exception as e:
             logger.error(f"[MF-XlsxDB] Failed to update sold row {fund_code}:{row_idx}: {e}")
@@ -1529,7 +1718,7 @@ class MFXlsxPortfolio:
 
             _sync_to_drive(filepath)
 
-            self._cache.pop(old_code, None)
+            self._invalidate_fund(old_code)
             if old_code in self._file_map:
                 del self._file_map[old_code]
             self._file_map[new_code] = filepath
@@ -1552,6 +1741,20 @@ class MFXlsxPortfolio:
         except Exception:
             return 0.0
 
+    # ── Lifecycle ─────────────────────────────────────────
+
+    def approx_size(self) -> int:
+        """Rough bytes held by the parsed fund cache."""
+        return approx_sizeof((self._cache, self._file_map, self._name_map))
+
+    def close(self):
+        """Stop listening for file changes before this instance is dropped."""
+        if self._watcher is not None:
+            self._watcher.unsubscribe(self._on_fs_change)
+            self._watcher = None
+            with self._lock:
+                self._fresh.clear()
+
 
 # ═══════════════════════════════════════════════════════════
 #  MODULE-LEVEL SINGLETON
@@ -94,6 +94,12 @@ class StockLiveData(BaseModel):
     signal: Optional[str] = None         # strong_bull, weak_bull, weak_bear, strong_bear
     days_below_sma: int = 0
     rsi: Optional[float] = None
+    # Freshness: where the price came from (zerodha, yahoo, google, saved,
+    # xlsx, manual), when it was fetched (epoch seconds) and how long it
+    # counts as fresh (seconds; None = never expires)
+    source: Optional[str] = None
+    fetched_at: Optional[float] = None
+    max_age: Optional[float] = None
 
 
 class PortfolioSummary(BaseModel):
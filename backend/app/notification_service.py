@@ -9,7 +9,6 @@ import os
 import json
 import smtplib
 import logging
-import requests
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
@@ -28,6 +27,7 @@ _TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
 
 # Per-user notification preferences
 from .config import DUMPS_BASE, get_user_dumps_dir
+from . import http_client, provider_health
 
 # Legacy shared files (for migration)
 _DATA_DIR = Path(__file__).resolve().parent.parent / "data"
@@ -156,7 +156,7 @@ def send_telegram(message: str) -> bool:
         return False
     try:
         url = f"https://api.telegram.org/bot{_TELEGRAM_BOT_TOKEN}/sendMessage"
-        resp = requests.post(url, json={
+        resp = provider_health.call("telegram", http_client.post, url, json={
             "chat_id": _TELEGRAM_CHAT_ID,
             "text": message,
             "parse_mode": "HTML",
@@ -0,0 +1,130 @@
+"""
+Persistent parsed-workbook cache (sidecar JSON).
+
+Opening a workbook with openpyxl and walking its Trading History sheet is
+by far the slowest part of a cold start.  This module stores the *parsed*
+result for each xlsx file on disk, keyed by absolute path and validated by
+(size, mtime_ns), so a restart only needs one stat() per file and re-parses
+just the workbooks that actually changed.
+
+The cache file lives in a hidden directory next to the asset folder
+(e.g. dumps/<email>/<Name>/.cache/Stocks.json) so it is per-user and is
+skipped by the "*.xlsx" directory scans.  Payloads must be JSON-serialisable.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the shape of a cached payload changes (parser output,
+# index fields, ...).  A mismatch discards the whole file on load.
+CACHE_VERSION = 3
+
+
+class ParseCache:
+    """Thread-safe {path: (size, mtime_ns, payload)} store persisted as JSON."""
+
+    def __init__(self, cache_file: str | Path):
+        self.cache_file = Path(cache_file)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._load()
+
+    # ── Persistence ───────────────────────────────────────
+
+    def _load(self):
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"[ParseCache] Ignoring unreadable {self.cache_file.name}: {e}")
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            logger.info(f"[ParseCache] {self.cache_file.name}: version changed, starting fresh")
+            return
+        entries = data.get("entries")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def save(self):
+        """Write the cache to disk if anything changed (atomic replace)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {"version": CACHE_VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_name(
+                f"{self.cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp, self.cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"[ParseCache] Failed to save {self.cache_file.name}: {e}")
+            with self._lock:
+                self._dirty = True
+
+    # ── Lookup / update ───────────────────────────────────
+
+    @staticmethod
+    def _stat(fp: Path, st: Optional[os.stat_result]) -> Optional[os.stat_result]:
+        if st is not None:
+            return st
+        try:
+            return fp.stat()
+        except OSError:
+            return None
+
+    def get(self, fp: Path, st: Optional[os.stat_result] = None) -> Optional[dict]:
+        """Return the cached payload for *fp* if size and mtime still match."""
+        st = self._stat(fp, st)
+        if st is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(str(fp))
+        if not entry:
+            return None
+        if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+            return None
+        return entry.get("payload")
+
+    def put(self, fp: Path, payload: dict, st: Optional[os.stat_result] = None):
+        """Store *payload* for *fp* at its current size/mtime."""
+        st = self._stat(fp, st)
+        if st is None:
+            return
+        with self._lock:
+            self._entries[str(fp)] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "payload": payload,
+            }
+            self._dirty = True
+
+    def discard(self, fp: Path):
+        with self._lock:
+            if self._entries.pop(str(fp), None) is not None:
+                self._dirty = True
+
+    def prune(self, live_paths: Iterable[Path]):
+        """Drop entries for files that no longer exist in the scanned set."""
+        keep = {str(p) for p in live_paths}
+        with self._lock:
+            stale = [k for k in self._entries if k not in keep]
+            for k in stale:
+                del self._entries[k]
+            if stale:
+                self._dirty = True
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
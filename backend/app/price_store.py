@@ -0,0 +1,169 @@
+"""
+Indexed local store for last-known stock prices (SQLite, WAL mode).
+
+stock_service persists every fetched quote so prices survive restarts and
+can be served when Zerodha/Yahoo are unavailable.  That used to be one
+JSON file that was loaded, merged and rewritten in full on every fetch
+batch, and re-parsed in full on every cache miss.  Here each price is one
+row keyed by "SYMBOL.EXCHANGE":
+
+    prices(key TEXT PRIMARY KEY, data TEXT, updated_at REAL)
+    meta(key TEXT PRIMARY KEY, value TEXT)
+
+so a batch is a single upsert transaction and a miss is an indexed lookup
+of just the keys asked for.  data holds the same JSON dict the file used
+to (price, name, week_52_high, ...); updated_at is when the row was last
+written (epoch seconds).
+
+A store opened next to an existing stock_prices.json imports that file so
+no saved prices are lost.  Success is recorded in meta, so an import that
+failed (or was interrupted) is retried on the next open; rows already
+newer than the file are kept.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on "?" parameters is 999 on older builds
+_CHUNK = 500
+
+
+class PriceStore:
+    """Thread-safe {key: price dict} table with per-row timestamps."""
+
+    def __init__(self, db_path: str, import_json: Optional[str] = None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        if import_json and not self._imported():
+            self._import_json(import_json)
+
+    def _imported(self) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone() is not None
+
+    def _import_json(self, json_path: str):
+        """Import the legacy JSON file; records success so it runs only once."""
+        name = os.path.basename(json_path)
+        rows = []
+        try:
+            with open(json_path) as f:
+                saved = json.load(f)
+            ts = os.path.getmtime(json_path)
+        except FileNotFoundError:
+            saved = {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"[PriceStore] Not importing unreadable {name} (will retry): {e}")
+            return
+        if isinstance(saved, dict):
+            rows = [(key, json.dumps(info, default=str), ts)
+                    for key, info in saved.items() if isinstance(info, dict)]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO prices (key, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET data = excluded.data, "
+                    "updated_at = excluded.updated_at "
+                    "WHERE excluded.updated_at > prices.updated_at", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                    (str(time.time()),))
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._conn.execute("ROLLBACK")
+                logger.warning(f"[PriceStore] Importing {name} failed (will retry): {e}")
+                return
+        if rows:
+            logger.info(f"[PriceStore] Imported {len(rows)} prices from {name}")
+
+    # ── Writes ────────────────────────────────────────────
+
+    def upsert(self, prices: Dict[str, dict], updated_at: Optional[float] = None):
+        """Insert or replace one row per key, in one transaction."""
+        if not prices:
+            return
+        ts = time.time() if updated_at is None else updated_at
+        rows = [(key, json.dumps(info, default=str), ts) for key, info in prices.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO prices (key, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET data = excluded.data, "
+                    "updated_at = excluded.updated_at", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # ── Reads ─────────────────────────────────────────────
+
+    def _select(self, columns: str, keys: Iterable[str]) -> list:
+        keys = list(dict.fromkeys(keys))
+        rows = []
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows += self._conn.execute(
+                    f"SELECT key, {columns} FROM prices WHERE key IN ({marks})", chunk).fetchall()
+        return rows
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        """{key: saved dict} for the keys that have a row."""
+        return {key: json.loads(data) for key, data in self._select("data", keys)}
+
+    def get_rows(self, keys: Iterable[str]) -> Dict[str, Tuple[dict, float]]:
+        """{key: (saved dict, updated_at)} for the keys that have a row."""
+        return {key: (json.loads(data), ts)
+                for key, data, ts in self._select("data, updated_at", keys)}
+
+    def get(self, key: str) -> Optional[dict]:
+        return self.get_many([key]).get(key)
+
+    def last_updated(self, keys: Iterable[str]) -> Dict[str, float]:
+        """{key: epoch seconds of its last upsert} for the keys that have a row."""
+        return dict(self._select("updated_at", keys))
+
+    def all(self) -> Dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, data FROM prices").fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[str, PriceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def store_for(json_path: str) -> PriceStore:
+    """The shared store replacing *json_path* (…/stock_prices.json →
+    …/stock_prices.sqlite), importing the JSON file on first use."""
+    db_path = os.path.splitext(os.path.abspath(json_path))[0] + ".sqlite"
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = PriceStore(db_path, import_json=json_path)
+        return store
@@ -0,0 +1,304 @@
+"""
+Circuit breakers and health tracking for upstream providers.
+
+Every outbound fetcher (Zerodha, Yahoo, Google Finance, AMFI, mfapi.in,
+NSE, the news feeds, ...) goes through the breaker named after its
+provider, either with call():
+
+    resp = provider_health.call("amfi", http_client.get, url, timeout=15)
+
+or, when success isn't just "no exception and no 5xx/429", with guard():
+
+    with provider_health.guard("yahoo") as g:
+        df = yf.download(...)
+        if df is None or df.empty:
+            g.fail("empty response")
+
+A breaker opens after FAILURE_THRESHOLD consecutive failures (or when at
+least half of the last WINDOW calls failed).  While open, calls fail at
+once with CircuitOpenError instead of waiting on a timeout per symbol.
+After the cooldown one probe call is let through (half-open): success
+closes the breaker, failure re-opens it with the cooldown doubled (up to
+MAX_COOLDOWN).  Each breaker also keeps error counts and a latency
+histogram for GET /api/diagnostics/providers.
+
+Tuning via environment:
+  PROVIDER_FAILURE_THRESHOLD  consecutive failures that open a breaker (default 5)
+  PROVIDER_COOLDOWN           first open period in seconds (default 30)
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(0.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+FAILURE_THRESHOLD = max(1, int(_env_float("PROVIDER_FAILURE_THRESHOLD", 5)))
+COOLDOWN = _env_float("PROVIDER_COOLDOWN", 30.0)
+MAX_COOLDOWN = 600.0
+WINDOW = 50             # recent calls kept for error rate / percentiles
+ERROR_RATE = 0.5        # ...and the failure share over them that opens
+MIN_CALLS = 10          # calls needed before the error rate counts
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)   # seconds (upper bounds)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def _failed_response(result) -> Optional[str]:
+    """HTTP responses that mean the provider is unhealthy (5xx, 429)."""
+    status = getattr(result, "status_code", None)
+    if isinstance(status, int) and (status >= 500 or status == 429):
+        return f"HTTP {status}"
+    return None
+
+
+class _Guard:
+    def __init__(self):
+        self.error: Optional[str] = None
+
+    def fail(self, reason: str):
+        """Count this call as a failure without raising."""
+        self.error = reason
+
+
+class CircuitBreaker:
+    """Closed → open → half-open state machine plus health counters."""
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown: float = COOLDOWN, max_cooldown: float = MAX_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._cooldown = cooldown
+        self._opened_at = 0.0
+        self._probing = False
+        self._consecutive = 0
+        # (ok, latency) per recent call
+        self._recent: Deque[Tuple[bool, float]] = deque(maxlen=WINDOW)
+        self._histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+
+    # ── State ─────────────────────────────────────────────
+
+    def _refresh(self, now: float):
+        # Caller holds _lock
+        if self._state == OPEN and now - self._opened_at >= self._cooldown:
+            self._state = HALF_OPEN
+            self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(self._clock())
+            return self._state
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self._cooldown - self._clock())
+
+    def allow(self) -> bool:
+        """May a call go out now?  In half-open, only one probe at a time."""
+        with self._lock:
+            self._refresh(self._clock())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def _open(self, now: float):
+        # Caller holds _lock
+        if self._state == HALF_OPEN:
+            self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+        else:
+            self._cooldown = self.base_cooldown
+        self._state = OPEN
+        self._opened_at = now
+        self._probing = False
+        self.opened += 1
+        logger.warning(f"[ProviderHealth] {self.name} circuit open for {self._cooldown:.0f}s "
+                       f"({self.last_error})")
+
+    # ── Outcomes ──────────────────────────────────────────
+
+    def _record(self, ok: bool, latency: float):
+        self.calls += 1
+        self._recent.append((ok, latency))
+        self._histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def record_success(self, latency: float = 0.0):
+        with self._lock:
+            self._record(True, latency)
+            self._consecutive = 0
+            self.last_success_at = time.time()
+            if self._state != CLOSED:
+                logger.info(f"[ProviderHealth] {self.name} recovered — circuit closed")
+            self._state = CLOSED
+            self._cooldown = self.base_cooldown
+            self._probing = False
+
+    def record_failure(self, latency: float = 0.0, error: object = None):
+        with self._lock:
+            now = self._clock()
+            self._record(False, latency)
+            self.failures += 1
+            self._consecutive += 1
+            self.last_error = str(error)[:200] if error is not None else "failed"
+            self.last_failure_at = time.time()
+            self._refresh(now)
+            if self._state == HALF_OPEN:
+                self._open(now)
+            elif self._state == CLOSED:
+                failed = sum(1 for ok, _ in self._recent if not ok)
+                if (self._consecutive >= self.failure_threshold or
+                        (len(self._recent) >= MIN_CALLS and failed / len(self._recent) >= ERROR_RATE)):
+                    self._open(now)
+
+    @contextmanager
+    def guard(self):
+        """Run the block as one call to this provider (see module docstring)."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+        g = _Guard()
+        t0 = time.monotonic()
+        try:
+            yield g
+        except Exception as e:
+            self.record_failure(time.monotonic() - t0, e)
+            raise
+        if g.error:
+            self.record_failure(time.monotonic() - t0, g.error)
+        else:
+            self.record_success(time.monotonic() - t0)
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """fn(*args, **kwargs) through the breaker; 5xx / 429 responses count as failures."""
+        with self.guard() as g:
+            result = fn(*args, **kwargs)
+            error = _failed_response(result)
+            if error:
+                g.fail(error)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._cooldown = self.base_cooldown
+            self._consecutive = 0
+            self._probing = False
+
+    def probe_now(self):
+        """Let the next call through as a half-open probe (e.g. on a manual refresh)."""
+        with self._lock:
+            if self._state == OPEN:
+                self._state = HALF_OPEN
+                self._probing = False
+
+    # ── Reporting ─────────────────────────────────────────
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._refresh(self._clock())
+            recent = list(self._recent)
+            latencies = sorted(lat for _, lat in recent)
+            pct = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+            bounds = [f"<={b:g}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+            return {
+                "provider": self.name,
+                "state": self._state,
+                "retry_in": (round(max(0.0, self._opened_at + self._cooldown - self._clock()), 1)
+                             if self._state == OPEN else 0.0),
+                "cooldown": self._cooldown,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "opened": self.opened,
+                "consecutive_failures": self._consecutive,
+                "error_rate": (round(sum(1 for ok, _ in recent if not ok) / len(recent), 3)
+                               if recent else None),
+                "latency_p50": pct(0.5) if latencies else None,
+                "latency_p95": pct(0.95) if latencies else None,
+                "latency_histogram": dict(zip(bounds, self._histogram)),
+                "last_error": self.last_error,
+                "last_failure_at": self.last_failure_at,
+                "last_success_at": self.last_success_at,
+            }
+
+
+# ═══════════════════════════════════════════════════════════
+#  REGISTRY
+# ═══════════════════════════════════════════════════════════
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for provider *name* (created on first use)."""
+    with _breakers_lock:
+        b = _breakers.get(name)
+        if b is None:
+            b = _breakers[name] = CircuitBreaker(name)
+        return b
+
+
+def call(provider: str, fn: Callable, *args, **kwargs):
+    return breaker(provider).call(fn, *args, **kwargs)
+
+
+def guard(provider: str):
+    return breaker(provider).guard()
+
+
+def is_open(provider: str) -> bool:
+    """True while *provider* is failing fast (doesn't use up a probe)."""
+    return breaker(provider).state == OPEN
+
+
+def snapshot() -> List[dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in sorted(breakers, key=lambda b: b.name)]
+
+
+def reset_all():
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,144 @@
+"""
+Coalescing background jobs for price refreshes.
+
+A refresh (auto-login, reindex, cache clear, the Zerodha/Yahoo fetch) used
+to run inside every POST /api/prices/refresh, so several tabs or users
+hitting it together ran the whole pipeline several times in parallel.
+
+RefreshCoordinator runs at most one job per key (e.g. one per portfolio):
+submit() starts a job in a worker thread and returns it at once, or — if a
+job for that key is still running — returns that job so the caller can
+wait on it or poll it instead of starting another.  Jobs record the stage
+they are in and how long each stage / upstream source took.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEEP_FINISHED = 100     # finished jobs kept for status lookups
+
+
+class RefreshJob:
+    """One run of a refresh pipeline; safe to read from any thread."""
+
+    def __init__(self, job_id: str, key: Hashable):
+        self.id = job_id
+        self.key = key
+        self.status = "running"         # running | done | error
+        self.stage = "queued"
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        # stage or source name → seconds
+        self.timings: Dict[str, float] = {}
+        self.progress: Dict[str, int] = {}
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.attached = 0               # callers that joined instead of starting a job
+        self._stage_t0 = time.monotonic()
+        self._done = threading.Event()
+
+    def set_stage(self, stage: str):
+        """Enter *stage*, recording how long the previous one took."""
+        now = time.monotonic()
+        if self.stage != "queued":
+            self.timings[self.stage] = round(self.timings.get(self.stage, 0.0) + now - self._stage_t0, 3)
+        self.stage = stage
+        self._stage_t0 = now
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; False on timeout."""
+        return self._done.wait(timeout)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def _finish(self, result: Optional[dict], error: Optional[str]):
+        self.set_stage("finished")
+        self.result = result
+        self.error = error
+        self.status = "error" if error else "done"
+        self.finished_at = time.time()
+        self._done.set()
+
+    def to_dict(self) -> dict:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed": round(end - self.started_at, 1),
+            "timings": dict(self.timings),
+            "progress": dict(self.progress),
+            "attached": self.attached,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class RefreshCoordinator:
+    """At most one running job per key; later callers attach to it."""
+
+    def __init__(self, prefix: str = "job"):
+        self._prefix = prefix
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._running: Dict[Hashable, RefreshJob] = {}
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+
+    def submit(self, key: Hashable, run: Callable[[RefreshJob], dict]) -> Tuple[RefreshJob, bool]:
+        """Start *run(job)* for *key*, or join the job already running.
+
+        Returns (job, attached).  *run* returns the job's result dict;
+        an exception marks the job as failed.
+        """
+        with self._lock:
+            job = self._running.get(key)
+            if job is not None:
+                job.attached += 1
+                return job, True
+            job = RefreshJob(f"{self._prefix}-{next(self._ids)}", key)
+            self._running[key] = job
+            self._jobs[job.id] = job
+            self._trim()
+        threading.Thread(target=self._run, args=(job, run), name=job.id, daemon=True).start()
+        return job, False
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def running(self) -> list:
+        with self._lock:
+            return list(self._running.values())
+
+    def _run(self, job: RefreshJob, run: Callable[[RefreshJob], dict]):
+        result, error = None, None
+        try:
+            result = run(job)
+        except Exception as e:
+            logger.error(f"[RefreshJobs] {job.id} failed: {e}")
+            error = str(e)[:200] or type(e).__name__
+        finally:
+            with self._lock:
+                if self._running.get(job.key) is job:
+                    del self._running[job.key]
+            job._finish(result, error)
+
+    def _trim(self):
+        # Caller holds _lock; never drop running jobs
+        excess = len(self._jobs) - KEEP_FINISHED
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+                excess -= 1
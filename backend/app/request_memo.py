@@ -0,0 +1,47 @@
+"""
+Request-scoped memoization for portfolio reads.
+
+A GET handler often reaches the same portfolio through several accessors
+(get_all_holdings, get_all_sold, get_dividends_by_symbol, ...), and each
+used to validate every cached symbol again — one stat() per workbook per
+call.  Inside request_scope() the first call's result is remembered for
+the rest of the request; outside one (background threads, scripts, tests)
+memoized() simply computes.
+
+Anything that changes a portfolio calls forget() for its key, so a read
+after a write in the same request still sees the write.
+"""
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Optional
+
+_memo: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("_request_memo", default=None)
+
+
+@contextmanager
+def request_scope():
+    """Memoize reads until the block exits (one HTTP request)."""
+    token = _memo.set({})
+    try:
+        yield
+    finally:
+        _memo.reset(token)
+
+
+def memoized(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """compute() once per request for *key*; uncached outside a scope."""
+    memo = _memo.get()
+    if memo is None:
+        return compute()
+    try:
+        return memo[key]
+    except KeyError:
+        value = memo[key] = compute()
+        return value
+
+
+def forget(key: Hashable):
+    """Drop *key* from the current request's memo, if any."""
+    memo = _memo.get()
+    if memo is not None:
+        memo.pop(key, None)
@@ -5,23 +5,32 @@ Priority order:
   1. Zerodha Kite Connect (primary — fast, reliable, Indian market)
   2. yfinance (batched, with retry + exponential backoff)
   3. Google Finance scraping (fallback)
-  4. Saved JSON prices (offline fallback)
+  4. Saved prices (local SQLite store — offline fallback)
   5. xlsx Index sheet data (last resort)
 
 All sources feed into a unified cache.  Manual push via bulk_update_prices()
-also writes to the JSON file so data survives restarts.
+also writes to the price store so data survives restarts.
+
+Cache entries carry their source, fetch time and max age (StockLiveData
+.source / .fetched_at / .max_age).  Refreshes expire entries and overwrite
+them in place rather than clearing the cache, so readers always get the
+last known price; get_cached_prices() serves stale entries immediately and
+queues them for background revalidation.
 """
 import os
-import json
 import re
 import time
 import threading
 import random
-import requests as _requests
+from contextlib import contextmanager
 import yfinance as yf
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, List, Set, Tuple
 from .models import StockLiveData
 from .xlsx_database import xlsx_db as db
+from . import fetch_scheduler
+from . import live_feed
+from . import price_store
+from . import http_client, provider_health
 from . import zerodha_service
 
 import logging
@@ -32,9 +41,11 @@ logger = logging.getLogger(__name__)
 # ═══════════════════════════════════════════════════════════
 
 BATCH_SIZE = 5            # tickers per yf.download()
-BATCH_DELAY = (2.0, 3.5)  # random delay between batches
+YAHOO_RATE = (0.5, 2)     # yf.download() calls per second, burst
+GOOGLE_RATE = (2.0, 4)    # Google Finance requests per second, burst
 REFRESH_INTERVAL = 300    # (used by frontend auto-refresh setting)
 MAX_RETRIES = 3           # retry attempts per source
+REVALIDATE_BACKOFF = 60   # seconds before a stale key is revalidated again
 
 # Fallback toggle — Yahoo/Google are OFF by default.
 # Enable via: python -m uvicorn app.main:app --port 9999 --reload
@@ -46,56 +57,135 @@ _DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 _PRICES_FILE = os.path.join(_DATA_DIR, "stock_prices.json")
 
 # ═══════════════════════════════════════════════════════════
-#  CACHE  (simple dict — NO TTL, cleared explicitly on refresh)
+#  CACHE  (per-entry freshness — expired on refresh, never dropped)
 # ═══════════════════════════════════════════════════════════
+# An entry is fresh while now - fetched_at < max_age (max_age None = always).
+# Offline sources (saved prices, xlsx) use max_age 0: served, but stale.
 
 _cache: Dict[str, StockLiveData] = {}
 _cache_lock = threading.Lock()
+# Entries dropped by clear_cache(), kept until re-fetched so that an
+# unchanged price doesn't count as a change (see cache_version)
+_cleared: Dict[str, StockLiveData] = {}
+# Keys expire_cache() marked stale, until they are set again
+_expired: Set[str] = set()
+_cache_version = 0
+
+_FRESHNESS_FIELDS = {"source", "fetched_at", "max_age"}
+
+
+def _live_ttl() -> float:
+    """How long a price fetched from a live source counts as fresh."""
+    return float(REFRESH_INTERVAL)
+
+
+def _is_fresh(key: str, data: StockLiveData, now: Optional[float] = None) -> bool:
+    if key in _expired:
+        return False
+    if data.max_age is None:
+        return True
+    if data.fetched_at is None:
+        return False
+    return (now or time.time()) - data.fetched_at < data.max_age
 
 
 def _cache_get(key: str) -> Optional[StockLiveData]:
-    """Get from cache.  Returns data until explicitly cleared."""
+    """Get from cache, fresh or stale (see _is_fresh)."""
     with _cache_lock:
         return _cache.get(key)
 
 
-def _cache_set(key: str, data: StockLiveData):
-    """Set a cache entry."""
+def _cache_get_fresh(key: str) -> Optional[StockLiveData]:
+    """Get from cache only if the entry is still fresh."""
     with _cache_lock:
+        data = _cache.get(key)
+        return data if data is not None and _is_fresh(key, data) else None
+
+
+def _cache_set(key: str, data: StockLiveData, local: bool = False):
+    """Set a cache entry (a changed price is also published to live_feed).
+
+    A new fetch time alone changes cache_version (responses carry it) but
+    is not published as a price change.  *local* marks a first load from
+    the saved price store or xlsx: any read would load the same value, so
+    it leaves cache_version alone and an ETag taken before it stays valid.
+    """
+    global _cache_version
+    with _cache_lock:
+        previous = _cache.get(key, _cleared.pop(key, None))
+        _expired.discard(key)
+        changed = previous != data
+        if changed and not (local and previous is None):
+            _cache_version += 1
         _cache[key] = data
+    if changed and (previous is None or
+                    previous.model_dump(exclude=_FRESHNESS_FIELDS)
+                    != data.model_dump(exclude=_FRESHNESS_FIELDS)):
+        live_feed.publish("price", key, data.model_dump())
+
+
+def _cache_settle(keys: List[str]):
+    """Count cleared entries that could not be re-fetched as a change."""
+    global _cache_version
+    with _cache_lock:
+        lost = [k for k in keys if k not in _cache and _cleared.pop(k, None) is not None]
+        if lost:
+            _cache_version += 1
+
+
+def cache_version() -> int:
+    """Changes whenever a price served from the cache does (for HTTP ETags)."""
+    return _cache_version
 
 
 # ═══════════════════════════════════════════════════════════
-#  JSON FILE PERSISTENCE (survives restarts)
+#  PRICE STORE PERSISTENCE (survives restarts)
 # ═══════════════════════════════════════════════════════════
+# Rows live in an indexed SQLite store next to _PRICES_FILE (see
+# price_store); the legacy JSON file is imported into it on first use.
+
+def _price_store() -> price_store.PriceStore:
+    return price_store.store_for(_PRICES_FILE)
+
 
 def _save_prices_file(prices: Dict[str, dict]):
-    """Save stock prices to JSON for offline fallback."""
-    os.makedirs(_DATA_DIR, exist_ok=True)
+    """Upsert saved stock prices (one row per key) for offline fallback."""
     try:
-        # Merge with existing
-        existing = _load_prices_file()
-        existing.update(prices)
-        with open(_PRICES_FILE, "w") as f:
-            json.dump(existing, f, indent=2)
+        _price_store().upsert(prices)
     except Exception as e:
-        logger.error(f"[StockService] Failed to save prices file: {e}")
+        logger.error(f"[StockService] Failed to save prices: {e}")
+
+
+def _load_saved_prices(keys: List[str]) -> Dict[str, dict]:
+    """Saved prices for just *keys* (indexed lookup)."""
+    try:
+        return _price_store().get_many(keys)
+    except Exception as e:
+        logger.error(f"[StockService] Failed to read saved prices: {e}")
+        return {}
+
+
+def _load_saved_rows(keys: List[str]) -> Dict[str, Tuple[dict, float]]:
+    """Saved prices for just *keys*, with when each was saved."""
+    try:
+        return _price_store().get_rows(keys)
+    except Exception as e:
+        logger.error(f"[StockService] Failed to read saved prices: {e}")
+        return {}
 
 
 def _load_prices_file() -> Dict[str, dict]:
-    """Load saved stock prices from JSON."""
+    """Load every saved stock price."""
     try:
-        with open(_PRICES_FILE) as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
+        return _price_store().all()
+    except Exception as e:
+        logger.error(f"[StockService] Failed to read saved prices: {e}")
         return {}
 
 
-def _file_fallback(symbol: str, exchange: str) -> Optional[StockLiveData]:
-    """Load a single stock price from the saved JSON file."""
-    saved = _load_prices_file()
-    key = f"{symbol}.{exchange}"
-    info = saved.get(key)
+def _from_saved(symbol: str, exchange: str, info: Optional[dict],
+                saved_at: Optional[float] = None) -> Optional[StockLiveData]:
+    """StockLiveData for a saved price row (stale by definition)."""
     if not info or float(info.get("price", 0)) <= 0:
         return None
     return StockLiveData(
@@ -111,9 +201,17 @@ def _file_fallback(symbol: str, exchange: str) -> Optional[StockLiveData]:
         volume=int(info.get("volume", 0) or 0),
         previous_close=float(info.get("previous_close", 0) or 0),
         is_manual=True,
+        source="saved", fetched_at=saved_at, max_age=0.0,
     )
 
 
+def _file_fallback(symbol: str, exchange: str) -> Optional[StockLiveData]:
+    """Load a single stock price from the saved price store."""
+    key = f"{symbol}.{exchange}"
+    info, saved_at = _load_saved_rows([key]).get(key, (None, None))
+    return _from_saved(symbol, exchange, info, saved_at)
+
+
 # ═══════════════════════════════════════════════════════════
 #  XLSX FALLBACK (last resort — Index sheet data)
 # ═══════════════════════════════════════════════════════════
@@ -128,7 +226,7 @@ def _build_xlsx():  # pragma: no cover
     if _xlsx_built:
         return
     import openpyxl
-    from .xlsx_database import _extract_index_data
+    from .xlsx_parse import _extract_index_data
     for sym, fp in db._file_map.items():
         if sym in _xlsx_idx:
             continue  # already cached
@@ -157,7 +255,7 @@ def _xlsx_single(symbol: str) -> dict:  # pragma: no cover
         return {"price": 0, "w52h": 0, "w52l": 0}
     try:
         import openpyxl
-        from .xlsx_database import _extract_index_data
+        from .xlsx_parse import _extract_index_data
         wb = openpyxl.load_workbook(fp, data_only=True)
         idx = _extract_index_data(wb)
         wb.close()
@@ -190,6 +288,7 @@ def _xlsx_fallback(symbol: str, exchange: str) -> Optional[StockLiveData]:
         day_change=0, day_change_pct=0,
         volume=0, previous_close=0,
         is_manual=True,
+        source="xlsx", max_age=0.0,
     )
 
 
@@ -210,13 +309,16 @@ def _download_batch(tickers: List[str]) -> Dict[str, float]:
     if not tickers:
         return prices
     try:
-        df = yf.download(
-            " ".join(tickers),
-            period="5d",
-            progress=False,
-            threads=False,
-            timeout=15,
-        )
+        with provider_health.guard("yahoo") as g:
+            df = yf.download(
+                " ".join(tickers),
+                period="5d",
+                progress=False,
+                threads=False,
+                timeout=15,
+            )
+            if df is None or df.empty:
+                g.fail("empty download")
         if df is None or df.empty:
             return prices
 
@@ -250,7 +352,7 @@ def _download_batch_with_retry(tickers: List[str]) -> Dict[str, float]:
     """Download with retry + exponential backoff."""
     for attempt in range(MAX_RETRIES):
         prices = _download_batch(tickers)
-        if prices:
+        if prices or provider_health.is_open("yahoo"):
             return prices
         if attempt < MAX_RETRIES - 1:
             delay = (attempt + 1) * 2 + random.uniform(0, 1)
@@ -278,7 +380,8 @@ def _fetch_google_finance_price(symbol: str, exchange: str) -> Optional[float]:
     url = f"https://www.google.com/finance/quote/{symbol}:{suffix}"
     for attempt in range(2):
         try:
-            resp = _requests.get(url, headers=_GOOGLE_HEADERS, timeout=10)
+            resp = provider_health.call("google_finance", http_client.get, url,
+                                        headers=_GOOGLE_HEADERS, timeout=10)
             if resp.status_code == 200:
                 # Google Finance embeds price in data-last-price attribute
                 match = re.search(r'data-last-price="([\d,.]+)"', resp.text)
@@ -287,6 +390,8 @@ def _fetch_google_finance_price(symbol: str, exchange: str) -> Optional[float]:
                     price = float(price_str)
                     if price > 0:
                         return price
+        except provider_health.CircuitOpenError:
+            return None
         except Exception:
             pass
         if attempt < 1:
@@ -300,7 +405,8 @@ def _fetch_google_finance_ticker(gf_symbol: str) -> Optional[Tuple[float, float]
     url = f"https://www.google.com/finance/quote/{gf_symbol}"
     for attempt in range(2):
         try:
-            resp = _requests.get(url, headers=_GOOGLE_HEADERS, timeout=10)
+            resp = provider_health.call("google_finance", http_client.get, url,
+                                        headers=_GOOGLE_HEADERS, timeout=10)
             if resp.status_code == 200:
                 match = re.search(r'data-last-price="([\d,.]+)"', resp.text)
                 prev_match = re.search(r'data-previous-close="([\d,.]+)"', resp.text)
@@ -308,6 +414,8 @@ def _fetch_google_finance_ticker(gf_symbol: str) -> Optional[Tuple[float, float]
                     price = float(match.group(1).replace(",", ""))
                     prev = float(prev_match.group(1).replace(",", "")) if prev_match else 0
                     return (price, prev)
+        except provider_health.CircuitOpenError:
+            return None
         except Exception:
             pass
         if attempt < 1:
@@ -335,18 +443,60 @@ def _fetch_via_zerodha(symbols: List[Tuple[str, str]]) -> Dict[str, dict]:
         return {}
 
 
-def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
-    """Fetch prices: Zerodha → yfinance → Google Finance → saved JSON → xlsx."""
+@contextmanager
+def _timed(timings: Optional[Dict[str, float]], source: str):
+    """Add the block's wall time to timings[source] (no-op when None)."""
+    t0 = time.monotonic()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[source] = round(timings.get(source, 0.0) + time.monotonic() - t0, 3)
+
+
+def _fallback_providers(ymap: Dict[str, Tuple[str, str]]) -> List[fetch_scheduler.Provider]:
+    """Yahoo (batched) then Google Finance (per symbol), keyed by Yahoo symbol."""
+    def google(batch: List[str]) -> Dict[str, float]:
+        prices = {}
+        for ys in batch:
+            price = _fetch_google_finance_price(*ymap[ys])
+            if price and price > 0:
+                prices[ys] = price
+        return prices
+
+    return [
+        fetch_scheduler.Provider("yahoo", _download_batch_with_retry, batch_size=BATCH_SIZE,
+                                 bucket=fetch_scheduler.limiter("yahoo", *YAHOO_RATE)),
+        fetch_scheduler.Provider("google", google,
+                                 bucket=fetch_scheduler.limiter("google", *GOOGLE_RATE)),
+    ]
+
+
+def fetch_multiple(symbols: List[Tuple[str, str]],
+                   timings: Optional[Dict[str, float]] = None,
+                   on_result: Optional[Callable[[str, StockLiveData], None]] = None,
+                   ) -> Dict[str, StockLiveData]:
+    """Fetch prices: Zerodha → yfinance → Google Finance → saved prices → xlsx.
+
+    Yahoo and Google run concurrently under per-provider rate limits (see
+    fetch_scheduler).  *timings*, if given, receives seconds spent per
+    source; *on_result(key, data)* is called as each fetched price lands.
+    """
     results: Dict[str, StockLiveData] = {}
     need: List[Tuple[str, str]] = []
+    # Stale live prices, kept if every source fails this time
+    stale: Dict[str, StockLiveData] = {}
 
-    # 1. Serve from cache
+    # 1. Serve fresh entries from cache
     for sym, exch in symbols:
         key = f"{sym}.{exch}"
-        c = _cache_get(key)
+        c = _cache_get_fresh(key)
         if c:
             results[key] = c
         else:
+            c = _cache_get(key)
+            if c and not c.is_manual:
+                stale[key] = c
             need.append((sym, exch))
 
     if not need:
@@ -357,7 +507,8 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
     still_need: List[Tuple[str, str]] = []
 
     if zerodha_service.is_session_valid():
-        zerodha_prices = _fetch_via_zerodha(need)
+        with _timed(timings, "zerodha"):
+            zerodha_prices = _fetch_via_zerodha(need)
 
     to_save: Dict[str, dict] = {}
 
@@ -376,9 +527,12 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
                 volume=int(zq.get("volume", 0) or 0),
                 previous_close=float(zq.get("close", 0) or 0),
                 is_manual=False,
+                source="zerodha", fetched_at=time.time(), max_age=_live_ttl(),
             )
             _cache_set(key, data)
             results[key] = data
+            if on_result is not None:
+                on_result(key, data)
             to_save[key] = {
                 "price": data.current_price,
                 "name": data.name,
@@ -406,10 +560,11 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
                        and not results[f"{sym}.{exch}"].is_manual]
     if zerodha_symbols:
         try:
-            w52_data = zerodha_service.fetch_52_week_range(zerodha_symbols)
+            with _timed(timings, "zerodha_52w"):
+                w52_data = zerodha_service.fetch_52_week_range(zerodha_symbols)
             if w52_data:
                 # Load existing saved data for fallback
-                saved_prices = _load_prices_file()
+                saved_prices = _load_saved_prices([f"{s}.{e}" for s, e in zerodha_symbols])
                 for sym, exch in zerodha_symbols:
                     key = f"{sym}.{exch}"
                     w52 = w52_data.get(key)
@@ -439,15 +594,15 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
                             h = idx.get("w52h", 0)
                             l = idx.get("w52l", 0)
                     if h > 0 and key in results:
-                        results[key].week_52_high = h
-                        results[key].week_52_low = l
-                        results[key].week_change_pct = wcp
-                        results[key].month_change_pct = mcp
-                        results[key].sma_50 = s50
-                        results[key].sma_200 = s200
-                        results[key].signal = sig
-                        results[key].days_below_sma = dbs
-                        results[key].rsi = rsi_val
+                        # Replace (not mutate) the cached object so the
+                        # change is versioned and published
+                        results[key] = results[key].model_copy(update={
+                            "week_52_high": h, "week_52_low": l,
+                            "week_change_pct": wcp, "month_change_pct": mcp,
+                            "sma_50": s50, "sma_200": s200, "signal": sig,
+                            "days_below_sma": dbs, "rsi": rsi_val,
+                        })
+                        _cache_set(key, results[key])
                         if key in to_save:
                             to_save[key]["week_52_high"] = h
                             to_save[key]["week_52_low"] = l
@@ -463,8 +618,8 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
                     _save_prices_file(to_save)
         except Exception as e:
             logger.error(f"[StockService] 52-week fetch error: {e}")
-            # Fallback: try to preserve existing 52-week from JSON/xlsx
-            saved_prices = _load_prices_file()
+            # Fallback: try to preserve existing 52-week from saved prices/xlsx
+            saved_prices = _load_saved_prices([f"{s}.{e}" for s, e in zerodha_symbols])
             for sym, exch in zerodha_symbols:
                 key = f"{sym}.{exch}"
                 if key in results and results[key].week_52_high <= 0:
@@ -476,8 +631,10 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
                         h = idx.get("w52h", 0)
                         l = idx.get("w52l", 0)
                     if h > 0:
-                        results[key].week_52_high = h
-                        results[key].week_52_low = l
+                        results[key] = results[key].model_copy(update={
+                            "week_52_high": h, "week_52_low": l,
+                        })
+                        _cache_set(key, results[key])
 
     if not still_need:
         zerodha_got = len(need) - len(still_need)
@@ -487,89 +644,71 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
 
     # ── SOURCE 2 & 3: YAHOO / GOOGLE (only if ENABLE_YAHOO_GOOGLE) ──
     ymap: Dict[str, Tuple[str, str]] = {}
-    all_prices: Dict[str, float] = {}
-
-    if ENABLE_YAHOO_GOOGLE:
-        for sym, exch in still_need:
-            ys = _yahoo_sym(sym, exch)
-            ymap[ys] = (sym, exch)
-
-        all_ys = list(ymap.keys())
-
-        # Yahoo Finance
-        total_batches = (len(all_ys) + BATCH_SIZE - 1) // BATCH_SIZE
-        for i in range(0, len(all_ys), BATCH_SIZE):
-            batch = all_ys[i:i + BATCH_SIZE]
-            bnum = (i // BATCH_SIZE) + 1
-
-            prices = _download_batch_with_retry(batch)
-            all_prices.update(prices)
-            logger.info(f"[StockService] Yahoo batch {bnum}/{total_batches}: "
-                  f"{len(prices)}/{len(batch)} OK")
-
-            if i + BATCH_SIZE < len(all_ys):
-                time.sleep(random.uniform(*BATCH_DELAY))
-
-        yahoo_got = len(all_prices)
-        if yahoo_got > 0:
-            logger.info(f"[StockService] Yahoo total: {yahoo_got}/{len(all_ys)}")
-
-        # Google Finance fallback
-        missing_from_yahoo = [ys for ys in all_ys if ys not in all_prices]
-        if missing_from_yahoo:
-            gf_got = 0
-            for ys in missing_from_yahoo:
-                sym, exch = ymap[ys]
-                gf_price = _fetch_google_finance_price(sym, exch)
-                if gf_price and gf_price > 0:
-                    all_prices[ys] = gf_price
-                    gf_got += 1
-                time.sleep(random.uniform(0.3, 0.8))
-            if gf_got > 0:
-                logger.info(f"[StockService] Google Finance: {gf_got}/{len(missing_from_yahoo)}")
-    else:
-        # Build ymap for the fallback chain below (stale cache / JSON / xlsx)
-        for sym, exch in still_need:
-            ys = _yahoo_sym(sym, exch)
-            ymap[ys] = (sym, exch)
-        if still_need:
-            missed = [f"{s}.{e}" for s, e in still_need]
-            logger.warning(f"[StockService] {len(still_need)} stocks not on Zerodha — "
-                  f"fallback: {', '.join(missed)}")
-
-    # ── BUILD RESULTS + fallback chain ─────────────────────
+    for sym, exch in still_need:
+        ymap[_yahoo_sym(sym, exch)] = (sym, exch)
     yahoo_save: Dict[str, dict] = {}
 
-    for ys, (sym, exch) in ymap.items():
+    def resolved(ys: str, source: str, price: float):
+        # Called as each symbol resolves, so the cache (and live feed)
+        # fill in progressively while slower batches are still running
+        if not price or price <= 0:
+            return
+        sym, exch = ymap[ys]
         key = f"{sym}.{exch}"
-        price = all_prices.get(ys)
+        idx = _xlsx_idx.get(sym, {})
+        data = StockLiveData(
+            symbol=sym, exchange=exch,
+            name=db._name_map.get(sym, sym),
+            current_price=round(price, 2),
+            week_52_high=idx.get("w52h", 0),
+            week_52_low=idx.get("w52l", 0),
+            day_change=0, day_change_pct=0,
+            volume=0, previous_close=0,
+            is_manual=False,
+            source=source, fetched_at=time.time(), max_age=_live_ttl(),
+        )
+        _cache_set(key, data)
+        results[key] = data
+        yahoo_save[key] = {
+            "price": data.current_price,
+            "name": data.name,
+            "week_52_high": data.week_52_high,
+            "week_52_low": data.week_52_low,
+        }
+        if on_result is not None:
+            on_result(key, data)
 
-        if price and price > 0:
-            idx = _xlsx_idx.get(sym, {})
-            data = StockLiveData(
-                symbol=sym, exchange=exch,
-                name=db._name_map.get(sym, sym),
-                current_price=round(price, 2),
-                week_52_high=idx.get("w52h", 0),
-                week_52_low=idx.get("w52l", 0),
-                day_change=0, day_change_pct=0,
-                volume=0, previous_close=0,
-                is_manual=False,
-            )
-            _cache_set(key, data)
-            results[key] = data
-            yahoo_save[key] = {
-                "price": data.current_price,
-                "name": data.name,
-                "week_52_high": data.week_52_high,
-                "week_52_low": data.week_52_low,
-            }
+    if ENABLE_YAHOO_GOOGLE:
+        got = fetch_scheduler.fetch_chain(
+            list(ymap), _fallback_providers(ymap), on_result=resolved, timings=timings)
+        by_source = {}
+        for source, _ in got.values():
+            by_source[source] = by_source.get(source, 0) + 1
+        if got:
+            logger.info(f"[StockService] Yahoo/Google: {len(got)}/{len(ymap)} "
+                        f"({', '.join(f'{k} {v}' for k, v in sorted(by_source.items()))})")
+    elif still_need:
+        missed = [f"{s}.{e}" for s, e in still_need]
+        logger.warning(f"[StockService] {len(still_need)} stocks not on Zerodha — "
+              f"fallback: {', '.join(missed)}")
+
+    # ── Fallback chain for whatever no live source returned ──
+    for ys, (sym, exch) in ymap.items():
+        key = f"{sym}.{exch}"
+        if key in results:
+            continue
+        if key in stale:
+            # Last live price beats the offline sources; stays stale
+            results[key] = stale[key]
         else:
-            # Try saved JSON → xlsx
-            fb = _file_fallback(sym, exch) or _xlsx_fallback(sym, exch)
+            # Try saved prices → xlsx
+            with _timed(timings, "fallback"):
+                fb = _file_fallback(sym, exch) or _xlsx_fallback(sym, exch)
             if fb:
                 _cache_set(key, fb)
                 results[key] = fb
+        if on_result is not None and key in results:
+            on_result(key, results[key])
 
     if yahoo_save:
         _save_prices_file(yahoo_save)
@@ -582,10 +721,13 @@ def fetch_multiple(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
 # ═══════════════════════════════════════════════════════════
 
 def get_cached_prices(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData]:
-    """Return prices from local sources ONLY: memory cache → JSON file → xlsx.
-    Never makes network calls.  Used by GET endpoints to respond instantly."""
+    """Return prices from local sources ONLY: memory cache → price store → xlsx.
+    Never makes network calls.  Used by GET endpoints to respond instantly;
+    stale entries are served as-is and queued for background revalidation."""
     results: Dict[str, StockLiveData] = {}
     need_file: List[Tuple[str, str]] = []
+    stale: List[Tuple[str, str]] = []
+    now = time.time()
 
     # ── Pass 1: serve from memory cache (fast, no I/O) ──
     for sym, exch in symbols:
@@ -593,80 +735,103 @@ def get_cached_prices(symbols: List[Tuple[str, str]]) -> Dict[str, StockLiveData
         c = _cache_get(key)
         if c:
             results[key] = c
+            if not _is_fresh(key, c, now):
+                stale.append((sym, exch))
             continue
         need_file.append((sym, exch))
 
     if not need_file:
+        _revalidate(stale)
         return results
 
-    # ── Pass 2: load JSON file ONCE for all remaining stocks ──
-    saved = _load_prices_file()
+    # ── Pass 2: one indexed lookup for the remaining keys (and their
+    #    alternate-exchange keys) in the saved price store ──
+    saved = _load_saved_rows(
+        [f"{sym}.{exch}" for sym, exch in need_file] +
+        [f"{sym}.{'NSE' if exch.upper() == 'BSE' else 'BSE'}" for sym, exch in need_file])
     need_xlsx: List[Tuple[str, str]] = []
 
     for sym, exch in need_file:
         key = f"{sym}.{exch}"
-        info = saved.get(key)
-        if info and float(info.get("price", 0)) > 0:
-            data = StockLiveData(
-                symbol=sym, exchange=exch,
-                name=info.get("name", db._name_map.get(sym, sym)),
-                current_price=round(float(info["price"]), 2),
-                week_52_high=float(info.get("week_52_high", 0) or 0),
-                week_52_low=float(info.get("week_52_low", 0) or 0),
-                day_change=float(info.get("day_change", 0) or 0),
-                day_change_pct=float(info.get("day_change_pct", 0) or 0),
-                week_change_pct=float(info.get("week_change_pct", 0) or 0),
-                month_change_pct=float(info.get("month_change_pct", 0) or 0),
-                volume=int(info.get("volume", 0) or 0),
-                previous_close=float(info.get("previous_close", 0) or 0),
-                is_manual=True,
-            )
-            _cache_set(key, data)
+        # Fall back to the alternate exchange (BSE→NSE or NSE→BSE)
+        alt_key = f"{sym}.{'NSE' if exch.upper() == 'BSE' else 'BSE'}"
+        data = (_from_saved(sym, exch, *saved.get(key, (None, None)))
+                or _from_saved(sym, exch, *saved.get(alt_key, (None, None))))
+        if data:
+            _cache_set(key, data, local=True)
             results[key] = data
-            continue
-
-        # Try alternate exchange (BSE→NSE or NSE→BSE) from same JSON
-        alt_exch = "NSE" if exch.upper() == "BSE" else "BSE"
-        alt_key = f"{sym}.{alt_exch}"
-        alt_info = saved.get(alt_key)
-        if alt_info and float(alt_info.get("price", 0)) > 0:
-            data = StockLiveData(
-                symbol=sym, exchange=exch,
-                name=alt_info.get("name", db._name_map.get(sym, sym)),
-                current_price=round(float(alt_info["price"]), 2),
-                week_52_high=float(alt_info.get("week_52_high", 0) or 0),
-                week_52_low=float(alt_info.get("week_52_low", 0) or 0),
-                day_change=float(alt_info.get("day_change", 0) or 0),
-                day_change_pct=float(alt_info.get("day_change_pct", 0) or 0),
-                week_change_pct=float(alt_info.get("week_change_pct", 0) or 0),
-                month_change_pct=float(alt_info.get("month_change_pct", 0) or 0),
-                volume=int(alt_info.get("volume", 0) or 0),
-                previous_close=float(alt_info.get("previous_close", 0) or 0),
-                is_manual=True,
-            )
-            _cache_set(key, data)
-            results[key] = data
-            continue
-
-        need_xlsx.append((sym, exch))
+        else:
+            need_xlsx.append((sym, exch))
+        stale.append((sym, exch))
 
     # ── Pass 3: xlsx Index sheet fallback (per-symbol, opens only needed file) ──
     for sym, exch in need_xlsx:
         key = f"{sym}.{exch}"
         xf = _xlsx_fallback(sym, exch)
         if xf:
-            _cache_set(key, xf)
+            _cache_set(key, xf, local=True)
             results[key] = xf
+    _cache_settle([f"{sym}.{exch}" for sym, exch in need_xlsx])
+    _revalidate(stale)
     return results
 
 
+# ═══════════════════════════════════════════════════════════
+#  BACKGROUND REVALIDATION (stale-while-revalidate)
+# ═══════════════════════════════════════════════════════════
+# Reads never wait on the network: stale keys are queued here and fetched
+# by one worker thread at a time.  Only runs when a live source is usable
+# without logging in, and retries a key at most every REVALIDATE_BACKOFF s.
+
+_revalidate_lock = threading.Lock()
+_revalidate_pending: Dict[str, Tuple[str, str]] = {}
+_revalidate_tried: Dict[str, float] = {}
+_revalidate_thread: Optional[threading.Thread] = None
+
+
+def _revalidate(symbols: List[Tuple[str, str]]):
+    """Queue *symbols* for a background fetch_multiple()."""
+    global _revalidate_thread
+    if not symbols or not (ENABLE_YAHOO_GOOGLE or zerodha_service.has_session()):
+        return
+    now = time.monotonic()
+    with _revalidate_lock:
+        for sym, exch in symbols:
+            key = f"{sym}.{exch}"
+            if key in _revalidate_pending or now - _revalidate_tried.get(key, -REVALIDATE_BACKOFF) < REVALIDATE_BACKOFF:
+                continue
+            _revalidate_tried[key] = now
+            _revalidate_pending[key] = (sym, exch)
+        if not _revalidate_pending or _revalidate_thread is not None:
+            return
+        _revalidate_thread = threading.Thread(
+            target=_revalidate_worker, name="price-revalidate", daemon=True)
+        _revalidate_thread.start()
+
+
+def _revalidate_worker():
+    global _revalidate_thread
+    while True:
+        with _revalidate_lock:
+            batch = list(_revalidate_pending.values())
+            _revalidate_pending.clear()
+            if not batch:
+                _revalidate_thread = None
+                return
+        try:
+            fetch_multiple(batch)
+            logger.info(f"[StockService] Revalidated {len(batch)} stale prices")
+        except Exception as e:
+            logger.error(f"[StockService] Revalidation error: {e}")
+
+
 # ═══════════════════════════════════════════════════════════
 #  SINGLE FETCH
 # ═══════════════════════════════════════════════════════════
 
 def fetch_live_data(symbol: str, exchange: str = "NSE") -> Optional[StockLiveData]:
     key = f"{symbol}.{exchange}"
-    c = _cache_get(key)
+    c = _cache_get_fresh(key)
     if c:
         return c
     res = fetch_multiple([(symbol, exchange)])
@@ -711,7 +876,7 @@ def fetch_market_ticker(meta: dict) -> dict:
     try:
         url = f"https://query1.finance.yahoo.com/v8/finance/chart/{yf_sym}?range=5d&interval=1d"
         headers = {"User-Agent": _GOOGLE_HEADERS["User-Agent"]}
-        resp = _requests.get(url, headers=headers, timeout=10)
+        resp = provider_health.call("yahoo", http_client.get, url, headers=headers, timeout=10)
         if resp.status_code == 200:
             data = resp.json()
             chart = data.get("chart", {}).get("result", [])
@@ -766,7 +931,7 @@ def fetch_yahoo_ticker_historical(meta: dict) -> dict:
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36",
     }
     try:
-        resp = _requests.get(url, headers=headers, timeout=10)
+        resp = provider_health.call("yahoo", http_client.get, url, headers=headers, timeout=10)
         if resp.status_code != 200:
             logger.warning(f"[MarketTicker] Yahoo chart API {resp.status_code} for {meta['key']}")
             return result
@@ -842,6 +1007,7 @@ def bulk_update_prices(prices: Dict[str, dict]):
             volume=int(info.get("volume", 0) or 0),
             previous_close=float(info.get("previous_close", 0) or 0),
             is_manual=True,
+            source="manual", fetched_at=time.time(), max_age=_live_ttl(),
         )
         _cache_set(key, data)
         to_save[key] = {
@@ -927,19 +1093,22 @@ def get_refresh_status() -> dict:
             "seconds_ago": (round(time.time() - _last_refresh_time, 1)
                             if _last_refresh_time > 0 else None),
             "cache_size": len(_cache),
+            "cache_stale": sum(1 for k, v in list(_cache.items()) if not _is_fresh(k, v)),
             "refresh_interval": REFRESH_INTERVAL,
         }
 
 
 def _reset_circuit():
-    pass
+    """Let an explicit refresh probe price providers that are failing fast."""
+    for name in ("yahoo", "google_finance"):
+        provider_health.breaker(name).probe_now()
 
 
 def search_stock(query: str, exchange: str = "NSE") -> list:
     ys = _yahoo_sym(query, exchange)
     try:
-        t = yf.Ticker(ys)
-        info = t.info
+        with provider_health.guard("yahoo"):
+            info = yf.Ticker(ys).info
         if info and info.get("shortName"):
             return [{"symbol": query.upper(),
                       "name": info["shortName"],
@@ -949,6 +1118,16 @@ def search_stock(query: str, exchange: str = "NSE") -> list:
     return []
 
 
+def expire_cache(keys: Optional[List[str]] = None):
+    """Mark *keys* (default: every entry) stale without dropping them, so
+    they are re-fetched by the next refresh but still served until then."""
+    with _cache_lock:
+        _expired.update(_cache if keys is None else (k for k in keys if k in _cache))
+
+
 def clear_cache():
+    """Drop every entry (a refresh should use expire_cache instead)."""
     with _cache_lock:
+        _cleared.update(_cache)
         _cache.clear()
+        _expired.clear()
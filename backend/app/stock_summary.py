@@ -0,0 +1,312 @@
+"""
+Materialized per-symbol aggregates behind /api/portfolio/stock-summary.
+
+Everything in a StockSummaryItem that doesn't depend on the live price —
+held/sold quantities, invested cost, realized P&L and its LTCG/STCG split,
+each held lot's holding-period bucket, last transaction — is computed once
+per symbol into a SymbolAggregate and kept in a SummaryTable per
+portfolio.  The table is keyed by the portfolio snapshot version and
+today's date (lots cross the 365-day line at midnight); on a new snapshot
+only symbols whose holdings/sold lists changed are re-aggregated.
+
+summary_item() then adds the price-dependent fields in one pass over the
+pre-bucketed held lots, without any date parsing.
+"""
+import threading
+import weakref
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import Holding, SoldPosition, StockLiveData, StockSummaryItem
+
+
+def _is_long_term(buy_date: str, until: date) -> bool:
+    """India: held for more than 365 days = long-term."""
+    try:
+        return (until - datetime.strptime(buy_date, "%Y-%m-%d").date()).days > 365
+    except Exception:
+        return False
+
+
+class SymbolAggregate:
+    """Price-independent summary of one symbol's held and sold lots."""
+
+    __slots__ = (
+        "exchange", "name", "exchanges", "total_held_qty", "total_sold_qty",
+        "total_invested", "avg_buy_price", "avg_price", "realized_pl", "realized_pl_pct",
+        "ltcg_realized_pl", "stcg_realized_pl", "ltcg_sold_qty", "stcg_sold_qty",
+        "ltcg_sold_cost", "stcg_sold_cost", "ltcg_sold_earliest_buy", "ltcg_sold_latest_sell",
+        "stcg_sold_earliest_buy", "stcg_sold_latest_sell", "last_tx_date", "last_tx_type",
+        "num_held_lots", "num_sold_lots", "lots",
+    )
+
+    def __init__(self, holdings: List[Holding], sold: List[SoldPosition], today: date):
+        # Exchange/name come from the first held lot, else the first sold lot
+        first = holdings[0] if holdings else (sold[0] if sold else None)
+        self.exchange = first.exchange if first else "NSE"
+        self.name = first.name if first else ""
+        # Every exchange the lots were traded on (prices are looked up for each)
+        self.exchanges = {h.exchange for h in holdings} | {s.exchange for s in sold}
+
+        self.total_held_qty = sum(h.quantity for h in holdings)
+        self.total_sold_qty = sum(s.quantity for s in sold)
+        # total_invested = sum of column F (COST) for held lots
+        self.total_invested = sum(
+            h.buy_cost if h.buy_cost > 0 else (h.buy_price * h.quantity)
+            for h in holdings
+        )
+        self.avg_buy_price = (self.total_invested / self.total_held_qty) if self.total_held_qty > 0 else 0
+        # avg_price = weighted average of raw transaction price (column E)
+        self.avg_price = (
+            sum(h.price * h.quantity for h in holdings) / self.total_held_qty
+        ) if self.total_held_qty > 0 else 0
+        self.realized_pl = sum(s.realized_pl for s in sold)
+        total_sold_cost = sum(s.buy_price * s.quantity for s in sold)
+        self.realized_pl_pct = (self.realized_pl / total_sold_cost * 100) if total_sold_cost > 0 else 0
+
+        # Split realized P&L by holding period (LTCG vs STCG)
+        self.ltcg_realized_pl = 0.0
+        self.stcg_realized_pl = 0.0
+        self.ltcg_sold_qty = 0
+        self.stcg_sold_qty = 0
+        self.ltcg_sold_cost = 0.0
+        self.stcg_sold_cost = 0.0
+        self.ltcg_sold_earliest_buy = ""
+        self.ltcg_sold_latest_sell = ""
+        self.stcg_sold_earliest_buy = ""
+        self.stcg_sold_latest_sell = ""
+        for s in sold:
+            try:
+                sell_dt = datetime.strptime(s.sell_date, "%Y-%m-%d").date()
+                is_lt = _is_long_term(s.buy_date, sell_dt)
+            except Exception:
+                is_lt = False
+            if is_lt:
+                self.ltcg_realized_pl += s.realized_pl
+                self.ltcg_sold_qty += s.quantity
+                self.ltcg_sold_cost += s.buy_price * s.quantity
+                if not self.ltcg_sold_earliest_buy or s.buy_date < self.ltcg_sold_earliest_buy:
+                    self.ltcg_sold_earliest_buy = s.buy_date
+                if not self.ltcg_sold_latest_sell or s.sell_date > self.ltcg_sold_latest_sell:
+                    self.ltcg_sold_latest_sell = s.sell_date
+            else:
+                self.stcg_realized_pl += s.realized_pl
+                self.stcg_sold_qty += s.quantity
+                self.stcg_sold_cost += s.buy_price * s.quantity
+                if not self.stcg_sold_earliest_buy or s.buy_date < self.stcg_sold_earliest_buy:
+                    self.stcg_sold_earliest_buy = s.buy_date
+                if not self.stcg_sold_latest_sell or s.sell_date > self.stcg_sold_latest_sell:
+                    self.stcg_sold_latest_sell = s.sell_date
+
+        self.last_tx_date, self.last_tx_type = max(
+            [(h.buy_date, "Buy") for h in holdings] + [(s.sell_date, "Sell") for s in sold],
+            default=("", ""),
+        )
+        self.num_held_lots = len(holdings)
+        self.num_sold_lots = len(sold)
+        # Held lots for the price pass: (buy_price, quantity, cost, is_ltcg, buy_date)
+        self.lots: List[Tuple[float, int, float, bool, str]] = [
+            (h.buy_price, h.quantity, h.buy_cost if h.buy_cost > 0 else (h.buy_price * h.quantity),
+             _is_long_term(h.buy_date, today), h.buy_date)
+            for h in holdings
+        ]
+
+
+class SummaryTable:
+    """SymbolAggregate per symbol, kept in step with a portfolio's snapshots."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key: Optional[tuple] = None   # (snapshot version, today)
+        # symbol → (holdings list, sold list, aggregate)
+        self._rows: Dict[str, tuple] = {}
+
+    def rows(self, snapshot, today: Optional[date] = None) -> Dict[str, SymbolAggregate]:
+        """Aggregates for every symbol in *snapshot* (a PortfolioSnapshot)."""
+        today = today or date.today()
+        key = (snapshot.version, today)
+        with self._lock:
+            if key != self._key:
+                stale_day = self._key is None or self._key[1] != today
+                rows = {}
+                for symbol, (holdings, sold, _) in snapshot.by_symbol.items():
+                    prev = None if stale_day else self._rows.get(symbol)
+                    if prev is not None and prev[0] is holdings and prev[1] is sold:
+                        rows[symbol] = prev
+                    else:
+                        rows[symbol] = (holdings, sold, SymbolAggregate(holdings, sold, today))
+                self._rows, self._key = rows, key
+            return {symbol: row[2] for symbol, row in self._rows.items()}
+
+    def row(self, snapshot, symbol: str, today: Optional[date] = None) -> Optional[SymbolAggregate]:
+        """One symbol's aggregate, without touching the other symbols."""
+        today = today or date.today()
+        entry = snapshot.by_symbol.get(symbol)
+        if entry is None:
+            return None
+        holdings, sold, _ = entry
+        with self._lock:
+            prev = self._rows.get(symbol)
+            if (prev is not None and prev[0] is holdings and prev[1] is sold
+                    and self._key is not None and self._key[1] == today):
+                return prev[2]
+        return SymbolAggregate(holdings, sold, today)
+
+
+_tables: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_tables_lock = threading.Lock()
+
+
+def table_for(portfolio) -> SummaryTable:
+    """The SummaryTable for an XlsxPortfolio (dropped with the portfolio)."""
+    with _tables_lock:
+        table = _tables.get(portfolio)
+        if table is None:
+            table = _tables[portfolio] = SummaryTable()
+        return table
+
+
+def price_keys(symbol: str, agg: Optional[SymbolAggregate]) -> List[Tuple[str, str]]:
+    """(symbol, exchange) pairs to look prices up for, incl. the BSE↔NSE alternate."""
+    exchanges = agg.exchanges if agg is not None and agg.exchanges else {"NSE"}
+    keys = set()
+    for exch in exchanges:
+        keys.add((symbol, exch))
+        keys.add((symbol, "NSE" if exch == "BSE" else "BSE"))
+    return sorted(keys)
+
+
+def summary_item(symbol: str, agg: Optional[SymbolAggregate], live_data: Dict[str, StockLiveData],
+                 dividends: dict, lookup_name: Callable[[str, str], str]) -> StockSummaryItem:
+    """Combine an aggregate with the live price into a StockSummaryItem.
+
+    agg is None for a watchlist-only stock (file with no transactions).
+    """
+    if agg is None:
+        agg = SymbolAggregate([], [], date.today())
+    exchange = agg.exchange if agg.num_held_lots or agg.num_sold_lots else "NSE"
+    name = agg.name if agg.num_held_lots or agg.num_sold_lots else symbol
+    # If name is just the symbol (no proper company name), resolve it
+    if not name or name == symbol:
+        resolved = lookup_name(symbol, exchange)
+        if resolved:
+            name = resolved
+
+    # Live data — try primary exchange, fall back to alternate (BSE↔NSE)
+    live = live_data.get(f"{symbol}.{exchange}")
+    if not live or (live.current_price or 0) <= 0:
+        alt_exchange = "NSE" if exchange == "BSE" else "BSE"
+        alt_live = live_data.get(f"{symbol}.{alt_exchange}")
+        if alt_live and (alt_live.current_price or 0) > 0:
+            live = alt_live
+    current_price = live.current_price if live else 0
+    total_held_qty = agg.total_held_qty
+    total_invested = agg.total_invested
+    current_value = current_price * total_held_qty
+    unrealized_pl = current_value - total_invested
+    unrealized_pl_pct = (unrealized_pl / total_invested * 100) if total_invested > 0 else 0
+
+    # Per-lot profitability: split into profitable vs loss lots AND LTCG vs STCG
+    profitable_qty = 0
+    loss_qty = 0
+    unrealized_profit = 0.0  # P&L sum from lots where current > buy
+    unrealized_loss = 0.0    # P&L sum from lots where current <= buy
+    ltcg_unrealized_profit = 0.0
+    stcg_unrealized_profit = 0.0
+    ltcg_unrealized_loss = 0.0
+    stcg_unrealized_loss = 0.0
+    ltcg_profitable_qty = 0
+    stcg_profitable_qty = 0
+    ltcg_loss_qty = 0
+    stcg_loss_qty = 0
+    ltcg_invested = 0.0
+    stcg_invested = 0.0
+    ltcg_earliest_date = ""
+    stcg_earliest_date = ""
+    if current_price > 0:
+        for buy_price, quantity, lot_cost, is_ltcg, buy_date in agg.lots:
+            lot_pl = (current_price - buy_price) * quantity
+            # Track per-category invested & earliest date
+            if is_ltcg:
+                ltcg_invested += lot_cost
+                if not ltcg_earliest_date or buy_date < ltcg_earliest_date:
+                    ltcg_earliest_date = buy_date
+            else:
+                stcg_invested += lot_cost
+                if not stcg_earliest_date or buy_date < stcg_earliest_date:
+                    stcg_earliest_date = buy_date
+            if current_price > buy_price:
+                profitable_qty += quantity
+                unrealized_profit += lot_pl
+                if is_ltcg:
+                    ltcg_unrealized_profit += lot_pl
+                    ltcg_profitable_qty += quantity
+                else:
+                    stcg_unrealized_profit += lot_pl
+                    stcg_profitable_qty += quantity
+            else:
+                loss_qty += quantity
+                unrealized_loss += lot_pl
+                if is_ltcg:
+                    ltcg_unrealized_loss += lot_pl
+                    ltcg_loss_qty += quantity
+                else:
+                    stcg_unrealized_loss += lot_pl
+                    stcg_loss_qty += quantity
+
+    price_error = ""
+    if total_held_qty > 0 and (not live or current_price <= 0):
+        price_error = f"Price unavailable for {symbol}.{exchange}"
+
+    div = dividends.get(symbol, {})
+    return StockSummaryItem(
+        symbol=symbol,
+        exchange=exchange,
+        name=name,
+        total_held_qty=total_held_qty,
+        total_sold_qty=agg.total_sold_qty,
+        avg_price=round(agg.avg_price, 2),
+        avg_buy_price=round(agg.avg_buy_price, 2),
+        total_invested=round(total_invested, 2),
+        current_value=round(current_value, 2),
+        unrealized_pl=round(unrealized_pl, 2),
+        unrealized_pl_pct=round(unrealized_pl_pct, 2),
+        unrealized_profit=round(unrealized_profit, 2),
+        unrealized_loss=round(unrealized_loss, 2),
+        realized_pl=round(agg.realized_pl, 2),
+        realized_pl_pct=round(agg.realized_pl_pct, 2),
+        ltcg_unrealized_profit=round(ltcg_unrealized_profit, 2),
+        stcg_unrealized_profit=round(stcg_unrealized_profit, 2),
+        ltcg_unrealized_loss=round(ltcg_unrealized_loss, 2),
+        stcg_unrealized_loss=round(stcg_unrealized_loss, 2),
+        ltcg_realized_pl=round(agg.ltcg_realized_pl, 2),
+        stcg_realized_pl=round(agg.stcg_realized_pl, 2),
+        ltcg_profitable_qty=ltcg_profitable_qty,
+        stcg_profitable_qty=stcg_profitable_qty,
+        ltcg_loss_qty=ltcg_loss_qty,
+        stcg_loss_qty=stcg_loss_qty,
+        ltcg_invested=round(ltcg_invested, 2),
+        stcg_invested=round(stcg_invested, 2),
+        ltcg_earliest_date=ltcg_earliest_date,
+        stcg_earliest_date=stcg_earliest_date,
+        ltcg_sold_qty=agg.ltcg_sold_qty,
+        stcg_sold_qty=agg.stcg_sold_qty,
+        ltcg_sold_cost=round(agg.ltcg_sold_cost, 2),
+        stcg_sold_cost=round(agg.stcg_sold_cost, 2),
+        ltcg_sold_earliest_buy=agg.ltcg_sold_earliest_buy,
+        ltcg_sold_latest_sell=agg.ltcg_sold_latest_sell,
+        stcg_sold_earliest_buy=agg.stcg_sold_earliest_buy,
+        stcg_sold_latest_sell=agg.stcg_sold_latest_sell,
+        total_dividend=round(div.get("amount", 0), 2),
+        dividend_count=div.get("count", 0),
+        dividend_units=div.get("units", 0),
+        last_tx_date=agg.last_tx_date,
+        last_tx_type=agg.last_tx_type,
+        num_held_lots=agg.num_held_lots,
+        num_sold_lots=agg.num_sold_lots,
+        profitable_qty=profitable_qty,
+        loss_qty=loss_qty,
+        live=live,
+        is_above_avg_buy=current_price > agg.avg_buy_price if current_price > 0 and agg.avg_buy_price > 0 else False,
+        price_error=price_error,
+    )
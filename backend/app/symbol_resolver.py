@@ -24,10 +24,11 @@ import logging
 import os
 import re
 import time
-import urllib.request
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from . import http_client, provider_health
+
 logger = logging.getLogger(__name__)
 
 # ── State ──
@@ -109,15 +110,15 @@ def _load_from_network() -> Tuple[Dict, Dict]:
     # ── Source 1: NSE EQUITY_L.csv (ISIN → symbol) ──
     try:
         logger.info("[SymbolResolver] Downloading NSE equity list...")
-        req = urllib.request.Request(_NSE_EQUITY_URL, headers={
+        resp = provider_health.call("nse", http_client.get, _NSE_EQUITY_URL, headers={
             "User-Agent": _UA,
             "Accept": "text/csv,text/plain,*/*",
             "Referer": "https://www.nseindia.com/",
             "Accept-Language": "en-US,en;q=0.9",
             "Accept-Encoding": "identity",
-        })
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
+        }, timeout=20)
+        resp.raise_for_status()
+        raw = resp.content.decode("utf-8", errors="replace")
 
         reader = csv.DictReader(io.StringIO(raw))
         for row in reader:
@@ -150,9 +151,10 @@ def _load_from_network() -> Tuple[Dict, Dict]:
     # ── Source 2: Zerodha instruments (name → symbol) ──
     try:
         logger.info("[SymbolResolver] Downloading Zerodha instruments...")
-        req = urllib.request.Request(_ZERODHA_URL, headers={"User-Agent": _UA})
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
+        resp = provider_health.call("zerodha", http_client.get, _ZERODHA_URL,
+                                    headers={"User-Agent": _UA}, timeout=30)
+        resp.raise_for_status()
+        raw = resp.content.decode("utf-8", errors="replace")
 
         reader = csv.DictReader(io.StringIO(raw))
         zcount = 0
@@ -0,0 +1,311 @@
+"""
+Bounded cache of per-user portfolio DB instances.
+
+Every persona that makes a request gets its own XlsxPortfolio +
+MFXlsxPortfolio, each holding that user's fully parsed workbooks.  They
+used to be kept forever, so memory grew with every persona ever touched.
+
+UserDBCache keeps them in LRU order with an approximate byte size each
+and evicts
+  - entries idle for longer than IDLE_SECONDS, and
+  - least-recently-used entries while the total is over MAX_BYTES.
+An evicted user's next request builds fresh instances, which warm from the
+on-disk parse cache (dumps/<...>/.cache) instead of re-opening every
+workbook.  Entries used in the last MIN_IDLE seconds are never evicted, so
+a request still holding an instance doesn't race a new one for the same
+files; the budget can be exceeded briefly instead.  Nor are entries that
+are leased (an open SSE stream, see acquire/release) or whose DBs still
+have unflushed journaled writes: a second instance on the same journal
+would replay and flush it independently.
+
+Opt-out / tuning via environment:
+  USER_DB_CACHE_MB      total budget for cached instances (default 512, 0 = unbounded)
+  USER_DB_IDLE_MINUTES  evict users idle this long (default 60, 0 = never)
+"""
+
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(0.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+MAX_BYTES = int(_env_float("USER_DB_CACHE_MB", 512) * 1024 * 1024)
+IDLE_SECONDS = _env_float("USER_DB_IDLE_MINUTES", 60) * 60
+MIN_IDLE = 30.0         # seconds an entry is protected after its last use
+SWEEP_INTERVAL = 60.0   # re-measure / check idle entries at most this often
+
+
+# ═══════════════════════════════════════════════════════════
+#  SIZE ESTIMATE
+# ═══════════════════════════════════════════════════════════
+
+_ATOMIC = (str, bytes, int, float, bool, complex, type(None))
+
+
+def approx_sizeof(obj, sample: int = 64) -> int:
+    """Rough deep size of *obj* in bytes.
+
+    Walks dicts, sequences, sets and plain objects (__dict__ / __slots__,
+    which covers pydantic models and the ledger classes).  Containers with
+    more than *sample* items are measured on their first *sample* items
+    and scaled up — cheap enough to run on every sweep.  Shared objects
+    are counted once.
+    """
+    seen = set()
+
+    def size(o) -> float:
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        n = sys.getsizeof(o, 0)
+        if isinstance(o, _ATOMIC) or isinstance(o, type):
+            return n
+        if isinstance(o, dict):
+            count = len(o)
+            measure = lambda kv: size(kv[0]) + size(kv[1])
+            items = o.items()
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            count = len(o)
+            measure = size
+            items = o
+        else:
+            slots = [s for cls in type(o).__mro__ for s in getattr(cls, "__slots__", ())]
+            fields = [getattr(o, s) for s in slots if s != "__dict__" and hasattr(o, s)]
+            if hasattr(o, "__dict__") and isinstance(o.__dict__, dict):
+                fields.append(o.__dict__)
+            count = len(fields)
+            measure = size
+            items = fields
+        if not count:
+            return n
+        taken = list(itertools.islice(items, sample))
+        inner = sum(measure(x) for x in taken)
+        return n + inner * count / len(taken)
+
+    return int(size(obj))
+
+
+# ═══════════════════════════════════════════════════════════
+#  CACHE
+# ═══════════════════════════════════════════════════════════
+
+class _Entry:
+    __slots__ = ("dbs", "size", "last_used", "measured_at", "leases")
+
+    def __init__(self, dbs: dict, now: float):
+        self.dbs = dbs
+        self.size = 0
+        self.last_used = now
+        self.measured_at = 0.0
+        self.leases = 0
+
+
+def _measure(dbs: dict) -> int:
+    total = 0
+    for value in dbs.values():
+        approx = getattr(value, "approx_size", None)
+        if approx is None:
+            continue
+        try:
+            total += int(approx())
+        except Exception as e:
+            logger.warning(f"[UserDBCache] Size estimate failed: {e}")
+    return total
+
+
+def _busy(dbs: dict) -> bool:
+    """True while any DB has writes that must not be handed to a new instance."""
+    for value in dbs.values():
+        pending = getattr(value, "has_pending_writes", None)
+        if pending is None:
+            continue
+        try:
+            if pending():
+                return True
+        except Exception as e:
+            logger.warning(f"[UserDBCache] Pending-write check failed: {e}")
+            return True
+    return False
+
+
+def _close(dbs: dict):
+    for value in dbs.values():
+        close = getattr(value, "close", None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"[UserDBCache] Closing evicted DB failed: {e}")
+
+
+class UserDBCache:
+    """{key: {"stocks": ..., "mf": ..., ...}} with LRU + idle eviction."""
+
+    def __init__(self, max_bytes: Optional[int] = None, idle_seconds: Optional[float] = None,
+                 min_idle: float = MIN_IDLE, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+        self.idle_seconds = IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self.min_idle = min_idle
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._last_sweep = clock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"idle": 0, "memory": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        """The cached DBs for *key* (marked most recently used), or None."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                entry.last_used = now
+                self._entries.move_to_end(key)
+            due = now - self._last_sweep >= SWEEP_INTERVAL
+        if due:
+            self.sweep(keep=key)
+        return entry.dbs if entry is not None else None
+
+    def put(self, key: Hashable, dbs: dict) -> dict:
+        """Cache *dbs* for *key* and return the instance to use.
+
+        If another thread cached *key* first, its DBs win and *dbs* is
+        closed.
+        """
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is None:
+                self._entries[key] = _Entry(dbs, self._clock())
+        if existing is not None:
+            _close(dbs)
+            return existing.dbs
+        self.sweep(keep=key)
+        return dbs
+
+    def pop(self, key: Hashable, default=None):
+        """Drop *key* without closing its DBs (the caller owns them)."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return entry.dbs if entry is not None else default
+
+    def acquire(self, key: Hashable) -> bool:
+        """Lease *key*'s entry so it isn't evicted until release().
+
+        Used by long-lived holders (SSE streams) instead of keeping a
+        private reference the cache doesn't know about.  Returns False if
+        *key* isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.leases += 1
+            entry.last_used = self._clock()
+            return True
+
+    def release(self, key: Hashable):
+        """Drop a lease taken with acquire(); the entry counts as just used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.leases:
+                entry.leases -= 1
+                entry.last_used = self._clock()
+
+    def values(self) -> List[dict]:
+        with self._lock:
+            return [e.dbs for e in self._entries.values()]
+
+    def sweep(self, keep: Optional[Hashable] = None) -> int:
+        """Re-measure entries and evict idle / over-budget ones.
+
+        *keep* (the entry being served), leased entries and entries with
+        pending writes are never evicted.  Returns the number of entries
+        evicted.
+        """
+        now = self._clock()
+        with self._lock:
+            self._last_sweep = now
+            entries = list(self._entries.items())
+        stale = [e for _, e in entries if now - e.measured_at >= SWEEP_INTERVAL or not e.measured_at]
+        # Measure outside the lock — walks the parsed caches
+        for entry in stale:
+            entry.size = _measure(entry.dbs)
+            entry.measured_at = now
+        pinned = {key for key, e in entries if key == keep or _busy(e.dbs)}
+
+        evicted = []
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.leases:
+                    pinned.add(key)
+                idle = now - entry.last_used
+                if key not in pinned and self.idle_seconds and idle >= self.idle_seconds:
+                    evicted.append((key, self._entries.pop(key), "idle"))
+            if self.max_bytes:
+                total = sum(e.size for e in self._entries.values())
+                # OrderedDict order is least recently used first
+                for key, entry in list(self._entries.items()):
+                    if total <= self.max_bytes:
+                        break
+                    if key in pinned or now - entry.last_used < self.min_idle:
+                        continue
+                    evicted.append((key, self._entries.pop(key), "memory"))
+                    total -= entry.size
+            for _, _, reason in evicted:
+                self.evictions[reason] += 1
+
+        for key, entry, reason in evicted:
+            logger.info(f"[UserDBCache] Evicted {key[0] if isinstance(key, tuple) else key} "
+                        f"({reason}, ~{entry.size // 1024} KB)")
+            _close(entry.dbs)
+        return len(evicted)
+
+    def stats(self) -> Dict:
+        """Counters and per-entry sizes for the diagnostics endpoint."""
+        now = self._clock()
+        with self._lock:
+            entries = [
+                {
+                    "user_id": key[0] if isinstance(key, tuple) else str(key),
+                    "bytes": e.size,
+                    "idle_seconds": round(now - e.last_used, 1),
+                }
+                for key, e in reversed(self._entries.items())
+            ]
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(entries),
+                "bytes": sum(e["bytes"] for e in entries),
+                "max_bytes": self.max_bytes,
+                "idle_seconds_limit": self.idle_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": dict(self.evictions),
+                "users": entries,
+            }
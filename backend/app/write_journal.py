@@ -0,0 +1,201 @@
+"""
+Append-only write-ahead journal (JSON lines).
+
+Stock writes (buys, sells, dividends) are appended here and fsync'd before
+the request returns; a background flusher later applies them to the xlsx
+files and discards the applied entries.  Anything still in the journal on
+startup was acknowledged but never reached the workbook and is replayed.
+
+The journal lives in a hidden directory next to the asset folder
+(e.g. dumps/<email>/<Name>/.journal/Stocks.jsonl), like the parse cache.
+Each line is one JSON object carrying a monotonically increasing "seq".
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync_dir(path: Path):
+    """Make a create/rename in *path* durable (no-op where unsupported)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteJournal:
+    """Thread-safe, fsync'd JSON-lines journal of pending writes."""
+
+    def __init__(self, journal_file: str | Path):
+        self.journal_file = Path(journal_file)
+        self._lock = threading.Lock()
+        self._entries: List[dict] = self._load()
+        self._seq = max((e["seq"] for e in self._entries), default=0)
+
+    # ── Persistence ───────────────────────────────────────
+
+    def _load(self) -> List[dict]:
+        try:
+            with open(self.journal_file, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            logger.error(f"[Journal] Cannot read {self.journal_file.name}: {e}")
+            return []
+        if data and not data.endswith(b"\n"):
+            data = self._truncate_torn_tail(data)
+        entries = []
+        for n, line in enumerate(data.decode("utf-8", errors="replace").splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.error(f"[Journal] Skipping unreadable line {n} of {self.journal_file.name}")
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("seq"), int):
+                entries.append(entry)
+        return entries
+
+    def _truncate_torn_tail(self, data: bytes) -> bytes:
+        """Cut a partial final line (a crash mid-append) off the journal.
+
+        That write was never acknowledged; left in place, the next append
+        would be glued onto it and the merged line lost on reload.
+        """
+        keep = data.rfind(b"\n") + 1
+        logger.warning(f"[Journal] Truncating torn final line of {self.journal_file.name}")
+        try:
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(keep)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"[Journal] Cannot truncate {self.journal_file.name}: {e}")
+        return data[:keep]
+
+    def _rewrite(self, entries: List[dict]):
+        """Atomically replace the journal with *entries* (caller holds _lock)."""
+        if not entries:
+            try:
+                self.journal_file.unlink()
+            except FileNotFoundError:
+                return
+            _fsync_dir(self.journal_file.parent)
+            return
+        tmp = self.journal_file.with_name(f"{self.journal_file.name}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            for e in entries:
+                f.write(json.dumps(e, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal_file)
+        _fsync_dir(self.journal_file.parent)
+
+    # ── Public API ────────────────────────────────────────
+
+    def append(self, entry: dict) -> dict:
+        """Durably append *entry*; returns it with its assigned "seq".
+
+        Returns only after the line has been fsync'd, so an acknowledged
+        write survives a crash.
+        """
+        with self._lock:
+            entry = {**entry, "seq": self._seq + 1}
+            line = json.dumps(entry, separators=(",", ":")) + "\n"
+            created = not self.journal_file.exists()
+            if created:
+                self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_file, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if created:
+                _fsync_dir(self.journal_file.parent)
+            self._seq = entry["seq"]
+            self._entries.append(entry)
+            return entry
+
+    def entries(self) -> List[dict]:
+        """All pending entries in append order."""
+        with self._lock:
+            return list(self._entries)
+
+    def mark(self, seqs: Iterable[int], **fields):
+        """Durably set *fields* on the given entries (e.g. flushing=True)."""
+        target = set(seqs)
+        if not target:
+            return
+        with self._lock:
+            updated = [{**e, **fields} if e["seq"] in target else e for e in self._entries]
+            self._rewrite(updated)
+            self._entries = updated
+
+    def discard(self, seqs: Iterable[int]):
+        """Drop applied entries and compact the journal file."""
+        drop = set(seqs)
+        if not drop:
+            return
+        with self._lock:
+            remaining = [e for e in self._entries if e["seq"] not in drop]
+            self._rewrite(remaining)
+            self._entries = remaining
+
+    def dead_letter(self, seqs: Iterable[int], error: str):
+        """Move entries that can never be applied to the dead-letter file.
+
+        They were acknowledged to the client, so they are kept (with the
+        reason) in <name>.dead.jsonl for inspection instead of being dropped.
+        """
+        target = set(seqs)
+        if not target:
+            return
+        with self._lock:
+            dead = [{**e, "error": error} for e in self._entries if e["seq"] in target]
+            if not dead:
+                return
+            with open(self.dead_letter_file, "a") as f:
+                for e in dead:
+                    f.write(json.dumps(e, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_dir(self.dead_letter_file.parent)
+            remaining = [e for e in self._entries if e["seq"] not in target]
+            self._rewrite(remaining)
+            self._entries = remaining
+
+    @property
+    def dead_letter_file(self) -> Path:
+        return self.journal_file.with_name(f"{self.journal_file.stem}.dead.jsonl")
+
+    def dead_letters(self) -> List[dict]:
+        """Entries moved aside by dead_letter(), oldest first."""
+        try:
+            with open(self.dead_letter_file) as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+        dead = []
+        for line in lines:
+            try:
+                dead.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return dead
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
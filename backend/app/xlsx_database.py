@@ -6,14 +6,20 @@ Holdings and sold positions are derived on-the-fly via FIFO matching
 of Buy/Sell rows in each file's "Trading History" sheet.
 """
 
+import bisect
 import hashlib
+import itertools
 import json
 import logging
+import multiprocessing
 import os
 import threading
-from datetime import datetime, date
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +27,34 @@ import openpyxl
 from openpyxl.styles import Font, PatternFill
 
 from .models import Holding, SoldPosition, Transaction
+from .parse_cache import ParseCache
+from .user_db_cache import approx_sizeof
+from .write_journal import WriteJournal
+from . import fifo_engine
+from . import fs_watcher
+from . import request_memo
+from .xlsx_parse import (
+    _empty_fingerprints, _fingerprint_row, _parse_date, _parse_history_row,
+    _parse_workbook, _read_values, _safe_float, _safe_int,
+)
+from . import xlsx_parse
+
+
+def _save_workbook(wb, filepath: Path):
+    """Save *wb* over *filepath* atomically.
+
+    Writes a hidden temp file next to it and renames it into place, so a
+    reindex or pool worker parsing the workbook never sees a half-written
+    file (the "*.xlsx" scans skip dot-files).
+    """
+    filepath = Path(filepath)
+    tmp = filepath.with_name(f".{filepath.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        wb.save(tmp)
+        os.replace(tmp, filepath)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 def _sync_to_drive(filepath: Path):
@@ -52,6 +86,64 @@ SYMBOL_MAP: Dict[str, str] = {}
 _REVERSE_MAP: Dict[str, str] = {}
 
 
+# ═══════════════════════════════════════════════════════════
+#  PARALLEL PARSE CONFIG
+# ═══════════════════════════════════════════════════════════
+#
+# openpyxl parsing is CPU-bound pure Python, so cold parses can be spread
+# over a process pool (threads don't help). Opt-in via XLSX_PARSE_WORKERS:
+#   unset / 0 / 1 → serial (default)
+#   N            → up to N worker processes
+#   auto         → os.cpu_count()
+# Portfolios with fewer than _PARALLEL_MIN_SYMBOLS cache misses stay serial —
+# spinning up the pool costs more than it saves.
+
+def _env_parse_workers() -> int:
+    raw = os.getenv("XLSX_PARSE_WORKERS", "").strip().lower()
+    if raw == "auto":
+        return os.cpu_count() or 1
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+PARSE_WORKERS = _env_parse_workers()
+_PARALLEL_MIN_SYMBOLS = 8
+
+
+def _mp_context():
+    """forkserver (else spawn) for the parse pools — never fork.
+
+    The pools are started from request threads while the watcher, timers,
+    fetch pool and journal flushers are running; a forked child can
+    inherit a lock one of them held and deadlock.  Workers only import
+    xlsx_parse (preloaded once into the fork server), never this module
+    and its singletons.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([xlsx_parse.__name__])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+# ═══════════════════════════════════════════════════════════
+#  WRITE JOURNAL CONFIG
+# ═══════════════════════════════════════════════════════════
+#
+# Every buy/sell/dividend normally loads and re-saves the whole workbook
+# inside the HTTP request.  With XLSX_WRITE_JOURNAL=1 writes are appended
+# to an fsync'd journal (.journal/Stocks.jsonl next to the Stocks dir),
+# overlaid on reads immediately, and applied to the xlsx files by a
+# background flusher _JOURNAL_FLUSH_DELAY seconds later (batched per file).
+# Unflushed entries are replayed on the next startup.
+
+WRITE_JOURNAL = os.getenv("XLSX_WRITE_JOURNAL", "").strip().lower() in ("1", "true", "yes")
+_JOURNAL_FLUSH_DELAY = 1.0
+_JOURNAL_RETRY_DELAY = 30.0
+
+
 # ═══════════════════════════════════════════════════════════
 #  HELPERS
 # ═══════════════════════════════════════════════════════════
@@ -62,38 +154,37 @@ def _gen_id(symbol: str, exchange: str, buy_date: str, buy_price: float, row_idx
     return hashlib.md5(key.encode()).hexdigest()[:8]
 
 
-def _parse_date(val) -> Optional[str]:
-    """Convert xlsx cell value to YYYY-MM-DD string (e.g. 2026-01-27)."""
-    _FMT = "%Y-%m-%d"
-    if isinstance(val, datetime):
-        return val.strftime(_FMT)
-    if isinstance(val, date):
-        return val.strftime(_FMT)
-    if isinstance(val, str):
-        for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d-%b-%Y", "%d-%B-%Y"):
-            try:
-                return datetime.strptime(val.strip(), fmt).strftime(_FMT)
-            except ValueError:
-                continue
-    return None
+def _clean_stem(stem: str) -> str:
+    """Company name from an xlsx stem (drops archive markers)."""
+    return stem.replace("Archive_", "").replace(" - Archive", "").strip()
 
 
-def _safe_float(val, default=0.0) -> float:
-    if val is None:
-        return default
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return default
+def dividend_transaction(amount: float, dividend_date: str, remarks: str = "") -> Transaction:
+    """Trading History row for a dividend (EXCH=DIV, amount in the PRICE column)."""
+    return Transaction(
+        date=dividend_date,
+        exchange="DIV",
+        action="Buy",         # action column, doesn't matter for DIV
+        quantity=1,            # placeholder
+        price=amount,          # dividend amount stored in price column
+        remarks=remarks or "DIVIDEND",
+    )
 
 
-def _safe_int(val, default=0) -> int:
-    if val is None:
-        return default
+def _transaction_values(tx: Transaction) -> tuple:
+    """Cell values A–G (DATE … REMARKS) of the row a transaction is written as."""
     try:
-        return int(float(val))
-    except (ValueError, TypeError):
-        return default
+        dt = datetime.strptime(tx.date, "%Y-%m-%d")
+    except ValueError:
+        dt = datetime.now()
+    # F: COST (use explicit cost if provided, else compute from price * qty)
+    cost_val = tx.cost if tx.cost > 0 else round(tx.price * tx.quantity, 2)
+    return (dt, tx.exchange, tx.action, tx.quantity, tx.price, cost_val, tx.remarks or "~")
+
+
+def _entry_transaction(entry: dict) -> Transaction:
+    """The Trading History row a write-journal entry will be flushed as."""
+    return Transaction(**entry["tx"])
 
 
 # ═══════════════════════════════════════════════════════════
@@ -109,6 +200,11 @@ def fifo_match(buys: list, sells: list):
     buys_sorted = sorted(buys, key=lambda x: x["date"])
     sells_sorted = sorted(sells, key=lambda x: x["date"])
 
+    if len(buys_sorted) + len(sells_sorted) >= fifo_engine.VECTOR_MIN_ROWS:
+        matched = _fifo_match_vectorized(buys_sorted, sells_sorted)
+        if matched is not None:
+            return matched
+
     buy_lots = [{**b, "remaining": b["quantity"]} for b in buys_sorted]
     sold_positions = []
 
@@ -139,50 +235,39 @@ def fifo_match(buys: list, sells: list):
     return remaining, sold_positions
 
 
+def _fifo_match_vectorized(buys_sorted: list, sells_sorted: list):
+    """fifo_match on the array engine; None if the loop must handle it."""
+    buy_qty = [b["quantity"] for b in buys_sorted]
+    sell_qty = [s["quantity"] for s in sells_sorted]
+    if not all(isinstance(q, int) for q in buy_qty + sell_qty):
+        return None
+    alloc = fifo_engine.allocate(buy_qty, sell_qty)
+    if alloc is None:
+        return None
+    lot_idx, sell_idx, matched, left = alloc
+
+    sold_positions = []
+    for i, j, qty in zip(lot_idx, sell_idx, matched):
+        lot, sell = buys_sorted[i], sells_sorted[j]
+        sold_positions.append({
+            "buy_price": lot["price"],
+            "buy_date": lot["date"],
+            "buy_exchange": lot.get("exchange", "NSE"),
+            "sell_price": sell["price"],
+            "sell_date": sell["date"],
+            "quantity": qty,
+            "realized_pl": round((sell["price"] - lot["price"]) * qty, 2),
+            "row_idx": lot.get("row_idx", 0),
+            "sell_row_idx": sell.get("row_idx", 0),
+        })
+    remaining = [{**b, "remaining": r} for b, r in zip(buys_sorted, left) if r > 0]
+    return remaining, sold_positions
+
+
 # ═══════════════════════════════════════════════════════════
 #  XLSX PARSING
 # ═══════════════════════════════════════════════════════════
 
-def _extract_index_data(wb) -> dict:
-    """Read metadata from the Index sheet."""
-    data = {"code": None, "exchange": "NSE", "symbol": None,
-            "current_price": 0, "week_52_high": 0, "week_52_low": 0}
-    if "Index" not in wb.sheetnames:
-        return data
-    ws = wb["Index"]
-    max_row = ws.max_row
-    if max_row is not None and max_row == 0:
-        return data
-    for row in ws.iter_rows(min_row=1, max_row=min(15, max_row) if max_row else 15, values_only=False):
-        vals = [c.value for c in row]
-        if len(vals) >= 3:
-            label = vals[1]
-            value = vals[2]
-            if label == "Code" and value:
-                code = str(value)
-                data["code"] = code
-                if ":" in code:
-                    parts = code.split(":")
-                    data["exchange"] = parts[0]
-                    data["symbol"] = parts[1]
-            elif label == "Current Price" and isinstance(value, (int, float)):
-                data["current_price"] = float(value)
-            elif label == "52 Week High" and isinstance(value, (int, float)):
-                data["week_52_high"] = float(value)
-            elif label == "52 Week Low" and isinstance(value, (int, float)):
-                data["week_52_low"] = float(value)
-    return data
-
-
-def _parse_excel_serial_date(val) -> Optional[str]:
-    """Convert Excel serial date number to YYYY-MM-DD string."""
-    if isinstance(val, (int, float)) and val > 1000:
-        from datetime import timedelta
-        base = datetime(1899, 12, 30)
-        return (base + timedelta(days=int(val))).strftime("%Y-%m-%d")
-    return _parse_date(val)
-
-
 def _find_realised_columns(ws, header_row: int) -> dict:
     """Dynamically find the Realised section column positions.
 
@@ -221,130 +306,350 @@ def _find_realised_columns(ws, header_row: int) -> dict:
     return cols
 
 
-def _parse_trading_history(wb) -> Tuple[list, list, list]:
-    """Parse Buy and Sell rows from Trading History sheet.
-
-    ALL Buy rows go into held[]; ALL Sell rows go into sell_rows[].
-    Held/sold determination is done purely via FIFO matching of Sell rows
-    against Buy rows (in _parse_and_match_symbol).
-
-    Uses iter_rows for compatibility with read_only=True mode (39x faster).
+def _overlay_pending(parsed: dict, transactions: List[Transaction]) -> dict:
+    """Payload as the workbook will read once *transactions* are flushed.
 
-    Returns (held_lots, column_sold_lots, sell_rows, dividends):
-      - held_lots: ALL Buy rows (non-DIV)
-      - column_sold_lots: always empty (FIFO handles sold determination)
-      - sell_rows: ALL Sell action rows
-      - dividends: List of {date, amount, remarks} for dividend rows
+    Journaled rows are inserted at the top of Trading History (oldest
+    first, so the newest ends up on the top row) and push every existing
+    row down — row_idx values, and therefore holding IDs, match what a
+    re-parse after the flush will produce.  *parsed* is not modified.
     """
-    held, sold, sell_rows, dividends = [], [], [], []
-    if "Trading History" not in wb.sheetnames:
-        return held, sold, sell_rows, dividends
-    ws = wb["Trading History"]
-
-    # Read all rows at once (fast with read_only=True)
-    all_rows = list(ws.iter_rows(values_only=True))
-    if len(all_rows) < 5:
-        return held, sold, sell_rows, dividends
-
-    # Find header row (search first 10 rows for DATE + ACTION)
-    header_idx = None
-    for i, row in enumerate(all_rows[:10]):
-        if row and len(row) >= 4 and "DATE" in row[:5] and "ACTION" in row[:5]:
-            header_idx = i
-            break
-    if header_idx is None:
-        return held, sold, sell_rows, dividends
-
-    # Helper to safely get column value
-    def col(row, c):
-        return row[c] if c < len(row) else None
-
-    for row_num, row in enumerate(all_rows[header_idx + 1:], start=header_idx + 2):
-        if not row or len(row) < 5:
-            continue
+    n = len(transactions)
+    if not n:
+        return parsed
+    header_row = parsed.get("header_row") or 4  # _find_header_row default
+    held, sell_rows, dividends = [], [], []
+    fingerprints = _empty_fingerprints()
+    for offset, tx in enumerate(reversed(transactions), start=1):
+        values = _transaction_values(tx)
+        _parse_history_row(values, header_row + offset, held, sell_rows, dividends)
+        _fingerprint_row(values, fingerprints)
+    held += [{**h, "row_idx": h["row_idx"] + n} for h in parsed["held"]]
+    sell_rows += [{**s, "row_idx": s["row_idx"] + n} for s in parsed["sell_rows"]]
+    dividends += parsed["dividends"]
+    for kind, keys in parsed.get("fingerprints", _empty_fingerprints()).items():
+        fingerprints[kind] += keys
+    return {**parsed, "held": held, "sell_rows": sell_rows, "dividends": dividends,
+            "fingerprints": fingerprints}
+
+
+class _Lot:
+    """One buy lot in a FifoLedger queue (slotted: ledgers stay in memory)."""
+
+    __slots__ = ("date", "exchange", "quantity", "remaining", "price",
+                 "raw_price", "cost", "file", "row")
+
+    def __init__(self, date: str, exchange: str, quantity: int, price: float,
+                 raw_price: float, cost: float, file: str, row: int):
+        self.date = date
+        self.exchange = exchange
+        self.quantity = quantity
+        self.remaining = quantity
+        self.price = price
+        self.raw_price = raw_price
+        self.cost = cost
+        self.file = file
+        self.row = row
+
+
+class FifoLedger:
+    """Per-symbol FIFO state: a date-ordered buy-lot queue plus the realized list.
+
+    Built once from a symbol's parsed workbooks (same result as running
+    fifo_match over the whole history).  Rows we insert ourselves at the
+    top of one of its files are then applied with apply(), which only
+    touches the lots a new Sell consumes — no workbook is reopened and the
+    history is not re-matched.
+
+    Lots are ordered as fifo_match's stable date sort leaves them: by
+    date, then file parse order, then sheet row.  Row numbers are kept per
+    file relative to an offset, so shifting a file down by n inserted rows
+    is O(1); holding IDs (which include the row) are computed in result().
+    """
+
+    def __init__(self, symbol: str, parsed_files: List[Tuple[str, dict]]):
+        self.symbol = symbol
+        self.exchange = "NSE"
+        self.name = symbol
+        self._pos: Dict[str, int] = {}       # file stem → parse order
+        self._header: Dict[str, int] = {}    # file stem → header row
+        self._offset: Dict[str, int] = {}    # file stem → rows inserted since build
+        self._lots: List[_Lot] = []
+        self._head = 0                       # first lot with anything left
+        self._unmatched = 0                  # sell qty no lot could cover
+        self._sell_count = 0
+        self._last_sell_date = ""
+        self._sold: List[SoldPosition] = []
+        self._dividends: List[dict] = []
+        self._div_pos: List[int] = []
+
+        sells, realized = [], []
+        for pos, (stem, parsed) in enumerate(parsed_files):
+            idx = parsed["index"]
+            # Use index data from the primary (non-archive) file
+            if idx.get("exchange"):
+                self.exchange = idx["exchange"]
+            if not self.name or self.name == symbol:
+                self.name = _clean_stem(stem)
+            self._pos[stem] = pos
+            self._header[stem] = parsed.get("header_row") or 4  # _find_header_row default
+            self._offset[stem] = 0
+            self._lots.extend(self._lot(h, stem) for h in parsed["held"])
+            sells.extend((s, stem) for s in parsed["sell_rows"])
+            # Column-tracked sells: already realized, their lots are not in held
+            realized.extend(parsed["sold"])
+            self._dividends.extend(parsed["dividends"])
+            self._div_pos.extend([pos] * len(parsed["dividends"]))
+
+        self._lots.sort(key=self._lot_key)
+        self._sold = [self._sold_position(s) for s in realized]
+        sells.sort(key=lambda item: (item[0]["date"], self._pos[item[1]], item[0]["row_idx"]))
+        sell_rows = [sell for sell, _ in sells]
+        if (len(self._lots) + len(sell_rows) < fifo_engine.VECTOR_MIN_ROWS
+                or not self._consume_vectorized(sell_rows)):
+            for sell in sell_rows:
+                self._consume(sell)
+
+    # ── Internals ─────────────────────────────────────────
+
+    def _lot(self, h: dict, stem: str) -> _Lot:
+        return _Lot(h["date"], h.get("exchange", self.exchange), h["quantity"], h["price"],
+                    h.get("raw_price", h["price"]), h.get("cost", 0), stem,
+                    h.get("row_idx", 0) - self._offset.get(stem, 0))
+
+    def _lot_key(self, lot: _Lot):
+        return (lot.date, self._pos[lot.file], lot.row + self._offset[lot.file])
+
+    def _consume(self, sell: dict):
+        """FIFO-match one Sell row against the lot queue (as fifo_match)."""
+        self._sell_count += 1
+        if sell["date"] > self._last_sell_date:
+            self._last_sell_date = sell["date"]
+        qty = sell["quantity"]
+        while qty > 0 and self._head < len(self._lots):
+            lot = self._lots[self._head]
+            matched = min(lot.remaining, qty)
+            self._sold.append(self._sold_model(
+                lot.exchange, lot.date, lot.price, sell["date"], sell["price"], matched,
+                round((sell["price"] - lot.price) * matched, 2), 0))
+            lot.remaining -= matched
+            qty -= matched
+            if lot.remaining <= 0:
+                self._head += 1
+        self._unmatched += qty
+
+    def _consume_vectorized(self, sells: List[dict]) -> bool:
+        """_consume every sell at once on the array engine (initial build).
+
+        Returns False, having changed nothing, where the loop must run
+        instead: non-integer or empty lots (the loop emits a zero-quantity
+        match for those) and inputs fifo_engine.allocate declines.
+        """
+        lot_qty = [lot.remaining for lot in self._lots]
+        sell_qty = [s["quantity"] for s in sells]
+        if not all(isinstance(q, int) and q > 0 for q in lot_qty):
+            return False
+        if not all(isinstance(q, int) for q in sell_qty):
+            return False
+        alloc = fifo_engine.allocate(lot_qty, sell_qty)
+        if alloc is None:
+            return False
+        lot_idx, sell_idx, matched, left = alloc
+
+        for i, j, qty in zip(lot_idx, sell_idx, matched):
+            lot, sell = self._lots[i], sells[j]
+            self._sold.append(self._sold_model(
+                lot.exchange, lot.date, lot.price, sell["date"], sell["price"], qty,
+                round((sell["price"] - lot.price) * qty, 2), 0))
+        for lot, remaining in zip(self._lots, left):
+            lot.remaining = remaining
+        self._head = next((i for i, r in enumerate(left) if r > 0), len(left))
+        self._unmatched += sum(sell_qty) - sum(matched)
+        self._sell_count += len(sells)
+        self._last_sell_date = max([self._last_sell_date] + [s["date"] for s in sells])
+        return True
+
+    def _sold_position(self, s: dict) -> SoldPosition:
+        """SoldPosition for a column-tracked (already realized) sold row."""
+        return self._sold_model(s.get("exchange", self.exchange), s["buy_date"], s["buy_price"],
+                                s["sell_date"], s["sell_price"], s["quantity"],
+                                s["realized_pl"], s.get("row_idx", 0))
+
+    def _sold_model(self, exchange: str, buy_date: str, buy_price: float, sell_date: str,
+                    sell_price: float, quantity: int, realized_pl: float, row_idx: int) -> SoldPosition:
+        return SoldPosition(
+            id=_gen_id(self.symbol + "_S", exchange, sell_date, sell_price, row_idx),
+            symbol=self.symbol,
+            exchange=exchange,
+            name=self.name,
+            quantity=quantity,
+            buy_price=round(buy_price, 2),
+            buy_date=buy_date,
+            sell_price=round(sell_price, 2),
+            sell_date=sell_date,
+            realized_pl=realized_pl,
+            row_idx=row_idx,
+        )
 
-        date_val = col(row, 0)   # A: DATE
-        exch = col(row, 1)       # B: EXCH
-        action = col(row, 2)     # C: ACTION
-        qty = col(row, 3)        # D: QTY
-        price = col(row, 4)      # E: PRICE
+    # ── Public API ────────────────────────────────────────
 
-        if not action or not date_val:
-            continue
+    def apply(self, stem: str, transactions: List[Transaction]) -> bool:
+        """Apply rows inserted at the top of file *stem* (oldest first).
 
-        action = str(action).strip()
-        exch = str(exch).strip() if exch else ""
-
-        # Collect dividends
-        if exch == "DIV":
-            tx_date = _parse_date(date_val)
-            cost_col_f = _safe_float(col(row, 5))   # F = total amount
-            per_share = _safe_float(price)            # E = dividend per share
-            div_qty = _safe_float(qty) or 0           # D = number of units
-            amount = cost_col_f or per_share or div_qty
-            if amount and amount > 0:
-                remarks_val = str(col(row, 6) or "").strip()
-                dividends.append({
-                    "date": tx_date or "",
-                    "amount": amount,
-                    "units": int(div_qty) if div_qty > 0 else 0,
-                    "remarks": remarks_val if remarks_val != "~" else "",
-                })
-            continue
+        Returns False, leaving the ledger untouched, when the rows can't be
+        applied incrementally: a Sell dated on or before an existing Sell, or
+        a Buy that would sort into the part of the queue already consumed.
+        The caller should rebuild the ledger from the parsed workbooks.
+        """
+        if stem not in self._pos:
+            return False
+        n = len(transactions)
+        held, sell_rows, dividends = [], [], []
+        for offset, tx in enumerate(reversed(transactions), start=1):
+            _parse_history_row(_transaction_values(tx), self._header[stem] + offset,
+                               held, sell_rows, dividends)
 
-        # Collect ALL Sell rows for FIFO matching
-        if action == "Sell":
-            tx_date = _parse_date(date_val)
-            if not tx_date:
+        if any(s["date"] <= self._last_sell_date for s in sell_rows):
+            return False
+        pos = self._pos[stem]
+        keys = [self._lot_key(lot) for lot in self._lots]
+        for h in held:
+            at = bisect.bisect_left(keys, (h["date"], pos))
+            if self._unmatched or at < self._head:
+                return False
+            if at == self._head < len(self._lots):
+                head = self._lots[at]
+                if head.remaining != head.quantity:
+                    return False
+
+        # Existing rows of this file move down by n
+        self._offset[stem] += n
+        for h in held:
+            lot = self._lot(h, stem)
+            bisect.insort_left(self._lots, lot, key=self._lot_key)
+        for sell in sorted(sell_rows, key=lambda s: (s["date"], s["row_idx"])):
+            self._consume(sell)
+        at = bisect.bisect_left(self._div_pos, pos)
+        self._dividends[at:at] = dividends
+        self._div_pos[at:at] = [pos] * len(dividends)
+        return True
+
+    def result(self) -> Tuple[List[Holding], List[SoldPosition], List[dict]]:
+        """(holdings, sold_positions, dividends) in _match_symbol's shape."""
+        if self._sell_count:
+            lots = self._lots[self._head:]
+        else:
+            # Nothing was FIFO-matched: lots stay in sheet order, as they're parsed
+            lots = sorted(self._lots, key=lambda l: (self._pos[l.file], l.row + self._offset[l.file]))
+        holdings = []
+        for lot in lots:
+            remaining = lot.remaining
+            if remaining <= 0:
                 continue
-            qty_int = _safe_int(qty)
-            price_f = _safe_float(price)
-            if qty_int > 0 and price_f > 0:
-                exchange = exch if exch in ("NSE", "BSE") else "NSE"
-                sell_rows.append({
-                    "date": tx_date,
-                    "quantity": qty_int,
-                    "price": price_f,
-                    "exchange": exchange,
-                    "row_idx": row_num,
-                })
-            continue
+            if lot.quantity > 0 and lot.cost > 0:
+                lot_cost = round((lot.cost / lot.quantity) * remaining, 2)
+            else:
+                lot_cost = round(lot.price * remaining, 2)
+            row_idx = lot.row + self._offset[lot.file]
+            holdings.append(Holding(
+                id=_gen_id(self.symbol, lot.exchange, lot.date, lot.price, row_idx),
+                symbol=self.symbol,
+                exchange=lot.exchange,
+                name=self.name,
+                quantity=remaining,
+                price=round(lot.raw_price, 2),
+                buy_price=round(lot.price, 2),
+                buy_cost=round(lot_cost, 2),
+                buy_date=lot.date,
+                notes="",
+            ))
+        return holdings, list(self._sold), list(self._dividends)
 
-        # Only process Buy rows
-        if action != "Buy":
-            continue
 
-        tx_date = _parse_date(date_val)
-        if not tx_date:
-            continue
+def _match_symbol(symbol: str, parsed_files: List[Tuple[str, dict]]):
+    """FIFO-match parsed rows from all of a symbol's files into model objects.
 
-        qty_int = _safe_int(qty)
-        price_e = _safe_float(price)                  # E: transaction price per share
-        cost_f = _safe_float(col(row, 5))             # F: COST (value at cost incl. charges)
-        if qty_int <= 0 or (price_e <= 0 and cost_f <= 0):
-            continue
+    parsed_files is [(file_stem, _parse_workbook payload), ...].
+    Returns (holdings, sold_positions, dividends).
+    """
+    return FifoLedger(symbol, parsed_files).result()
 
-        # buy_price = per-unit cost from column F; fallback to column E
-        if cost_f > 0 and qty_int > 0:
-            buy_price = cost_f / qty_int
-        else:
-            buy_price = price_e
-            cost_f = round(price_e * qty_int, 2)
-
-        exchange = exch if exch in ("NSE", "BSE") else "NSE"
-
-        # Every Buy row goes into held; FIFO matching (later) moves sold lots out
-        held.append({
-            "date": tx_date,
-            "exchange": exchange,
-            "quantity": qty_int,
-            "price": buy_price,
-            "raw_price": price_e,
-            "cost": cost_f,
-            "row_idx": row_num,
-        })
 
-    return held, sold, sell_rows, dividends
+# Stand-in cache entry for symbols without readable files
+_NO_STOCK_DATA = (None, [], [], [])
+
+# Distinguishes portfolio instances in data_version (snapshot versions
+# restart at 0 for every instance)
+_instance_serials = itertools.count(1)
+
+
+class PortfolioSnapshot:
+    """Everything get_all_data() serves, built once per change.
+
+    Never mutated after build(): XlsxPortfolio swaps in a new snapshot with
+    the next version, so a reader holding one always sees a consistent set
+    of holdings, sold positions, dividends and id index.
+
+    by_symbol maps symbol → (holdings, sold, dividend rows) as cached per
+    symbol; dividends is the {symbol: {"amount", "count", "units"}} summary.
+    """
+
+    __slots__ = ("version", "holdings", "sold", "dividends", "index",
+                 "holding_file", "by_symbol", "_files", "_entries")
+
+    def __init__(self, version: int, holdings: List[Holding], sold: List[SoldPosition],
+                 dividends: dict, index: Dict[str, Holding], holding_file: Dict[str, Path],
+                 by_symbol: Dict[str, tuple], files: Optional[Dict[str, Path]] = None,
+                 entries: Optional[Dict[str, tuple]] = None):
+        self.version = version
+        self.holdings = holdings
+        self.sold = sold
+        self.dividends = dividends
+        self.index = index
+        self.holding_file = holding_file
+        self.by_symbol = by_symbol
+        # What it was built from: symbol → primary file, symbol → cache entry
+        self._files = files
+        self._entries = entries
+
+    @classmethod
+    def empty(cls, version: int = 0) -> "PortfolioSnapshot":
+        return cls(version, [], [], {}, {}, {}, {})
+
+    @classmethod
+    def build(cls, version: int, files: Dict[str, Path],
+              entries: Dict[str, Optional[tuple]]) -> "PortfolioSnapshot":
+        holdings: List[Holding] = []
+        sold: List[SoldPosition] = []
+        dividends = {}
+        index: Dict[str, Holding] = {}
+        holding_file: Dict[str, Path] = {}
+        by_symbol: Dict[str, tuple] = {}
+        for symbol, primary_fp in files.items():
+            entry = entries.get(symbol)
+            if entry is None:
+                continue
+            _, sym_holdings, sym_sold, sym_divs = entry
+            by_symbol[symbol] = (sym_holdings, sym_sold, sym_divs)
+            for h in sym_holdings:
+                index[h.id] = h
+                holding_file[h.id] = primary_fp
+            holdings.extend(sym_holdings)
+            sold.extend(sym_sold)
+            if sym_divs:
+                dividends[symbol] = {
+                    "amount": sum(d["amount"] for d in sym_divs),
+                    "count": len(sym_divs),
+                    "units": sum(d.get("units", 0) for d in sym_divs),
+                }
+        return cls(version, holdings, sold, dividends, index, holding_file,
+                   by_symbol, files, entries)
+
+    def matches(self, files: Dict[str, Path], entries: Dict[str, Optional[tuple]]) -> bool:
+        """True if built from exactly these files and (identical) cache entries."""
+        if self._entries is None or self._files != files or self._entries.keys() != entries.keys():
+            return False
+        return all(self._entries[s] is e for s, e in entries.items())
 
 
 # ═══════════════════════════════════════════════════════════
@@ -354,23 +659,65 @@ def _parse_trading_history(wb) -> Tuple[list, list, list]:
 class XlsxPortfolio:
     """File-per-stock xlsx database with FIFO-derived holdings."""
 
-    def __init__(self, stocks_dir: str | Path):
+    def __init__(self, stocks_dir: str | Path, parse_workers: Optional[int] = None,
+                 write_journal: Optional[bool] = None,
+                 watcher: Optional[fs_watcher.DumpsWatcher] = None):
         self.stocks_dir = Path(stocks_dir)
         self.stocks_dir.mkdir(parents=True, exist_ok=True)
-        self._lock = threading.RLock()  # Reentrant — nested calls OK
+        # Writes lock per workbook (reentrant), so saves to different stocks
+        # run in parallel; _map_lock only guards swapping/mutating the
+        # symbol ↔ file maps, and _scan_lock keeps reindexes from overlapping
+        self._file_locks: Dict[Path, threading.RLock] = {}
+        self._file_locks_guard = threading.Lock()
+        self._map_lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        # Process-pool size for cold parses (<= 1 → serial)
+        self._parse_workers = PARSE_WORKERS if parse_workers is None else parse_workers
 
         # Caches keyed by symbol (combined data from all files)
         self._cache: Dict[str, Tuple[float, List[Holding], List[SoldPosition]]] = {}
+        # symbol → (cache key, FifoLedger) — advanced in place by our own writes
+        self._ledgers: Dict[str, tuple] = {}
         # symbol → primary filepath (for writes)
         self._file_map: Dict[str, Path] = {}
         # symbol → ALL file paths (primary + archives, for reads)
         self._all_files: Dict[str, List[Path]] = {}
         # symbol → company name
         self._name_map: Dict[str, str] = {}
-        # holding_id → Holding  (rebuilt on every full scan)
-        self._holding_index: Dict[str, Holding] = {}
-        # holding_id → filepath  (to find file for sell ops)
-        self._holding_file: Dict[str, Path] = {}
+        # Current PortfolioSnapshot — replaced, never mutated, so readers
+        # just take the reference; _snapshot_lock only serialises rebuilds
+        self._snapshot = PortfolioSnapshot.empty()
+        self._snapshot_lock = threading.Lock()
+        self._memo_key = ("stocks", id(self))
+        self._serial = next(_instance_serials)
+        # Bumped by every write and invalidation (see data_version)
+        self._change_seq = itertools.count(1)
+        self._changes = 0
+
+        # Parsed workbook rows and resolved symbols persisted across
+        # restarts, both validated by path + size + mtime
+        cache_dir = self.stocks_dir.parent / ".cache"
+        self._parse_cache = ParseCache(cache_dir / f"{self.stocks_dir.name}.json")
+        self._symbol_cache = ParseCache(cache_dir / f"{self.stocks_dir.name}.symbols.json")
+        # filepath → (size, mtime_ns, symbol) from the last directory scan
+        self._scan: Dict[Path, Tuple[int, int, str]] = {}
+
+        # Write-ahead journal for buys/sells/dividends (None → write through)
+        if WRITE_JOURNAL if write_journal is None else write_journal:
+            journal_dir = self.stocks_dir.parent / ".journal"
+            self._journal: Optional[WriteJournal] = WriteJournal(journal_dir / f"{self.stocks_dir.name}.jsonl")
+        else:
+            self._journal = None
+        self._flush_timer: Optional[threading.Timer] = None
+        self._flush_timer_lock = threading.Lock()
+
+        # Filesystem watcher (None → stat() every file on every read).
+        # With one, _cache entries validated since the last change event
+        # are served as-is; _fs_epoch counts events so a read that raced
+        # one doesn't mark its result fresh
+        self._watcher = watcher if watcher is not None else fs_watcher.watcher_for(self.stocks_dir.parent)
+        self._fresh: Set[str] = set()
+        self._fs_epoch = 0
 
         # Manual prices
         self._manual_prices_file = Path(stocks_dir).parent / "manual_prices.json"
@@ -379,6 +726,16 @@ class XlsxPortfolio:
         # Build file map on init
         self._build_file_map()
 
+        # Replay writes acknowledged before the last shutdown/crash
+        if self._journal is not None and len(self._journal):
+            logger.info(f"[XlsxDB] Replaying {len(self._journal)} journaled writes")
+            self.flush_journal()
+            if len(self._journal):
+                self._schedule_flush(_JOURNAL_RETRY_DELAY)
+
+        if self._watcher is not None:
+            self._watcher.subscribe(self.stocks_dir, self._on_fs_change)
+
     # ── Initialisation ────────────────────────────────────
 
     def _ensure_manual_prices(self):
@@ -387,51 +744,67 @@ class XlsxPortfolio:
             with open(self._manual_prices_file, "w") as f:
                 json.dump({}, f)
 
-    def _build_file_map(self):
-        """Scan xlsx files and build symbol ↔ filepath map.
-
-        Multiple files for the same symbol (main + archive + duplicates)
-        are all stored so that transactions can be merged during parsing.
-        The non-archive file is treated as the primary (for writes).
-
-        Symbol resolution order (no hardcoded map):
-          1. Index sheet Code (authoritative — set at file creation, e.g. "NSE:RELIANCE")
-          2. Zerodha/NSE name→symbol lookup (dynamic, always fresh)
-          3. Derive from filename as last resort
-        """
-        # Ensure Zerodha/NSE symbol data is loaded (cached to disk, fast)
-        _sym_resolver.ensure_loaded()
-
+    def _scan_dir(self) -> Dict[Path, os.stat_result]:
+        """List candidate stock workbooks with one stat() each."""
+        listing: Dict[Path, os.stat_result] = {}
         for fp in sorted(self.stocks_dir.glob("*.xlsx")):
             if fp.name.startswith("~") or fp.name.startswith("."):
                 continue
-
-            stem = fp.stem
-
             # Skip "(1)" files — they are near-duplicates with rounding diffs
-            if "(1)" in stem:
+            if "(1)" in fp.stem:
+                continue
+            try:
+                listing[fp] = fp.stat()
+            except OSError:
                 continue
+        return listing
 
-            clean = stem.replace("Archive_", "").replace(" - Archive", "").strip()
+    def _resolve_file_symbol(self, fp: Path, st: os.stat_result) -> str:
+        """Resolve the trading symbol for one workbook.
 
-            # 1. Index sheet Code is authoritative (e.g. "NSE:RELIANCE")
-            symbol = None
-            try:
-                wb = openpyxl.load_workbook(fp, data_only=True, read_only=True)
-                idx = _extract_index_data(wb)
-                wb.close()
-                symbol = idx.get("symbol")
-            except Exception:
-                pass
+        Resolution order (no hardcoded map):
+          1. Index sheet Code (authoritative — set at file creation, e.g. "NSE:RELIANCE")
+          2. Zerodha/NSE name→symbol lookup (dynamic, always fresh)
+          3. Derive from filename as last resort
 
-            # 2. Fallback: Zerodha/NSE name→symbol lookup
-            if not symbol:
-                symbol = _sym_resolver.resolve_by_name(clean)
+        Results from (1) and (2) are persisted keyed by size + mtime, so an
+        unchanged file never needs its workbook opened again across restarts.
+        Derived symbols (3) are not persisted — the resolver may know better
+        on the next scan.
+        """
+        cached = self._symbol_cache.get(fp, st)
+        if cached and cached.get("symbol"):
+            return cached["symbol"]
+
+        clean = _clean_stem(fp.stem)
+        parsed = self._read_workbook(fp, st)
+        symbol = parsed["index"].get("symbol") if parsed else None
+
+        if not symbol:
+            # Ensure Zerodha/NSE symbol data is loaded (cached to disk, fast)
+            _sym_resolver.ensure_loaded()
+            symbol = _sym_resolver.resolve_by_name(clean)
+
+        if not symbol:
+            symbol = _sym_resolver.derive_symbol(clean)
+            logger.warning(f"[XlsxDB] Could not resolve '{clean}', derived: {symbol}")
+        else:
+            self._symbol_cache.put(fp, {"symbol": symbol}, st)
+        return symbol
 
-            # 3. Last resort: derive from filename heuristic
-            if not symbol:
-                symbol = _sym_resolver.derive_symbol(clean)
-                logger.warning(f"[XlsxDB] Could not resolve '{clean}', derived: {symbol}")
+    def _apply_scan(self, scan: Dict[Path, Tuple[int, int, str]]):
+        """Rebuild symbol ↔ filepath maps from a scan and swap them in.
+
+        Multiple files for the same symbol (main + archive + duplicates)
+        are all stored so that transactions can be merged during parsing.
+        The non-archive file is treated as the primary (for writes).
+        """
+        file_map: Dict[str, Path] = {}
+        all_files: Dict[str, List[Path]] = {}
+        name_map: Dict[str, str] = {}
+        for fp in sorted(scan):
+            symbol = scan[fp][2]
+            clean = _clean_stem(fp.stem)
 
             # Populate the runtime SYMBOL_MAP so other modules can reference it
             if clean not in SYMBOL_MAP:
@@ -440,22 +813,69 @@ class XlsxPortfolio:
                     _REVERSE_MAP[symbol] = clean
 
             # Accumulate all files for this symbol
-            if symbol not in self._all_files:
-                self._all_files[symbol] = []
-            self._all_files[symbol].append(fp)
+            all_files.setdefault(symbol, []).append(fp)
 
             # Primary file = non-archive (for writes)
-            is_archive = "Archive" in stem
-            existing = self._file_map.get(symbol)
-            if existing is None or (not is_archive):
-                self._file_map[symbol] = fp
-                self._name_map[symbol] = clean
+            is_archive = "Archive" in fp.stem
+            if symbol not in file_map or not is_archive:
+                file_map[symbol] = fp
+                name_map[symbol] = clean
 
             # NOTE: Derived symbol aliases (derive_symbol → first word of name)
             # were removed because they create wrong cross-stock mappings
             # (e.g. ITC→ITCHOTELS, TATA→TATACAP). Duplicate detection during
             # import relies on get_existing_transaction_fingerprints() which
             # has a glob-based fallback via _find_file_for_symbol().
+
+        # Swap whole dicts so concurrent readers never see a half-built map
+        with self._map_lock:
+            self._file_map, self._all_files, self._name_map = file_map, all_files, name_map
+            self._scan = scan
+
+    def _persist_scan(self):
+        live = list(self._scan)
+        for cache in (self._parse_cache, self._symbol_cache):
+            cache.prune(live)
+            cache.save()
+
+    def _warm_parse_cache(self, items: List[Tuple[Path, os.stat_result]]):
+        """Parse uncached workbooks in a process pool ahead of resolution.
+
+        Used by full scans and reindex so that symbol resolution (which
+        needs each new file's Index sheet) hits the parse cache instead of
+        opening workbooks one at a time.
+        """
+        todo = [(fp, st) for fp, st in items
+                if self._symbol_cache.get(fp, st) is None and self._parse_cache.get(fp, st) is None]
+        if self._parse_workers <= 1 or len(todo) < _PARALLEL_MIN_SYMBOLS:
+            return
+        t0 = time.time()
+        workers = min(self._parse_workers, len(todo))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as pool:
+                results = pool.map(xlsx_parse._parse_workbook, [fp for fp, _ in todo], chunksize=4)
+                for (fp, st), parsed in zip(todo, results):
+                    if parsed is not None:
+                        self._parse_cache.put(fp, parsed, st)
+        except Exception as e:
+            logger.warning(f"[XlsxDB] Parallel parse unavailable, using serial path: {e}")
+            return
+        logger.info(f"[XlsxDB] Parsed {len(todo)} workbooks on {workers} processes "
+                    f"in {time.time() - t0:.1f}s")
+
+    def _build_file_map(self):
+        """Full scan: stat every xlsx file and resolve its symbol.
+
+        Unchanged files are resolved from the persisted symbol cache, so a
+        restart with no file changes opens zero workbooks.
+        """
+        scan: Dict[Path, Tuple[int, int, str]] = {}
+        listing = self._scan_dir()
+        self._warm_parse_cache(list(listing.items()))
+        for fp, st in listing.items():
+            scan[fp] = (st.st_size, st.st_mtime_ns, self._resolve_file_symbol(fp, st))
+        self._apply_scan(scan)
+        self._persist_scan()
         logger.info(f"[XlsxDB] Indexed {len(self._file_map)} stock files "
                     f"({sum(len(v) for v in self._all_files.values())} total including archives)")
 
@@ -465,40 +885,127 @@ class XlsxPortfolio:
         Call this periodically (e.g. every refresh cycle) so that newly
         dropped xlsx files appear without a backend restart.
 
+        Incremental: the directory listing (path, size, mtime) is diffed
+        against the previous scan and only added or modified files are
+        resolved/opened. Only symbols whose files changed are invalidated.
         Uses build-then-swap so concurrent readers never see empty dicts.
         """
-        with self._lock:
+        with self._scan_lock:
+            if not self.stocks_dir.is_dir():
+                # Drive folder unmounted / mid-sync — keep what we have
+                logger.error("[XlsxDB] Stocks directory missing during reindex — keeping old maps")
+                return {"total": len(self._file_map), "added": [], "removed": [], "modified": []}
+
+            old_scan = self._scan
             old_symbols = set(self._file_map.keys())
+            listing = self._scan_dir()
+
+            self._warm_parse_cache([
+                (fp, st) for fp, st in listing.items()
+                if fp not in old_scan or old_scan[fp][:2] != (st.st_size, st.st_mtime_ns)
+            ])
+
+            scan: Dict[Path, Tuple[int, int, str]] = {}
+            touched: set = set()
+            for fp, st in listing.items():
+                prev = old_scan.get(fp)
+                if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+                    scan[fp] = prev
+                    continue
+                symbol = self._resolve_file_symbol(fp, st)
+                scan[fp] = (st.st_size, st.st_mtime_ns, symbol)
+                touched.add(symbol)
+                if prev:
+                    touched.add(prev[2])
+            for fp, prev in old_scan.items():
+                if fp not in listing:
+                    touched.add(prev[2])
 
-            # Build into NEW dicts — old dicts remain readable by concurrent threads
-            old_file_map, old_all_files, old_name_map = self._file_map, self._all_files, self._name_map
-            self._file_map = {}
-            self._all_files = {}
-            self._name_map = {}
-            self._build_file_map()
+            if not touched and set(old_scan) == set(scan):
+                return {"total": len(old_symbols), "added": [], "removed": [], "modified": []}
 
-            # If rebuild failed, keep old maps
-            if not self._file_map and old_file_map:
-                self._file_map, self._all_files, self._name_map = old_file_map, old_all_files, old_name_map
-                logger.error("[XlsxDB] Reindex produced empty results — keeping old maps")
-                return
+            self._apply_scan(scan)
+            self._persist_scan()
 
             new_symbols = set(self._file_map.keys())
             added = new_symbols - old_symbols
             removed = old_symbols - new_symbols
+            modified = (touched & old_symbols & new_symbols)
 
-            # Invalidate caches for changed/new/removed symbols
-            for sym in new_symbols | removed:
+            # Invalidate caches only for symbols whose files changed
+            for sym in touched:
                 self._invalidate_symbol(sym)
 
-            if added or removed:
-                parts = []
-                if added:
-                    parts.append(f"+{len(added)}")
-                if removed:
-                    parts.append(f"-{len(removed)}")
-                logger.info(f"[XlsxDB] Reindex: {len(new_symbols)} stocks ({', '.join(parts)} changed)")
-            return {"total": len(new_symbols), "added": list(added), "removed": list(removed)}
+            parts = []
+            if added:
+                parts.append(f"+{len(added)}")
+            if removed:
+                parts.append(f"-{len(removed)}")
+            if modified:
+                parts.append(f"~{len(modified)}")
+            logger.info(f"[XlsxDB] Reindex: {len(new_symbols)} stocks ({', '.join(parts) or 'no symbol'} changed)")
+            return {"total": len(new_symbols), "added": list(added),
+                    "removed": list(removed), "modified": list(modified)}
+
+    def _on_fs_change(self, paths: Set[Path]):
+        """Watcher callback: invalidate and re-parse only what changed.
+
+        A workbook whose new stat already matches its parse cache entry was
+        written by us (_advance_ledger stored it), so its ledger is kept.
+        Added or removed workbooks go through reindex(); the directory
+        itself in *paths* means events were lost and everything is rescanned.
+        """
+        self._fs_epoch += 1
+        self._note_change()
+        if self.stocks_dir in paths:
+            # Reads fall back to stat() until they revalidate
+            self._fresh.clear()
+            self.reindex()
+            return
+
+        changed: Set[str] = set()
+        rescan = False
+        for fp in paths:
+            if fp.suffix != ".xlsx" or fp.name.startswith(("~", ".")) or "(1)" in fp.stem:
+                continue
+            prev = self._scan.get(fp)
+            try:
+                st = fp.stat()
+            except OSError:
+                st = None
+            if prev is None or st is None:
+                rescan = True
+                continue
+            if self._parse_cache.get(fp, st) is not None:
+                with self._map_lock:
+                    if fp in self._scan:
+                        self._scan[fp] = (st.st_size, st.st_mtime_ns, prev[2])
+                continue
+            # Not ours: drop this file's parse and the symbol's derived state
+            self._parse_cache.discard(fp)
+            changed.add(prev[2])
+
+        for symbol in changed:
+            self._fresh.discard(symbol)
+            self._cache.pop(symbol, None)
+            self._ledgers.pop(symbol, None)
+        if rescan or changed:
+            self.reindex()
+        # Warm what was invalidated (we're on the watcher's thread, not a request)
+        for symbol in changed:
+            try:
+                self._get_stock_data(symbol)
+            except Exception as e:
+                logger.error(f"[XlsxDB] Re-parse after change failed for {symbol}: {e}")
+
+    def _file_lock(self, filepath: Path) -> threading.RLock:
+        """Write lock for one workbook, created on first use."""
+        filepath = Path(filepath)
+        with self._file_locks_guard:
+            lock = self._file_locks.get(filepath)
+            if lock is None:
+                lock = self._file_locks[filepath] = threading.RLock()
+            return lock
 
     def _find_file_for_symbol(self, symbol: str) -> Optional[Path]:
         """Find xlsx file for a given stock symbol (exact match only)."""
@@ -515,168 +1022,370 @@ class XlsxPortfolio:
 
     # ── Cache Layer ───────────────────────────────────────
 
+    def _cache_key(self, symbol: str, stats: Dict[Path, os.stat_result]):
+        """Combined mtime of a symbol's files, plus its newest journal seq.
+
+        Journaled writes change the key without touching any file, and so
+        does the flush that drains them.
+        """
+        combined_mtime = max(st.st_mtime for st in stats.values())
+        pending = self._pending_entries(symbol)
+        return (combined_mtime, pending[-1]["seq"]) if pending else combined_mtime
+
     def _get_stock_data(self, symbol: str) -> Tuple[List[Holding], List[SoldPosition]]:
         """Get holdings/sold for a symbol, combining all files, with mtime caching."""
         files = self._all_files.get(symbol, [])
         if not files:
             return [], [], []
 
-        # Compute combined mtime (max of all files)
+        if symbol in self._fresh:
+            cached = self._cache.get(symbol)
+            if cached is not None:
+                return cached[1], cached[2], cached[3]
+        epoch = self._fs_epoch
+
+        # Compute combined mtime (max of all files) — one stat() per file,
+        # reused by the parse cache on a miss
         try:
-            combined_mtime = max(fp.stat().st_mtime for fp in files)
+            stats = {fp: fp.stat() for fp in files}
         except OSError:
             return [], [], []
+        key = self._cache_key(symbol, stats)
 
         if symbol in self._cache:
-            cached_mtime, cached_h, cached_s, cached_d = self._cache[symbol]
-            if cached_mtime == combined_mtime:
+            cached_key, cached_h, cached_s, cached_d = self._cache[symbol]
+            if cached_key == key:
+                self._mark_fresh(symbol, epoch)
                 return cached_h, cached_s, cached_d
 
-        holdings, sold, dividends = self._parse_and_match_symbol(symbol, files)
-        self._cache[symbol] = (combined_mtime, holdings, sold, dividends)
+        if isinstance(key, tuple):
+            # Pending journal entries: parse under the write lock so a
+            # concurrent flush can't land between reading the file and the
+            # journal (entries are written against the primary file)
+            with self._file_lock(self._file_map.get(symbol, files[0])):
+                try:
+                    stats = {fp: fp.stat() for fp in files}
+                except OSError:
+                    return [], [], []
+                key = self._cache_key(symbol, stats)
+                ledger = self._build_ledger(symbol, files, stats)
+        else:
+            ledger = self._build_ledger(symbol, files, stats)
+        holdings, sold, dividends = self._store_ledger(symbol, key, stats, ledger)
+        self._mark_fresh(symbol, epoch)
         return holdings, sold, dividends
 
+    def _store_ledger(self, symbol: str, key, stats: Dict[Path, os.stat_result],
+                      ledger: FifoLedger):
+        """Cache a freshly built ledger's result (and the ledger) under *key*."""
+        holdings, sold, dividends = ledger.result()
+        self._cache[symbol] = (key, holdings, sold, dividends)
+        # Keep the ledger only if no write landed while we were parsing —
+        # advancing one built from newer rows would apply them twice
+        try:
+            if all(fp.stat().st_mtime_ns == st.st_mtime_ns for fp, st in stats.items()):
+                self._ledgers[symbol] = (key, ledger)
+        except OSError:
+            pass
+        return holdings, sold, dividends
+
+    def _mark_fresh(self, symbol: str, epoch: int):
+        """Serve *symbol* from _cache without stat() until the next change event."""
+        if self._watcher is not None and self._fs_epoch == epoch:
+            self._fresh.add(symbol)
+
+    def _note_change(self):
+        """Something this instance serves changed: drop the request memo
+        and move data_version on."""
+        request_memo.forget(self._memo_key)
+        self._changes = next(self._change_seq)
+
     def _invalidate_symbol(self, symbol: str):
         """Remove a symbol from cache so next read re-parses."""
+        self._note_change()
+        self._fresh.discard(symbol)
         self._cache.pop(symbol, None)
+        self._ledgers.pop(symbol, None)
+
+    def _invalidate_file(self, filepath: Path):
+        """Drop the on-disk parse/symbol cache entries of a file we just wrote.
+
+        A rewrite can land within the filesystem's mtime granularity with an
+        unchanged size, so our own writes must not rely on stat alone.
+        """
+        self._parse_cache.discard(filepath)
+        self._symbol_cache.discard(filepath)
+
+    @contextmanager
+    def _ledger_write(self, symbol: str, filepath: Path, transactions: List[Transaction],
+                      op: str = "write"):
+        """Wrap one of our own writes of *transactions* to the top of *filepath*.
+
+        Instead of invalidating the symbol, its cached ledger is advanced by
+        the new rows (FifoLedger.apply) and the parse cache entry is updated
+        in place, so the next read reopens no workbook and re-matches nothing.
+
+        op says where the rows go:
+          "write"   — into the workbook (write-through)
+          "journal" — into the write journal (overlaid on reads)
+          "flush"   — from the journal into the workbook; the ledger already
+                      holds them, only the parse cache and key move on
+        Falls back to _invalidate_symbol when the ledger can't be advanced
+        or the body raises.
+        """
+        with self._file_lock(filepath):
+            try:
+                stats = {fp: fp.stat() for fp in self._all_files.get(symbol, [])}
+            except OSError:
+                stats = {}
+            before_key = self._cache_key(symbol, stats) if stats else None
+            st = stats.get(filepath)
+            before = (self._parse_cache.get(filepath, st), self._symbol_cache.get(filepath, st))
+            try:
+                yield
+            except BaseException:
+                self._invalidate_file(filepath)
+                self._invalidate_symbol(symbol)
+                raise
+            self._advance_ledger(symbol, filepath, transactions, op, before_key, before)
+
+    def _advance_ledger(self, symbol: str, filepath: Path, transactions: List[Transaction],
+                        op: str, before_key, before: tuple):
+        self._note_change()
+        try:
+            stats = {fp: fp.stat() for fp in self._all_files.get(symbol, [])}
+        except OSError:
+            self._invalidate_file(filepath)
+            self._invalidate_symbol(symbol)
+            return
+
+        if op != "journal":
+            # The workbook now reads as its old payload with the rows on top
+            payload, resolved = before
+            st = stats.get(filepath)
+            if payload is not None and st is not None:
+                self._parse_cache.put(filepath, _overlay_pending(payload, transactions), st)
+            else:
+                self._parse_cache.discard(filepath)
+            if resolved is not None and st is not None:
+                self._symbol_cache.put(filepath, resolved, st)
+            else:
+                self._symbol_cache.discard(filepath)
+
+        entry = self._ledgers.get(symbol)
+        if (before_key is None or entry is None or entry[0] != before_key
+                or (op != "flush" and not entry[1].apply(filepath.stem, transactions))):
+            self._fresh.discard(symbol)
+            self._cache.pop(symbol, None)
+            self._ledgers.pop(symbol, None)
+            return
+        ledger = entry[1]
+        key = self._cache_key(symbol, stats)
+        holdings, sold, dividends = ledger.result()
+        self._ledgers[symbol] = (key, ledger)
+        self._cache[symbol] = (key, holdings, sold, dividends)
 
     def _invalidate_all(self):
         """Clear all caches."""
+        self._note_change()
+        self._fresh.clear()
         self._cache.clear()
-        self._holding_index.clear()
-        self._holding_file.clear()
+        self._ledgers.clear()
+        with self._snapshot_lock:
+            self._snapshot = PortfolioSnapshot.empty(self._snapshot.version + 1)
 
     # ── Parse + FIFO ──────────────────────────────────────
 
-    def _parse_and_match_symbol(self, symbol: str, files: List[Path]):
+    def _read_workbook(self, filepath: Path, st: Optional[os.stat_result] = None) -> Optional[dict]:
+        """Return parsed Index + Trading History data for one xlsx file.
+
+        Served from the on-disk parse cache when the file's size and mtime
+        are unchanged; otherwise the workbook is opened with openpyxl and
+        the result is stored back.  Returns None if the file can't be opened.
+        """
+        cached = self._parse_cache.get(filepath, st)
+        if cached is not None:
+            return cached
+        parsed = _parse_workbook(filepath)
+        if parsed is None:
+            return None
+        self._parse_cache.put(filepath, parsed, st)
+        return parsed
+
+    def _parse_and_match_symbol(self, symbol: str, files: List[Path],
+                                stats: Optional[Dict[Path, os.stat_result]] = None):
         """Parse ALL xlsx files for a symbol with hybrid sold detection.
 
         Column-based: Buy rows with Realised section data → sold via columns.
         FIFO-based: Explicit Sell rows are FIFO-matched against held lots.
         This ensures sells done through the app (which add Sell rows) are
         properly reflected alongside original column-tracked sells.
-        """
-        all_held, all_sold_raw, all_sell_rows, all_dividends = [], [], [], []
-        exchange = "NSE"
-        name = symbol
 
+        Journaled writes not yet flushed are overlaid on their workbook.
+        """
+        return self._build_ledger(symbol, files, stats).result()
+
+    def _build_ledger(self, symbol: str, files: List[Path],
+                      stats: Optional[Dict[Path, os.stat_result]] = None) -> FifoLedger:
+        """FifoLedger over ALL of a symbol's files (see _parse_and_match_symbol)."""
+        pending: Dict[str, List[Transaction]] = {}
+        for entry in self._pending_entries(symbol):
+            pending.setdefault(entry["file"], []).append(_entry_transaction(entry))
+        parsed_files = []
         for filepath in files:
-            stem = filepath.stem
+            parsed = self._read_workbook(filepath, (stats or {}).get(filepath))
+            if parsed is not None:
+                parsed = _overlay_pending(parsed, pending.get(str(filepath), []))
+                parsed_files.append((filepath.stem, parsed))
+        return FifoLedger(symbol, parsed_files)
+
+    def _prefetch_parallel(self, symbols: List[str]):
+        """Parse cache-missed symbols in a process pool and fill _cache.
+
+        Only symbols whose per-symbol cache is stale AND that have at least
+        one file missing from the parse cache are sent to workers; everything
+        else is cheap enough for the serial path in get_all_data(). Any
+        symbol a worker fails on is simply left for the serial path.
+        Workers only parse; the FIFO ledgers are built here from their
+        payloads, so later writes can advance them like serially built ones.
+        """
+        if self._parse_workers <= 1:
+            return
+        pending = []
+        for symbol in symbols:
+            if symbol in self._fresh and symbol in self._cache:
+                continue
+            files = self._all_files.get(symbol, [])
+            if not files:
+                continue
             try:
-                wb = openpyxl.load_workbook(filepath, data_only=True, read_only=True)
-            except Exception as e:
-                logger.error(f"[XlsxDB] Failed to open {filepath.name}: {e}")
+                stats = {fp: fp.stat() for fp in files}
+            except OSError:
+                continue
+            combined_mtime = self._cache_key(symbol, stats)
+            if isinstance(combined_mtime, tuple):
+                continue  # pending journal entries — workers can't overlay them
+            cached = self._cache.get(symbol)
+            if cached and cached[0] == combined_mtime:
                 continue
+            if all(self._parse_cache.get(fp, st) is not None for fp, st in stats.items()):
+                continue
+            pending.append((symbol, files, stats, combined_mtime))
 
-            idx = _extract_index_data(wb)
-            held, sold, sell_rows, dividends = _parse_trading_history(wb)
-            wb.close()
+        if len(pending) < _PARALLEL_MIN_SYMBOLS:
+            return
 
-            # Use index data from the primary (non-archive) file
-            if idx.get("exchange"):
-                exchange = idx["exchange"]
-            clean_name = stem.replace("Archive_", "").replace(" - Archive", "").strip()
-            if not name or name == symbol:
-                name = clean_name
-
-            all_held.extend(held)
-            all_sold_raw.extend(sold)
-            all_sell_rows.extend(sell_rows)
-            all_dividends.extend(dividends)
-
-        if not all_held and not all_sold_raw and not all_sell_rows:
-            return [], [], all_dividends
-
-        # FIFO-match explicit Sell rows against held lots.
-        # Column-tracked sells (Buy rows with Realised data) are already in
-        # all_sold_raw and their lots are NOT in all_held, so no double-counting.
-        if all_sell_rows and all_held:
-            buys_for_fifo = [{
-                "date": h["date"],
-                "quantity": h["quantity"],
-                "price": h["price"],
-                "raw_price": h.get("raw_price", h["price"]),
-                "cost": h.get("cost", 0),
-                "exchange": h.get("exchange", exchange),
-                "row_idx": h.get("row_idx", 0),
-            } for h in all_held]
-
-            sells_for_fifo = [{
-                "date": s["date"],
-                "quantity": s["quantity"],
-                "price": s["price"],
-            } for s in all_sell_rows]
-
-            remaining, fifo_sold = fifo_match(buys_for_fifo, sells_for_fifo)
-
-            # Replace held lots with remaining after FIFO
-            all_held = [{
-                "date": r["date"],
-                "exchange": r.get("exchange", exchange),
-                "quantity": r["remaining"],
-                "price": r["price"],
-                "raw_price": r.get("raw_price", r["price"]),
-                "cost": round((r["cost"] / r["quantity"]) * r["remaining"], 2) if r.get("quantity", 0) > 0 and r.get("cost", 0) > 0 else round(r["price"] * r["remaining"], 2),
-                "row_idx": r.get("row_idx", 0),
-            } for r in remaining if r["remaining"] > 0]
-
-            # Add FIFO-derived sold positions
-            for fs in fifo_sold:
-                all_sold_raw.append({
-                    "buy_date": fs["buy_date"],
-                    "buy_price": fs["buy_price"],
-                    "sell_date": fs["sell_date"],
-                    "sell_price": fs["sell_price"],
-                    "quantity": fs["quantity"],
-                    "realized_pl": fs["realized_pl"],
-                    "exchange": fs.get("buy_exchange", exchange),
-                    "row_idx": fs.get("sell_row_idx", fs.get("row_idx", 0)),
-                })
+        t0 = time.time()
+        workers = min(self._parse_workers, len(pending))
+        done = 0
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as pool:
+                futures = {
+                    pool.submit(xlsx_parse.parse_files, files): (symbol, stats, combined_mtime)
+                    for symbol, files, stats, combined_mtime in pending
+                }
+                for fut in as_completed(futures):
+                    symbol, stats, combined_mtime = futures[fut]
+                    try:
+                        parsed_files = fut.result()
+                    except Exception as e:
+                        logger.error(f"[XlsxDB] Parallel parse failed for {symbol}: {e}")
+                        continue
+                    for fp, parsed in parsed_files:
+                        self._parse_cache.put(fp, parsed, stats.get(fp))
+                    ledger = FifoLedger(symbol, [(fp.stem, parsed) for fp, parsed in parsed_files])
+                    self._store_ledger(symbol, combined_mtime, stats, ledger)
+                    done += 1
+        except Exception as e:
+            # e.g. no /dev/shm or process limits — the serial path still works
+            logger.warning(f"[XlsxDB] Parallel parse unavailable, using serial path: {e}")
+            return
+        logger.info(f"[XlsxDB] Parsed {done}/{len(pending)} symbols on "
+                    f"{workers} processes in {time.time() - t0:.1f}s")
 
-        # Build Holding objects directly
-        holdings = []
-        for lot in all_held:
-            h_id = _gen_id(symbol, lot.get("exchange", exchange),
-                           lot["date"], lot["price"], lot.get("row_idx", 0))
-            lot_cost = lot.get("cost", 0)
-            if lot_cost <= 0:
-                lot_cost = round(lot["price"] * lot["quantity"], 2)
-            h = Holding(
-                id=h_id,
-                symbol=symbol,
-                exchange=lot.get("exchange", exchange),
-                name=name,
-                quantity=lot["quantity"],
-                price=round(lot.get("raw_price", lot["price"]), 2),
-                buy_price=round(lot["price"], 2),
-                buy_cost=round(lot_cost, 2),
-                buy_date=lot["date"],
-                notes="",
-            )
-            holdings.append(h)
-
-        # Build SoldPosition objects directly
-        sold = []
-        for s in all_sold_raw:
-            s_id = _gen_id(symbol + "_S", s.get("exchange", exchange),
-                           s["sell_date"], s["sell_price"], s.get("row_idx", 0))
-            sold.append(SoldPosition(
-                id=s_id,
-                symbol=symbol,
-                exchange=s.get("exchange", exchange),
-                name=name,
-                quantity=s["quantity"],
-                buy_price=round(s["buy_price"], 2),
-                buy_date=s["buy_date"],
-                sell_price=round(s["sell_price"], 2),
-                sell_date=s["sell_date"],
-                realized_pl=s["realized_pl"],
-                row_idx=s.get("row_idx", 0),
-            ))
+    # ── Public READ API ───────────────────────────────────
 
-        return holdings, sold, all_dividends
+    def snapshot(self) -> "PortfolioSnapshot":
+        """The current PortfolioSnapshot, rebuilt only if something changed.
 
-    # ── Public READ API ───────────────────────────────────
+        Every symbol's cache entry is validated as usual (stat(), or the
+        watcher); when all of them and the file map are the ones the current
+        snapshot was built from, that same object is returned.  Otherwise a
+        new snapshot with the next version is built and swapped in.
+
+        Within a request (request_memo.request_scope) the validation runs
+        once; later calls in the same request get the same snapshot.
+        """
+        return request_memo.memoized(self._memo_key, self._refresh_snapshot)
+
+    def _refresh_snapshot(self) -> "PortfolioSnapshot":
+        current = self._snapshot
+        files = dict(self._file_map)
+        self._prefetch_parallel(list(files))
+        entries = {}
+        for symbol in files:
+            try:
+                holdings, sold, dividends = self._get_stock_data(symbol)
+            except Exception as e:
+                logger.error(f"[XlsxDB] Error reading {symbol}: {e}")
+                continue
+            # The cache entry these lists came from (a write may have
+            # replaced it since — then a fresh tuple forces a rebuild)
+            entry = self._cache.get(symbol)
+            if entry is None and not (holdings or sold or dividends):
+                entry = _NO_STOCK_DATA
+            elif entry is None or entry[1] is not holdings:
+                entry = (None, holdings, sold, dividends)
+            entries[symbol] = entry
+        if current.matches(files, entries):
+            return current
+
+        with self._snapshot_lock:
+            latest = self._snapshot
+            if latest.matches(files, entries):
+                return latest
+            snap = PortfolioSnapshot.build(latest.version + 1, files, entries)
+            self._snapshot = snap
+        # Persist any newly parsed workbooks for the next cold start
+        self._parse_cache.save()
+        return snap
+
+    @property
+    def data_version(self) -> tuple:
+        """Changes whenever any holding, sold position or dividend may
+        have, so it can key HTTP ETags without building the snapshot.
+
+        With the dumps watcher running this is (instance, change counter):
+        our writes and watcher events bump the counter.  Without it a
+        workbook can change behind our back (Drive sync, Excel) and only
+        stat() shows that — the same check reads make — so the files'
+        (mtime, size) are folded in.  Nothing is opened or parsed.
+        """
+        if self._watcher is not None:
+            return self._serial, self._changes
+        return self._serial, self._changes, self._stat_signature()
+
+    def _stat_signature(self) -> int:
+        """Hash of every indexed workbook's (path, mtime, size)."""
+        sig = []
+        for files in list(self._all_files.values()):
+            for fp in files:
+                try:
+                    st = fp.stat()
+                    sig.append((str(fp), st.st_mtime_ns, st.st_size))
+                except OSError:
+                    sig.append((str(fp), None, None))
+        return hash(tuple(sorted(sig)))
+
+    @property
+    def _holding_index(self) -> Dict[str, Holding]:
+        """holding_id → Holding in the current snapshot."""
+        return self._snapshot.index
+
+    @property
+    def _holding_file(self) -> Dict[str, Path]:
+        """holding_id → primary filepath (to find the file for sell ops)."""
+        return self._snapshot.holding_file
 
     def get_all_data(self):
         """Get all holdings, sold positions, and dividends in a SINGLE pass.
@@ -684,32 +1393,12 @@ class XlsxPortfolio:
         Returns (holdings: List[Holding], sold: List[SoldPosition], dividends_by_symbol: dict).
         This is much faster than calling get_all_holdings() + get_all_sold() +
         get_dividends_by_symbol() separately, as it iterates the file map only once.
-        """
-        all_holdings: List[Holding] = []
-        all_sold: List[SoldPosition] = []
-        dividends_by_symbol = {}
-        self._holding_index.clear()
-        self._holding_file.clear()
-
-        file_snapshot = dict(self._file_map)
-        for symbol, primary_fp in file_snapshot.items():
-            try:
-                holdings, sold, dividends = self._get_stock_data(symbol)
-                for h in holdings:
-                    self._holding_index[h.id] = h
-                    self._holding_file[h.id] = primary_fp
-                all_holdings.extend(holdings)
-                all_sold.extend(sold)
-                if dividends:
-                    dividends_by_symbol[symbol] = {
-                        "amount": sum(d["amount"] for d in dividends),
-                        "count": len(dividends),
-                        "units": sum(d.get("units", 0) for d in dividends),
-                    }
-            except Exception as e:
-                logger.error(f"[XlsxDB] Error reading {symbol}: {e}")
 
-        return all_holdings, all_sold, dividends_by_symbol
+        The lists belong to the current snapshot and are shared between
+        callers until the next change — don't mutate them.
+        """
+        snap = self.snapshot()
+        return snap.holdings, snap.sold, snap.dividends
 
     def get_all_holdings(self) -> List[Holding]:
         """Get all current holdings across every stock file."""
@@ -718,12 +1407,12 @@ class XlsxPortfolio:
 
     def get_holding_by_id(self, holding_id: str) -> Optional[Holding]:
         """Lookup a specific holding by its deterministic ID."""
-        # Try index first (populated by get_all_holdings/get_all_data)
-        if holding_id in self._holding_index:
-            return self._holding_index[holding_id]
-        # Fallback: full scan
-        self.get_all_holdings()
-        return self._holding_index.get(holding_id)
+        # Try the current snapshot first
+        holding = self._holding_index.get(holding_id)
+        if holding is not None:
+            return holding
+        # Fallback: refresh the snapshot
+        return self.snapshot().index.get(holding_id)
 
     def get_all_sold(self) -> List[SoldPosition]:
         """Get all sold positions (FIFO-derived) across every stock file."""
@@ -748,7 +1437,11 @@ class XlsxPortfolio:
 
         filepath = self._find_file_for_symbol(symbol)
         if filepath is None:
-            filepath = self._create_stock_file(symbol, exchange, name)
+            # Two first buys of a new stock must not both create its file
+            with self._file_lock(self.stocks_dir / f"{name}.xlsx"):
+                filepath = self._find_file_for_symbol(symbol)
+                if filepath is None:
+                    filepath = self._create_stock_file(symbol, exchange, name)
 
         tx = Transaction(
             date=holding.buy_date,
@@ -758,8 +1451,11 @@ class XlsxPortfolio:
             price=holding.buy_price,
             remarks=holding.notes or "~",
         )
-        self._insert_transaction(filepath, tx)
-        self._invalidate_symbol(symbol)
+        if self._journal is not None:
+            self._journal_write("insert", symbol, filepath, tx)
+        else:
+            with self._ledger_write(symbol, filepath, [tx]):
+                self._insert_transaction(filepath, tx)
 
         # Re-parse to get the proper deterministic ID
         holdings, _, _ = self._get_stock_data(symbol)
@@ -789,13 +1485,39 @@ class XlsxPortfolio:
           AA = (E * units) + Z
           Y  = Z / SUM(F:I)
           AB = units
+
+        With the write journal enabled only the Sell row is journaled (after
+        checking enough shares are held); the Realised data is written when
+        the journal is flushed.
         """
         symbol = symbol.upper()
         filepath = self._find_file_for_symbol(symbol)
         if filepath is None:
             raise FileNotFoundError(f"No xlsx file for symbol {symbol}")
 
-        with self._lock:
+        if self._journal is not None:
+            with self._file_lock(filepath):
+                holdings, _, _ = self._get_stock_data(symbol)
+                available = sum(h.quantity for h in holdings)
+                if quantity > available:
+                    raise ValueError(
+                        f"Cannot sell {quantity} shares of {symbol}: "
+                        f"only {available} unsold shares available"
+                    )
+                tx = Transaction(date=sell_date, exchange=exchange, action="Sell",
+                                 quantity=quantity, price=price)
+                self._journal_write("sell", symbol, filepath, tx)
+            return
+
+        tx = Transaction(date=sell_date, exchange=exchange, action="Sell",
+                         quantity=quantity, price=price)
+        with self._ledger_write(symbol, filepath, [tx]):
+            self._write_sell(symbol, filepath, exchange, quantity, price, sell_date)
+
+    def _write_sell(self, symbol: str, filepath: Path, exchange: str,
+                    quantity: int, price: float, sell_date: str):
+        """Insert the Sell row and write Realised data (see add_sell_transaction)."""
+        with self._file_lock(filepath):
             # Convert Realised formulas → values so insert_rows won't break them
             self._convert_realised_formulas(filepath)
 
@@ -977,9 +1699,8 @@ class XlsxPortfolio:
                     ws.cell(r, col_aa, value=gross)                # AA: Gross
                 ws.cell(r, col_ab, value=sell_qty)                 # AB: Units
 
-            wb.save(filepath)
+            _save_workbook(wb, filepath)
             _sync_to_drive(filepath)
-        self._invalidate_symbol(symbol)
 
     def add_dividend(self, symbol: str, exchange: str, amount: float,
                      dividend_date: str, remarks: str = ""):
@@ -989,22 +1710,37 @@ class XlsxPortfolio:
         if filepath is None:
             raise FileNotFoundError(f"No xlsx file for symbol {symbol}")
 
-        tx = Transaction(
-            date=dividend_date,
-            exchange="DIV",
-            action="Buy",         # action column, doesn't matter for DIV
-            quantity=1,            # placeholder
-            price=amount,          # dividend amount stored in price column
-            remarks=remarks or "DIVIDEND",
-        )
-        self._insert_transaction(filepath, tx)
-        self._invalidate_symbol(symbol)
+        tx = dividend_transaction(amount, dividend_date, remarks)
+        if self._journal is not None:
+            self._journal_write("insert", symbol, filepath, tx)
+            return
+        with self._ledger_write(symbol, filepath, [tx]):
+            self._insert_transaction(filepath, tx)
+
+    def insert_transactions(self, symbol: str, transactions: List[Transaction]) -> Path:
+        """Insert many Buy/Sell/DIV rows into a stock's xlsx at once.
+
+        Loads and saves the workbook once for the whole batch instead of
+        once per row (bulk imports).  Rows are laid out exactly as repeated
+        single inserts would leave them.  Raises FileNotFoundError if the
+        symbol has no file yet.
+        """
+        symbol = symbol.upper()
+        filepath = self._find_file_for_symbol(symbol)
+        if filepath is None:
+            raise FileNotFoundError(f"No xlsx file for symbol {symbol}")
+        if transactions:
+            self.flush_journal()
+            with self._ledger_write(symbol, filepath, transactions):
+                self._insert_transactions(filepath, transactions)
+        return filepath
 
     def remove_holding(self, holding_id: str) -> bool:
         """
         Remove a holding by deleting its Buy row from the xlsx.
         Use sparingly — selling is the normal workflow.
         """
+        self.flush_journal()
         holding = self.get_holding_by_id(holding_id)
         if not holding:
             return False
@@ -1014,27 +1750,29 @@ class XlsxPortfolio:
             return False
 
         try:
-            wb = openpyxl.load_workbook(filepath)
-            ws = wb["Trading History"]
-            # Find the row
-            header_row = self._find_header_row(ws)
-            for row_idx in range(header_row + 1, ws.max_row + 1):
-                tx_date = _parse_date(ws.cell(row_idx, 1).value)
-                action = ws.cell(row_idx, 3).value
-                price = _safe_float(ws.cell(row_idx, 5).value)
-                qty = _safe_int(ws.cell(row_idx, 4).value)
-                if (action == "Buy" and tx_date == holding.buy_date and
-                        qty == holding.quantity):
-                    ws.delete_rows(row_idx)
-                    wb.save(filepath)
-                    _sync_to_drive(filepath)
-                    # Find symbol for this file to invalidate cache
-                    for sym, fp in self._file_map.items():
-                        if fp == filepath:
-                            self._invalidate_symbol(sym)
-                            break
-                    return True
-            wb.close()
+            with self._file_lock(filepath):
+                wb = openpyxl.load_workbook(filepath)
+                ws = wb["Trading History"]
+                # Find the row
+                header_row = self._find_header_row(ws)
+                for row_idx in range(header_row + 1, ws.max_row + 1):
+                    tx_date = _parse_date(ws.cell(row_idx, 1).value)
+                    action = ws.cell(row_idx, 3).value
+                    price = _safe_float(ws.cell(row_idx, 5).value)
+                    qty = _safe_int(ws.cell(row_idx, 4).value)
+                    if (action == "Buy" and tx_date == holding.buy_date and
+                            qty == holding.quantity):
+                        ws.delete_rows(row_idx)
+                        _save_workbook(wb, filepath)
+                        _sync_to_drive(filepath)
+                        self._invalidate_file(filepath)
+                        # Find symbol for this file to invalidate cache
+                        for sym, fp in self._file_map.items():
+                            if fp == filepath:
+                                self._invalidate_symbol(sym)
+                                break
+                        return True
+                wb.close()
         except Exception as e:
             logger.error(f"[XlsxDB] Failed to remove holding: {e}")
         return False
@@ -1043,6 +1781,7 @@ class XlsxPortfolio:
         """Update a held lot's Buy row in the xlsx.
         Supports updating: buy_date, quantity, buy_price.
         Returns the updated Holding or None if not found."""
+        self.flush_journal()
         # Ensure indexes are populated
         if not self._holding_index:
             self.get_all_data()
@@ -1057,54 +1796,56 @@ class XlsxPortfolio:
             return None
 
         try:
-            wb = openpyxl.load_workbook(filepath)
-            ws = wb["Trading History"]
-            header_row = self._find_header_row(ws)
+            with self._file_lock(filepath):
+                wb = openpyxl.load_workbook(filepath)
+                ws = wb["Trading History"]
+                header_row = self._find_header_row(ws)
 
-            # Find the matching Buy row by regenerating the ID for each row
-            exchange = holding.exchange
-            for row_idx in range(header_row + 1, ws.max_row + 1):
-                action = str(ws.cell(row_idx, 3).value or "").strip()
-                if action != "Buy":
-                    continue
-                tx_date = _parse_date(ws.cell(row_idx, 1).value)
-                price = _safe_float(ws.cell(row_idx, 5).value)
-                cost = _safe_float(ws.cell(row_idx, 6).value)
-                qty = _safe_int(ws.cell(row_idx, 4).value)
-                buy_price = (cost / qty) if cost > 0 and qty > 0 else price
-                row_id = _gen_id(holding.symbol, exchange, tx_date, buy_price, row_idx)
-                if row_id == holding_id:
-                    # Found it — apply updates
-                    if "buy_date" in updates:
-                        try:
-                            dt = datetime.strptime(updates["buy_date"], "%Y-%m-%d")
-                            ws.cell(row_idx, 1, value=dt)
-                        except ValueError:
-                            pass
-                    if "quantity" in updates:
-                        new_qty = int(updates["quantity"])
-                        ws.cell(row_idx, 4, value=new_qty)
-                        # Recalculate cost (column F) if price unchanged
-                        new_price = float(updates.get("buy_price", price))
-                        ws.cell(row_idx, 6, value=round(new_price * new_qty, 2))
-                    if "buy_price" in updates:
-                        new_price = float(updates["buy_price"])
-                        ws.cell(row_idx, 5, value=new_price)
-                        new_qty = int(updates.get("quantity", qty))
-                        ws.cell(row_idx, 6, value=round(new_price * new_qty, 2))
-
-                    wb.save(filepath)
-                    _sync_to_drive(filepath)
-
-                    # Invalidate cache
-                    for sym, fp in self._file_map.items():
-                        if fp == filepath:
-                            self._invalidate_symbol(sym)
-                            break
-                    logger.info(f"[XlsxDB] Updated holding {holding_id} in {filepath.name}")
-                    return holding  # Return original holding as confirmation
+                # Find the matching Buy row by regenerating the ID for each row
+                exchange = holding.exchange
+                for row_idx in range(header_row + 1, ws.max_row + 1):
+                    action = str(ws.cell(row_idx, 3).value or "").strip()
+                    if action != "Buy":
+                        continue
+                    tx_date = _parse_date(ws.cell(row_idx, 1).value)
+                    price = _safe_float(ws.cell(row_idx, 5).value)
+                    cost = _safe_float(ws.cell(row_idx, 6).value)
+                    qty = _safe_int(ws.cell(row_idx, 4).value)
+                    buy_price = (cost / qty) if cost > 0 and qty > 0 else price
+                    row_id = _gen_id(holding.symbol, exchange, tx_date, buy_price, row_idx)
+                    if row_id == holding_id:
+                        # Found it — apply updates
+                        if "buy_date" in updates:
+                            try:
+                                dt = datetime.strptime(updates["buy_date"], "%Y-%m-%d")
+                                ws.cell(row_idx, 1, value=dt)
+                            except ValueError:
+                                pass
+                        if "quantity" in updates:
+                            new_qty = int(updates["quantity"])
+                            ws.cell(row_idx, 4, value=new_qty)
+                            # Recalculate cost (column F) if price unchanged
+                            new_price = float(updates.get("buy_price", price))
+                            ws.cell(row_idx, 6, value=round(new_price * new_qty, 2))
+                        if "buy_price" in updates:
+                            new_price = float(updates["buy_price"])
+                            ws.cell(row_idx, 5, value=new_price)
+                            new_qty = int(updates.get("quantity", qty))
+                            ws.cell(row_idx, 6, value=round(new_price * new_qty, 2))
+
+                        _save_workbook(wb, filepath)
+                        _sync_to_drive(filepath)
+
+                        # Invalidate cache
+                        self._invalidate_file(filepath)
+                        for sym, fp in self._file_map.items():
+                            if fp == filepath:
+                                self._invalidate_symbol(sym)
+                                break
+                        logger.info(f"[XlsxDB] Updated holding {holding_id} in {filepath.name}")
+                        return holding  # Return original holding as confirmation
 
-            wb.close()
+                wb.close()
         except Exception as e:
             logger.error(f"[XlsxDB] Failed to update holding {holding_id}: {e}")
         return None
@@ -1113,38 +1854,41 @@ class XlsxPortfolio:
         """Update a Sell row in a stock's xlsx.
         Supports updating: sell_date, sell_price, quantity.
         row_idx is the 1-based row number in the Trading History sheet."""
+        self.flush_journal()
         filepath = self._file_map.get(symbol)
         if not filepath:
             return False
 
         try:
-            wb = openpyxl.load_workbook(filepath)
-            ws = wb["Trading History"]
-
-            # Verify the row is actually a Sell row
-            action = str(ws.cell(row_idx, 3).value or "").strip()
-            if action != "Sell":
-                wb.close()
-                return False
+            with self._file_lock(filepath):
+                wb = openpyxl.load_workbook(filepath)
+                ws = wb["Trading History"]
 
-            if "sell_date" in updates:
-                try:
-                    dt = datetime.strptime(updates["sell_date"], "%Y-%m-%d")
-                    ws.cell(row_idx, 1, value=dt)
-                except ValueError:
-                    pass
-            if "quantity" in updates:
-                ws.cell(row_idx, 4, value=int(updates["quantity"]))
-            if "sell_price" in updates:
-                new_price = float(updates["sell_price"])
-                ws.cell(row_idx, 5, value=new_price)
-                new_qty = int(updates.get("quantity", _safe_int(ws.cell(row_idx, 4).value)))
-                ws.cell(row_idx, 6, value=round(new_price * new_qty, 2))
-
-            wb.save(filepath)
-            _sync_to_drive(filepath)
-            self._invalidate_symbol(symbol)
-            return True
+                # Verify the row is actually a Sell row
+                action = str(ws.cell(row_idx, 3).value or "").strip()
+                if action != "Sell":
+                    wb.close()
+                    return False
+
+                if "sell_date" in updates:
+                    try:
+                        dt = datetime.strptime(updates["sell_date"], "%Y-%m-%d")
+                        ws.cell(row_idx, 1, value=dt)
+                    except ValueError:
+                        pass
+                if "quantity" in updates:
+                    ws.cell(row_idx, 4, value=int(updates["quantity"]))
+                if "sell_price" in updates:
+                    new_price = float(updates["sell_price"])
+                    ws.cell(row_idx, 5, value=new_price)
+                    new_qty = int(updates.get("quantity", _safe_int(ws.cell(row_idx, 4).value)))
+                    ws.cell(row_idx, 6, value=round(new_price * new_qty, 2))
+
+                _save_workbook(wb, filepath)
+                _sync_to_drive(filepath)
+                self._invalidate_file(filepath)
+                self._invalidate_symbol(symbol)
+                return True
         except Exception as e:
             logger.error(f"[XlsxDB] Failed to update sold row {symbol}:{row_idx}: {e}")
             return False
@@ -1153,6 +1897,7 @@ class XlsxPortfolio:
         """Rename a stock symbol by updating the Code in the Index sheet.
         Does NOT rename the file — avoids Google Drive creating duplicate copies.
         The Code cell (C1) contains values like 'NSE:SYMBOL' or 'BOM:SYMBOL'."""
+        self.flush_journal()
         filepath = self._file_map.get(old_symbol)
         if not filepath or not filepath.exists():
             return False
@@ -1160,44 +1905,195 @@ class XlsxPortfolio:
         display_name = new_name or new_symbol
 
         try:
-            wb = openpyxl.load_workbook(filepath)
-            if "Index" in wb.sheetnames:
-                idx_ws = wb["Index"]
-                # Find the Code cell and update it
-                for row in idx_ws.iter_rows(min_row=1, max_row=15, values_only=False):
-                    vals = [c.value for c in row]
-                    if len(vals) >= 3 and vals[1] == "Code" and vals[2]:
-                        old_code = str(vals[2])
-                        if ":" in old_code:
-                            exchange_prefix = old_code.split(":")[0]
-                            # Map exchange prefix for new symbol
-                            new_exchange = "NSE"
-                            if exchange_prefix in ("BOM", "BSE"):
-                                new_exchange = "NSE"  # Default to NSE for renamed
-                            row[2].value = f"NSE:{new_symbol}"
-                        else:
-                            row[2].value = new_symbol
-                        logger.info(f"[XlsxDB] Updated Code: {old_code} -> NSE:{new_symbol}")
-                        break
-            wb.save(filepath)
-            wb.close()
+            with self._file_lock(filepath):
+                wb = openpyxl.load_workbook(filepath)
+                if "Index" in wb.sheetnames:
+                    idx_ws = wb["Index"]
+                    # Find the Code cell and update it
+                    for row in idx_ws.iter_rows(min_row=1, max_row=15, values_only=False):
+                        vals = [c.value for c in row]
+                        if len(vals) >= 3 and vals[1] == "Code" and vals[2]:
+                            old_code = str(vals[2])
+                            if ":" in old_code:
+                                exchange_prefix = old_code.split(":")[0]
+                                # Map exchange prefix for new symbol
+                                new_exchange = "NSE"
+                                if exchange_prefix in ("BOM", "BSE"):
+                                    new_exchange = "NSE"  # Default to NSE for renamed
+                                row[2].value = f"NSE:{new_symbol}"
+                            else:
+                                row[2].value = new_symbol
+                            logger.info(f"[XlsxDB] Updated Code: {old_code} -> NSE:{new_symbol}")
+                            break
+                _save_workbook(wb, filepath)
+                wb.close()
 
-            # Clean up any Drive conflict copies
-            _sync_to_drive(filepath)
+                # Clean up any Drive conflict copies
+                _sync_to_drive(filepath)
 
-            # Update internal caches — same file, new symbol mapping
-            self._invalidate_symbol(old_symbol)
-            if old_symbol in self._file_map:
-                del self._file_map[old_symbol]
-            self._file_map[new_symbol] = filepath
-            self._name_map[new_symbol] = display_name
+                # Update internal caches — same file, new symbol mapping
+                self._invalidate_file(filepath)
+                self._invalidate_symbol(old_symbol)
+                with self._map_lock:
+                    if old_symbol in self._file_map:
+                        del self._file_map[old_symbol]
+                    self._file_map[new_symbol] = filepath
+                    self._name_map[new_symbol] = display_name
 
-            logger.info(f"[XlsxDB] Renamed stock {old_symbol} -> {new_symbol} (file unchanged: {filepath.name})")
-            return True
+                logger.info(f"[XlsxDB] Renamed stock {old_symbol} -> {new_symbol} (file unchanged: {filepath.name})")
+                return True
         except Exception as e:
             logger.error(f"[XlsxDB] Failed to rename {old_symbol} -> {new_symbol}: {e}")
             return False
 
+    # ── Write Journal ─────────────────────────────────────
+
+    def _pending_entries(self, symbol: str) -> List[dict]:
+        """Unflushed journal entries for *symbol*, oldest first."""
+        if self._journal is None:
+            return []
+        return [e for e in self._journal.entries() if e["symbol"] == symbol]
+
+    def has_pending_writes(self) -> bool:
+        """True while journaled writes are waiting to be flushed."""
+        return self._journal is not None and len(self._journal) > 0
+
+    def journal_status(self) -> dict:
+        """Pending and dead-lettered journal entries (for diagnostics)."""
+        if self._journal is None:
+            return {"enabled": False, "pending": 0, "dead_letters": []}
+        return {
+            "enabled": True,
+            "pending": len(self._journal),
+            "dead_letters": self._journal.dead_letters(),
+        }
+
+    def _journal_write(self, op: str, symbol: str, filepath: Path, tx: Transaction):
+        """Durably journal one row and schedule the background flush.
+
+        op is "insert" (Buy/DIV row) or "sell" (Sell row + Realised data).
+        Reads see the row as soon as this returns: the new seq changes the
+        symbol's cache key and the row is overlaid on the parsed workbook.
+        """
+        with self._ledger_write(symbol, filepath, [tx], op="journal"):
+            self._journal.append({"op": op, "symbol": symbol, "file": str(filepath), "tx": tx.dict()})
+        self._schedule_flush()
+
+    def _schedule_flush(self, delay: Optional[float] = None):
+        with self._flush_timer_lock:
+            if self._flush_timer is not None:
+                return  # a flush is already due and will pick this entry up
+            timer = threading.Timer(_JOURNAL_FLUSH_DELAY if delay is None else delay,
+                                    self._background_flush)
+            timer.daemon = True
+            self._flush_timer = timer
+            timer.start()
+
+    def _background_flush(self):
+        with self._flush_timer_lock:
+            self._flush_timer = None
+        try:
+            self.flush_journal()
+        except Exception as e:
+            logger.error(f"[XlsxDB] Journal flush failed: {e}")
+        if len(self._journal):
+            self._schedule_flush(_JOURNAL_RETRY_DELAY)
+
+    def flush_journal(self) -> int:
+        """Apply all journaled writes to their workbooks now.
+
+        Entries are grouped per file and applied in journal order, runs of
+        consecutive inserts as one batch.  A file that fails keeps its
+        entries for the next attempt.  Returns the number of entries applied.
+        """
+        if self._journal is None:
+            return 0
+        by_file: Dict[str, List[dict]] = {}
+        for entry in self._journal.entries():
+            by_file.setdefault(entry["file"], []).append(entry)
+        applied = 0
+        for file, entries in by_file.items():
+            try:
+                applied += self._flush_file(Path(file), entries)
+            except Exception as e:
+                logger.error(f"[XlsxDB] Journal flush of {Path(file).name} failed, will retry: {e}")
+        return applied
+
+    def _flush_file(self, filepath: Path, entries: List[dict]) -> int:
+        with self._file_lock(filepath):
+            # Entries marked "flushing" were being written when the previous
+            # flush died; drop the ones whose rows already made it to disk
+            flushing = [e for e in entries if e.get("flushing")]
+            if flushing:
+                done = self._applied_prefix(filepath, flushing)
+                if done:
+                    logger.info(f"[XlsxDB] {done} journaled rows already in {filepath.name}")
+                    self._journal.discard(e["seq"] for e in flushing[:done])
+                    self._invalidate_file(filepath)
+                    for symbol in {e["symbol"] for e in flushing[:done]}:
+                        self._invalidate_symbol(symbol)
+                    entries = entries[done:]
+
+            applied = 0
+            self._journal.mark([e["seq"] for e in entries], flushing=True)
+            i = 0
+            while i < len(entries):
+                batch = [entries[i]]
+                symbol = batch[0]["symbol"]
+                if batch[0]["op"] == "sell":
+                    tx = _entry_transaction(batch[0])
+                    try:
+                        with self._ledger_write(symbol, filepath, [tx], op="flush"):
+                            self._write_sell(symbol, filepath, tx.exchange,
+                                             tx.quantity, tx.price, tx.date)
+                            self._journal.discard([batch[0]["seq"]])
+                        applied += 1
+                    except ValueError as e:
+                        # Can never succeed — the lots it was checked against
+                        # are gone.  It was acknowledged, so keep it visible
+                        logger.error(f"[XlsxDB] Dead-lettering journaled sell for {symbol}: {e}")
+                        self._journal.dead_letter([batch[0]["seq"]], str(e))
+                else:
+                    while (i + len(batch) < len(entries)
+                           and entries[i + len(batch)]["op"] == "insert"
+                           and entries[i + len(batch)]["symbol"] == symbol):
+                        batch.append(entries[i + len(batch)])
+                    txs = [_entry_transaction(e) for e in batch]
+                    with self._ledger_write(symbol, filepath, txs, op="flush"):
+                        self._insert_transactions(filepath, txs)
+                        self._journal.discard(e["seq"] for e in batch)
+                    applied += len(batch)
+                i += len(batch)
+        if applied:
+            logger.info(f"[XlsxDB] Flushed {applied} journaled rows to {filepath.name}")
+        return applied
+
+    def _applied_prefix(self, filepath: Path, entries: List[dict]) -> int:
+        """How many of *entries* (oldest first) are already at the top of the sheet.
+
+        Compares columns A–E of the rows under the header with the rows the
+        entries would have produced (newest on top).
+        """
+        def top_rows(wb):
+            if "Trading History" not in wb.sheetnames:
+                return []
+            rows = list(wb["Trading History"].iter_rows(max_row=10 + len(entries), values_only=True))
+            for i, row in enumerate(rows[:10]):
+                if row and "DATE" in row[:5] and "ACTION" in row[:5]:
+                    return [tuple(r[:5]) for r in rows[i + 1:i + 1 + len(entries)]]
+            return []
+
+        try:
+            rows = _read_values(filepath, top_rows)
+        except Exception as e:
+            logger.warning(f"[XlsxDB] Could not check {filepath.name} for journaled rows: {e}")
+            return 0
+        expected = [_transaction_values(_entry_transaction(e))[:5] for e in entries]
+        for n in range(len(entries), 0, -1):
+            if rows[:n] == expected[:n][::-1]:
+                return n
+        return 0
+
     # ── XLSX Write Helpers ────────────────────────────────
 
     def _convert_realised_formulas(self, filepath: Path):
@@ -1245,7 +2141,7 @@ class XlsxPortfolio:
                 cell.value = val
                 changed = True
         if changed:
-            wb.save(filepath)
+            _save_workbook(wb, filepath)
             _sync_to_drive(filepath)
         else:
             wb.close()
@@ -1269,16 +2165,14 @@ class XlsxPortfolio:
             cell.font = hdr_font
             cell.fill = hdr_fill
 
-    def get_existing_transaction_fingerprints(self, symbol: str):
-        """Return (fingerprints, remarks_set) for existing transactions in a stock's xlsx.
+    def _fingerprint_payloads(self, symbol: str) -> List[dict]:
+        """Parse payloads (journal overlaid) of every file for *symbol*.
 
-        fingerprints: dict of {(date_str, action, qty, price_rounded): count}
-        remarks_set: set of CN# remark strings
-        Used for duplicate detection before import.
+        Served from the parse cache, which our own writes keep current, so
+        duplicate checks normally open no workbook at all.
         """
-        symbol = symbol.upper()
         # Snapshot _all_files reference under lock to avoid reading during reindex
-        with self._lock:
+        with self._map_lock:
             all_files = self._all_files
             file_map = self._file_map
         files = all_files.get(symbol, [])
@@ -1286,63 +2180,36 @@ class XlsxPortfolio:
             fallback = file_map.get(symbol)
             if not fallback:
                 fallback = self._find_file_for_symbol(symbol)
-            if fallback:
-                files = [fallback]
-            else:
-                return {}, set()
-
-        fingerprints = {}  # count-based: {fingerprint_tuple: count}
-        remarks_set = set()
+            if not fallback:
+                return []
+            files = [fallback]
 
+        pending: Dict[str, List[Transaction]] = {}
+        for entry in self._pending_entries(symbol):
+            pending.setdefault(entry["file"], []).append(_entry_transaction(entry))
+        payloads = []
         for fp in files:
-            try:
-                wb = openpyxl.load_workbook(fp, data_only=True, read_only=True)
-                if "Trading History" not in wb.sheetnames:
-                    wb.close()
-                    continue
-                ws = wb["Trading History"]
-
-                # Find header row
-                header_row = 4
-                for r in range(1, 11):
-                    vals = [ws.cell(r, c).value for c in range(1, 5)]
-                    if "DATE" in vals and "ACTION" in vals:
-                        header_row = r
-                        break
-
-                for row in ws.iter_rows(min_row=header_row + 1, values_only=True):
-                    if not row or len(row) < 7:
-                        continue
-                    raw_date, exch, action, qty, price, cost, remarks = (
-                        row[0], row[1], row[2], row[3], row[4], row[5], row[6]
-                    )
-                    if not action or str(action).strip() not in ("Buy", "Sell"):
-                        continue
-
-                    # Parse date
-                    date_str = ""
-                    if isinstance(raw_date, datetime):
-                        date_str = raw_date.strftime("%Y-%m-%d")
-                    elif isinstance(raw_date, date):
-                        date_str = raw_date.strftime("%Y-%m-%d")
-                    elif raw_date:
-                        date_str = _parse_date(raw_date) or ""
-
-                    qty_int = int(qty) if qty else 0
-                    price_r = round(float(price), 2) if price else 0.0
-
-                    if date_str and qty_int > 0:
-                        fp_tuple = (date_str, str(action).strip(), qty_int, price_r)
-                        fingerprints[fp_tuple] = fingerprints.get(fp_tuple, 0) + 1
-
-                    # Also track CN# remarks for contract-note-level dedup
-                    if remarks and str(remarks).startswith("CN#"):
-                        remarks_set.add(str(remarks).strip())
+            parsed = self._read_workbook(fp)
+            if parsed is None:
+                continue
+            payloads.append(_overlay_pending(parsed, pending.get(str(fp), [])))
+        return payloads
 
-                wb.close()
-            except Exception as e:
-                logger.error(f"[XlsxDB] Error reading fingerprints from {fp.name}: {e}")
+    def get_existing_transaction_fingerprints(self, symbol: str):
+        """Return (fingerprints, remarks_set) for existing transactions in a stock's xlsx.
 
+        fingerprints: dict of {(date_str, action, qty, price_rounded): count}
+        remarks_set: set of CN# remark strings
+        Used for duplicate detection before import.
+        """
+        fingerprints = {}  # count-based: {fingerprint_tuple: count}
+        remarks_set = set()
+        for parsed in self._fingerprint_payloads(symbol.upper()):
+            keys = parsed["fingerprints"]
+            for fp in keys["tx"]:
+                fp_tuple = tuple(fp)
+                fingerprints[fp_tuple] = fingerprints.get(fp_tuple, 0) + 1
+            remarks_set.update(keys["cn"])
         return fingerprints, remarks_set
 
     def get_existing_dividend_fingerprints(self, symbol: str) -> set:
@@ -1350,59 +2217,9 @@ class XlsxPortfolio:
 
         Used for duplicate detection when bulk-importing dividends from bank statements.
         """
-        symbol = symbol.upper()
-        files = self._all_files.get(symbol, [])
-        if not files:
-            fallback = self._find_file_for_symbol(symbol)
-            if fallback:
-                files = [fallback]
-            else:
-                return set()
-
         fingerprints = set()
-
-        for fp in files:
-            try:
-                wb = openpyxl.load_workbook(fp, data_only=True, read_only=True)
-                if "Trading History" not in wb.sheetnames:
-                    wb.close()
-                    continue
-                ws = wb["Trading History"]
-
-                header_row = 4
-                for r in range(1, 11):
-                    vals = [ws.cell(r, c).value for c in range(1, 5)]
-                    if "DATE" in vals and "ACTION" in vals:
-                        header_row = r
-                        break
-
-                for row in ws.iter_rows(min_row=header_row + 1, values_only=True):
-                    if not row or len(row) < 6:
-                        continue
-                    raw_date, exch, _action, _qty, price, cost = (
-                        row[0], row[1], row[2], row[3], row[4], row[5]
-                    )
-                    if str(exch).strip() != "DIV":
-                        continue
-
-                    # Parse date
-                    date_str = ""
-                    if isinstance(raw_date, datetime):
-                        date_str = raw_date.strftime("%Y-%m-%d")
-                    elif isinstance(raw_date, date):
-                        date_str = raw_date.strftime("%Y-%m-%d")
-                    elif raw_date:
-                        date_str = _parse_date(raw_date) or ""
-
-                    # Amount: prefer column F (cost), fall back to E (price)
-                    amount = _safe_float(cost) or _safe_float(price) or 0
-                    if date_str and amount > 0:
-                        fingerprints.add((date_str, round(amount, 2)))
-
-                wb.close()
-            except Exception as e:
-                logger.error(f"[XlsxDB] Error reading dividend fingerprints from {fp.name}: {e}")
-
+        for parsed in self._fingerprint_payloads(symbol.upper()):
+            fingerprints.update(tuple(fp) for fp in parsed["fingerprints"]["div"])
         return fingerprints
 
     def _find_header_row(self, ws) -> int:
@@ -1415,7 +2232,17 @@ class XlsxPortfolio:
 
     def _insert_transaction(self, filepath: Path, tx: Transaction):
         """Insert a transaction row at the top of Trading History."""
-        with self._lock:
+        self._insert_transactions(filepath, [tx])
+
+    def _insert_transactions(self, filepath: Path, transactions: List[Transaction]):
+        """Insert several rows at the top of Trading History in one load/save.
+
+        The resulting layout is the same as calling _insert_transaction for
+        each one in order: the last transaction ends up on the top row.
+        """
+        if not transactions:
+            return
+        with self._file_lock(filepath):
             # Preserve cached formula values before row insertion
             self._convert_realised_formulas(filepath)
 
@@ -1424,41 +2251,26 @@ class XlsxPortfolio:
             header_row = self._find_header_row(ws)
             insert_at = header_row + 1  # row 5 by default
 
-            ws.insert_rows(insert_at)
+            ws.insert_rows(insert_at, amount=len(transactions))
 
-            # A: DATE
-            try:
-                dt = datetime.strptime(tx.date, "%Y-%m-%d")
-            except ValueError:
-                dt = datetime.now()
-            ws.cell(insert_at, 1, value=dt)
-
-            # B: EXCH
-            ws.cell(insert_at, 2, value=tx.exchange)
-            # C: ACTION
-            ws.cell(insert_at, 3, value=tx.action)
-            # D: QTY
-            ws.cell(insert_at, 4, value=tx.quantity)
-            # E: PRICE
-            ws.cell(insert_at, 5, value=tx.price)
-            # F: COST (use explicit cost if provided, else compute from price * qty)
-            cost_val = tx.cost if tx.cost > 0 else round(tx.price * tx.quantity, 2)
-            ws.cell(insert_at, 6, value=cost_val)
-            # G: REMARKS
-            ws.cell(insert_at, 7, value=tx.remarks or "~")
-            # H: STT
-            if tx.stt:
-                ws.cell(insert_at, 8, value=tx.stt)
-            # I: ADD CHRG
-            if tx.add_chrg:
-                ws.cell(insert_at, 9, value=tx.add_chrg)
-
-            # J: Current Price formula (only for Buy rows)
-            if tx.action == "Buy":
-                ws.cell(insert_at, 10, value="=Index!$C$2")
-
-            wb.save(filepath)
+            for row, tx in enumerate(reversed(transactions), start=insert_at):
+                # A: DATE  B: EXCH  C: ACTION  D: QTY  E: PRICE  F: COST  G: REMARKS
+                for col, value in enumerate(_transaction_values(tx), start=1):
+                    ws.cell(row, col, value=value)
+                # H: STT
+                if tx.stt:
+                    ws.cell(row, 8, value=tx.stt)
+                # I: ADD CHRG
+                if tx.add_chrg:
+                    ws.cell(row, 9, value=tx.add_chrg)
+
+                # J: Current Price formula (only for Buy rows)
+                if tx.action == "Buy":
+                    ws.cell(row, 10, value="=Index!$C$2")
+
+            _save_workbook(wb, filepath)
             _sync_to_drive(filepath)
+            self._parse_cache.discard(filepath)
 
     def _create_stock_file(self, symbol: str, exchange: str, company_name: str) -> Path:
         """Create a new xlsx file with proper template structure."""
@@ -1521,15 +2333,16 @@ class XlsxPortfolio:
         ws_idx.cell(11, 2, value="Invested")
         ws_idx.cell(11, 3, value=0)
 
-        wb.save(filepath)
+        _save_workbook(wb, filepath)
         _sync_to_drive(filepath)
 
         # Register in maps
-        self._file_map[symbol] = filepath
-        self._name_map[symbol] = company_name
-        if symbol not in self._all_files:
-            self._all_files[symbol] = []
-        self._all_files[symbol].append(filepath)
+        with self._map_lock:
+            self._file_map[symbol] = filepath
+            self._name_map[symbol] = company_name
+            if symbol not in self._all_files:
+                self._all_files[symbol] = []
+            self._all_files[symbol].append(filepath)
 
         logger.info(f"[XlsxDB] Created new stock file: {filename}")
         return filepath
@@ -1562,6 +2375,38 @@ class XlsxPortfolio:
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
 
+    # ── Lifecycle ─────────────────────────────────────────
+
+    def approx_size(self) -> int:
+        """Rough bytes held by the parsed caches (for the per-user DB cache)."""
+        return approx_sizeof((
+            self._cache, self._ledgers, self._snapshot, self._scan,
+            self._file_map, self._all_files, self._name_map,
+            self._parse_cache._entries, self._symbol_cache._entries,
+        ))
+
+    def close(self):
+        """Prepare to be dropped: apply journaled writes, save the parse
+        caches and stop listening for file changes.  Reads keep working
+        (stat-validated) for callers still holding this instance."""
+        with self._flush_timer_lock:
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush_journal()
+        if self._journal is not None and len(self._journal):
+            # No retry timer here: the next instance for this directory
+            # replays the journal on startup, and two flushers must not race
+            logger.warning(f"[XlsxDB] Closing with {len(self._journal)} unflushed journal "
+                           f"entries; they will be replayed by the next instance")
+        for cache in (self._parse_cache, self._symbol_cache):
+            cache.save()
+        if self._watcher is not None:
+            self._watcher.unsubscribe(self._on_fs_change)
+            self._watcher = None
+            self._fresh.clear()
+
+
 
 # ═══════════════════════════════════════════════════════════
 #  MODULE-LEVEL SINGLETON
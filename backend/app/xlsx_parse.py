@@ -0,0 +1,347 @@
+"""
+Value-only parsing of stock workbooks (Index + Trading History sheets)
+into the parse-cache payload.
+
+Split out of xlsx_database, which re-exports everything here, so that
+process-pool workers can import the parser without importing
+xlsx_database — whose module-level XlsxPortfolio would scan the dumps
+tree, start watchers and replay write journals in every child.
+Nothing in this module holds state.
+"""
+
+import logging
+from datetime import datetime, date
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import openpyxl
+
+from . import xlsx_reader
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_date(val) -> Optional[str]:
+    """Convert xlsx cell value to YYYY-MM-DD string (e.g. 2026-01-27)."""
+    _FMT = "%Y-%m-%d"
+    if isinstance(val, datetime):
+        return val.strftime(_FMT)
+    if isinstance(val, date):
+        return val.strftime(_FMT)
+    if isinstance(val, str):
+        for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y", "%d-%b-%Y", "%d-%B-%Y"):
+            try:
+                return datetime.strptime(val.strip(), fmt).strftime(_FMT)
+            except ValueError:
+                continue
+    return None
+
+
+def _safe_float(val, default=0.0) -> float:
+    if val is None:
+        return default
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+
+def _safe_int(val, default=0) -> int:
+    if val is None:
+        return default
+    try:
+        return int(float(val))
+    except (ValueError, TypeError):
+        return default
+
+
+def _parse_excel_serial_date(val) -> Optional[str]:
+    """Convert Excel serial date number to YYYY-MM-DD string."""
+    if isinstance(val, (int, float)) and val > 1000:
+        from datetime import timedelta
+        base = datetime(1899, 12, 30)
+        return (base + timedelta(days=int(val))).strftime("%Y-%m-%d")
+    return _parse_date(val)
+
+
+def _extract_index_data(wb) -> dict:
+    """Read metadata from the Index sheet."""
+    data = {"code": None, "exchange": "NSE", "symbol": None,
+            "current_price": 0, "week_52_high": 0, "week_52_low": 0}
+    if "Index" not in wb.sheetnames:
+        return data
+    ws = wb["Index"]
+    for vals in ws.iter_rows(min_row=1, max_row=15, values_only=True):
+        if len(vals) >= 3:
+            label = vals[1]
+            value = vals[2]
+            if label == "Code" and value:
+                code = str(value)
+                data["code"] = code
+                if ":" in code:
+                    parts = code.split(":")
+                    data["exchange"] = parts[0]
+                    data["symbol"] = parts[1]
+            elif label == "Current Price" and isinstance(value, (int, float)):
+                data["current_price"] = float(value)
+            elif label == "52 Week High" and isinstance(value, (int, float)):
+                data["week_52_high"] = float(value)
+            elif label == "52 Week Low" and isinstance(value, (int, float)):
+                data["week_52_low"] = float(value)
+    return data
+
+
+def _parse_history_row(row, row_num: int, held: list, sell_rows: list, dividends: list):
+    """Classify one Trading History row into held / sell_rows / dividends.
+
+    Rows that are not Buy, Sell or DIV (or are missing a date/action) are
+    ignored.  row_num is the 1-based sheet row, used for deterministic IDs.
+    """
+    if not row or len(row) < 5:
+        return
+
+    # Helper to safely get column value
+    def col(c):
+        return row[c] if c < len(row) else None
+
+    date_val = col(0)   # A: DATE
+    exch = col(1)       # B: EXCH
+    action = col(2)     # C: ACTION
+    qty = col(3)        # D: QTY
+    price = col(4)      # E: PRICE
+
+    if not action or not date_val:
+        return
+
+    action = str(action).strip()
+    exch = str(exch).strip() if exch else ""
+
+    # Collect dividends
+    if exch == "DIV":
+        tx_date = _parse_date(date_val)
+        cost_col_f = _safe_float(col(5))   # F = total amount
+        per_share = _safe_float(price)       # E = dividend per share
+        div_qty = _safe_float(qty) or 0      # D = number of units
+        amount = cost_col_f or per_share or div_qty
+        if amount and amount > 0:
+            remarks_val = str(col(6) or "").strip()
+            dividends.append({
+                "date": tx_date or "",
+                "amount": amount,
+                "units": int(div_qty) if div_qty > 0 else 0,
+                "remarks": remarks_val if remarks_val != "~" else "",
+            })
+        return
+
+    # Collect ALL Sell rows for FIFO matching
+    if action == "Sell":
+        tx_date = _parse_date(date_val)
+        if not tx_date:
+            return
+        qty_int = _safe_int(qty)
+        price_f = _safe_float(price)
+        if qty_int > 0 and price_f > 0:
+            exchange = exch if exch in ("NSE", "BSE") else "NSE"
+            sell_rows.append({
+                "date": tx_date,
+                "quantity": qty_int,
+                "price": price_f,
+                "exchange": exchange,
+                "row_idx": row_num,
+            })
+        return
+
+    # Only process Buy rows
+    if action != "Buy":
+        return
+
+    tx_date = _parse_date(date_val)
+    if not tx_date:
+        return
+
+    qty_int = _safe_int(qty)
+    price_e = _safe_float(price)                  # E: transaction price per share
+    cost_f = _safe_float(col(5))                  # F: COST (value at cost incl. charges)
+    if qty_int <= 0 or (price_e <= 0 and cost_f <= 0):
+        return
+
+    # buy_price = per-unit cost from column F; fallback to column E
+    if cost_f > 0 and qty_int > 0:
+        buy_price = cost_f / qty_int
+    else:
+        buy_price = price_e
+        cost_f = round(price_e * qty_int, 2)
+
+    exchange = exch if exch in ("NSE", "BSE") else "NSE"
+
+    # Every Buy row goes into held; FIFO matching (later) moves sold lots out
+    held.append({
+        "date": tx_date,
+        "exchange": exchange,
+        "quantity": qty_int,
+        "price": buy_price,
+        "raw_price": price_e,
+        "cost": cost_f,
+        "row_idx": row_num,
+    })
+
+
+def _fingerprint_date(raw_date) -> str:
+    if isinstance(raw_date, (datetime, date)):
+        return raw_date.strftime("%Y-%m-%d")
+    if raw_date:
+        return _parse_date(raw_date) or ""
+    return ""
+
+
+def _fingerprint_row(row, fingerprints: dict):
+    """Add one Trading History row's duplicate-detection keys to *fingerprints*.
+
+    fingerprints holds JSON-friendly lists (it lives in the parse-cache
+    payload): "tx" [date, action, qty, price_rounded] for Buy/Sell rows,
+    "cn" CN# remarks, "div" [date, amount_rounded] for DIV rows.
+    """
+    if not row or len(row) < 6:
+        return
+    raw_date, exch, action, qty, price, cost = row[:6]
+
+    if str(exch).strip() == "DIV":
+        # Amount: prefer column F (cost), fall back to E (price)
+        date_str = _fingerprint_date(raw_date)
+        amount = _safe_float(cost) or _safe_float(price) or 0
+        if date_str and amount > 0:
+            fingerprints["div"].append([date_str, round(amount, 2)])
+
+    if len(row) < 7 or not action or str(action).strip() not in ("Buy", "Sell"):
+        return
+    try:
+        qty_int = int(qty) if qty else 0
+        price_r = round(float(price), 2) if price else 0.0
+    except (TypeError, ValueError):
+        return
+    date_str = _fingerprint_date(raw_date)
+    if date_str and qty_int > 0:
+        fingerprints["tx"].append([date_str, str(action).strip(), qty_int, price_r])
+
+    # Also track CN# remarks for contract-note-level dedup
+    remarks = row[6]
+    if remarks and str(remarks).startswith("CN#"):
+        fingerprints["cn"].append(str(remarks).strip())
+
+
+def _empty_fingerprints() -> dict:
+    return {"tx": [], "cn": [], "div": []}
+
+
+def _read_trading_history(wb, fingerprints: Optional[dict] = None
+                          ) -> Tuple[Optional[int], list, list, list, list]:
+    """_parse_trading_history plus the 1-based header row (None if absent).
+
+    If *fingerprints* (see _empty_fingerprints) is given, every data row's
+    duplicate-detection keys are collected into it in the same pass.
+    """
+    held, sold, sell_rows, dividends = [], [], [], []
+    if "Trading History" not in wb.sheetnames:
+        return None, held, sold, sell_rows, dividends
+    ws = wb["Trading History"]
+
+    # Read all rows at once (fast with read_only=True)
+    all_rows = list(ws.iter_rows(values_only=True))
+    if len(all_rows) < 5:
+        return None, held, sold, sell_rows, dividends
+
+    # Find header row (search first 10 rows for DATE + ACTION)
+    header_idx = None
+    for i, row in enumerate(all_rows[:10]):
+        if row and len(row) >= 4 and "DATE" in row[:5] and "ACTION" in row[:5]:
+            header_idx = i
+            break
+    if header_idx is None:
+        if fingerprints is not None:
+            # Fingerprints assume the template's header on row 4
+            for row in all_rows[4:]:
+                _fingerprint_row(row, fingerprints)
+        return None, held, sold, sell_rows, dividends
+
+    for row_num, row in enumerate(all_rows[header_idx + 1:], start=header_idx + 2):
+        _parse_history_row(row, row_num, held, sell_rows, dividends)
+        if fingerprints is not None:
+            _fingerprint_row(row, fingerprints)
+
+    return header_idx + 1, held, sold, sell_rows, dividends
+
+
+def _parse_trading_history(wb) -> Tuple[list, list, list]:
+    """Parse Buy and Sell rows from Trading History sheet.
+
+    ALL Buy rows go into held[]; ALL Sell rows go into sell_rows[].
+    Held/sold determination is done purely via FIFO matching of Sell rows
+    against Buy rows (in _parse_and_match_symbol).
+
+    Uses iter_rows for compatibility with read_only=True mode (39x faster).
+
+    Returns (held_lots, column_sold_lots, sell_rows, dividends):
+      - held_lots: ALL Buy rows (non-DIV)
+      - column_sold_lots: always empty (FIFO handles sold determination)
+      - sell_rows: ALL Sell action rows
+      - dividends: List of {date, amount, remarks} for dividend rows
+    """
+    _, held, sold, sell_rows, dividends = _read_trading_history(wb)
+    return held, sold, sell_rows, dividends
+
+
+def _read_values(filepath: Path, reader):
+    """Run ``reader(wb)`` on a value-only view of *filepath*.
+
+    Uses the streaming reader (xlsx_reader) and falls back to openpyxl's
+    read-only mode if it can't handle the file.  Errors from the openpyxl
+    attempt propagate to the caller.
+    """
+    try:
+        with xlsx_reader.load_workbook(filepath) as wb:
+            return reader(wb)
+    except Exception as e:
+        logger.debug(f"[XlsxDB] Streaming reader failed on {filepath.name} ({e}), using openpyxl")
+    wb = openpyxl.load_workbook(filepath, data_only=True, read_only=True)
+    try:
+        return reader(wb)
+    finally:
+        wb.close()
+
+
+def _workbook_payload(wb) -> dict:
+    idx = _extract_index_data(wb)
+    fingerprints = _empty_fingerprints()
+    header_row, held, sold, sell_rows, dividends = _read_trading_history(wb, fingerprints)
+    return {
+        "index": idx,
+        "header_row": header_row,
+        "held": held,
+        "sold": sold,
+        "sell_rows": sell_rows,
+        "dividends": dividends,
+        "fingerprints": fingerprints,
+    }
+
+
+def _parse_workbook(filepath: Path) -> Optional[dict]:
+    """Open one stock xlsx and parse its Index + Trading History sheets.
+
+    Returns a JSON-serialisable dict (the parse-cache payload), or None if
+    the workbook can't be opened.
+    """
+    try:
+        return _read_values(filepath, _workbook_payload)
+    except Exception as e:
+        logger.error(f"[XlsxDB] Failed to open {filepath.name}: {e}")
+        return None
+
+
+def parse_files(files: List[Path]) -> List[Tuple[Path, dict]]:
+    """Process-pool worker: (filepath, payload) for every readable file."""
+    parsed_files = []
+    for fp in files:
+        parsed = _parse_workbook(fp)
+        if parsed is not None:
+            parsed_files.append((fp, parsed))
+    return parsed_files
@@ -0,0 +1,400 @@
+"""
+Streaming value-only .xlsx reader for the stock read path.
+
+openpyxl's read-only mode is still a general-purpose loader: it parses the
+whole stylesheet into style objects, builds a cell dict per value and a
+ReadOnlyCell per cell when values_only=False.  The portfolio read path only
+ever needs cell *values* from two small sheets (Index and Trading History),
+so this module does the minimum:
+
+  - open the zip once and map sheet names to their worksheet XML via
+    xl/workbook.xml + its relationships,
+  - load the shared-strings table once per workbook (lazily, on first use),
+  - index which cell styles are date/timedelta formats (styles.xml cellXfs),
+  - stream the sheet XML with iterparse straight into value tuples.
+
+Values match openpyxl.load_workbook(data_only=True, read_only=True): numbers
+are cast with the same int/float rule, date-formatted serials become
+datetimes (honouring the 1904 epoch), formula cells yield their cached <v>
+result (None if the file was never recalculated) and rows are padded to the
+sheet <dimension> exactly like ReadOnlyWorksheet._cells_by_row.
+
+The returned objects expose the small subset of the openpyxl workbook /
+worksheet API the parsers use (sheetnames, wb[name], ws.iter_rows(...,
+values_only=True), close()), so the same parsing functions run against
+either backend.
+"""
+
+import io
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from xml.etree.ElementTree import iterparse
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.utils.datetime import (
+    CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601,
+)
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_ROW = _NS_MAIN + "row"
+_CELL = _NS_MAIN + "c"
+_VALUE = _NS_MAIN + "v"
+_TEXT = _NS_MAIN + "t"
+_RUN = _NS_MAIN + "r"
+_SI = _NS_MAIN + "si"
+_INLINE = _NS_MAIN + "is"
+_DIMENSION = _NS_MAIN + "dimension"
+
+_REL_OFFICE_DOC = "/officeDocument"
+_REL_SHARED_STRINGS = "/sharedStrings"
+_REL_STYLES = "/styles"
+
+
+class XlsxReaderError(Exception):
+    """The file is not a workbook this reader understands."""
+
+
+# ═══════════════════════════════════════════════════════════
+#  HELPERS
+# ═══════════════════════════════════════════════════════════
+
+_COLUMN_CACHE: Dict[str, int] = {}
+
+
+def _column_index(ref: str) -> int:
+    """'AB12' → 28 (1-based column of a cell reference)."""
+    letters = ref.rstrip("0123456789")
+    col = _COLUMN_CACHE.get(letters)
+    if col is None:
+        col = 0
+        for ch in letters:
+            o = ord(ch)
+            if 65 <= o <= 90:
+                col = col * 26 + (o - 64)
+            elif 97 <= o <= 122:
+                col = col * 26 + (o - 96)
+            else:
+                break
+        _COLUMN_CACHE[letters] = col
+    return col
+
+
+def _dimension_bounds(ref: str) -> Tuple[Optional[int], Optional[int]]:
+    """'A1:N57' → (max_col, max_row), as openpyxl reads the <dimension> ref."""
+    try:
+        _, _, max_col, max_row = range_boundaries(ref)
+    except (TypeError, ValueError):
+        return None, None
+    return max_col, max_row
+
+
+def _cast_number(value: str):
+    """Same int/float rule as openpyxl's worksheet reader."""
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _text_content(elem) -> str:
+    """Plain text of an <si> / <is> element: direct <t> plus rich-text runs.
+
+    Phonetic runs (<rPh>) are skipped, as openpyxl does.
+    """
+    parts = []
+    t = elem.find(_TEXT)
+    if t is not None and t.text:
+        parts.append(t.text)
+    for run in elem.findall(_RUN):
+        rt = run.find(_TEXT)
+        if rt is not None and rt.text:
+            parts.append(rt.text)
+    return "".join(parts)
+
+
+def _resolve_target(base_dir: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+# ═══════════════════════════════════════════════════════════
+#  WORKBOOK / SHEET
+# ═══════════════════════════════════════════════════════════
+
+class StreamingWorkbook:
+    """Value-only view of an .xlsx file.  Use as a context manager or close()."""
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        try:
+            self._zip = zipfile.ZipFile(self.filepath)
+        except (OSError, zipfile.BadZipFile) as e:
+            raise XlsxReaderError(f"{self.filepath.name}: {e}") from e
+        try:
+            self._load_manifest()
+        except XlsxReaderError:
+            self._zip.close()
+            raise
+        except Exception as e:
+            self._zip.close()
+            raise XlsxReaderError(f"{self.filepath.name}: {e}") from e
+        self._shared_strings: Optional[List[str]] = None
+        self._date_styles: Optional[Set[int]] = None
+        self._timedelta_styles: Set[int] = set()
+
+    # ── Manifest ──────────────────────────────────────────
+
+    def _read_rels(self, rels_path: str) -> Dict[str, Tuple[str, str]]:
+        """{rId: (type, target)} from a .rels part (empty if missing)."""
+        try:
+            data = self._zip.read(rels_path)
+        except KeyError:
+            return {}
+        rels = {}
+        for _, el in iterparse(io.BytesIO(data)):
+            if el.tag == _NS_PKG_REL + "Relationship":
+                rels[el.get("Id")] = (el.get("Type", ""), el.get("Target", ""))
+        return rels
+
+    def _load_manifest(self):
+        workbook_path = "xl/workbook.xml"
+        for rel_type, target in self._read_rels("_rels/.rels").values():
+            if rel_type.endswith(_REL_OFFICE_DOC):
+                workbook_path = _resolve_target("", target)
+                break
+        base_dir = posixpath.dirname(workbook_path)
+        rels_path = posixpath.join(base_dir, "_rels", posixpath.basename(workbook_path) + ".rels")
+        rels = self._read_rels(rels_path)
+
+        self._shared_strings_path = None
+        self._styles_path = None
+        for rel_type, target in rels.values():
+            if rel_type.endswith(_REL_SHARED_STRINGS):
+                self._shared_strings_path = _resolve_target(base_dir, target)
+            elif rel_type.endswith(_REL_STYLES):
+                self._styles_path = _resolve_target(base_dir, target)
+
+        try:
+            data = self._zip.read(workbook_path)
+        except KeyError:
+            raise XlsxReaderError(f"{self.filepath.name}: no {workbook_path}")
+
+        self.epoch = CALENDAR_WINDOWS_1900
+        self._sheet_paths: Dict[str, str] = {}
+        for _, el in iterparse(io.BytesIO(data)):
+            if el.tag == _NS_MAIN + "workbookPr":
+                if el.get("date1904", "").lower() in ("1", "true"):
+                    self.epoch = CALENDAR_MAC_1904
+            elif el.tag == _NS_MAIN + "sheet":
+                rel = rels.get(el.get(_NS_DOC_REL + "id"))
+                if rel:
+                    self._sheet_paths[el.get("name")] = _resolve_target(base_dir, rel[1])
+
+    # ── Lazily loaded shared parts ────────────────────────
+
+    def shared_strings(self) -> List[str]:
+        if self._shared_strings is None:
+            strings: List[str] = []
+            if self._shared_strings_path:
+                try:
+                    src = self._zip.open(self._shared_strings_path)
+                except KeyError:
+                    src = None
+                if src is not None:
+                    with src:
+                        for _, el in iterparse(src):
+                            if el.tag == _SI:
+                                strings.append(_text_content(el))
+                                el.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def date_styles(self) -> Set[int]:
+        """Indices into cellXfs whose number format is a date (or timedelta)."""
+        if self._date_styles is None:
+            self._load_styles()
+        return self._date_styles
+
+    def timedelta_styles(self) -> Set[int]:
+        if self._date_styles is None:
+            self._load_styles()
+        return self._timedelta_styles
+
+    def _load_styles(self):
+        self._date_styles = set()
+        if not self._styles_path:
+            return
+        try:
+            data = self._zip.read(self._styles_path)
+        except KeyError:
+            return
+        custom: Dict[int, str] = {}
+        xf_fmt_ids: List[int] = []
+        in_cell_xfs = False
+        for event, el in iterparse(io.BytesIO(data), events=("start", "end")):
+            tag = el.tag
+            if tag == _NS_MAIN + "cellXfs":
+                in_cell_xfs = event == "start"
+            elif event != "end":
+                continue
+            elif tag == _NS_MAIN + "numFmt":
+                try:
+                    custom[int(el.get("numFmtId"))] = el.get("formatCode", "")
+                except (TypeError, ValueError):
+                    pass
+            elif tag == _NS_MAIN + "xf" and in_cell_xfs:
+                try:
+                    xf_fmt_ids.append(int(el.get("numFmtId", 0)))
+                except ValueError:
+                    xf_fmt_ids.append(0)
+        for idx, fmt_id in enumerate(xf_fmt_ids):
+            fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+            if is_date_format(fmt):
+                self._date_styles.add(idx)
+            if is_timedelta_format(fmt):
+                self._timedelta_styles.add(idx)
+
+    # ── openpyxl-compatible surface ───────────────────────
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheet_paths)
+
+    def __getitem__(self, name: str) -> "StreamingSheet":
+        path = self._sheet_paths.get(name)
+        if path is None:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return StreamingSheet(self, name, path)
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StreamingSheet:
+    """One worksheet; each iter_rows() call re-streams the sheet XML."""
+
+    def __init__(self, workbook: StreamingWorkbook, title: str, path: str):
+        self.parent = workbook
+        self.title = title
+        self._path = path
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None,
+                  values_only: bool = True) -> Iterator[tuple]:
+        """Yield row value tuples, padded like openpyxl's read-only sheets."""
+        if not values_only:
+            raise NotImplementedError("StreamingSheet only supports values_only=True")
+        return self._rows(min_row or 1, max_row)
+
+    def _rows(self, min_row: int, max_row: Optional[int]) -> Iterator[tuple]:
+        wb = self.parent
+        try:
+            src = wb._zip.open(self._path)
+        except KeyError:
+            raise XlsxReaderError(f"{wb.filepath.name}: missing {self._path}")
+
+        shared = None
+        date_styles = wb.date_styles()
+        timedelta_styles = wb.timedelta_styles()
+        epoch = wb.epoch
+
+        max_col = None
+        empty_row: tuple = ()
+        counter = min_row
+        idx = 0
+        row_counter = 0
+
+        with src:
+            for _, el in iterparse(src):
+                tag = el.tag
+                if tag == _DIMENSION:
+                    dim_col, dim_row = _dimension_bounds(el.get("ref", ""))
+                    if dim_col:
+                        max_col = dim_col
+                        empty_row = (None,) * max_col
+                    if max_row is None:
+                        max_row = dim_row
+                    continue
+                if tag != _ROW:
+                    continue
+
+                r = el.get("r")
+                idx = int(r) if r else row_counter + 1
+                row_counter = idx
+                if max_row is not None and idx > max_row:
+                    break
+
+                # Rows missing from the XML come back empty
+                while counter < idx:
+                    counter += 1
+                    yield empty_row
+                if counter > idx:
+                    el.clear()
+                    continue
+                counter += 1
+
+                cells = []
+                col_counter = 0
+                for c in el.iter(_CELL):
+                    ref = c.get("r")
+                    col = _column_index(ref) if ref else col_counter + 1
+                    col_counter = col
+                    dtype = c.get("t", "n")
+                    if dtype == "inlineStr":
+                        inline = c.find(_INLINE)
+                        value = _text_content(inline) if inline is not None else None
+                    else:
+                        value = c.findtext(_VALUE) or None
+                        if value is not None:
+                            if dtype == "n":
+                                value = _cast_number(value)
+                                style = c.get("s")
+                                if style and int(style) in date_styles:
+                                    try:
+                                        value = from_excel(
+                                            value, epoch,
+                                            timedelta=int(style) in timedelta_styles)
+                                    except (OverflowError, ValueError):
+                                        value = "#VALUE!"
+                            elif dtype == "s":
+                                if shared is None:
+                                    shared = wb.shared_strings()
+                                value = shared[int(value)]
+                            elif dtype == "b":
+                                value = bool(int(value))
+                            elif dtype == "d":
+                                value = from_ISO8601(value)
+                    cells.append((col, value))
+                el.clear()
+
+                width = max_col or (cells[-1][0] if cells else 0)
+                if not width:
+                    yield ()
+                    continue
+                row = [None] * width
+                for col, value in cells:
+                    if 1 <= col <= width:
+                        row[col - 1] = value
+                yield tuple(row)
+
+        # Rows skipped just before the max_row cut-off are still reported
+        if max_row is not None and max_row < idx:
+            while counter <= max_row:
+                counter += 1
+                yield empty_row
+
+
+def load_workbook(filepath) -> StreamingWorkbook:
+    """Open *filepath* for streaming value reads (raises XlsxReaderError)."""
+    return StreamingWorkbook(filepath)
@@ -22,6 +22,8 @@ from typing import Optional, Dict, List, Tuple
 import logging
 from dotenv import load_dotenv
 
+from . import http_client, provider_health
+
 logger = logging.getLogger(__name__)
 
 # ═══════════════════════════════════════════════════════════
@@ -82,7 +84,8 @@ def _try_auto_login_and_retry(path: str, params: dict = None) -> Optional[dict]:
     logger.info("[Zerodha] Attempting auto-login...")
     if auto_login():
         try:
-            retry_resp = requests.get(
+            retry_resp = provider_health.call(
+                "zerodha", http_client.get,
                 f"{_BASE_URL}{path}",
                 headers=_headers(),
                 params=params,
@@ -112,7 +115,8 @@ def _api_get(path: str, params: dict = None) -> Optional[dict]:
     max_retries = 2
     for attempt in range(max_retries):
         try:
-            resp = requests.get(
+            resp = provider_health.call(
+                "zerodha", http_client.get,
                 f"{_BASE_URL}{path}",
                 headers=_headers(),
                 params=params,
@@ -148,7 +152,10 @@ def _api_get(path: str, params: dict = None) -> Optional[dict]:
                 _last_error = f"API error {resp.status_code}: {resp.text[:100]}"
                 logger.error(f"[Zerodha] {_last_error}")
                 return None
-        except requests.exceptions.RequestException as e:
+        except provider_health.CircuitOpenError as e:
+            _last_error = str(e)
+            return None
+        except http_client.RequestError as e:
             if attempt < max_retries - 1:
                 time.sleep(0.5)
                 continue
@@ -168,11 +175,17 @@ def is_configured() -> bool:
     return bool(_api_key)
 
 
+def has_session() -> bool:
+    """True if an access token is set and hasn't been rejected.
+    Unlike is_session_valid(), never attempts auto-login."""
+    return bool(_api_key and _access_token and not _auth_failed)
+
+
 def is_session_valid() -> bool:
     """Check if we have a valid access token (and it hasn't been rejected).
     If session is invalid but auto-login credentials are available, attempts auto-login.
     """
-    if _api_key and _access_token and not _auth_failed:
+    if has_session():
         return True
     # Try auto-login if credentials are available
     if can_auto_login() and not _auto_login_in_progress:
@@ -201,7 +214,7 @@ def generate_session(request_token: str) -> bool:
     ).hexdigest()
 
     try:
-        resp = requests.post(
+        resp = http_client.post(
             f"{_BASE_URL}/session/token",
             data={
                 "api_key": _api_key,
@@ -235,6 +248,7 @@ def set_access_token(token: str):
     _access_token = token.strip()
     _auth_failed = False  # Reset — allow retrying with new token
     _conn_failed = False  # Reset connection failure too
+    provider_health.breaker("zerodha").reset()
     with _lock:
         _session_valid = bool(_access_token)
     if _access_token:
@@ -1081,7 +1095,8 @@ def _load_instruments():
     tokens: Dict[str, int] = {}
     for exchange in ("NSE", "BSE"):
         try:
-            resp = requests.get(
+            resp = provider_health.call(
+                "zerodha", http_client.get,
                 f"{_BASE_URL}/instruments/{exchange}",
                 headers=_headers(),
                 timeout=(5, 30),
@@ -1185,7 +1200,8 @@ def _load_mf_instruments():
             return
 
     try:
-        resp = requests.get(
+        resp = provider_health.call(
+            "zerodha", http_client.get,
             f"{_BASE_URL}/mf/instruments",
             headers=_headers(),
             timeout=(5, 30),
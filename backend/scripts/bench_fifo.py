@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark the array-backed FIFO engine against the dict-based loops.
+
+Generates synthetic ledgers (about 60% buys, 40% sells) at each size, runs
+fifo_match (whole shares) and fifo_match_mf (fractional units) both
+ways, checks the results are identical and prints per-engine timings.
+The loop rescans the lot list for every sell, so it gets slow fast.
+
+Usage:
+  python backend/scripts/bench_fifo.py
+  python backend/scripts/bench_fifo.py --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app import fifo_engine  # noqa: E402
+from app.mf_xlsx_database import fifo_match_mf  # noqa: E402
+from app.xlsx_database import fifo_match  # noqa: E402
+
+
+def synthetic_ledger(rows: int, fractional: bool, seed: int = 42):
+    """(buys, sells) shaped like the parsed Trading History rows."""
+    rng = random.Random(seed)
+    qty_key, price_key = ("units", "nav") if fractional else ("quantity", "price")
+    buys, sells = [], []
+    day = date(2010, 1, 1)
+    held = 0
+    for r in range(rows):
+        day += timedelta(days=rng.randint(0, 2))
+        qty = round(rng.uniform(0.5, 300), 3) if fractional else rng.randint(1, 200)
+        row = {"date": day.isoformat(), qty_key: qty,
+               price_key: round(rng.uniform(10, 5000), 2), "row_idx": r + 5}
+        # Sell at most what's held so most sells match (high churn)
+        if held > qty and rng.random() < 0.4:
+            sells.append(row)
+            held -= qty
+        else:
+            buys.append({**row, "exchange": "NSE"})
+            held += qty
+    return buys, sells
+
+
+def run(fn, buys, sells, vectorized: bool, repeat: int):
+    threshold = 0 if vectorized else float("inf")
+    best, result = None, None
+    with patch.object(fifo_engine, "VECTOR_MIN_ROWS", threshold):
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = fn(buys, sells)
+            elapsed = time.perf_counter() - t0
+            if best is None or elapsed < best:
+                best, result = elapsed, out
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                    help="ledger rows (buys + sells)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per engine, best is reported")
+    args = ap.parse_args()
+
+    mismatches = 0
+    print(f"{'matcher':<16}{'rows':>8}{'loop s':>10}{'array s':>10}{'speedup':>9}")
+    for name, fn, fractional in (("fifo_match", fifo_match, False),
+                                 ("fifo_match_mf", fifo_match_mf, True)):
+        for rows in args.sizes:
+            buys, sells = synthetic_ledger(rows, fractional)
+            t_loop, ref = run(fn, buys, sells, False, args.repeat)
+            t_vec, got = run(fn, buys, sells, True, args.repeat)
+            same = ref == got
+            mismatches += not same
+            print(f"{name:<16}{rows:>8}{t_loop:>10.3f}{t_vec:>10.3f}"
+                  f"{t_loop / t_vec:>8.1f}x{'' if same else '  MISMATCH'}")
+
+    if mismatches:
+        print(f"\n{mismatches} result mismatch(es)")
+        return 1
+    print("\nresults identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
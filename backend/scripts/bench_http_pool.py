@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark pooled keep-alive HTTP calls against a new connection per call.
+
+Starts a local stand-in server (HTTP/1.1 keep-alive, small CSV-ish body)
+and makes the same requests with the module-level requests.get the
+services used to call, and with app.http_client.get.  --connect-ms adds
+a delay to every new connection the server accepts, standing in for the
+DNS + TCP + TLS setup a real remote host costs.  Prints per-request
+latency and how many connections each client opened.
+
+Usage:
+  python backend/scripts/bench_http_pool.py
+  python backend/scripts/bench_http_pool.py --requests 500 --threads 8 --connect-ms 40
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app import http_client  # noqa: E402
+
+BODY = b"SYMBOL,NAME,PRICE\n" + b"".join(b"SYM%d,Company %d,%d.50\n" % (i, i, i) for i in range(200))
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # reused connection stalls ~40 ms on delayed ACKs
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StandIn.lock:
+            StandIn.connections += 1
+        if StandIn.connect_delay:
+            time.sleep(StandIn.connect_delay)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(get, url: str, count: int, threads: int):
+    """Per-request latencies (seconds) and connections the server accepted."""
+    before = StandIn.connections
+
+    def one(_):
+        t0 = time.perf_counter()
+        resp = get(url, timeout=10)
+        resp.raise_for_status()
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(count)))
+    return latencies, StandIn.connections - before
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--requests", type=int, default=200, help="requests per client")
+    ap.add_argument("--threads", type=int, default=4, help="concurrent callers")
+    ap.add_argument("--connect-ms", type=float, default=20.0,
+                    help="simulated setup cost per new connection")
+    args = ap.parse_args()
+
+    StandIn.connect_delay = args.connect_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/EQUITY_L.csv"
+
+    print(f"{args.requests} requests, {args.threads} threads, "
+          f"{args.connect_ms:g} ms per new connection ({http_client.backend_name()} backend)\n")
+    print(f"{'client':<16}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}{'conns':>7}")
+    means = {}
+    for name, get in (("requests.get", requests.get), ("http_client.get", http_client.get)):
+        t0 = time.perf_counter()
+        latencies, conns = run(get, url, args.requests, args.threads)
+        total = time.perf_counter() - t0
+        ms = sorted(lat * 1000 for lat in latencies)
+        means[name] = statistics.mean(ms)
+        print(f"{name:<16}{means[name]:>9.2f}{statistics.median(ms):>9.2f}"
+              f"{ms[int(0.95 * (len(ms) - 1))]:>9.2f}{total:>9.2f}{conns:>7}")
+
+    print(f"\npooled is {means['requests.get'] / means['http_client.get']:.1f}x faster per request")
+    server.shutdown()
+    http_client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Measure the memory held per lot by the stock and MF read paths.
+
+Builds synthetic parsed ledgers (same shapes as the parse cache payload)
+and reports, per input row, the bytes retained by:
+  ledger   — a FifoLedger as kept in XlsxPortfolio._ledgers: its lot
+             queue plus the SoldPosition models it shares with the cache
+  models   — the Holding objects result() adds on top
+and the peak bytes allocated while fifo_match_mf matches one fund on
+the dict loop (small ledgers, or ones the array engine declines).
+
+Usage:
+  python backend/scripts/bench_lot_memory.py
+  python backend/scripts/bench_lot_memory.py --rows 50000
+"""
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from unittest.mock import patch  # noqa: E402
+
+from app import fifo_engine  # noqa: E402
+from app.xlsx_database import FifoLedger  # noqa: E402
+from app.mf_xlsx_database import fifo_match_mf  # noqa: E402
+
+
+def synthetic_payload(rows: int, seed: int = 7) -> dict:
+    """A parse-cache payload with about 70% buys and 30% sells."""
+    rng = random.Random(seed)
+    held, sells = [], []
+    day = date(2010, 1, 1)
+    for r in range(rows):
+        day += timedelta(days=rng.randint(0, 2))
+        qty = rng.randint(1, 100)
+        price = round(rng.uniform(10, 5000), 2)
+        row = {"date": day.isoformat(), "quantity": qty, "price": price, "row_idx": rows + 5 - r}
+        if rng.random() < 0.3:
+            sells.append({**row, "exchange": "NSE"})
+        else:
+            held.append({**row, "exchange": "NSE", "raw_price": price, "cost": round(price * qty, 2)})
+    return {"index": {"exchange": "NSE"}, "header_row": 4, "held": held,
+            "sell_rows": sells, "sold": [], "dividends": []}
+
+
+def retained(build):
+    """(result, bytes still allocated after build() returns)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def peak(build):
+    """Peak bytes allocated while build() runs."""
+    gc.collect()
+    tracemalloc.start()
+    build()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--rows", type=int, default=20000, help="Trading History rows per ledger")
+    args = ap.parse_args()
+
+    payload = synthetic_payload(args.rows)
+    ledger, ledger_bytes = retained(lambda: FifoLedger("BENCH", [("Bench", payload)]))
+    (holdings, sold, _), model_bytes = retained(ledger.result)
+
+    rng = random.Random(3)
+    buys = [{"date": f"2020-01-{1 + i % 28:02d}", "units": round(rng.uniform(1, 50), 3),
+             "nav": round(rng.uniform(10, 500), 4), "row_idx": i + 5} for i in range(args.rows)]
+    sells = [{"date": "2021-01-01", "units": 1.5, "nav": 600.0, "row_idx": args.rows + 5 + i}
+             for i in range(args.rows // 3)]
+    with patch.object(fifo_engine, "VECTOR_MIN_ROWS", float("inf")):
+        mf_peak = peak(lambda: fifo_match_mf(buys, sells))
+
+    n = args.rows
+    print(f"rows: {n} ({len(payload['held'])} buys, {len(payload['sell_rows'])} sells) → "
+          f"{len(holdings)} open lots, {len(sold)} sold")
+    print(f"{'ledger':<22}{ledger_bytes / n:>10.0f} B/row")
+    print(f"{'holding models':<22}{model_bytes / n:>10.0f} B/row")
+    print(f"{'fifo_match_mf peak':<22}{mf_peak / n:>10.0f} B/row")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming xlsx reader against openpyxl read-only mode.
+
+Parses every stock workbook (Index + Trading History, i.e. the parse-cache
+payload) with both backends, checks the payloads are identical and prints
+per-backend timings.
+
+By default it runs over the real dump layout (dumps/{email}/{Name}/Stocks/
+and legacy dumps/{Name}/Stocks/).  If no dumps are present, or with
+--synthetic N, it generates N workbooks shaped like ours in a temp dir.
+
+Usage:
+  python backend/scripts/bench_xlsx_reader.py
+  python backend/scripts/bench_xlsx_reader.py path/to/Stocks --repeat 5
+  python backend/scripts/bench_xlsx_reader.py --synthetic 200 --rows 400
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import openpyxl  # noqa: E402
+
+from app import xlsx_reader  # noqa: E402
+from app.config import DUMPS_BASE  # noqa: E402
+from app.xlsx_parse import _workbook_payload  # noqa: E402
+
+
+def find_dump_files() -> list:
+    files = set(DUMPS_BASE.glob("*/*/Stocks/*.xlsx")) | set(DUMPS_BASE.glob("*/Stocks/*.xlsx"))
+    return sorted(f for f in files if not f.name.startswith(("~", ".")))
+
+
+def collect_files(paths) -> list:
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(p.glob("*.xlsx")))
+        elif p.suffix == ".xlsx":
+            files.append(p)
+    return files
+
+
+def write_synthetic(out_dir: Path, count: int, rows: int) -> list:
+    """Workbooks with the same sheet layout as dumps/.../Stocks/*.xlsx."""
+    rng = random.Random(42)
+    files = []
+    for n in range(count):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Trading History"
+        ws.cell(2, 10, value="UnRealised")
+        ws.cell(2, 23, value="Realised")
+        headers = ["DATE", "EXCH", "ACTION", "QTY", "PRICE", "COST", "REMARKS",
+                   "STT", "ADD CHRG", "Current Price", "Gain %", "Gain", "Gross", "Units"]
+        for col, h in enumerate(headers, 1):
+            ws.cell(4, col, value=h)
+        day = datetime(2015, 1, 1)
+        for r in range(5, 5 + rows):
+            day += timedelta(days=rng.randint(1, 5))
+            qty = rng.randint(1, 200)
+            price = round(rng.uniform(50, 5000), 2)
+            action = "Sell" if rng.random() < 0.3 else "Buy"
+            exch = "DIV" if rng.random() < 0.05 else rng.choice(("NSE", "BSE"))
+            ws.cell(r, 1, value=day)
+            ws.cell(r, 2, value=exch)
+            ws.cell(r, 3, value=action)
+            ws.cell(r, 4, value=qty)
+            ws.cell(r, 5, value=price)
+            ws.cell(r, 6, value=round(qty * price * 1.001, 2))
+            ws.cell(r, 7, value=f"CN#{rng.randint(10000, 99999)}")
+            ws.cell(r, 8, value=round(qty * price * 0.001, 2))
+            ws.cell(r, 9, value=round(rng.uniform(0, 20), 2))
+            ws.cell(r, 10, value="=Index!$C$2")
+            ws.cell(r, 11, value=f"=(J{r}-E{r})/E{r}")
+            ws.cell(r, 12, value=f"=(J{r}-E{r})*D{r}")
+        idx = wb.create_sheet("Index")
+        idx.cell(1, 2, value="Code")
+        idx.cell(1, 3, value=f"NSE:SYN{n}")
+        idx.cell(2, 2, value="Current Price")
+        idx.cell(2, 3, value=round(rng.uniform(50, 5000), 2))
+        idx.cell(3, 2, value="52 Week High")
+        idx.cell(3, 3, value=6000)
+        idx.cell(4, 2, value="52 Week Low")
+        idx.cell(4, 3, value=10)
+        fp = out_dir / f"Synthetic {n:04d}.xlsx"
+        wb.save(fp)
+        wb.close()
+        files.append(fp)
+    return files
+
+
+def parse_openpyxl(fp: Path) -> dict:
+    wb = openpyxl.load_workbook(fp, data_only=True, read_only=True)
+    try:
+        return _workbook_payload(wb)
+    finally:
+        wb.close()
+
+
+def parse_streaming(fp: Path) -> dict:
+    with xlsx_reader.load_workbook(fp) as wb:
+        return _workbook_payload(wb)
+
+
+def bench(fn, files, repeat: int):
+    best = None
+    results = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(fp) for fp in files]
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best:
+            best, results = elapsed, out
+    return best, results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("paths", nargs="*", help="Stocks dirs or .xlsx files (default: dumps/)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per backend, best is reported")
+    ap.add_argument("--synthetic", type=int, default=0, help="generate N synthetic workbooks")
+    ap.add_argument("--rows", type=int, default=200, help="Trading History rows per synthetic workbook")
+    args = ap.parse_args()
+
+    tmp = None
+    if args.synthetic:
+        files = []
+    elif args.paths:
+        files = collect_files(args.paths)
+    else:
+        files = find_dump_files()
+    if not files:
+        count = args.synthetic or 100
+        tmp = tempfile.TemporaryDirectory()
+        print(f"Generating {count} synthetic workbooks x {args.rows} rows ...")
+        files = write_synthetic(Path(tmp.name), count, args.rows)
+
+    try:
+        total_mb = sum(f.stat().st_size for f in files) / 1e6
+        print(f"{len(files)} workbooks, {total_mb:.1f} MB, best of {args.repeat}\n")
+
+        t_opx, ref = bench(parse_openpyxl, files, args.repeat)
+        t_str, got = bench(parse_streaming, files, args.repeat)
+
+        mismatches = [f.name for f, a, b in zip(files, ref, got) if a != b]
+        n = len(files)
+        print(f"{'backend':<12}{'total s':>10}{'ms/file':>10}")
+        print(f"{'openpyxl':<12}{t_opx:>10.3f}{t_opx / n * 1000:>10.2f}")
+        print(f"{'streaming':<12}{t_str:>10.3f}{t_str / n * 1000:>10.2f}")
+        print(f"\nspeedup: {t_opx / t_str:.1f}x")
+        if mismatches:
+            print(f"PAYLOAD MISMATCH in {len(mismatches)} file(s): {', '.join(mismatches[:10])}")
+            return 1
+        print("payloads identical")
+        return 0
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,18 @@ import pytest
 from fastapi.testclient import TestClient
 
 
+# ---------------------------------------------------------------------------
+# Circuit breakers are process-wide; don't let one test's simulated outages
+# make the next one fail fast
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def _reset_provider_health():
+    from app import provider_health
+    provider_health.reset_all()
+    yield
+
+
 # ---------------------------------------------------------------------------
 # Temporary data directory (replaces backend/data/)
 # ---------------------------------------------------------------------------
@@ -155,6 +167,7 @@ def app_client(tmp_data_dir, tmp_dumps_dir):
         patch("app.drive_service.sync_dumps_file", return_value=None),
         patch("app.drive_service.upload_file", return_value=None),
         patch("app.stock_service.fetch_live_data", return_value=None),
+        patch("app.stock_service._revalidate", return_value=None),
     ]
 
     for p in patches:
@@ -163,9 +176,35 @@ def app_client(tmp_data_dir, tmp_dumps_dir):
     # Import app *after* patches are in place
     from app.main import app as fastapi_app
 
+    # The default user's module-level DBs (and a few files resolved at
+    # import time) point into the real backend/dumps and backend/data
+    # trees — swap them for instances on the temp dirs so writes made by
+    # tests never land there
+    from app.mf_xlsx_database import MFXlsxPortfolio
+    from app.sip_manager import SIPManager
+    from app.xlsx_database import XlsxPortfolio
+    user_dir = tmp_dumps_dir / "test@example.com" / "TestUser"
+    stocks_db = XlsxPortfolio(user_dir / "Stocks")
+    mf_db = MFXlsxPortfolio(user_dir / "Mutual Funds")
+    db_patches = [
+        patch("app.main.db", stocks_db),
+        patch("app.stock_service.db", stocks_db),
+        patch("app.main.mf_db", mf_db),
+        patch("app.cdsl_cas_parser.mf_db", mf_db),
+        patch("app.main.sip_mgr", SIPManager(user_dir / "sip_config.json")),
+        patch("app.main._TICKER_FILE", str(tmp_data_dir / "market_ticker.json")),
+        patch("app.main._TICKER_HISTORY_FILE", str(tmp_data_dir / "market_ticker_history.json")),
+        patch("app.dividend_parser._OVERRIDES_FILE", tmp_data_dir / "dividend_symbol_overrides.json"),
+    ]
+    for p in db_patches:
+        p.start()
+
     client = TestClient(fastapi_app, raise_server_exceptions=False)
     yield client
 
+    for p in reversed(db_patches):
+        p.stop()
+    stocks_db.close()
     for p in patches:
         p.stop()
 
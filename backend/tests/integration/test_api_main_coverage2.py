@@ -415,6 +415,30 @@ def test_get_user_dbs_creates_instances():
         _current_email.reset(token)
 
 
+def test_user_db_cache_diagnostics(app_client):
+    """Per-user DB cache counters are exposed and lookups are counted."""
+    from app.main import _user_dbs
+    before = _user_dbs.stats()
+    resp = app_client.get("/api/diagnostics/user-dbs", headers=HEADERS)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert {"entries", "bytes", "max_bytes", "hits", "misses", "evictions", "users"} <= set(body)
+    assert body["hits"] + body["misses"] >= before["hits"] + before["misses"]
+
+
+def test_provider_health_diagnostics(app_client):
+    """A provider that keeps failing shows up as an open circuit."""
+    from app import provider_health
+    for _ in range(provider_health.FAILURE_THRESHOLD):
+        provider_health.breaker("mfapi").record_failure(0.5, "timeout")
+    resp = app_client.get("/api/diagnostics/providers", headers=HEADERS)
+    assert resp.status_code == 200
+    mfapi = {p["provider"]: p for p in resp.json()["providers"]}["mfapi"]
+    assert mfapi["state"] == "open"
+    assert mfapi["failures"] == provider_health.FAILURE_THRESHOLD
+    assert mfapi["last_error"] == "timeout"
+
+
 def test_udb_returns_non_default_user_db():
     """Cover udb() returning a user-specific DB (line 290)."""
     from app.main import udb, _current_user_id, _current_email
@@ -1014,7 +1038,7 @@ def test_import_dividends_confirmed_general_error(app_client):
     with patch("app.main.udb") as mock_udb:
         mock_db_inst = MagicMock()
         mock_db_inst.get_existing_dividend_fingerprints.return_value = set()
-        mock_db_inst.add_dividend.side_effect = RuntimeError("unexpected error")
+        mock_db_inst.insert_transactions.side_effect = RuntimeError("unexpected error")
         mock_db_inst.reindex.return_value = None
         mock_udb.return_value = mock_db_inst
         resp = app_client.post(
@@ -1443,6 +1467,99 @@ def test_import_contract_note_confirmed_cn_remark_dup(app_client):
         assert resp.json()["skipped_duplicates"] >= 1
 
 
+def _cn_tx(action, symbol, qty, wap):
+    return {
+        "action": action, "symbol": symbol, "exchange": "NSE", "name": symbol,
+        "quantity": qty, "wap": wap, "effective_price": wap,
+        "net_total_after_levies": qty * wap, "stt": 0, "add_charges": 0,
+        "trade_date": "2024-06-01",
+    }
+
+
+def test_import_contract_note_confirmed_batches_per_stock(app_client):
+    """Rows are queued and written with one insert_transactions call per stock."""
+    with patch("app.main.udb") as mock_udb:
+        mock_db_inst = MagicMock()
+        mock_db_inst.get_existing_transaction_fingerprints.return_value = ({}, set())
+        mock_db_inst._find_file_for_symbol.return_value = "/tmp/BATCH.xlsx"
+        mock_udb.return_value = mock_db_inst
+        resp = app_client.post(
+            "/api/portfolio/import-contract-note-confirmed",
+            json={
+                "trade_date": "2024-06-01",
+                "contract_no": "CNBATCH",
+                "transactions": [
+                    _cn_tx("Buy", "AAA", 10, 100.0),
+                    _cn_tx("Buy", "BBB", 5, 50.0),
+                    _cn_tx("Buy", "AAA", 3, 101.0),
+                    _cn_tx("Sell", "AAA", 2, 110.0),
+                ],
+            },
+            headers=HEADERS,
+        )
+    assert resp.status_code == 200
+    assert resp.json()["imported"]["buys"] == 3
+    mock_db_inst._insert_transaction.assert_not_called()
+    calls = {c.args[0]: c.args[1] for c in mock_db_inst.insert_transactions.call_args_list}
+    assert mock_db_inst.insert_transactions.call_count == 2
+    assert [(t.action, t.quantity) for t in calls["AAA"]] == [("Buy", 10), ("Buy", 3), ("Sell", 2)]
+    assert [t.quantity for t in calls["BBB"]] == [5]
+
+
+def test_import_contract_note_confirmed_failed_batch(app_client):
+    """A stock whose batch write fails is reported in errors, not as imported."""
+    def insert(symbol, txs):
+        if symbol == "BAD":
+            raise RuntimeError("disk full")
+
+    with patch("app.main.udb") as mock_udb:
+        mock_db_inst = MagicMock()
+        mock_db_inst.get_existing_transaction_fingerprints.return_value = ({}, set())
+        mock_db_inst._find_file_for_symbol.return_value = "/tmp/BATCH.xlsx"
+        mock_db_inst.insert_transactions.side_effect = insert
+        mock_udb.return_value = mock_db_inst
+        resp = app_client.post(
+            "/api/portfolio/import-contract-note-confirmed",
+            json={
+                "trade_date": "2024-06-01",
+                "contract_no": "CNFAIL",
+                "transactions": [
+                    _cn_tx("Buy", "GOOD", 10, 100.0),
+                    _cn_tx("Buy", "BAD", 5, 50.0),
+                    _cn_tx("Sell", "BAD", 1, 55.0),
+                ],
+            },
+            headers=HEADERS,
+        )
+    data = resp.json()
+    assert [b["symbol"] for b in data["imported"]["buy_details"]] == ["GOOD"]
+    assert data["imported"]["sells"] == 0
+    assert data["errors"] == ["Buy BAD: disk full", "Sell BAD: disk full"]
+
+
+def test_import_dividends_confirmed_batches_per_stock(app_client):
+    """Dividend rows for the same stock go through a single insert_transactions call."""
+    with patch("app.main.udb") as mock_udb:
+        mock_db_inst = MagicMock()
+        mock_db_inst.get_existing_dividend_fingerprints.return_value = set()
+        mock_udb.return_value = mock_db_inst
+        resp = app_client.post(
+            "/api/portfolio/import-dividends-confirmed",
+            json={
+                "dividends": [
+                    {"symbol": "DIVA", "date": "2024-06-15", "amount": 50.0},
+                    {"symbol": "DIVA", "date": "2024-09-15", "amount": 25.0},
+                ],
+            },
+            headers=HEADERS,
+        )
+    assert resp.json()["imported"] == 2
+    mock_db_inst.add_dividend.assert_not_called()
+    (sym, txs), _ = mock_db_inst.insert_transactions.call_args
+    assert sym == "DIVA"
+    assert [(t.exchange, t.price) for t in txs] == [("DIV", 50.0), ("DIV", 25.0)]
+
+
 # ══════════════════════════════════════════════════════════
 #  STOCK SUMMARY — complex branches (lines 1415, 1446-1533, 1597-1601)
 # ══════════════════════════════════════════════════════════
@@ -1639,7 +1756,7 @@ def test_price_refresh_auto_login(app_client):
         mock_zs.can_auto_login.return_value = True
         mock_zs.auto_login.return_value = True
         mock_ss.fetch_multiple.return_value = {}
-        mock_ss.clear_cache.return_value = None
+        mock_ss.expire_cache.return_value = None
         mock_ss._reset_circuit.return_value = None
         resp = app_client.post("/api/prices/refresh", headers=HEADERS)
         assert resp.status_code == 200
@@ -1656,7 +1773,7 @@ def test_price_refresh_no_symbols(app_client):
         mock_db_inst.get_all_data.return_value = ([], [], {})
         mock_db_inst._file_map = {}
         mock_udb.return_value = mock_db_inst
-        mock_ss.clear_cache.return_value = None
+        mock_ss.expire_cache.return_value = None
         mock_ss._reset_circuit.return_value = None
         resp = app_client.post("/api/prices/refresh", headers=HEADERS)
         assert resp.status_code == 200
@@ -1669,12 +1786,58 @@ def test_price_refresh_error(app_client):
          patch("app.main.stock_service") as mock_ss, \
          patch("app.main.zerodha_service") as mock_zs:
         mock_zs.is_configured.return_value = False
-        mock_ss.clear_cache.side_effect = RuntimeError("refresh fail")
+        mock_ss.expire_cache.side_effect = RuntimeError("refresh fail")
         resp = app_client.post("/api/prices/refresh", headers=HEADERS)
         assert resp.status_code == 200
         assert "error" in resp.json()["message"].lower()
 
 
+def test_price_refresh_failure_marks_job_error(app_client):
+    """A failed refresh is reported as status "error", not "done"."""
+    with patch("app.main.udb") as mock_udb, \
+         patch("app.main.stock_service") as mock_ss, \
+         patch("app.main.zerodha_service") as mock_zs:
+        mock_zs.is_configured.return_value = False
+        mock_udb.return_value.reindex.return_value = {}
+        mock_udb.return_value.get_all_data.return_value = ([], [], [])
+        mock_udb.return_value._file_map = {"FAIL": MagicMock()}
+        mock_ss.expire_cache.side_effect = RuntimeError("refresh fail")
+        resp = app_client.post("/api/prices/refresh?wait=false", headers=HEADERS)
+        job_id = resp.json()["job_id"]
+        from app.main import _refresh_jobs
+        assert _refresh_jobs.get(job_id).wait(5)
+        body = app_client.get(f"/api/prices/refresh/{job_id}", headers=HEADERS).json()
+    assert body["status"] == "error"
+    assert "refresh fail" in body["error"]
+    assert body["result"] is None
+
+
+def test_price_refresh_async_job_status(app_client):
+    """wait=false returns a job to poll; the job reports stages and result."""
+    with patch("app.main.udb") as mock_udb, \
+         patch("app.main.stock_service") as mock_ss, \
+         patch("app.main.zerodha_service") as mock_zs:
+        mock_zs.is_configured.return_value = False
+        mock_db_inst = MagicMock()
+        mock_db_inst.reindex.return_value = {}
+        mock_db_inst.get_all_data.return_value = ([], [], {})
+        mock_db_inst._file_map = {}
+        mock_udb.return_value = mock_db_inst
+        resp = app_client.post("/api/prices/refresh?wait=false", headers=HEADERS)
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+        from app.main import _refresh_jobs
+        assert _refresh_jobs.get(job_id).wait(5)
+        resp = app_client.get(f"/api/prices/refresh/{job_id}", headers=HEADERS)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["status"] == "done"
+        assert body["result"]["stocks"] == 0
+        assert "reindex" in body["timings"]
+    resp = app_client.get("/api/prices/refresh/prices-0", headers=HEADERS)
+    assert resp.status_code == 404
+
+
 # ══════════════════════════════════════════════════════════
 #  TICKER REFRESH (lines 1875-1876)
 # ══════════════════════════════════════════════════════════
@@ -1774,8 +1937,7 @@ def test_dashboard_summary_no_holdings(app_client):
     """Cover dashboard summary with no holdings (line 2026)."""
     with patch("app.main.udb") as mock_udb:
         mock_db_inst = MagicMock()
-        mock_db_inst.get_all_holdings.return_value = []
-        mock_db_inst.get_all_sold.return_value = []
+        mock_db_inst.get_all_data.return_value = ([], [], {})
         mock_udb.return_value = mock_db_inst
         resp = app_client.get("/api/dashboard/summary", headers=HEADERS)
         assert resp.status_code == 200
@@ -1793,6 +1955,28 @@ def test_dashboard_summary_per_holding_error(app_client):
         assert resp.status_code == 200
 
 
+
+def test_dashboard_summary_reads_each_stock_once(app_client):
+    """One request validates each symbol once, not once per accessor."""
+    from collections import Counter
+    from app.xlsx_database import XlsxPortfolio
+    _add_stock(app_client, symbol="DASHONE", qty=10, price=100)
+    _add_stock(app_client, symbol="DASHTWO", qty=5, price=200)
+    original = XlsxPortfolio._get_stock_data
+    calls = Counter()
+
+    def counting(self, symbol):
+        calls[symbol] += 1
+        return original(self, symbol)
+
+    with patch.object(XlsxPortfolio, "_get_stock_data", counting), \
+         patch("app.stock_service.get_cached_prices", return_value={}):
+        resp = app_client.get("/api/dashboard/summary", headers=HEADERS)
+    assert resp.status_code == 200
+    assert resp.json()["total_holdings"] >= 2
+    assert calls["DASHONE"] == 1 and calls["DASHTWO"] == 1
+    assert set(calls.values()) == {1}
+
 # ══════════════════════════════════════════════════════════
 #  TICKER FILE OPS + HISTORY + ENRICHMENT (lines 2120-2237)
 # ══════════════════════════════════════════════════════════
@@ -2862,3 +3046,96 @@ def test_delete_expiry_rule_success(app_client):
         mock_er.delete_rule.return_value = True
         resp = app_client.delete("/api/expiry-rules/rule123", headers=HEADERS)
         assert resp.status_code == 200
+
+
+# ══════════════════════════════════════════════════════════
+#  LIVE STREAM — shared refresh for all open streams
+# ══════════════════════════════════════════════════════════
+
+def test_live_refresh_fetches_union_once(app_client):
+    """Two portfolios with open streams → one fetch for the union of symbols."""
+    import app.main as m
+    from app.models import Holding
+    stocks_a, stocks_b, mf = MagicMock(), MagicMock(), MagicMock()
+    h = lambda sym: Holding(id=sym, symbol=sym, exchange="NSE", name=sym, quantity=1,
+                            buy_price=1.0, buy_date="2024-01-01")
+    stocks_a.get_all_data.return_value = ([h("AAA"), h("BBB")], [], {})
+    stocks_b.get_all_data.return_value = ([h("BBB"), h("CCC")], [], {})
+    stocks_a._file_map = stocks_b._file_map = {}
+    mf._file_map = {"INF1": None}
+    with patch.object(m, "_live_refresh_loop"), \
+         patch("app.stock_service.fetch_multiple") as fetch, \
+         patch("app.stock_service.expire_cache"), \
+         patch.object(m, "fetch_mf_live_navs") as navs, \
+         patch.object(m, "clear_mf_nav_cache"):
+        m._stream_attach(stocks_a, mf)
+        m._stream_attach(stocks_b, mf)
+        try:
+            m._live_refresh_once()
+        finally:
+            m._stream_detach(stocks_a)
+            m._stream_detach(stocks_b)
+    fetch.assert_called_once()
+    assert sorted(fetch.call_args.args[0]) == [("AAA", "NSE"), ("BBB", "NSE"), ("CCC", "NSE")]
+    navs.assert_called_once_with(["INF1"])
+    assert m._stream_dbs == {}
+
+
+def test_stream_leases_user_db_entry(app_client):
+    """An open stream keeps its user's cached DBs from being evicted."""
+    import app.main as m
+    stocks, mf = MagicMock(), MagicMock()
+    key = ("streamuser", "stream@example.com")
+    m._user_dbs.put(key, {"stocks": stocks, "mf": mf})
+    try:
+        with patch.object(m, "_live_refresh_loop"):
+            m._stream_attach(stocks, mf, key)
+            try:
+                assert m._user_dbs._entries[key].leases == 1
+            finally:
+                m._stream_detach(stocks, key)
+        assert m._user_dbs._entries[key].leases == 0
+    finally:
+        m._user_dbs.pop(key, None)
+
+
+# ══════════════════════════════════════════════════════════
+#  BOOTSTRAP — all tabs in one streamed response
+# ══════════════════════════════════════════════════════════
+
+def _bootstrap_lines(client):
+    resp = client.get("/api/bootstrap", headers=HEADERS)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in resp.text.splitlines() if line]
+
+
+def test_bootstrap_returns_every_section(app_client):
+    _add_stock(app_client, "RELIANCE", qty=5)
+    lines = _bootstrap_lines(app_client)
+    assert lines[-1]["done"] is True
+    sections = {line["section"]: line for line in lines[:-1]}
+    assert set(sections) == {"stocks", "global", "mutual_funds", "fd", "rd",
+                             "insurance", "ppf", "nps", "si"}
+    stocks = sections["stocks"]["data"]
+    assert "RELIANCE" in {h["holding"]["symbol"] for h in stocks["portfolio"]}
+    assert stocks["summary"] == app_client.get("/api/dashboard/summary", headers=HEADERS).json()
+    assert sections["fd"]["data"]["summary"] == app_client.get(
+        "/api/fixed-deposits/summary", headers=HEADERS).json()
+    assert all("errors" not in line for line in sections.values())
+
+
+def test_bootstrap_failing_part_does_not_hold_up_others(app_client):
+    with patch("app.main.fd_get_all", side_effect=RuntimeError("fd broken")):
+        lines = _bootstrap_lines(app_client)
+    sections = {line["section"]: line for line in lines[:-1]}
+    assert sections["fd"]["errors"] == {"summary": "fd broken"}
+    assert "dashboard" in sections["fd"]["data"]
+    assert "errors" not in sections["rd"]
+
+
+def test_bootstrap_resolves_user_once(app_client):
+    import app.main as m
+    with patch.object(m, "get_user_dumps_dir", wraps=m.get_user_dumps_dir) as dirs:
+        _bootstrap_lines(app_client)
+    assert dirs.call_count == 1
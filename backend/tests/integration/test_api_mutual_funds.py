@@ -250,3 +250,22 @@ def test_get_pending_sips_returns_200(app_client):
     """GET /api/mutual-funds/sip/pending returns 200."""
     response = app_client.get("/api/mutual-funds/sip/pending", headers=HEADERS)
     assert response.status_code == 200
+
+
+# ── Conditional GET (ETag) ───────────────────────────────────────────────────
+
+def test_mf_summary_etag_304_until_changed(app_client):
+    """MF summary answers 304 until a buy or a NAV change."""
+    from unittest.mock import patch
+    _buy_mf(app_client)
+    with patch("app.mf_xlsx_database.fetch_live_navs", return_value={}):
+        first = app_client.get("/api/mutual-funds/summary", headers=HEADERS)
+        etag = first.headers["etag"]
+        again = app_client.get("/api/mutual-funds/summary",
+                               headers={**HEADERS, "If-None-Match": etag})
+        assert again.status_code == 304
+
+        _buy_mf(app_client, units=5.0)
+        changed = app_client.get("/api/mutual-funds/summary",
+                                 headers={**HEADERS, "If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
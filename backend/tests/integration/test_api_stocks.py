@@ -226,3 +226,40 @@ def test_get_transactions_returns_list(app_client):
     """GET /api/transactions returns a list."""
     response = app_client.get("/api/transactions", headers=HEADERS)
     assert isinstance(response.json(), list)
+
+
+# ── Conditional GET (ETag) ───────────────────────────────────────────────────
+
+def test_stock_summary_etag_304_until_changed(app_client):
+    """A matching If-None-Match gets 304; a write or a price change re-tags."""
+    _add_stock(app_client, symbol="ETAGCO", qty=5, price=100.0)
+    first = app_client.get("/api/portfolio/stock-summary", headers=HEADERS)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('"')
+
+    again = app_client.get("/api/portfolio/stock-summary",
+                           headers={**HEADERS, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag and again.content == b""
+
+    _add_stock(app_client, symbol="ETAGCO", qty=1, price=110.0)
+    changed = app_client.get("/api/portfolio/stock-summary",
+                             headers={**HEADERS, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+    etag = changed.headers["etag"]
+    app_client.post("/api/prices/bulk-update",
+                    json={"prices": {"ETAGCO": {"exchange": "NSE", "price": 123.0}}},
+                    headers=HEADERS)
+    priced = app_client.get("/api/portfolio/stock-summary",
+                            headers={**HEADERS, "If-None-Match": etag})
+    assert priced.status_code == 200 and priced.headers["etag"] != etag
+
+
+def test_transactions_etag(app_client):
+    """Each heavy read endpoint tags its response."""
+    for path in ("/api/transactions", "/api/portfolio", "/api/dashboard/summary"):
+        first = app_client.get(path, headers=HEADERS)
+        assert first.status_code == 200
+        again = app_client.get(path, headers={**HEADERS, "If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
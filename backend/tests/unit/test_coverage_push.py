@@ -131,7 +131,7 @@ class TestStockServiceYahooTickerHistorical:
                 {"timestamp": timestamps, "indicators": {"quote": [{"close": closes}]}}
             ]}
         }
-        with patch.object(ss._requests, "get", return_value=mock_resp):
+        with patch.object(ss.http_client, "get", return_value=mock_resp):
             result = fetch_yahoo_ticker_historical({"key": "SGX", "yahoo": "%5ESTI"})
         assert "week_change_pct" in result
 
@@ -140,7 +140,7 @@ class TestStockServiceYahooTickerHistorical:
         import app.stock_service as ss
         mock_resp = MagicMock()
         mock_resp.status_code = 404
-        with patch.object(ss._requests, "get", return_value=mock_resp):
+        with patch.object(ss.http_client, "get", return_value=mock_resp):
             result = fetch_yahoo_ticker_historical({"key": "SGX", "yahoo": "%5ESTI"})
         assert result["week_change_pct"] == 0.0
 
@@ -174,7 +174,7 @@ class TestEpaperRSSParsing:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.content = self._build_rss_xml().encode()
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_bl_rss_articles("markets", "BL-Markets")
         assert isinstance(result, list)
         # Should have 1 article (the "Short" one is filtered out by len < 15)
@@ -185,7 +185,7 @@ class TestEpaperRSSParsing:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.content = self._build_rss_xml().encode()
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_th_rss_articles("markets", "TH-Markets")
         assert isinstance(result, list)
 
@@ -194,7 +194,7 @@ class TestEpaperRSSParsing:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.content = self._build_rss_xml().encode()
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_mc_rss_articles("https://mc.com/rss", "MC-Latest")
         assert isinstance(result, list)
 
@@ -215,7 +215,7 @@ class TestEpaperRSSParsing:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.content = xml.encode()
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_gn_rss_articles("test query", "GN-Test")
         assert isinstance(result, list)
 
@@ -223,13 +223,13 @@ class TestEpaperRSSParsing:
         import app.epaper_service as es
         mock_resp = MagicMock()
         mock_resp.status_code = 500
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_bl_rss_articles("markets", "BL-Markets")
         assert result == []
 
     def test_fetch_bl_rss_exception(self):
         import app.epaper_service as es
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             result = es._fetch_bl_rss_articles("markets", "BL-Markets")
         assert result == []
 
@@ -239,13 +239,13 @@ class TestEpaperRSSParsing:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.text = '<div class="artText"><p>This is a long enough article body text for the test.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_gn_article_body("https://news.google.com/article")
         assert "long enough article" in result
 
     def test_gn_article_body_exception(self):
         import app.epaper_service as es
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             result = es._fetch_gn_article_body("https://news.google.com/article")
         assert result == ""
 
@@ -254,13 +254,13 @@ class TestEpaperRSSParsing:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.text = '<div class="arti-flow"><p>Moneycontrol article body text that is really long enough.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_mc_article_body("https://mc.com/article")
         assert "Moneycontrol article" in result
 
     def test_mc_article_body_exception(self):
         import app.epaper_service as es
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             result = es._fetch_mc_article_body("https://mc.com/article")
         assert result == ""
 
@@ -342,7 +342,7 @@ class TestEpaperChat:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"content": [{"text": "AI response here"}]}
-        with patch("app.epaper_service.requests.post", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.post", return_value=mock_resp):
             result = es.chat("What happened today?", articles, ["RELIANCE"])
         assert result == "AI response here"
         es._ANTHROPIC_API_KEY = old_key
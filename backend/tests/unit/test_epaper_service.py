@@ -63,7 +63,7 @@ class TestFetchSectionArticles:
         <h3><a href="/markets/stock-markets/article87654321.ece">Nifty closes above 22000 mark today</a></h3>
         </body></html>
         """
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             with patch("app.epaper_service.time.sleep"):
                 articles = _fetch_section_articles("markets", "Markets", max_pages=1)
                 assert len(articles) == 2
@@ -72,14 +72,14 @@ class TestFetchSectionArticles:
 
     def test_non_200_response_stops(self):
         from app.epaper_service import _fetch_section_articles
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(404)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(404)):
             with patch("app.epaper_service.time.sleep"):
                 articles = _fetch_section_articles("markets", "Markets", max_pages=2)
                 assert articles == []
 
     def test_network_error(self):
         from app.epaper_service import _fetch_section_articles
-        with patch("app.epaper_service.requests.get", side_effect=Exception("Network error")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("Network error")):
             with patch("app.epaper_service.time.sleep"):
                 articles = _fetch_section_articles("markets", "Markets", max_pages=1)
                 assert articles == []
@@ -87,7 +87,7 @@ class TestFetchSectionArticles:
     def test_skip_short_titles(self):
         from app.epaper_service import _fetch_section_articles
         html = '<html><body><h2><a href="/article123">Short</a></h2></body></html>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             with patch("app.epaper_service.time.sleep"):
                 articles = _fetch_section_articles("markets", "Markets", max_pages=1)
                 assert articles == []
@@ -95,7 +95,7 @@ class TestFetchSectionArticles:
     def test_skip_non_article_links(self):
         from app.epaper_service import _fetch_section_articles
         html = '<html><body><h2><a href="/markets/overview-page">This is a very long title for a non-article page</a></h2></body></html>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             with patch("app.epaper_service.time.sleep"):
                 articles = _fetch_section_articles("markets", "Markets", max_pages=1)
                 assert articles == []
@@ -103,7 +103,7 @@ class TestFetchSectionArticles:
     def test_deduplication_across_pages(self):
         from app.epaper_service import _fetch_section_articles
         html = '<html><body><h2><a href="/article12345678.ece">Sensex rallies 500 points on buying</a></h2></body></html>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             with patch("app.epaper_service.time.sleep"):
                 articles = _fetch_section_articles("markets", "Markets", max_pages=3)
                 # After first page, same URL should be deduplicated
@@ -118,20 +118,20 @@ class TestFetchBLRssArticles:
             {"title": "Sensex rallies 500 points on FII buying today", "link": "https://bl.com/article123",
              "description": "<p>Market is up</p>", "pubDate": today},
         ])
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss)):
             articles = _fetch_bl_rss_articles("markets", "Markets", lookback_days=7)
             assert len(articles) == 1
             assert articles[0]["source"] == "Business Line"
 
     def test_rss_non_200(self):
         from app.epaper_service import _fetch_bl_rss_articles
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(500)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(500)):
             articles = _fetch_bl_rss_articles("markets", "Markets")
             assert articles == []
 
     def test_rss_error(self):
         from app.epaper_service import _fetch_bl_rss_articles
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             articles = _fetch_bl_rss_articles("markets", "Markets")
             assert articles == []
 
@@ -142,7 +142,7 @@ class TestFetchBLRssArticles:
             {"title": "Sensex rallies 500 points old article here", "link": "https://bl.com/article456",
              "pubDate": old_date},
         ])
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss)):
             articles = _fetch_bl_rss_articles("markets", "Markets", lookback_days=7)
             assert articles == []
 
@@ -151,7 +151,7 @@ class TestFetchBLRssArticles:
         rss = _make_rss_xml([
             {"title": "Sensex rallies 500 points on FII buying today", "link": "https://bl.com/overview-page"},
         ])
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss)):
             articles = _fetch_bl_rss_articles("markets", "Markets")
             assert articles == []
 
@@ -160,26 +160,26 @@ class TestFetchArticleBody:
     def test_fetch_body_success(self):
         from app.epaper_service import _fetch_article_body
         html = '<div class="contentbody"><p>This is a substantial paragraph with lots of content here.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_article_body("https://bl.com/article123")
             assert "substantial" in body
 
     def test_fetch_body_non_200(self):
         from app.epaper_service import _fetch_article_body
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(404)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(404)):
             body = _fetch_article_body("https://bl.com/article123")
             assert body == ""
 
     def test_fetch_body_error(self):
         from app.epaper_service import _fetch_article_body
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             body = _fetch_article_body("https://bl.com/article123")
             assert body == ""
 
     def test_fetch_body_fallback_selectors(self):
         from app.epaper_service import _fetch_article_body
         html = '<div class="paywall"><p>Paywalled content with substantial length here.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_article_body("https://bl.com/article123")
             assert "Paywalled" in body
 
@@ -192,20 +192,20 @@ class TestFetchTHRssArticles:
             {"title": "RBI keeps repo rate unchanged for a long time", "link": "https://thehindu.com/article123",
              "description": "<p>Policy details</p>", "pubDate": today},
         ])
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss)):
             articles = _fetch_th_rss_articles("business/markets", "TH-Markets")
             assert len(articles) == 1
             assert articles[0]["source"] == "The Hindu"
 
     def test_th_rss_non_200(self):
         from app.epaper_service import _fetch_th_rss_articles
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(403)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(403)):
             articles = _fetch_th_rss_articles("business", "TH-Business")
             assert articles == []
 
     def test_th_rss_error(self):
         from app.epaper_service import _fetch_th_rss_articles
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             articles = _fetch_th_rss_articles("business", "TH-Business")
             assert articles == []
 
@@ -214,26 +214,26 @@ class TestFetchTHArticleBody:
     def test_success(self):
         from app.epaper_service import _fetch_th_article_body
         html = '<div class="articlebodycontent"><p>Article body content with detailed info here for the reader.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_th_article_body("https://thehindu.com/article123")
             assert "detailed" in body
 
     def test_non_200(self):
         from app.epaper_service import _fetch_th_article_body
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(500)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(500)):
             body = _fetch_th_article_body("https://thehindu.com/article123")
             assert body == ""
 
     def test_fallback_content_body_id(self):
         from app.epaper_service import _fetch_th_article_body
         html = '<div id="content-body-14123"><p>Article body from content-body selector with enough text.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_th_article_body("https://thehindu.com/article123")
             assert "content-body" in body
 
     def test_error(self):
         from app.epaper_service import _fetch_th_article_body
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             body = _fetch_th_article_body("https://thehindu.com/article123")
             assert body == ""
 
@@ -248,7 +248,7 @@ class TestFetchGNRssArticles:
              "pubDate": today, "source": "Economic Times",
              "description": "<p>Market update from ET</p>"},
         ])
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss)):
             articles = _fetch_gn_rss_articles("stock+market", "GN-Markets")
             assert len(articles) >= 1
 
@@ -261,19 +261,19 @@ class TestFetchGNRssArticles:
             <source>The Hindu Business Line</source>
             <pubDate>{}</pubDate>
         </item></channel></rss>""".format(today)
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss_xml)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss_xml)):
             articles = _fetch_gn_rss_articles("stock+market", "GN-Markets")
             assert articles == []
 
     def test_non_200(self):
         from app.epaper_service import _fetch_gn_rss_articles
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(500)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(500)):
             articles = _fetch_gn_rss_articles("query", "GN-Test")
             assert articles == []
 
     def test_error(self):
         from app.epaper_service import _fetch_gn_rss_articles
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             articles = _fetch_gn_rss_articles("query", "GN-Test")
             assert articles == []
 
@@ -282,26 +282,26 @@ class TestFetchGNArticleBody:
     def test_success(self):
         from app.epaper_service import _fetch_gn_article_body
         html = '<div itemprop="articleBody"><p>Article content with substantial text for parsing here.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_gn_article_body("https://example.com/article")
             assert "substantial" in body
 
     def test_non_200(self):
         from app.epaper_service import _fetch_gn_article_body
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(404)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(404)):
             body = _fetch_gn_article_body("https://example.com/article")
             assert body == ""
 
     def test_fallback_selectors(self):
         from app.epaper_service import _fetch_gn_article_body
         html = '<div class="story-content"><p>Story content with substantial text enough for extraction.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_gn_article_body("https://example.com/article")
             assert "Story" in body
 
     def test_error(self):
         from app.epaper_service import _fetch_gn_article_body
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             body = _fetch_gn_article_body("https://example.com/article")
             assert body == ""
 
@@ -315,20 +315,20 @@ class TestFetchMCRssArticles:
              "link": "https://moneycontrol.com/article123",
              "pubDate": today, "description": "<p>Markets update</p>"},
         ])
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, rss)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, rss)):
             articles = _fetch_mc_rss_articles("https://mc.com/rss/test.xml", "MC-Test")
             assert len(articles) == 1
             assert articles[0]["source"] == "Moneycontrol"
 
     def test_non_200(self):
         from app.epaper_service import _fetch_mc_rss_articles
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(500)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(500)):
             articles = _fetch_mc_rss_articles("https://mc.com/rss/test.xml", "MC-Test")
             assert articles == []
 
     def test_error(self):
         from app.epaper_service import _fetch_mc_rss_articles
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             articles = _fetch_mc_rss_articles("https://mc.com/rss/test.xml", "MC-Test")
             assert articles == []
 
@@ -337,19 +337,19 @@ class TestFetchMCArticleBody:
     def test_success(self):
         from app.epaper_service import _fetch_mc_article_body
         html = '<div class="content_wrapper"><p>Moneycontrol article content with detailed analysis here.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(200, html)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(200, html)):
             body = _fetch_mc_article_body("https://mc.com/article123")
             assert "Moneycontrol" in body
 
     def test_non_200(self):
         from app.epaper_service import _fetch_mc_article_body
-        with patch("app.epaper_service.requests.get", return_value=_mock_response(404)):
+        with patch("app.epaper_service.http_client.get", return_value=_mock_response(404)):
             body = _fetch_mc_article_body("https://mc.com/article123")
             assert body == ""
 
     def test_error(self):
         from app.epaper_service import _fetch_mc_article_body
-        with patch("app.epaper_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.get", side_effect=Exception("fail")):
             body = _fetch_mc_article_body("https://mc.com/article123")
             assert body == ""
 
@@ -403,7 +403,7 @@ class TestCallClaude:
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"content": [{"text": "AI response here"}]}
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", return_value=mock_resp):
+            with patch("app.epaper_service.http_client.post", return_value=mock_resp):
                 result = _call_claude("system", "user")
                 assert result == "AI response here"
 
@@ -413,14 +413,14 @@ class TestCallClaude:
         mock_resp.status_code = 500
         mock_resp.text = "Server error"
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", return_value=mock_resp):
+            with patch("app.epaper_service.http_client.post", return_value=mock_resp):
                 result = _call_claude("system", "user")
                 assert result == ""
 
     def test_exception(self):
         from app.epaper_service import _call_claude
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", side_effect=Exception("timeout")):
+            with patch("app.epaper_service.http_client.post", side_effect=Exception("timeout")):
                 result = _call_claude("system", "user")
                 assert result == ""
 
@@ -524,7 +524,7 @@ class TestChat:
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"content": [{"text": "Market analysis response"}]}
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", return_value=mock_resp):
+            with patch("app.epaper_service.http_client.post", return_value=mock_resp):
                 result = chat("What's happening?", [], ["RELIANCE"])
                 assert "Market analysis" in result
 
@@ -538,7 +538,7 @@ class TestChat:
             {"role": "assistant", "content": "Previous answer"},
         ]
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", return_value=mock_resp):
+            with patch("app.epaper_service.http_client.post", return_value=mock_resp):
                 result = chat("Follow-up", [], [], history)
                 assert result == "Follow-up response"
 
@@ -548,14 +548,14 @@ class TestChat:
         mock_resp.status_code = 500
         mock_resp.text = "Internal error"
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", return_value=mock_resp):
+            with patch("app.epaper_service.http_client.post", return_value=mock_resp):
                 result = chat("hello", [], [])
                 assert "API error" in result
 
     def test_chat_exception(self):
         from app.epaper_service import chat
         with patch("app.epaper_service._ANTHROPIC_API_KEY", "test-key"):
-            with patch("app.epaper_service.requests.post", side_effect=Exception("timeout")):
+            with patch("app.epaper_service.http_client.post", side_effect=Exception("timeout")):
                 result = chat("hello", [], [])
                 assert "Error" in result
 
@@ -0,0 +1,111 @@
+"""Unit tests for app.fetch_scheduler — rate-limited, hedged provider chains."""
+
+import threading
+import time
+
+from app.fetch_scheduler import Provider, TokenBucket, fetch_chain
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+        clock.now = 1.5
+        # 3 tokens refilled, 2 were owed
+        assert bucket.reserve() == 0.0
+
+    def test_unlimited(self):
+        slept = []
+        bucket = TokenBucket(rate=0, sleep=slept.append)
+        for _ in range(10):
+            bucket.acquire()
+        assert slept == []
+
+
+class TestFetchChain:
+    def test_misses_fall_through_in_order(self):
+        calls = []
+
+        def first(batch):
+            calls.append(("first", list(batch)))
+            return {i: f"a{i}" for i in batch if i % 2 == 0}
+
+        def second(batch):
+            calls.append(("second", list(batch)))
+            if batch == [5]:
+                raise RuntimeError("boom")
+            return {i: f"b{i}" for i in batch}
+
+        seen = []
+        got = fetch_chain(range(6), [Provider("first", first, batch_size=3), Provider("second", second)],
+                          on_result=lambda item, name, value: seen.append(item), hedge_after=30)
+        assert got == {0: ("first", "a0"), 1: ("second", "b1"), 2: ("first", "a2"),
+                       3: ("second", "b3"), 4: ("first", "a4")}
+        assert sorted(seen) == [0, 1, 2, 3, 4]
+        assert sorted(b for name, b in calls if name == "second") == [[1], [3], [5]]
+
+    def test_slow_provider_is_hedged(self):
+        release = threading.Event()
+
+        def slow(batch):
+            release.wait(5)
+            return {i: "slow" for i in batch}
+
+        timings = {}
+        t0 = time.monotonic()
+        got = fetch_chain(["x"], [Provider("slow", slow), Provider("fast", lambda b: {"x": "fast"})],
+                          hedge_after=0.05, timings=timings)
+        release.set()
+        assert got == {"x": ("fast", "fast")}
+        assert time.monotonic() - t0 < 2
+        assert "fast" in timings
+
+    def test_later_provider_not_called_when_first_finds_everything(self):
+        called = []
+        got = fetch_chain([1, 2], [Provider("a", lambda b: {i: i for i in b}, batch_size=2),
+                                   Provider("b", lambda b: called.append(b) or {})])
+        assert got == {1: ("a", 1), 2: ("a", 2)}
+        assert called == []
+
+    def test_calls_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=2)
+
+        def fetch(batch):
+            barrier.wait()
+            return {batch[0]: True}
+
+        got = fetch_chain([1, 2, 3], [Provider("p", fetch)], hedge_after=30)
+        assert len(got) == 3
+
+    def test_throttled_calls_wait_outside_the_pool(self):
+        called = []
+
+        def fetch(batch):
+            called.append((time.monotonic(), batch[0]))
+            return {batch[0]: True}
+
+        bucket = TokenBucket(rate=20.0, burst=1)
+        got = fetch_chain([1, 2, 3], [Provider("p", fetch, bucket=bucket)], hedge_after=30)
+        assert len(got) == 3
+        starts = sorted(t for t, _ in called)
+        assert starts[2] - starts[0] >= 0.08
+
+    def test_deadline_drops_calls_waiting_for_a_token(self):
+        called = []
+        bucket = TokenBucket(rate=1.0, burst=1)
+        t0 = time.monotonic()
+        got = fetch_chain([1, 2, 3], [Provider("p", lambda b: called.append(b) or {}, bucket=bucket)],
+                          hedge_after=30, deadline=0.2)
+        assert got == {}
+        assert time.monotonic() - t0 < 1
+        time.sleep(0.1)
+        assert called == [[1]]
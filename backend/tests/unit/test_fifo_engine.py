@@ -0,0 +1,41 @@
+"""Tests for app.fifo_engine — the array-backed FIFO allocator."""
+from app.fifo_engine import allocate, to_fixed
+
+
+class TestAllocate:
+    def test_pairs_in_sell_then_lot_order(self):
+        lots, sells, qty, left = allocate([10, 5, 8], [4, 9])
+        assert list(zip(lots, sells, qty)) == [(0, 0, 4), (0, 1, 6), (1, 1, 3)]
+        assert left == [0, 2, 8]
+
+    def test_oversell_dropped(self):
+        lots, sells, qty, left = allocate([3], [2, 5])
+        assert list(zip(lots, sells, qty)) == [(0, 0, 2), (0, 1, 1)]
+        assert left == [0]
+
+    def test_zero_lots_skipped(self):
+        lots, _, qty, left = allocate([0, 4, 0, 4], [6])
+        assert list(zip(lots, qty)) == [(1, 4), (3, 2)]
+        assert left == [0, 0, 0, 2]
+
+    def test_empty_sides(self):
+        assert allocate([5, 6], []) == ([], [], [], [5, 6])
+        assert allocate([], [5]) == ([], [], [], [])
+
+    def test_negative_quantity_declined(self):
+        assert allocate([5, -1], [2]) is None
+
+    def test_crumbs_within_min_qty_declined(self):
+        # The loops drop leftovers at or below the threshold instead of matching them
+        assert allocate([1000], [50], min_qty=100) is None
+        assert allocate([1000, 1000], [950], min_qty=100) is None
+        assert allocate([1000, 1000], [1050], min_qty=100) is None
+        assert allocate([1000, 1000], [1000, 500], min_qty=100) is not None
+
+
+class TestToFixed:
+    def test_exact_values(self):
+        assert to_fixed([1.5, 12.345678, 0.0], 10 ** 6).tolist() == [1500000, 12345678, 0]
+
+    def test_inexact_values_declined(self):
+        assert to_fixed([1.5, 0.1234567], 10 ** 6) is None
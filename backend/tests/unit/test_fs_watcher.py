@@ -0,0 +1,146 @@
+"""Tests for app.fs_watcher — dumps tree change notifications."""
+import os
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app import fs_watcher
+from app.fs_watcher import DumpsWatcher
+
+
+class _Collector:
+    def __init__(self):
+        self.batches = []
+        self.event = threading.Event()
+
+    def __call__(self, paths):
+        self.batches.append(paths)
+        self.event.set()
+
+    def wait(self):
+        assert self.event.wait(5), "no change delivered"
+        self.event.clear()
+        return self.batches[-1]
+
+
+@pytest.fixture(autouse=True)
+def _fast():
+    with patch.object(fs_watcher, "DEBOUNCE", 0.01), \
+         patch.object(fs_watcher, "POLL_INTERVAL", 3600):
+        yield
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "Stocks").mkdir()
+    (tmp_path / "Mutual Funds").mkdir()
+    return tmp_path
+
+
+class TestPollBackend:
+    def test_create_modify_delete(self, tree):
+        w = DumpsWatcher(tree, "poll")
+        got = _Collector()
+        w.subscribe(tree / "Stocks", got)
+        w.start()
+        try:
+            assert w.backend == "poll"
+            fp = tree / "Stocks" / "A.xlsx"
+            fp.write_bytes(b"one")
+            w.poll()
+            assert got.wait() == {fp}
+            os.utime(fp, ns=(0, 10**9))
+            w.poll()
+            assert got.wait() == {fp}
+            fp.unlink()
+            w.poll()
+            assert got.wait() == {fp}
+        finally:
+            w.stop()
+
+    def test_only_subscribed_dir_delivered(self, tree):
+        w = DumpsWatcher(tree, "poll")
+        stocks, mf = _Collector(), _Collector()
+        w.subscribe(tree / "Stocks", stocks)
+        w.subscribe(tree / "Mutual Funds", mf)
+        w.start()
+        try:
+            (tree / "Mutual Funds" / "F.xlsx").write_bytes(b"x")
+            w.poll()
+            assert mf.wait() == {tree / "Mutual Funds" / "F.xlsx"}
+            assert stocks.batches == []
+        finally:
+            w.stop()
+
+
+class TestDispatch:
+    def test_paths_rebased_onto_subscribed_dir(self, tree):
+        w = DumpsWatcher(tree.resolve(), "poll")
+        got = _Collector()
+        link = tree / "link"
+        link.symlink_to(tree / "Stocks")
+        w.subscribe(link, got)
+        w._queue({tree.resolve() / "Stocks" / "A.xlsx"})
+        assert got.wait() == {link / "A.xlsx"}
+
+    def test_root_means_rescan(self, tree):
+        w = DumpsWatcher(tree, "poll")
+        got = _Collector()
+        w.subscribe(tree / "Stocks", got)
+        w._queue({tree})
+        assert got.wait() == {tree / "Stocks"}
+
+    def test_events_debounced_into_one_batch(self, tree):
+        w = DumpsWatcher(tree, "poll")
+        got = _Collector()
+        w.subscribe(tree / "Stocks", got)
+        with patch.object(fs_watcher, "DEBOUNCE", 0.2):
+            w._queue({tree / "Stocks" / "A.xlsx"})
+            w._queue({tree / "Stocks" / "B.xlsx"})
+            assert got.wait() == {tree / "Stocks" / "A.xlsx", tree / "Stocks" / "B.xlsx"}
+        assert len(got.batches) == 1
+
+    def test_failing_subscriber_does_not_block_others(self, tree):
+        w = DumpsWatcher(tree, "poll")
+        got = _Collector()
+        w.subscribe(tree / "Stocks", lambda paths: 1 / 0)
+        w.subscribe(tree / "Stocks", got)
+        w._queue({tree / "Stocks" / "A.xlsx"})
+        assert got.wait() == {tree / "Stocks" / "A.xlsx"}
+
+
+class TestInotifyBackend:
+    def test_write_and_new_directory(self, tree):
+        w = DumpsWatcher(tree, "auto")
+        got = _Collector()
+        w.subscribe(tree / "Stocks", got)
+        w.start()
+        try:
+            if w.backend != "inotify":
+                pytest.skip("inotify unavailable")
+            fp = tree / "Stocks" / "A.xlsx"
+            fp.write_bytes(b"one")
+            assert fp in got.wait()
+            sub = tree / "Stocks" / "Archive"
+            sub.mkdir()
+            got.wait()
+            (sub / "B.xlsx").write_bytes(b"two")
+            assert sub / "B.xlsx" in got.wait()
+        finally:
+            w.stop()
+
+
+class TestRegistry:
+    def test_off_returns_none(self, tree):
+        assert fs_watcher.watcher_for(tree, "") is None
+
+    def test_shared_per_root(self, tree):
+        try:
+            a = fs_watcher.watcher_for(tree, "poll")
+            b = fs_watcher.watcher_for(Path(str(tree) + "/"), "poll")
+            assert a is b and a.backend == "poll"
+        finally:
+            fs_watcher.stop_all()
+        assert fs_watcher._watchers == {}
@@ -0,0 +1,75 @@
+"""Unit tests for app.http_client — the shared keep-alive HTTP session."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    cookies_seen = []
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_GET(self):
+        type(self).cookies_seen.append(self.headers.get("Cookie"))
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.connections = 0
+    _Handler.cookies_seen = []
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    http_client.close()
+    yield f"http://127.0.0.1:{srv.server_address[1]}/"
+    http_client.close()
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_connection_reused_across_calls(server):
+    for _ in range(5):
+        resp = http_client.get(server, timeout=5)
+        assert resp.status_code == 200 and resp.text == "ok"
+    assert _Handler.connections == 1
+
+
+def test_close_opens_fresh_session(server):
+    http_client.get(server, timeout=5)
+    http_client.close()
+    http_client.get(server, timeout=5)
+    assert _Handler.connections == 2
+
+
+def test_cookies_not_persisted(server):
+    http_client.get(server, timeout=5)
+    http_client.get(server, timeout=5)
+    assert _Handler.cookies_seen == [None, None]
+
+
+@pytest.mark.parametrize("given, expected", [
+    (None, (http_client.CONNECT_TIMEOUT, http_client.READ_TIMEOUT)),
+    (2, (2, 2)),
+    (60, (http_client.CONNECT_TIMEOUT, 60)),
+    ((3, 30), (3, 30)),
+])
+def test_timeout_normalized(given, expected):
+    assert http_client._timeout(given) == expected
@@ -0,0 +1,94 @@
+"""Unit tests for app.live_feed — the versioned price/NAV/ticker change feed."""
+
+import asyncio
+import json
+import threading
+
+from app.live_feed import ChangeFeed
+
+
+def _parse(chunk):
+    """SSE text → (event, id, payload); None for comments / retry lines."""
+    fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n") if ": " in line)
+    if "event" not in fields:
+        return None
+    return fields["event"], int(fields["id"]), json.loads(fields["data"])
+
+
+async def _take(gen, n):
+    out = []
+    while len(out) < n:
+        msg = _parse(await asyncio.wait_for(gen.__anext__(), 2))
+        if msg is not None:
+            out.append(msg)
+    return out
+
+
+class TestSince:
+    def test_versions_and_resume(self):
+        feed = ChangeFeed()
+        assert feed.since(0) == []
+        feed.publish("price", "A.NSE", {"current_price": 1})
+        feed.publish("nav", "INF1", {"nav": 2})
+        assert [e[0] for e in feed.since(0)] == [1, 2]
+        assert [e[2] for e in feed.since(1)] == ["INF1"]
+        assert feed.since(2) == []
+
+    def test_gap_or_future_version_needs_reload(self):
+        feed = ChangeFeed(capacity=2)
+        for i in range(4):
+            feed.publish("price", f"S{i}.NSE", {})
+        assert feed.since(0) is None
+        assert [e[0] for e in feed.since(2)] == [3, 4]
+        # e.g. a Last-Event-ID from before a server restart
+        assert feed.since(99) is None
+
+
+class TestStream:
+    def test_streams_changes_filtered_and_woken_from_threads(self):
+        feed = ChangeFeed()
+
+        async def run():
+            gen = feed.stream(None, accept=lambda kind, key: key != "SKIP.NSE")
+            hello = await _take(gen, 1)
+            assert hello == [("hello", 0, {"version": 0})]
+            t = threading.Thread(target=lambda: [
+                feed.publish("price", "SKIP.NSE", {"current_price": 1}),
+                feed.publish("price", "KEEP.NSE", {"current_price": 2}),
+            ])
+            t.start()
+            msgs = await _take(gen, 1)
+            t.join()
+            assert msgs == [("price", 2, {"key": "KEEP.NSE", "current_price": 2})]
+            assert feed.subscribers == 1
+            await gen.aclose()
+            assert feed.subscribers == 0
+
+        asyncio.run(run())
+
+    def test_resume_replays_missed_events_or_resets(self):
+        feed = ChangeFeed(capacity=3)
+        for i in range(3):
+            feed.publish("ticker", f"T{i}", {"price": i})
+
+        async def run():
+            gen = feed.stream(1)
+            assert [m[1] for m in await _take(gen, 2)] == [2, 3]
+            await gen.aclose()
+            feed.publish("ticker", "T3", {"price": 3})
+            gen = feed.stream(0)
+            assert await _take(gen, 1) == [("reset", 4, {"version": 4})]
+            await gen.aclose()
+
+        asyncio.run(run())
+
+    def test_heartbeat_on_idle_stream(self):
+        feed = ChangeFeed()
+
+        async def run():
+            gen = feed.stream(0, heartbeat=0.01)
+            assert (await gen.__anext__()).startswith("retry:")
+            assert (await gen.__anext__()).startswith(": keep-alive")
+            await gen.aclose()
+
+        asyncio.run(run())
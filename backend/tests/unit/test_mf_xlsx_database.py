@@ -6,16 +6,16 @@ Targets 100% line coverage by exercising every function and branch:
   - _fetch_amfi_navs (AMFI NAV bulk fetch + cache + error paths)
   - _fetch_nav_google_finance (Google Finance scraping + retry)
   - fetch_live_navs (ISIN + GF routing, cache hits)
-  - clear_nav_cache
+  - clear_nav_cache, nav_version (only real NAV changes count)
   - _load_scheme_map / _save_scheme_map
   - _search_mfapi_scheme (fund name search, direct/growth matching)
   - _fetch_nav_history_mfapi
   - compute_nav_changes (1D/7D/30D change, 52W high/low, SMA, RSI, signals)
   - get_mf_nav_history / _filter_by_period
   - _gen_mf_id, _parse_date, _safe_float
-  - fifo_match_mf (fractional units, multiple sells, tiny remainder)
+  - fifo_match_mf (fractional units, multiple sells, tiny remainder, array engine parity)
   - _extract_mf_index_data, _parse_mf_trading_history
-  - MFXlsxPortfolio: init, _build_file_map, reindex, caching
+  - MFXlsxPortfolio: init, _build_file_map, reindex, caching (incl. filesystem watcher)
   - add_mf_holding (create file, dup detection, invalid date)
   - add_mf_sell_transaction (FIFO, default date, no file)
   - update_mf_holding, update_mf_sold_row
@@ -188,7 +188,7 @@ class TestFetchAmfiNavs:
         mock_resp.status_code = 200
         mock_resp.text = amfi_text
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             result = _fetch_amfi_navs()
 
         assert "INF200K01RJ1" in result
@@ -220,7 +220,7 @@ class TestFetchAmfiNavs:
         mock_resp = MagicMock()
         mock_resp.status_code = 500
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             result = mod._fetch_amfi_navs()
         assert result == {}
 
@@ -232,7 +232,7 @@ class TestFetchAmfiNavs:
         mod._amfi_isin_nav = {}
         mod._amfi_fetch_time = 0.0
 
-        with patch("app.mf_xlsx_database._requests.get", side_effect=Exception("timeout")):
+        with patch("app.mf_xlsx_database.http_client.get", side_effect=Exception("timeout")):
             result = mod._fetch_amfi_navs()
         assert result == {}
 
@@ -250,7 +250,7 @@ class TestFetchAmfiNavs:
         mock_resp.status_code = 200
         mock_resp.text = amfi_text
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             result = mod._fetch_amfi_navs()
         assert result == {}
 
@@ -270,7 +270,7 @@ class TestFetchNavGoogleFinance:
         mock_resp.status_code = 200
         mock_resp.text = '<div data-last-price="125.50">NAV</div>'
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             with patch("app.mf_xlsx_database.time.sleep"):
                 nav = _fetch_nav_google_finance("MUTF_IN:SBI_SMAL_CAP")
         assert nav == 125.50
@@ -287,7 +287,7 @@ class TestFetchNavGoogleFinance:
         mock_resp.status_code = 200
         mock_resp.text = '<div>No price data</div>'
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             with patch("app.mf_xlsx_database.time.sleep"):
                 nav = _fetch_nav_google_finance("MUTF_IN:FUND")
         assert nav is None
@@ -295,7 +295,7 @@ class TestFetchNavGoogleFinance:
     def test_request_exception_retries(self):
         from app.mf_xlsx_database import _fetch_nav_google_finance
 
-        with patch("app.mf_xlsx_database._requests.get", side_effect=Exception("net err")):
+        with patch("app.mf_xlsx_database.http_client.get", side_effect=Exception("net err")):
             with patch("app.mf_xlsx_database.time.sleep"):
                 nav = _fetch_nav_google_finance("MUTF_IN:FUND")
         assert nav is None
@@ -306,7 +306,7 @@ class TestFetchNavGoogleFinance:
         mock_resp = MagicMock()
         mock_resp.status_code = 404
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             with patch("app.mf_xlsx_database.time.sleep"):
                 nav = _fetch_nav_google_finance("MUTF_IN:FUND")
         assert nav is None
@@ -318,7 +318,7 @@ class TestFetchNavGoogleFinance:
         mock_resp.status_code = 200
         mock_resp.text = '<div data-last-price="0">NAV</div>'
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             with patch("app.mf_xlsx_database.time.sleep"):
                 nav = _fetch_nav_google_finance("MUTF_IN:FUND")
         assert nav is None
@@ -408,6 +408,28 @@ class TestClearNavCache:
         assert len(mod._nav_cache) == 0
 
 
+class TestNavVersion:
+    def test_refetching_same_nav_is_not_a_change(self):
+        import app.mf_xlsx_database as mod
+        mod.clear_nav_cache()
+        with patch("app.mf_xlsx_database._fetch_amfi_navs", return_value={"INF777": 10.0}):
+            mod.fetch_live_navs(["INF777"])
+            v = mod.nav_version()
+            mod.clear_nav_cache()
+            mod.fetch_live_navs(["INF777"])
+        assert mod.nav_version() == v
+        mod.clear_nav_cache()
+        with patch("app.mf_xlsx_database._fetch_amfi_navs", return_value={"INF777": 10.5}):
+            mod.fetch_live_navs(["INF777"])
+        assert mod.nav_version() == v + 1
+        # A NAV that can no longer be fetched is a change too
+        mod.clear_nav_cache()
+        with patch("app.mf_xlsx_database._fetch_amfi_navs", return_value={}):
+            mod.fetch_live_navs(["INF777"])
+        assert mod.nav_version() == v + 2
+        mod._nav_cache.clear()
+
+
 # ---------------------------------------------------------------------------
 # Scheme Map
 # ---------------------------------------------------------------------------
@@ -468,7 +490,7 @@ class TestSearchMfapiScheme:
         mock_resp.status_code = 200
         mock_resp.json.return_value = results
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             code = _search_mfapi_scheme("SBI Small Cap Fund - Direct Plan - Growth")
         assert code == 102
 
@@ -483,7 +505,7 @@ class TestSearchMfapiScheme:
         mock_resp.status_code = 200
         mock_resp.json.return_value = results
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             code = _search_mfapi_scheme("Axis Bluechip Fund")
         assert code == 202
 
@@ -497,7 +519,7 @@ class TestSearchMfapiScheme:
         mock_resp.status_code = 200
         mock_resp.json.return_value = results
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             code = _search_mfapi_scheme("Some Fund")
         assert code == 301
 
@@ -508,14 +530,14 @@ class TestSearchMfapiScheme:
         mock_resp.status_code = 200
         mock_resp.json.return_value = []
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             code = _search_mfapi_scheme("Nonexistent Fund")
         assert code is None
 
     def test_network_error(self):
         from app.mf_xlsx_database import _search_mfapi_scheme
 
-        with patch("app.mf_xlsx_database._requests.get", side_effect=Exception("timeout")):
+        with patch("app.mf_xlsx_database.http_client.get", side_effect=Exception("timeout")):
             code = _search_mfapi_scheme("Any Fund")
         assert code is None
 
@@ -537,7 +559,7 @@ class TestFetchNavHistoryMfapi:
             ]
         }
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             data = _fetch_nav_history_mfapi(12345)
         assert len(data) == 2
 
@@ -547,14 +569,14 @@ class TestFetchNavHistoryMfapi:
         mock_resp = MagicMock()
         mock_resp.status_code = 500
 
-        with patch("app.mf_xlsx_database._requests.get", return_value=mock_resp):
+        with patch("app.mf_xlsx_database.http_client.get", return_value=mock_resp):
             data = _fetch_nav_history_mfapi(12345)
         assert data is None
 
     def test_network_error(self):
         from app.mf_xlsx_database import _fetch_nav_history_mfapi
 
-        with patch("app.mf_xlsx_database._requests.get", side_effect=Exception("err")):
+        with patch("app.mf_xlsx_database.http_client.get", side_effect=Exception("err")):
             data = _fetch_nav_history_mfapi(12345)
         assert data is None
 
@@ -1075,6 +1097,20 @@ class TestFifoMatchMF:
         assert abs(remaining[1]["remaining"] - 5.25) < 0.001
         assert sold == []
 
+    def test_inputs_untouched_and_exhausted_lots_skipped(self):
+        from app.mf_xlsx_database import fifo_match_mf
+        buys = [
+            {"date": "2025-01-01", "units": 0.0, "nav": 40.0},
+            {"date": "2025-01-02", "units": 4.0, "nav": 50.0},
+            {"date": "2025-01-03", "units": 6.0, "nav": 55.0},
+        ]
+        sells = [{"date": "2025-03-01", "units": 4.0, "nav": 60.0},
+                 {"date": "2025-03-02", "units": 1.5, "nav": 61.0}]
+        remaining, sold = fifo_match_mf(buys, sells)
+        assert [(s["buy_nav"], s["units"]) for s in sold] == [(50.0, 4.0), (55.0, 1.5)]
+        assert [(r["nav"], r["remaining"]) for r in remaining] == [(55.0, 4.5)]
+        assert all("remaining" not in b for b in buys)
+
     def test_full_sell_fifo_order(self):
         from app.mf_xlsx_database import fifo_match_mf
         buys = [
@@ -1147,6 +1183,35 @@ class TestFifoMatchMF:
         remaining, sold = fifo_match_mf(buys, sells)
         assert len(remaining) == 0
 
+    def test_array_engine_matches_loop(self):
+        """Fractional units give bit-identical results on the array engine."""
+        import random
+        from app import fifo_engine
+        from app.mf_xlsx_database import fifo_match_mf
+        rng = random.Random(11)
+        for _ in range(50):
+            rows = [{"date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     "units": round(rng.uniform(0.5, 80), rng.choice((3, 4))),
+                     "nav": round(rng.uniform(10, 500), 4), "row_idx": r}
+                    for r in range(rng.randint(0, 60))]
+            buys = [r for r in rows if r["row_idx"] % 3]
+            sells = [r for r in rows if not r["row_idx"] % 3]
+            with patch.object(fifo_engine, "VECTOR_MIN_ROWS", 10 ** 9):
+                loop = fifo_match_mf(buys, sells)
+            with patch.object(fifo_engine, "VECTOR_MIN_ROWS", 0):
+                assert fifo_match_mf(buys, sells) == loop
+
+    def test_array_engine_defers_tiny_remainder(self):
+        from app import fifo_engine
+        from app.mf_xlsx_database import fifo_match_mf
+        buys = [{"date": "2025-01-01", "units": 10.0, "nav": 100.0},
+                {"date": "2025-02-01", "units": 5.0, "nav": 105.0}]
+        sells = [{"date": "2025-03-01", "units": 9.9999, "nav": 110.0}]
+        with patch.object(fifo_engine, "VECTOR_MIN_ROWS", 0):
+            remaining, sold = fifo_match_mf(buys, sells)
+        assert [r["remaining"] for r in remaining] == [5.0]
+        assert [s["units"] for s in sold] == [9.9999]
+
 
 # ---------------------------------------------------------------------------
 # XLSX Parsing
@@ -1516,6 +1581,44 @@ class TestMFCaching:
         assert len(holdings) == 0
 
 
+class TestMFFsWatch:
+    @pytest.fixture
+    def watched(self, mf_dir):
+        from app.fs_watcher import DumpsWatcher
+        from app.mf_xlsx_database import MFXlsxPortfolio
+        fp = mf_dir / "Watched Fund.xlsx"
+        _create_mf_xlsx(fp, fund_code="INFWATCH", buys=[{"date": "2024-01-15", "units": 10.0, "nav": 100.0}])
+        with patch("app.mf_xlsx_database._sync_to_drive"):
+            db = MFXlsxPortfolio(mf_dir, watcher=DumpsWatcher(mf_dir.parent, "poll"))
+            db.get_all_holdings()
+            yield db, fp
+
+    def test_cached_read_skips_stat(self, watched):
+        db, _ = watched
+        with patch.object(Path, "stat", side_effect=AssertionError("stat")):
+            assert [h.units for h in db.get_all_holdings()] == [10.0]
+
+    def test_external_change_reparsed_on_event(self, watched):
+        db, fp = watched
+        _create_mf_xlsx(fp, fund_code="INFWATCH", buys=[{"date": "2024-01-15", "units": 4.0, "nav": 100.0}])
+        st = fp.stat()
+        os.utime(fp, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert [h.units for h in db.get_all_holdings()] == [10.0]
+        db._on_fs_change({fp})
+        with patch.object(Path, "stat", side_effect=AssertionError("stat")):
+            assert [h.units for h in db.get_all_holdings()] == [4.0]
+
+    def test_unchanged_file_kept_and_new_file_indexed(self, watched, mf_dir):
+        db, fp = watched
+        cached = db._cache["INFWATCH"]
+        db._on_fs_change({fp})
+        assert db._cache["INFWATCH"] is cached
+        new_fp = mf_dir / "New Fund.xlsx"
+        _create_mf_xlsx(new_fp, fund_code="INFNEW", buys=[{"date": "2024-02-01", "units": 2.0, "nav": 50.0}])
+        db._on_fs_change({new_fp})
+        assert "INFNEW" in db._file_map
+
+
 # ---------------------------------------------------------------------------
 # MFXlsxPortfolio: add_mf_holding
 # ---------------------------------------------------------------------------
@@ -195,7 +195,7 @@ class TestSendTelegram:
         from app.notification_service import send_telegram
         mock_resp = MagicMock()
         mock_resp.status_code = 200
-        with patch("app.notification_service.requests.post", return_value=mock_resp):
+        with patch("app.notification_service.http_client.post", return_value=mock_resp):
             result = send_telegram("test message")
         assert result is True
 
@@ -204,13 +204,13 @@ class TestSendTelegram:
         mock_resp = MagicMock()
         mock_resp.status_code = 400
         mock_resp.text = "Bad Request"
-        with patch("app.notification_service.requests.post", return_value=mock_resp):
+        with patch("app.notification_service.http_client.post", return_value=mock_resp):
             result = send_telegram("test message")
         assert result is False
 
     def test_send_telegram_exception(self, tmp_env_telegram):
         from app.notification_service import send_telegram
-        with patch("app.notification_service.requests.post", side_effect=Exception("Network error")):
+        with patch("app.notification_service.http_client.post", side_effect=Exception("Network error")):
             result = send_telegram("test message")
         assert result is False
 
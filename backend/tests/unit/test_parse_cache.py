@@ -0,0 +1,101 @@
+"""Tests for app.parse_cache — the persistent parsed-workbook sidecar."""
+import json
+import os
+
+import pytest
+
+from app.parse_cache import ParseCache, CACHE_VERSION
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return tmp_path / ".cache" / "Stocks.json"
+
+
+@pytest.fixture
+def xlsx(tmp_path):
+    fp = tmp_path / "Stock.xlsx"
+    fp.write_bytes(b"v1")
+    return fp
+
+
+class TestParseCache:
+    def test_miss_when_empty(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        assert cache.get(xlsx) is None
+        assert len(cache) == 0
+
+    def test_put_then_get(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"held": [1, 2]})
+        assert cache.get(xlsx) == {"held": [1, 2]}
+
+    def test_roundtrip_through_disk(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"index": {"symbol": "ABC"}})
+        cache.save()
+        assert cache_file.exists()
+
+        reloaded = ParseCache(cache_file)
+        assert reloaded.get(xlsx) == {"index": {"symbol": "ABC"}}
+
+    def test_changed_file_misses(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"x": 1})
+        xlsx.write_bytes(b"version-two")
+        assert cache.get(xlsx) is None
+
+    def test_same_size_new_mtime_misses(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"x": 1})
+        st = xlsx.stat()
+        os.utime(xlsx, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert cache.get(xlsx) is None
+
+    def test_missing_file_misses(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"x": 1})
+        xlsx.unlink()
+        assert cache.get(xlsx) is None
+        cache.put(xlsx, {"x": 2})  # no stat → ignored
+        assert len(cache) == 1
+
+    def test_save_noop_when_clean(self, cache_file):
+        ParseCache(cache_file).save()
+        assert not cache_file.exists()
+
+    def test_version_mismatch_discarded(self, cache_file, xlsx):
+        cache_file.parent.mkdir(parents=True)
+        st = xlsx.stat()
+        cache_file.write_text(json.dumps({
+            "version": CACHE_VERSION + 1,
+            "entries": {str(xlsx): {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                    "payload": {"x": 1}}},
+        }))
+        assert ParseCache(cache_file).get(xlsx) is None
+
+    def test_corrupt_file_ignored(self, cache_file, xlsx):
+        cache_file.parent.mkdir(parents=True)
+        cache_file.write_text("{not json")
+        cache = ParseCache(cache_file)
+        assert cache.get(xlsx) is None
+
+    def test_prune_and_discard(self, cache_file, tmp_path, xlsx):
+        other = tmp_path / "Other.xlsx"
+        other.write_bytes(b"o")
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"x": 1})
+        cache.put(other, {"x": 2})
+        cache.prune([xlsx])
+        assert cache.get(other) is None
+        assert cache.get(xlsx) == {"x": 1}
+        cache.discard(xlsx)
+        assert len(cache) == 0
+
+    def test_save_error_keeps_dirty(self, cache_file, xlsx):
+        cache = ParseCache(cache_file)
+        cache.put(xlsx, {"bad": object()})  # not JSON-serialisable
+        cache.save()
+        cache.discard(xlsx)
+        cache.save()
+        assert json.loads(cache_file.read_text())["entries"] == {}
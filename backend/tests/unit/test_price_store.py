@@ -0,0 +1,71 @@
+"""Unit tests for app.price_store — the indexed SQLite price store."""
+
+import json
+import os
+
+from app.price_store import PriceStore, store_for
+
+
+class TestPriceStore:
+    def test_upsert_replaces_rows_and_stamps_them(self, tmp_path):
+        store = PriceStore(str(tmp_path / "p.sqlite"))
+        store.upsert({"A.NSE": {"price": 1.0}, "B.NSE": {"price": 2.0}}, updated_at=100.0)
+        store.upsert({"A.NSE": {"price": 3.0, "name": "A"}}, updated_at=200.0)
+        assert store.get_many(["A.NSE", "B.NSE", "C.NSE"]) == {
+            "A.NSE": {"price": 3.0, "name": "A"}, "B.NSE": {"price": 2.0}}
+        assert store.last_updated(["A.NSE", "B.NSE"]) == {"A.NSE": 200.0, "B.NSE": 100.0}
+        assert store.get("C.NSE") is None
+        assert len(store) == 2
+        assert store.get_rows(["A.NSE", "C.NSE"]) == {"A.NSE": ({"price": 3.0, "name": "A"}, 200.0)}
+
+    def test_bulk_read_beyond_parameter_limit(self, tmp_path):
+        store = PriceStore(str(tmp_path / "p.sqlite"))
+        store.upsert({f"S{i}.NSE": {"price": i} for i in range(1200)})
+        got = store.get_many(f"S{i}.NSE" for i in range(0, 1300, 2))
+        assert len(got) == 600 and got["S1198.NSE"] == {"price": 1198}
+
+    def test_wal_mode_and_persistence(self, tmp_path):
+        path = str(tmp_path / "p.sqlite")
+        store = PriceStore(path)
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        store.upsert({"A.NSE": {"price": 1.0}})
+        store.close()
+        assert PriceStore(path).all() == {"A.NSE": {"price": 1.0}}
+
+
+class TestJsonImport:
+    def test_existing_json_imported_once(self, tmp_path):
+        legacy = tmp_path / "stock_prices.json"
+        legacy.write_text(json.dumps({"A.NSE": {"price": 5.0}, "bad": 1}))
+        store = store_for(str(legacy))
+        assert store.all() == {"A.NSE": {"price": 5.0}}
+        assert store.last_updated(["A.NSE"])["A.NSE"] == os.path.getmtime(legacy)
+        assert store_for(str(legacy)) is store
+        assert (tmp_path / "stock_prices.sqlite").exists()
+
+    def test_unreadable_json_starts_empty(self, tmp_path):
+        legacy = tmp_path / "stock_prices.json"
+        legacy.write_text("not json")
+        assert store_for(str(legacy)).all() == {}
+
+    def test_failed_import_retried_on_next_open(self, tmp_path):
+        legacy = tmp_path / "stock_prices.json"
+        legacy.write_text("not json")
+        path = str(tmp_path / "p.sqlite")
+        PriceStore(path, import_json=str(legacy)).close()
+        legacy.write_text(json.dumps({"A.NSE": {"price": 5.0}}))
+        store = PriceStore(path, import_json=str(legacy))
+        assert store.all() == {"A.NSE": {"price": 5.0}}
+        store.close()
+        legacy.write_text(json.dumps({"A.NSE": {"price": 9.0}}))
+        assert PriceStore(path, import_json=str(legacy)).all() == {"A.NSE": {"price": 5.0}}
+
+    def test_import_keeps_newer_rows(self, tmp_path):
+        legacy = tmp_path / "stock_prices.json"
+        legacy.write_text(json.dumps({"A.NSE": {"price": 5.0}, "B.NSE": {"price": 6.0}}))
+        path = str(tmp_path / "p.sqlite")
+        store = PriceStore(path)
+        store.upsert({"A.NSE": {"price": 7.0}}, updated_at=os.path.getmtime(legacy) + 60)
+        store.close()
+        store = PriceStore(path, import_json=str(legacy))
+        assert store.all() == {"A.NSE": {"price": 7.0}, "B.NSE": {"price": 6.0}}
@@ -0,0 +1,110 @@
+"""Unit tests for app.provider_health — per-provider circuit breakers."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import provider_health
+from app.provider_health import CircuitBreaker, CircuitOpenError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail(b, n=1):
+    for _ in range(n):
+        with pytest.raises(RuntimeError):
+            b.call(lambda: (_ for _ in ()).throw(RuntimeError("down")))
+
+
+class TestStates:
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        clock = _Clock()
+        b = CircuitBreaker("p", failure_threshold=3, cooldown=10, clock=clock)
+        _fail(b, 2)
+        assert b.state == "closed"
+        _fail(b)
+        assert b.state == "open"
+        fn = MagicMock()
+        with pytest.raises(CircuitOpenError):
+            b.call(fn)
+        fn.assert_not_called()
+        assert b.snapshot()["rejected"] == 1
+
+    def test_half_open_probe_closes_or_backs_off(self):
+        clock = _Clock()
+        b = CircuitBreaker("p", failure_threshold=1, cooldown=10, clock=clock)
+        _fail(b)
+        clock.now = 10
+        assert b.state == "half_open"
+        assert b.allow()
+        # Only one probe at a time
+        assert not b.allow()
+        b.record_failure(0.1, "still down")
+        assert b.state == "open"
+        assert b.snapshot()["cooldown"] == 20
+        clock.now = 29
+        assert b.state == "open"
+        clock.now = 30
+        assert b.call(lambda: "ok") == "ok"
+        assert b.state == "closed"
+        assert b.snapshot()["cooldown"] == 10
+
+    def test_error_rate_opens_without_a_streak(self):
+        b = CircuitBreaker("p", failure_threshold=100)
+        for _ in range(5):
+            b.record_success()
+            b.record_failure(error="flaky")
+        assert b.state == "open"
+
+    def test_probe_now_and_reset(self):
+        clock = _Clock()
+        b = CircuitBreaker("p", failure_threshold=1, cooldown=60, clock=clock)
+        _fail(b)
+        b.probe_now()
+        assert b.allow()
+        b.reset()
+        assert b.state == "closed"
+
+
+class TestOutcomes:
+    def test_server_errors_and_rate_limits_count_as_failures(self):
+        b = CircuitBreaker("p", failure_threshold=2)
+        b.call(lambda: MagicMock(status_code=404))
+        b.call(lambda: MagicMock(status_code=503))
+        b.call(lambda: MagicMock(status_code=429))
+        snap = b.snapshot()
+        assert (snap["calls"], snap["failures"], snap["state"]) == (3, 2, "open")
+        assert snap["last_error"] == "HTTP 429"
+
+    def test_guard_can_mark_failure(self):
+        b = CircuitBreaker("p")
+        with b.guard() as g:
+            g.fail("empty response")
+        assert b.snapshot()["failures"] == 1
+
+    def test_latency_histogram_and_percentiles(self):
+        b = CircuitBreaker("p")
+        for latency in (0.05, 0.2, 3.0, 60.0):
+            b.record_success(latency)
+        snap = b.snapshot()
+        assert snap["latency_histogram"]["<=0.1s"] == 1
+        assert snap["latency_histogram"]["<=0.25s"] == 1
+        assert snap["latency_histogram"]["<=5s"] == 1
+        assert snap["latency_histogram"][">30s"] == 1
+        assert snap["latency_p95"] == 60.0
+
+
+class TestRegistry:
+    def test_shared_breakers_and_snapshot(self):
+        assert provider_health.breaker("amfi") is provider_health.breaker("amfi")
+        provider_health.call("amfi", lambda: MagicMock(status_code=200))
+        names = [p["provider"] for p in provider_health.snapshot()]
+        assert "amfi" in names
+        provider_health.reset_all()
+        assert provider_health.snapshot() == []
@@ -0,0 +1,71 @@
+"""Unit tests for app.refresh_jobs — coalescing price-refresh jobs."""
+
+import threading
+
+from app.refresh_jobs import RefreshCoordinator
+
+
+class TestRefreshCoordinator:
+    def test_concurrent_submits_share_one_job(self):
+        coord = RefreshCoordinator(prefix="t")
+        release = threading.Event()
+        runs = []
+
+        def run(job):
+            runs.append(job.id)
+            release.wait(2)
+            return {"stocks": 3}
+
+        first, attached1 = coord.submit("k", run)
+        second, attached2 = coord.submit("k", run)
+        other, _ = coord.submit("other", lambda job: {})
+        assert (attached1, attached2) == (False, True)
+        assert second is first and other is not first
+        assert first.attached == 1
+        release.set()
+        assert first.wait(2) and other.wait(2)
+        assert runs == [first.id]
+        assert first.status == "done" and first.result == {"stocks": 3}
+        assert coord.running() == []
+        # Finished jobs are not reused
+        again, attached = coord.submit("k", lambda job: {})
+        assert again is not first and not attached
+        again.wait(2)
+
+    def test_stage_timings_and_lookup(self):
+        coord = RefreshCoordinator(prefix="t")
+
+        def run(job):
+            job.set_stage("reindex")
+            job.set_stage("fetch")
+            job.timings["yahoo"] = 0.5
+            return {}
+
+        job, _ = coord.submit("k", run)
+        job.wait(2)
+        info = coord.get(job.id).to_dict()
+        assert info["stage"] == "finished"
+        assert set(info["timings"]) == {"reindex", "fetch", "yahoo"}
+        assert coord.get("t-999") is None
+
+    def test_exception_marks_job_failed(self):
+        coord = RefreshCoordinator()
+
+        def run(job):
+            raise RuntimeError("boom")
+
+        job, _ = coord.submit("k", run)
+        assert job.wait(2)
+        assert job.status == "error" and job.error == "boom"
+        assert job.result is None
+        assert coord.running() == []
+
+    def test_exception_without_message_still_fails(self):
+        coord = RefreshCoordinator()
+
+        def run(job):
+            raise TimeoutError()
+
+        job, _ = coord.submit("k", run)
+        assert job.wait(2)
+        assert job.status == "error" and job.error == "TimeoutError"
@@ -320,7 +320,7 @@ class TestEpaperServiceCallClaude:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"content": [{"text": "Test analysis"}]}
-        with patch("app.epaper_service.requests.post", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.post", return_value=mock_resp):
             result = es._call_claude("system", "user")
         assert result == "Test analysis"
         es._ANTHROPIC_API_KEY = old_key
@@ -332,7 +332,7 @@ class TestEpaperServiceCallClaude:
         mock_resp = MagicMock()
         mock_resp.status_code = 500
         mock_resp.text = "Error"
-        with patch("app.epaper_service.requests.post", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.post", return_value=mock_resp):
             result = es._call_claude("system", "user")
         assert result == ""
         es._ANTHROPIC_API_KEY = old_key
@@ -341,7 +341,7 @@ class TestEpaperServiceCallClaude:
         import app.epaper_service as es
         old_key = es._ANTHROPIC_API_KEY
         es._ANTHROPIC_API_KEY = "test_key"
-        with patch("app.epaper_service.requests.post", side_effect=Exception("fail")):
+        with patch("app.epaper_service.http_client.post", side_effect=Exception("fail")):
             result = es._call_claude("system", "user")
         assert result == ""
         es._ANTHROPIC_API_KEY = old_key
@@ -423,7 +423,7 @@ class TestEpaperFetchArticleBody:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.text = '<div class="contentbody"><p>This is the article body text that is long enough to pass the length check.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_article_body("https://test.com/article/something")
         assert "article body text" in result
 
@@ -431,7 +431,7 @@ class TestEpaperFetchArticleBody:
         import app.epaper_service as es
         mock_resp = MagicMock()
         mock_resp.status_code = 404
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_article_body("https://test.com/404")
         assert result == ""
 
@@ -440,7 +440,7 @@ class TestEpaperFetchArticleBody:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.text = '<article><p>Google News article body long text here for testing.</p></article>'
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_gn_article_body("https://news.google.com/article")
         assert "Google News" in result or "article body" in result
 
@@ -449,7 +449,7 @@ class TestEpaperFetchArticleBody:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.text = '<div class="content_wrapper"><p>Moneycontrol article body text that is really long.</p></div>'
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_mc_article_body("https://moneycontrol.com/article")
         assert "Moneycontrol" in result or "article body" in result
 
@@ -457,7 +457,7 @@ class TestEpaperFetchArticleBody:
         import app.epaper_service as es
         mock_resp = MagicMock()
         mock_resp.status_code = 500
-        with patch("app.epaper_service.requests.get", return_value=mock_resp):
+        with patch("app.epaper_service.http_client.get", return_value=mock_resp):
             result = es._fetch_mc_article_body("https://mc.com/err")
         assert result == ""
 
@@ -662,7 +662,7 @@ class TestCdslCasParserEdgeCases:
 class TestXlsxDatabaseEdgeCases:
     def test_extract_index_data_missing_fields(self):
         import openpyxl
-        from app.xlsx_database import _extract_index_data
+        from app.xlsx_parse import _extract_index_data
         wb = openpyxl.Workbook()
         ws = wb.active
         ws.title = "Index"
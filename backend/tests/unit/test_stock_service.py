@@ -27,6 +27,19 @@ def _make_stock_live(symbol="RELIANCE", exchange="NSE", price=2500.0):
     )
 
 
+@pytest.fixture(autouse=True)
+def _no_background_revalidation():
+    """Stale reads queue a live fetch only when a source is usable; keep
+    both off (other tests may leave them on) and start from an empty queue."""
+    from app import stock_service as ss
+    with patch.object(ss, "ENABLE_YAHOO_GOOGLE", False), \
+         patch.object(ss.zerodha_service, "has_session", return_value=False):
+        ss._revalidate_pending.clear()
+        ss._revalidate_tried.clear()
+        ss._revalidate_thread = None
+        yield
+
+
 # cache helpers
 
 def test_cache_get_set_hit():
@@ -51,6 +64,185 @@ def test_clear_cache():
     assert ss._cache_get("X.NSE") is None
 
 
+def test_cache_version_counts_real_changes_only():
+    from app import stock_service as ss
+    ss.clear_cache()
+    ss._cache_set("V.NSE", _make_stock_live("V", price=100.0))
+    v = ss.cache_version()
+    # Refresh with the same price: cleared and re-set, no change
+    ss.clear_cache()
+    ss._cache_set("V.NSE", _make_stock_live("V", price=100.0))
+    assert ss.cache_version() == v
+    ss._cache_set("V.NSE", _make_stock_live("V", price=101.0))
+    assert ss.cache_version() == v + 1
+
+
+def test_local_first_load_keeps_cache_version():
+    from app import stock_service as ss
+    ss.clear_cache()
+    v = ss.cache_version()
+    ss._cache_set("LOC.NSE", _make_stock_live("LOC", price=50.0), local=True)
+    assert ss.cache_version() == v
+    # Replacing a price a client may have seen still counts
+    ss.clear_cache()
+    ss._cache_set("LOC.NSE", _make_stock_live("LOC", price=51.0), local=True)
+    assert ss.cache_version() == v + 1
+
+
+def test_changed_prices_are_published():
+    from app import stock_service as ss
+    ss.clear_cache()
+    with patch.object(ss.live_feed, "publish") as publish:
+        ss._cache_set("PUB.NSE", _make_stock_live("PUB", price=10.0))
+        ss.clear_cache()
+        ss._cache_set("PUB.NSE", _make_stock_live("PUB", price=10.0))
+        ss._cache_set("PUB.NSE", _make_stock_live("PUB", price=11.0))
+    assert [c.args[0] for c in publish.call_args_list] == ["price", "price"]
+    assert publish.call_args.args[1] == "PUB.NSE"
+    assert publish.call_args.args[2]["current_price"] == 11.0
+
+
+def test_cache_version_bumps_when_cleared_price_is_lost(tmp_path):
+    from app import stock_service as ss
+    ss.clear_cache()
+    ss._cache_set("GONE.NSE", _make_stock_live("GONE"))
+    v = ss.cache_version()
+    ss.clear_cache()
+    with patch.object(ss, "_PRICES_FILE", str(tmp_path / "none.json")), \
+         patch.object(ss, "_xlsx_fallback", return_value=None):
+        assert ss.get_cached_prices([("GONE", "NSE")]) == {}
+    assert ss.cache_version() == v + 1
+
+
+
+# freshness / stale-while-revalidate
+
+def test_expire_cache_keeps_entries_readable():
+    from app import stock_service as ss
+    ss.clear_cache()
+    data = _make_stock_live("EXP")
+    ss._cache_set("EXP.NSE", data)
+    ss.expire_cache(["EXP.NSE"])
+    assert ss._cache_get("EXP.NSE") is data
+    assert ss._cache_get_fresh("EXP.NSE") is None
+    ss._cache_set("EXP.NSE", data)
+    assert ss._cache_get_fresh("EXP.NSE") is data
+
+
+def test_is_fresh_uses_fetched_at_and_max_age():
+    from app import stock_service as ss
+    ss.clear_cache()
+    live = _make_stock_live().model_copy(update={"fetched_at": 1000.0, "max_age": 300.0})
+    assert ss._is_fresh("R.NSE", live, now=1299.0)
+    assert not ss._is_fresh("R.NSE", live, now=1300.0)
+    saved = live.model_copy(update={"source": "saved", "max_age": 0.0})
+    assert not ss._is_fresh("R.NSE", saved, now=1000.0)
+    assert ss._is_fresh("R.NSE", _make_stock_live(), now=1e12)
+
+
+def test_new_fetch_time_alone_is_not_published():
+    from app import stock_service as ss
+    ss.clear_cache()
+    first = _make_stock_live("TS").model_copy(update={"source": "zerodha", "fetched_at": 1.0, "max_age": 300.0})
+    with patch.object(ss.live_feed, "publish") as publish:
+        ss._cache_set("TS.NSE", first)
+        v = ss.cache_version()
+        ss._cache_set("TS.NSE", first.model_copy(update={"fetched_at": 2.0}))
+    assert publish.call_count == 1
+    assert ss.cache_version() == v + 1
+
+
+def test_fetch_multiple_refetches_expired_and_serves_fresh():
+    from app import stock_service as ss
+    ss.clear_cache()
+    ss._cache_set("HIT.NSE", _make_stock_live("HIT", price=1.0))
+    ss._cache_set("OLD.NSE", _make_stock_live("OLD", price=1.0))
+    ss.expire_cache(["OLD.NSE"])
+    quotes = {"OLD.NSE": {"price": 2.0}}
+    with patch.object(ss.zerodha_service, "is_session_valid", return_value=True), \
+         patch.object(ss, "_fetch_via_zerodha", return_value=quotes) as fetch, \
+         patch.object(ss.zerodha_service, "fetch_52_week_range", return_value={}), \
+         patch.object(ss, "_save_prices_file"):
+        res = ss.fetch_multiple([("HIT", "NSE"), ("OLD", "NSE")])
+    fetch.assert_called_once_with([("OLD", "NSE")])
+    assert res["HIT.NSE"].current_price == 1.0
+    assert res["OLD.NSE"].current_price == 2.0
+    assert res["OLD.NSE"].source == "zerodha"
+    assert ss._cache_get_fresh("OLD.NSE") is not None
+
+
+def test_fetch_multiple_keeps_stale_live_price_when_sources_fail():
+    from app import stock_service as ss
+    ss.clear_cache()
+    old = _make_stock_live("KEEP", price=5.0)
+    ss._cache_set("KEEP.NSE", old)
+    ss.expire_cache()
+    with patch.object(ss.zerodha_service, "is_session_valid", return_value=False), \
+         patch.object(ss, "_file_fallback") as file_fb:
+        res = ss.fetch_multiple([("KEEP", "NSE")])
+    file_fb.assert_not_called()
+    assert res["KEEP.NSE"] is old
+    assert not ss._is_fresh("KEEP.NSE", old)
+
+
+def test_get_cached_prices_serves_stale_and_revalidates():
+    from app import stock_service as ss
+    ss.clear_cache()
+    ss._cache_set("SWR.NSE", _make_stock_live("SWR"))
+    ss.expire_cache()
+    with patch.object(ss, "fetch_multiple") as fetch, \
+         patch.object(ss.threading, "Thread") as thread:
+        assert ss.get_cached_prices([("SWR", "NSE")])["SWR.NSE"].symbol == "SWR"
+        thread.assert_not_called()
+        with patch.object(ss.zerodha_service, "has_session", return_value=True):
+            ss.get_cached_prices([("SWR", "NSE")])
+            # Within the backoff window: not queued again
+            ss._revalidate_pending.clear()
+            ss.get_cached_prices([("SWR", "NSE")])
+    fetch.assert_not_called()
+    thread.assert_called_once()
+    assert thread.call_args.kwargs["target"] is ss._revalidate_worker
+
+
+def test_revalidate_worker_fetches_pending_batch():
+    from app import stock_service as ss
+    ss._revalidate_pending["A.NSE"] = ("A", "NSE")
+    ss._revalidate_thread = object()
+    with patch.object(ss, "fetch_multiple") as fetch:
+        ss._revalidate_worker()
+    fetch.assert_called_once_with([("A", "NSE")])
+    assert ss._revalidate_thread is None
+
+
+def test_saved_price_carries_its_save_time(tmp_path):
+    from app import stock_service as ss
+    ss.clear_cache()
+    with patch.object(ss, "_PRICES_FILE", str(tmp_path / "p.json")):
+        ss._price_store().upsert({"SAV.NSE": {"price": 10.0}}, updated_at=1234.0)
+        got = ss.get_cached_prices([("SAV", "NSE")])["SAV.NSE"]
+    assert (got.source, got.fetched_at, got.max_age) == ("saved", 1234.0, 0.0)
+    assert got.is_manual
+
+
+
+def test_fetch_multiple_yahoo_then_google_progressively():
+    from app import stock_service as ss
+    ss.clear_cache()
+    seen = []
+    yahoo = lambda batch: {ys: 100.0 for ys in batch if ys != "GG.NS"}
+    with patch.object(ss, "ENABLE_YAHOO_GOOGLE", True), \
+         patch.object(ss.zerodha_service, "is_session_valid", return_value=False), \
+         patch.object(ss, "_download_batch_with_retry", side_effect=yahoo), \
+         patch.object(ss, "_fetch_google_finance_price", return_value=50.0) as google, \
+         patch.object(ss, "_save_prices_file"):
+        res = ss.fetch_multiple([("YY", "NSE"), ("GG", "NSE")],
+                                on_result=lambda key, data: seen.append(key))
+    google.assert_called_once_with("GG", "NSE")
+    assert (res["YY.NSE"].source, res["YY.NSE"].current_price) == ("yahoo", 100.0)
+    assert (res["GG.NSE"].source, res["GG.NSE"].current_price) == ("google", 50.0)
+    assert sorted(seen) == ["GG.NSE", "YY.NSE"]
+    ss.clear_cache()
+
 # _yahoo_sym
 
 def test_yahoo_sym_nse():
@@ -160,6 +352,26 @@ def test_file_fallback_missing_key(tmp_path):
     assert result is None
 
 
+def test_cached_prices_read_only_requested_keys(tmp_path):
+    from app import stock_service as ss
+    from app.price_store import PriceStore
+    ss.clear_cache()
+    prices_file = tmp_path / "stock_prices.json"
+    prices_file.write_text(json.dumps({
+        "AAA.NSE": {"price": 10.0, "name": "Aaa"},
+        "BBB.BSE": {"price": 20.0, "name": "Bbb"},
+        **{f"X{i}.NSE": {"price": 1.0} for i in range(50)},
+    }))
+    with patch.object(ss, "_PRICES_FILE", str(prices_file)), \
+         patch.object(ss, "_xlsx_fallback", return_value=None), \
+         patch.object(PriceStore, "all", side_effect=AssertionError("full scan")):
+        got = ss.get_cached_prices([("AAA", "NSE"), ("BBB", "NSE")])
+    assert got["AAA.NSE"].current_price == 10.0
+    # BSE row served for the NSE key (alternate exchange)
+    assert got["BBB.NSE"].current_price == 20.0
+    ss.clear_cache()
+
+
 # xlsx fallback
 
 def test_xlsx_fallback_no_file():
@@ -558,7 +770,7 @@ def test_fetch_google_finance_price_success():
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.text = 'data-last-price="2500.50"'
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = _fetch_google_finance_price("RELIANCE", "NSE")
     assert result == 2500.50
 
@@ -568,15 +780,27 @@ def test_fetch_google_finance_price_no_match():
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.text = 'no price data here'
-    with patch("app.stock_service._requests.get", return_value=mock_resp), \
+    with patch("app.stock_service.http_client.get", return_value=mock_resp), \
          patch("time.sleep"):
         result = _fetch_google_finance_price("MISSING", "NSE")
     assert result is None
 
 
+def test_fetch_google_finance_price_fails_fast_when_circuit_open():
+    from app import provider_health
+    from app.stock_service import _fetch_google_finance_price
+    for _ in range(provider_health.FAILURE_THRESHOLD):
+        provider_health.breaker("google_finance").record_failure(error="timeout")
+    with patch("app.stock_service.http_client.get") as get, \
+         patch("time.sleep") as sleep:
+        assert _fetch_google_finance_price("X", "NSE") is None
+    get.assert_not_called()
+    sleep.assert_not_called()
+
+
 def test_fetch_google_finance_price_error():
     from app.stock_service import _fetch_google_finance_price
-    with patch("app.stock_service._requests.get", side_effect=Exception("timeout")), \
+    with patch("app.stock_service.http_client.get", side_effect=Exception("timeout")), \
          patch("time.sleep"):
         result = _fetch_google_finance_price("X", "NSE")
     assert result is None
@@ -587,7 +811,7 @@ def test_fetch_google_finance_ticker_success():
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.text = 'data-last-price="73000.50" data-previous-close="72800.00"'
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = _fetch_google_finance_ticker("SENSEX:INDEXBOM")
     assert result is not None
     assert result[0] == 73000.50
@@ -599,14 +823,14 @@ def test_fetch_google_finance_ticker_no_prev():
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.text = 'data-last-price="73000"'
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = _fetch_google_finance_ticker("SENSEX:INDEXBOM")
     assert result == (73000.0, 0)
 
 
 def test_fetch_google_finance_ticker_failure():
     from app.stock_service import _fetch_google_finance_ticker
-    with patch("app.stock_service._requests.get", side_effect=Exception("err")), \
+    with patch("app.stock_service.http_client.get", side_effect=Exception("err")), \
          patch("time.sleep"):
         result = _fetch_google_finance_ticker("X:Y")
     assert result is None
@@ -622,7 +846,7 @@ def test_fetch_market_ticker_non_kite_success():
         "chart": {"result": [{"meta": {"regularMarketPrice": 73000, "previousClose": 72500}}]}
     }
     meta = {"key": "SENSEX", "label": "SENSEX", "yahoo": "^BSESN", "kite": False, "type": "index", "unit": ""}
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = fetch_market_ticker(meta)
     assert result["price"] == 73000
     assert result["key"] == "SENSEX"
@@ -633,7 +857,7 @@ def test_fetch_market_ticker_fallback_google():
     mock_resp = MagicMock()
     mock_resp.status_code = 500
     meta = {"key": "SENSEX", "label": "SENSEX", "yahoo": "^BSESN", "kite": False, "type": "index", "unit": ""}
-    with patch("app.stock_service._requests.get", return_value=mock_resp), \
+    with patch("app.stock_service.http_client.get", return_value=mock_resp), \
          patch("app.stock_service._fetch_google_finance_ticker", return_value=(73000.0, 72000.0)):
         result = fetch_market_ticker(meta)
     assert result["price"] == 73000.0
@@ -672,7 +896,7 @@ def test_fetch_yahoo_ticker_historical_success():
         }]}
     }
     meta = {"key": "SENSEX", "yahoo": "^BSESN"}
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = fetch_yahoo_ticker_historical(meta)
     assert "week_change_pct" in result
     assert "month_change_pct" in result
@@ -683,7 +907,7 @@ def test_fetch_yahoo_ticker_historical_failure():
     mock_resp = MagicMock()
     mock_resp.status_code = 404
     meta = {"key": "SENSEX", "yahoo": "^BSESN"}
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = fetch_yahoo_ticker_historical(meta)
     assert result == {"week_change_pct": 0.0, "month_change_pct": 0.0}
 
@@ -691,7 +915,7 @@ def test_fetch_yahoo_ticker_historical_failure():
 def test_fetch_yahoo_ticker_historical_exception():
     from app.stock_service import fetch_yahoo_ticker_historical
     meta = {"key": "X", "yahoo": "^X"}
-    with patch("app.stock_service._requests.get", side_effect=Exception("err")):
+    with patch("app.stock_service.http_client.get", side_effect=Exception("err")):
         result = fetch_yahoo_ticker_historical(meta)
     assert result["week_change_pct"] == 0.0
 
@@ -702,7 +926,7 @@ def test_fetch_yahoo_ticker_historical_empty_chart():
     mock_resp.status_code = 200
     mock_resp.json.return_value = {"chart": {"result": []}}
     meta = {"key": "X", "yahoo": "^X"}
-    with patch("app.stock_service._requests.get", return_value=mock_resp):
+    with patch("app.stock_service.http_client.get", return_value=mock_resp):
         result = fetch_yahoo_ticker_historical(meta)
     assert result["week_change_pct"] == 0.0
 
@@ -0,0 +1,91 @@
+"""Tests for app.stock_summary — materialized per-symbol summary aggregates."""
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from app.models import Holding, SoldPosition, StockLiveData
+from app.stock_summary import SummaryTable, SymbolAggregate, price_keys, summary_item
+from app.xlsx_database import PortfolioSnapshot
+
+TODAY = date(2025, 6, 1)
+
+
+def _h(symbol, qty, buy_price, buy_date, exchange="NSE", cost=0.0):
+    return Holding(symbol=symbol, exchange=exchange, name=f"{symbol} Ltd", quantity=qty,
+                   price=buy_price, buy_price=buy_price, buy_cost=cost, buy_date=buy_date)
+
+
+def _s(symbol, qty, buy_price, buy_date, sell_price, sell_date):
+    return SoldPosition(symbol=symbol, exchange="NSE", name=f"{symbol} Ltd", quantity=qty,
+                        buy_price=buy_price, buy_date=buy_date, sell_price=sell_price,
+                        sell_date=sell_date, realized_pl=(sell_price - buy_price) * qty)
+
+
+def _snapshot(version, by_symbol):
+    entries = {sym: (None, h, s, []) for sym, (h, s) in by_symbol.items()}
+    return PortfolioSnapshot.build(version, {sym: Path(f"{sym}.xlsx") for sym in by_symbol}, entries)
+
+
+def _live(symbol, price, exchange="NSE"):
+    return StockLiveData(symbol=symbol, exchange=exchange, name=symbol, current_price=price,
+                         week_52_high=0, week_52_low=0)
+
+
+class TestSymbolAggregate:
+    def test_price_independent_totals(self):
+        agg = SymbolAggregate(
+            [_h("AAA", 10, 100.0, "2023-01-01", cost=1010.0), _h("AAA", 5, 120.0, "2025-03-01")],
+            [_s("AAA", 4, 90.0, "2022-01-01", 150.0, "2023-06-01"),
+             _s("AAA", 2, 95.0, "2024-01-01", 80.0, "2024-03-01")],
+            TODAY)
+        assert agg.total_held_qty == 15 and agg.total_sold_qty == 6
+        assert agg.total_invested == 1010.0 + 600.0
+        assert (agg.ltcg_sold_qty, agg.stcg_sold_qty) == (4, 2)
+        assert (agg.ltcg_realized_pl, agg.stcg_realized_pl) == (240.0, -30.0)
+        assert (agg.last_tx_date, agg.last_tx_type) == ("2025-03-01", "Buy")
+        assert [lot[3] for lot in agg.lots] == [True, False]
+
+    def test_price_pass_parses_no_dates(self):
+        agg = SymbolAggregate([_h("AAA", 10, 100.0, "2023-01-01"), _h("AAA", 5, 120.0, "2025-03-01")],
+                              [], TODAY)
+        with patch("app.stock_summary.datetime", side_effect=AssertionError("strptime")):
+            item = summary_item("AAA", agg, {"AAA.NSE": _live("AAA", 110.0)}, {}, lambda s, e: "")
+        assert item.profitable_qty == 10 and item.loss_qty == 5
+        assert item.ltcg_unrealized_profit == 100.0 and item.stcg_unrealized_loss == -50.0
+        assert item.ltcg_invested == 1000.0 and item.stcg_earliest_date == "2025-03-01"
+
+    def test_watchlist_and_alternate_exchange(self):
+        item = summary_item("WAT", None, {"WAT.BSE": _live("WAT", 12.0, "BSE")}, {},
+                            lambda s, e: "Watch Ltd")
+        assert (item.exchange, item.name, item.live.current_price) == ("NSE", "Watch Ltd", 12.0)
+        assert price_keys("WAT", None) == [("WAT", "BSE"), ("WAT", "NSE")]
+
+
+class TestSummaryTable:
+    def test_reaggregates_only_changed_symbols(self):
+        a, b, none = [_h("AAA", 1, 10.0, "2025-01-01")], [_h("BBB", 2, 20.0, "2025-01-01")], []
+        table = SummaryTable()
+        first = table.rows(_snapshot(1, {"AAA": (a, none), "BBB": (b, none)}), TODAY)
+        assert table.rows(_snapshot(1, {"AAA": (a, none), "BBB": (b, none)}), TODAY)["AAA"] is first["AAA"]
+        second = table.rows(_snapshot(2, {"AAA": (a, none),
+                                          "BBB": ([_h("BBB", 3, 20.0, "2025-01-01")], none)}), TODAY)
+        assert second["AAA"] is first["AAA"]
+        assert second["BBB"] is not first["BBB"] and second["BBB"].total_held_qty == 3
+
+    def test_new_day_rebuckets(self):
+        lots = [_h("AAA", 1, 10.0, "2024-06-01")]
+        snap = _snapshot(1, {"AAA": (lots, [])})
+        table = SummaryTable()
+        assert table.rows(snap, TODAY)["AAA"].lots[0][3] is False
+        assert table.rows(snap, date(2025, 6, 2))["AAA"].lots[0][3] is True
+
+    def test_row_reads_one_symbol(self):
+        a = [_h("AAA", 1, 10.0, "2025-01-01")]
+        snap = _snapshot(1, {"AAA": (a, []), "BBB": ([_h("BBB", 2, 20.0, "2025-01-01")], [])})
+        table = SummaryTable()
+        with patch("app.stock_summary.SymbolAggregate", wraps=SymbolAggregate) as build:
+            assert table.row(snap, "AAA", TODAY).total_held_qty == 1
+            assert build.call_count == 1
+        cached = table.rows(snap, TODAY)["AAA"]
+        assert table.row(snap, "AAA", TODAY) is cached
+        assert table.row(snap, "ZZZ", TODAY) is None
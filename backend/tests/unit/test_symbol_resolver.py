@@ -232,7 +232,7 @@ def test_ensure_loaded_calls_do_load_when_stale(tmp_path):
 
 
 # ═══════════════════════════════════════════════════════════
-#  _load_from_network — mocked urllib
+#  _load_from_network — mocked HTTP client
 # ═══════════════════════════════════════════════════════════
 
 def test_load_from_network_parses_nse_csv():
@@ -240,24 +240,18 @@ def test_load_from_network_parses_nse_csv():
     nse_csv = "SYMBOL,NAME OF COMPANY,SERIES,DATE OF LISTING,PAID UP VALUE,MARKET LOT,ISIN NUMBER,FACE VALUE\r\nRELIANCE,Reliance Industries Ltd,EQ,29-NOV-1995,10,1,INE002A01018,10\r\n"
     zerodha_csv = "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,instrument_type,segment,exchange\r\n"  # empty
 
-    mock_nse_resp = MagicMock()
-    mock_nse_resp.read.return_value = nse_csv.encode()
-    mock_nse_resp.__enter__ = lambda s: s
-    mock_nse_resp.__exit__ = MagicMock(return_value=False)
+    mock_nse_resp = MagicMock(status_code=200, content=nse_csv.encode())
 
-    mock_z_resp = MagicMock()
-    mock_z_resp.read.return_value = zerodha_csv.encode()
-    mock_z_resp.__enter__ = lambda s: s
-    mock_z_resp.__exit__ = MagicMock(return_value=False)
+    mock_z_resp = MagicMock(status_code=200, content=zerodha_csv.encode())
 
     call_count = [0]
-    def fake_urlopen(req, timeout=None):
+    def fake_get(url, **kwargs):
         call_count[0] += 1
         if call_count[0] == 1:
             return mock_nse_resp
         return mock_z_resp
 
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with patch("app.symbol_resolver.http_client.get", side_effect=fake_get):
         isin_map, name_map = sr._load_from_network()
 
     assert "INE002A01018" in isin_map
@@ -267,7 +261,7 @@ def test_load_from_network_parses_nse_csv():
 def test_load_from_network_handles_nse_failure():
     """Network failure returns empty maps without raising."""
     from app import symbol_resolver as sr
-    with patch("urllib.request.urlopen", side_effect=Exception("connection refused")):
+    with patch("app.symbol_resolver.http_client.get", side_effect=Exception("connection refused")):
         isin_map, name_map = sr._load_from_network()
     assert isin_map == {}
     assert name_map == {}
@@ -308,24 +302,18 @@ def test_load_from_network_parses_zerodha_csv():
         "4567,890,SBIN,State Bank of India,750,,0,0.05,1,EQ,BSE,BSE\r\n"
     )
 
-    mock_nse_resp = MagicMock()
-    mock_nse_resp.read.return_value = nse_csv.encode()
-    mock_nse_resp.__enter__ = lambda s: s
-    mock_nse_resp.__exit__ = MagicMock(return_value=False)
+    mock_nse_resp = MagicMock(status_code=200, content=nse_csv.encode())
 
-    mock_z_resp = MagicMock()
-    mock_z_resp.read.return_value = zerodha_csv.encode()
-    mock_z_resp.__enter__ = lambda s: s
-    mock_z_resp.__exit__ = MagicMock(return_value=False)
+    mock_z_resp = MagicMock(status_code=200, content=zerodha_csv.encode())
 
     call_count = [0]
-    def fake_urlopen(req, timeout=None):
+    def fake_get(url, **kwargs):
         call_count[0] += 1
         if call_count[0] == 1:
             return mock_nse_resp
         return mock_z_resp
 
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with patch("app.symbol_resolver.http_client.get", side_effect=fake_get):
         isin_map, name_map = sr._load_from_network()
 
     # EQ and ETF should be in the map
@@ -342,21 +330,15 @@ def test_load_from_network_nse_skips_missing_isin_or_symbol():
     nse_csv = "SYMBOL,NAME OF COMPANY,ISIN NUMBER\r\n,Missing Symbol Corp,INE999Z99999\r\nHASISIN,Has ISIN Corp,\r\n"
     zerodha_csv = "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,instrument_type,segment,exchange\r\n"
 
-    mock_nse_resp = MagicMock()
-    mock_nse_resp.read.return_value = nse_csv.encode()
-    mock_nse_resp.__enter__ = lambda s: s
-    mock_nse_resp.__exit__ = MagicMock(return_value=False)
-    mock_z_resp = MagicMock()
-    mock_z_resp.read.return_value = zerodha_csv.encode()
-    mock_z_resp.__enter__ = lambda s: s
-    mock_z_resp.__exit__ = MagicMock(return_value=False)
+    mock_nse_resp = MagicMock(status_code=200, content=nse_csv.encode())
+    mock_z_resp = MagicMock(status_code=200, content=zerodha_csv.encode())
 
     call_count = [0]
-    def fake_urlopen(req, timeout=None):
+    def fake_get(url, **kwargs):
         call_count[0] += 1
         return mock_nse_resp if call_count[0] == 1 else mock_z_resp
 
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with patch("app.symbol_resolver.http_client.get", side_effect=fake_get):
         isin_map, name_map = sr._load_from_network()
 
     # Both rows should be skipped
@@ -374,21 +356,15 @@ def test_load_from_network_zerodha_skips_empty_name_or_symbol():
         "2345,678,SBIN,,750,,0,0.05,1,EQ,NSE,NSE\r\n"  # missing name
     )
 
-    mock_nse_resp = MagicMock()
-    mock_nse_resp.read.return_value = nse_csv.encode()
-    mock_nse_resp.__enter__ = lambda s: s
-    mock_nse_resp.__exit__ = MagicMock(return_value=False)
-    mock_z_resp = MagicMock()
-    mock_z_resp.read.return_value = zerodha_csv.encode()
-    mock_z_resp.__enter__ = lambda s: s
-    mock_z_resp.__exit__ = MagicMock(return_value=False)
+    mock_nse_resp = MagicMock(status_code=200, content=nse_csv.encode())
+    mock_z_resp = MagicMock(status_code=200, content=zerodha_csv.encode())
 
     call_count = [0]
-    def fake_urlopen(req, timeout=None):
+    def fake_get(url, **kwargs):
         call_count[0] += 1
         return mock_nse_resp if call_count[0] == 1 else mock_z_resp
 
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with patch("app.symbol_resolver.http_client.get", side_effect=fake_get):
         isin_map, name_map = sr._load_from_network()
 
     # Both rows should be skipped
@@ -402,21 +378,15 @@ def test_load_from_network_nse_skips_non_ine_isins():
     nse_csv = "SYMBOL,NAME OF COMPANY,ISIN NUMBER\r\nFOREIGN,Foreign Corp,US0000000001\r\n"
     zerodha_csv = "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,instrument_type,segment,exchange\r\n"
 
-    mock_nse_resp = MagicMock()
-    mock_nse_resp.read.return_value = nse_csv.encode()
-    mock_nse_resp.__enter__ = lambda s: s
-    mock_nse_resp.__exit__ = MagicMock(return_value=False)
-    mock_z_resp = MagicMock()
-    mock_z_resp.read.return_value = zerodha_csv.encode()
-    mock_z_resp.__enter__ = lambda s: s
-    mock_z_resp.__exit__ = MagicMock(return_value=False)
+    mock_nse_resp = MagicMock(status_code=200, content=nse_csv.encode())
+    mock_z_resp = MagicMock(status_code=200, content=zerodha_csv.encode())
 
     call_count = [0]
-    def fake_urlopen(req, timeout=None):
+    def fake_get(url, **kwargs):
         call_count[0] += 1
         return mock_nse_resp if call_count[0] == 1 else mock_z_resp
 
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with patch("app.symbol_resolver.http_client.get", side_effect=fake_get):
         isin_map, name_map = sr._load_from_network()
 
     assert "US0000000001" not in isin_map
@@ -427,19 +397,16 @@ def test_load_from_network_zerodha_failure_returns_nse_only():
     from app import symbol_resolver as sr
 
     nse_csv = "SYMBOL,NAME OF COMPANY,ISIN NUMBER\r\nINFY,Infosys Ltd,INE009A01021\r\n"
-    mock_nse_resp = MagicMock()
-    mock_nse_resp.read.return_value = nse_csv.encode()
-    mock_nse_resp.__enter__ = lambda s: s
-    mock_nse_resp.__exit__ = MagicMock(return_value=False)
+    mock_nse_resp = MagicMock(status_code=200, content=nse_csv.encode())
 
     call_count = [0]
-    def fake_urlopen(req, timeout=None):
+    def fake_get(url, **kwargs):
         call_count[0] += 1
         if call_count[0] == 1:
             return mock_nse_resp
         raise ConnectionError("Zerodha down")
 
-    with patch("urllib.request.urlopen", side_effect=fake_urlopen):
+    with patch("app.symbol_resolver.http_client.get", side_effect=fake_get):
         isin_map, name_map = sr._load_from_network()
 
     assert "INE009A01021" in isin_map
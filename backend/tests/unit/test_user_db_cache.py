@@ -0,0 +1,120 @@
+"""Unit tests for app.user_db_cache — bounded per-user DB instance cache."""
+
+from app.models import Holding
+from app.user_db_cache import UserDBCache, approx_sizeof
+
+
+class FakeDB:
+    def __init__(self, size):
+        self.size = size
+        self.closed = False
+
+    def approx_size(self):
+        return self.size
+
+    def close(self):
+        self.closed = True
+
+
+class JournaledDB(FakeDB):
+    def __init__(self, size, pending=True):
+        super().__init__(size)
+        self.pending = pending
+
+    def has_pending_writes(self):
+        return self.pending
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(**kw):
+    clock = Clock()
+    kw.setdefault("max_bytes", 0)
+    kw.setdefault("idle_seconds", 0)
+    return UserDBCache(min_idle=10, clock=clock, **kw), clock
+
+
+class TestUserDBCache:
+    def test_hits_and_misses(self):
+        cache, _ = _cache()
+        assert cache.get("a") is None
+        dbs = {"stocks": FakeDB(10)}
+        assert cache.put("a", dbs) is dbs
+        assert cache.get("a") is dbs
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        assert stats["bytes"] == 10
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache, clock = _cache(max_bytes=250)
+        a, b = {"stocks": FakeDB(100)}, {"stocks": FakeDB(100)}
+        cache.put("a", a)
+        cache.put("b", b)
+        clock.now += 60
+        cache.get("a")          # b is now least recently used
+        clock.now += 60
+        cache.put("c", {"stocks": FakeDB(100)})
+        assert "b" not in cache and "a" in cache and "c" in cache
+        assert b["stocks"].closed and not a["stocks"].closed
+        assert cache.stats()["evictions"] == {"idle": 0, "memory": 1}
+
+    def test_recently_used_entries_are_not_evicted(self):
+        cache, clock = _cache(max_bytes=150)
+        cache.put("a", {"stocks": FakeDB(100)})
+        clock.now += 5          # still within min_idle
+        cache.put("b", {"stocks": FakeDB(100)})
+        assert len(cache) == 2
+
+    def test_idle_entries_evicted(self):
+        cache, clock = _cache(idle_seconds=600)
+        cache.put("a", {"stocks": FakeDB(1)})
+        cache.put("b", {"stocks": FakeDB(1)})
+        clock.now += 400
+        cache.get("b")
+        clock.now += 300
+        assert cache.sweep() == 1
+        assert "a" not in cache and "b" in cache
+        assert cache.stats()["evictions"]["idle"] == 1
+
+    def test_losing_racer_is_closed(self):
+        cache, _ = _cache()
+        first, second = {"stocks": FakeDB(1)}, {"stocks": FakeDB(1)}
+        cache.put("a", first)
+        assert cache.put("a", second) is first
+        assert second["stocks"].closed and not first["stocks"].closed
+
+
+class TestApproxSizeof:
+    def test_entries_with_pending_writes_not_evicted(self):
+        cache, clock = _cache(idle_seconds=600, max_bytes=50)
+        busy = {"stocks": JournaledDB(100)}
+        cache.put("a", busy)
+        clock.now += 700
+        assert cache.sweep() == 0 and "a" in cache and not busy["stocks"].closed
+        busy["stocks"].pending = False
+        assert cache.sweep() == 1 and busy["stocks"].closed
+
+    def test_leased_entries_not_evicted(self):
+        cache, clock = _cache(idle_seconds=600)
+        cache.put("a", {"stocks": FakeDB(1)})
+        assert cache.acquire("a") and not cache.acquire("missing")
+        clock.now += 700
+        assert cache.sweep() == 0
+        cache.release("a")
+        assert cache.sweep() == 0       # release counts as use
+        clock.now += 700
+        assert cache.sweep() == 1
+
+    def test_grows_with_content_and_counts_shared_once(self):
+        h = Holding(id="1", symbol="AAA", exchange="NSE", name="Aaa", quantity=1,
+                    buy_price=1.0, buy_date="2024-01-01")
+        one = approx_sizeof({"AAA": [h]})
+        many = approx_sizeof({f"S{i}": [h.model_copy(update={"id": str(i)})] for i in range(500)})
+        assert many > 100 * one
+        assert approx_sizeof([h, h]) < 2 * approx_sizeof([h])
@@ -0,0 +1,85 @@
+"""Tests for app.write_journal — the fsync'd write-ahead journal."""
+import pytest
+
+from app.write_journal import WriteJournal
+
+
+@pytest.fixture
+def journal_file(tmp_path):
+    return tmp_path / ".journal" / "Stocks.jsonl"
+
+
+class TestWriteJournal:
+    def test_empty_when_missing(self, journal_file):
+        journal = WriteJournal(journal_file)
+        assert journal.entries() == []
+        assert len(journal) == 0
+
+    def test_append_assigns_increasing_seq(self, journal_file):
+        journal = WriteJournal(journal_file)
+        a = journal.append({"op": "insert"})
+        b = journal.append({"op": "sell"})
+        assert (a["seq"], b["seq"]) == (1, 2)
+        assert [e["op"] for e in journal.entries()] == ["insert", "sell"]
+
+    def test_survives_reload(self, journal_file):
+        WriteJournal(journal_file).append({"op": "insert", "symbol": "ABC"})
+        reloaded = WriteJournal(journal_file)
+        assert reloaded.entries() == [{"op": "insert", "symbol": "ABC", "seq": 1}]
+        assert reloaded.append({"op": "insert"})["seq"] == 2
+
+    def test_discard_compacts_file(self, journal_file):
+        journal = WriteJournal(journal_file)
+        for _ in range(3):
+            journal.append({"op": "insert"})
+        journal.discard([1, 3])
+        assert [e["seq"] for e in WriteJournal(journal_file).entries()] == [2]
+
+    def test_discard_all_removes_file(self, journal_file):
+        journal = WriteJournal(journal_file)
+        journal.append({"op": "insert"})
+        journal.discard([1])
+        assert not journal_file.exists()
+        assert len(journal) == 0
+
+    def test_mark_persists_fields(self, journal_file):
+        journal = WriteJournal(journal_file)
+        journal.append({"op": "insert"})
+        journal.append({"op": "insert"})
+        journal.mark([1], flushing=True)
+        entries = WriteJournal(journal_file).entries()
+        assert entries[0]["flushing"] is True
+        assert "flushing" not in entries[1]
+
+    def test_torn_last_line_skipped(self, journal_file):
+        journal = WriteJournal(journal_file)
+        journal.append({"op": "insert"})
+        with open(journal_file, "a") as f:
+            f.write('{"op": "ins')
+        reloaded = WriteJournal(journal_file)
+        assert [e["seq"] for e in reloaded.entries()] == [1]
+
+    def test_append_after_torn_line_survives_reload(self, journal_file):
+        journal = WriteJournal(journal_file)
+        journal.append({"op": "insert"})
+        with open(journal_file, "a") as f:
+            f.write('{"op": "ins')
+        reloaded = WriteJournal(journal_file)
+        assert reloaded.append({"op": "sell"})["seq"] == 2
+        assert [e["op"] for e in WriteJournal(journal_file).entries()] == ["insert", "sell"]
+
+    def test_torn_only_line_truncated(self, journal_file):
+        journal_file.parent.mkdir(parents=True)
+        journal_file.write_text('{"op": "ins')
+        journal = WriteJournal(journal_file)
+        assert journal.entries() == []
+        assert journal.append({"op": "insert"})["seq"] == 1
+        assert [e["seq"] for e in WriteJournal(journal_file).entries()] == [1]
+
+    def test_dead_letter_moves_entry_aside(self, journal_file):
+        journal = WriteJournal(journal_file)
+        journal.append({"op": "insert"})
+        journal.append({"op": "sell"})
+        journal.dead_letter([2], "not enough shares")
+        assert [e["seq"] for e in WriteJournal(journal_file).entries()] == [1]
+        assert journal.dead_letters() == [{"op": "sell", "seq": 2, "error": "not enough shares"}]
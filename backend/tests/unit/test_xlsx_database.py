@@ -6,13 +6,16 @@ Targets 100% line coverage by exercising every function and branch:
   - _parse_date (datetime, date, string formats, invalid)
   - _safe_float, _safe_int
   - _gen_id, _parse_excel_serial_date
-  - fifo_match (all paths)
+  - fifo_match (all paths, array engine parity with the loop)
   - _extract_index_data (all branches)
   - _find_realised_columns
   - _parse_trading_history (Buy/Sell/DIV, edge cases)
-  - XlsxPortfolio init, _build_file_map, reindex
+  - XlsxPortfolio init, _build_file_map, reindex (incremental stat diff)
   - _find_file_for_symbol (exact match, glob fallback)
   - _get_stock_data (cache hit, OSError, multi-file)
+  - persistent parse cache (cold start without openpyxl, reparse on change)
+  - process-pool parallel parse (parity with serial, threshold, fallback)
+  - streaming reader on the read path (openpyxl parity, fallback)
   - _parse_and_match_symbol (Buy-only, Buy+Sell FIFO)
   - get_all_data, get_all_holdings, get_all_sold, get_dividends_by_symbol, get_holding_by_id
   - add_holding (new file, existing, zero-qty fallback)
@@ -22,12 +25,20 @@ Targets 100% line coverage by exercising every function and branch:
   - update_holding, update_sold_row
   - rename_stock
   - Manual prices: get/set/get_all
-  - get_existing_transaction_fingerprints, get_existing_dividend_fingerprints
-  - _insert_transaction, _create_stock_file
+  - get_existing_transaction_fingerprints, get_existing_dividend_fingerprints (parse-cache backed)
+  - _insert_transaction, insert_transactions (batch), _create_stock_file
   - _convert_realised_formulas, _ensure_realised_headers
+  - write-ahead journal (overlay before flush, flush parity, startup replay)
+  - per-file write locks (independent stocks in parallel, no lost writes)
+  - FifoLedger (incremental apply = full rebuild, fallbacks, no re-parse after own writes)
+  - filesystem watcher (no stat on watched reads, external change/new file, own writes kept)
+  - PortfolioSnapshot (reused between changes, swapped on change, old snapshots untouched)
+  - request-scoped memo (one validation pass per request, writes forget it)
+  - approx_size / close (per-user DB cache eviction)
 """
 
 import json
+import os
 from datetime import datetime, date, timedelta
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -120,7 +131,7 @@ def _create_stock_xlsx(filepath, symbol="RELIANCE", exchange="NSE",
     wb.close()
 
 
-def _make_portfolio(stocks_dir):
+def _make_portfolio(stocks_dir, **kwargs):
     """Create an XlsxPortfolio with mocked symbol resolver."""
     with patch("app.xlsx_database._sym_resolver") as mock_resolver, \
          patch("app.xlsx_database._sync_to_drive"):
@@ -128,7 +139,7 @@ def _make_portfolio(stocks_dir):
         mock_resolver.resolve_by_name.side_effect = lambda name: name.upper().replace(" ", "")
         mock_resolver.derive_symbol.side_effect = lambda name: name.upper().split()[0] if name else "UNKNOWN"
         from app.xlsx_database import XlsxPortfolio
-        db = XlsxPortfolio(stocks_dir)
+        db = XlsxPortfolio(stocks_dir, **kwargs)
     return db
 
 
@@ -188,6 +199,34 @@ class TestSyncToDrive:
             _sync_to_drive(main)  # Should not raise
 
 
+class TestSaveWorkbook:
+    def test_replaces_file(self, tmp_path):
+        from app.xlsx_database import _save_workbook
+        fp = tmp_path / "Stock.xlsx"
+        fp.write_bytes(b"old")
+        wb = openpyxl.Workbook()
+        wb.active["A1"] = "new"
+        _save_workbook(wb, fp)
+        assert openpyxl.load_workbook(fp).active["A1"].value == "new"
+        assert [p.name for p in tmp_path.iterdir()] == ["Stock.xlsx"]
+
+    def test_failed_save_keeps_original(self, tmp_path):
+        from app.xlsx_database import _save_workbook
+        fp = tmp_path / "Stock.xlsx"
+        fp.write_bytes(b"old")
+
+        def torn(path):
+            Path(path).write_bytes(b"half")
+            raise OSError("disk full")
+
+        wb = MagicMock()
+        wb.save.side_effect = torn
+        with pytest.raises(OSError):
+            _save_workbook(wb, fp)
+        assert fp.read_bytes() == b"old"
+        assert [p.name for p in tmp_path.iterdir()] == ["Stock.xlsx"]
+
+
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
@@ -240,7 +279,7 @@ class TestHelpers:
         assert _safe_int(10.7) == 10
 
     def test_parse_excel_serial_date(self):
-        from app.xlsx_database import _parse_excel_serial_date
+        from app.xlsx_parse import _parse_excel_serial_date
         # Excel serial date 44927 ≈ 2023-01-01
         result = _parse_excel_serial_date(44927)
         assert result is not None
@@ -354,6 +393,34 @@ class TestFifoMatch:
         remaining, sold = fifo_match(buys, sells)
         assert sold[0]["buy_exchange"] == "BSE"
 
+    def test_array_engine_matches_loop(self):
+        import random
+        from app import fifo_engine
+        from app.xlsx_database import fifo_match
+        rng = random.Random(7)
+        for _ in range(50):
+            rows = [{"date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     "quantity": rng.randint(1, 100), "price": round(rng.uniform(10, 500), 2),
+                     "exchange": rng.choice(("NSE", "BSE")), "row_idx": r}
+                    for r in range(rng.randint(0, 60))]
+            buys = [r for r in rows if r["row_idx"] % 3]
+            sells = [r for r in rows if not r["row_idx"] % 3]
+            with patch.object(fifo_engine, "VECTOR_MIN_ROWS", 10 ** 9):
+                loop = fifo_match(buys, sells)
+            with patch.object(fifo_engine, "VECTOR_MIN_ROWS", 0):
+                assert fifo_match(buys, sells) == loop
+
+    def test_float_quantities_use_loop(self):
+        from app import fifo_engine
+        from app.xlsx_database import fifo_match
+        buys = [{"date": "2025-01-01", "quantity": 2.5, "price": 100.0}]
+        sells = [{"date": "2025-03-01", "quantity": 1.5, "price": 120.0}]
+        with patch.object(fifo_engine, "VECTOR_MIN_ROWS", 0), \
+             patch.object(fifo_engine, "allocate") as allocate:
+            remaining, _ = fifo_match(buys, sells)
+        allocate.assert_not_called()
+        assert remaining[0]["remaining"] == 1.0
+
 
 # ---------------------------------------------------------------------------
 # _extract_index_data
@@ -361,7 +428,7 @@ class TestFifoMatch:
 
 class TestExtractIndexData:
     def test_extract_all_fields(self, tmp_path):
-        from app.xlsx_database import _extract_index_data
+        from app.xlsx_parse import _extract_index_data
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, symbol="TCS", exchange="NSE",
                            current_price=3800.0, w52_high=4000.0, w52_low=3500.0)
@@ -376,7 +443,7 @@ class TestExtractIndexData:
         assert data["week_52_low"] == 3500.0
 
     def test_no_index_sheet(self, tmp_path):
-        from app.xlsx_database import _extract_index_data
+        from app.xlsx_parse import _extract_index_data
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -389,7 +456,7 @@ class TestExtractIndexData:
         assert data["code"] is None
 
     def test_empty_index_sheet(self, tmp_path):
-        from app.xlsx_database import _extract_index_data
+        from app.xlsx_parse import _extract_index_data
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -403,7 +470,7 @@ class TestExtractIndexData:
         assert data["code"] is None
 
     def test_code_without_colon(self, tmp_path):
-        from app.xlsx_database import _extract_index_data
+        from app.xlsx_parse import _extract_index_data
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws_idx = wb.active
@@ -454,7 +521,7 @@ class TestFindRealisedColumns:
 
 class TestParseTradingHistory:
     def test_parse_buys_and_sells(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, buys=[
             {"date": "2025-01-15", "qty": 10, "price": 100.0},
@@ -470,7 +537,7 @@ class TestParseTradingHistory:
         assert sell_rows[0]["quantity"] == 7
 
     def test_parse_dividends(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, buys=[
             {"date": "2025-01-15", "qty": 10, "price": 100.0},
@@ -485,7 +552,7 @@ class TestParseTradingHistory:
         assert divs[0]["amount"] == 250.0
 
     def test_no_trading_history(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         wb.active.title = "NotTH"
@@ -497,7 +564,7 @@ class TestParseTradingHistory:
         assert held == []
 
     def test_too_few_rows(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -512,7 +579,7 @@ class TestParseTradingHistory:
         assert held == []
 
     def test_no_header_found(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -531,7 +598,7 @@ class TestParseTradingHistory:
         assert held == []
 
     def test_skip_invalid_rows(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -584,7 +651,7 @@ class TestParseTradingHistory:
 
     def test_buy_price_from_cost(self, tmp_path):
         """When cost > 0, buy_price = cost / qty."""
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, buys=[
             {"date": "2025-01-15", "qty": 10, "price": 100.0},
@@ -604,7 +671,7 @@ class TestParseTradingHistory:
 
     def test_buy_fallback_price_when_no_cost(self, tmp_path):
         """When cost = 0, buy_price = price_e."""
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, buys=[
             {"date": "2025-01-15", "qty": 10, "price": 100.0},
@@ -622,7 +689,7 @@ class TestParseTradingHistory:
         assert abs(held[0]["price"] - 100.0) < 0.01
 
     def test_sell_with_bse_exchange(self, tmp_path):
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, sells=[
             {"date": "2025-03-15", "qty": 5, "price": 120.0, "exchange": "BSE"},
@@ -635,7 +702,7 @@ class TestParseTradingHistory:
 
     def test_div_with_different_amount_sources(self, tmp_path):
         """Test dividend amount from different columns."""
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -675,7 +742,7 @@ class TestParseTradingHistory:
 
     def test_sell_with_zero_qty_or_price(self, tmp_path):
         """Sells with zero qty or price should be skipped."""
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         wb = openpyxl.Workbook()
         ws = wb.active
@@ -703,7 +770,7 @@ class TestParseTradingHistory:
 
     def test_exchange_fallback_to_nse(self, tmp_path):
         """Unknown exchange defaults to NSE."""
-        from app.xlsx_database import _parse_trading_history
+        from app.xlsx_parse import _parse_trading_history
         filepath = tmp_path / "test.xlsx"
         _create_stock_xlsx(filepath, buys=[
             {"date": "2025-01-15", "qty": 10, "price": 100.0, "exchange": "UNKNOWN"},
@@ -842,6 +909,98 @@ class TestReindex:
         assert "REMOVE" not in db._file_map
 
 
+class TestIncrementalReindex:
+    def _reindex(self, db):
+        with patch("app.xlsx_database._sym_resolver") as mock_resolver, \
+             patch("app.xlsx_database._sync_to_drive"):
+            mock_resolver.ensure_loaded.return_value = None
+            mock_resolver.resolve_by_name.side_effect = lambda name: name.upper().replace(" ", "")
+            mock_resolver.derive_symbol.side_effect = lambda name: name.upper().split()[0]
+            return db.reindex()
+
+    def test_no_change_opens_nothing(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "A.xlsx", symbol="AAA",
+                           buys=[{"date": "2025-01-01", "qty": 1, "price": 10.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+        with patch.object(db, "_read_workbook", side_effect=AssertionError("opened")), \
+             patch.object(db, "_invalidate_symbol") as inv:
+            result = self._reindex(db)
+        assert result == {"total": 1, "added": [], "removed": [], "modified": []}
+        inv.assert_not_called()
+        assert "AAA" in db._cache
+
+    def test_only_modified_symbol_invalidated(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "A.xlsx", symbol="AAA",
+                           buys=[{"date": "2025-01-01", "qty": 1, "price": 10.0}])
+        _create_stock_xlsx(stocks_dir / "B.xlsx", symbol="BBB",
+                           buys=[{"date": "2025-01-01", "qty": 1, "price": 10.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+
+        _create_stock_xlsx(stocks_dir / "B.xlsx", symbol="BBB",
+                           buys=[{"date": "2025-01-01", "qty": 3, "price": 10.0}])
+        result = self._reindex(db)
+        assert result["modified"] == ["BBB"]
+        assert "AAA" in db._cache
+        assert "BBB" not in db._cache
+        h, _, _ = db._get_stock_data("BBB")
+        assert h[0].quantity == 3
+
+    def test_reindex_keeps_warmed_parse(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "B.xlsx", symbol="BBB",
+                           buys=[{"date": "2025-01-01", "qty": 1, "price": 10.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+
+        _create_stock_xlsx(stocks_dir / "B.xlsx", symbol="BBB",
+                           buys=[{"date": "2025-01-01", "qty": 3, "price": 10.0}])
+        self._reindex(db)
+        fp = stocks_dir / "B.xlsx"
+        assert db._parse_cache.get(fp, fp.stat()) is not None
+        with patch("app.xlsx_database._parse_workbook", side_effect=AssertionError("re-parsed")):
+            h, _, _ = db._get_stock_data("BBB")
+        assert h[0].quantity == 3
+
+    def test_modified_file_can_change_symbol(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "A.xlsx", symbol="OLDSYM")
+        db = _make_portfolio(stocks_dir)
+        _create_stock_xlsx(stocks_dir / "A.xlsx", symbol="NEWSYM")
+        result = self._reindex(db)
+        assert result["added"] == ["NEWSYM"]
+        assert result["removed"] == ["OLDSYM"]
+
+    def test_symbol_resolution_persisted(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "A.xlsx", symbol="AAA")
+        _make_portfolio(stocks_dir)
+        # Drop the parse cache: the symbol cache alone must resolve the file
+        (stocks_dir.parent / ".cache" / "Stocks.json").unlink()
+        with patch("app.xlsx_database.openpyxl.load_workbook",
+                   side_effect=AssertionError("workbook should not be opened")), \
+             patch("app.xlsx_reader.load_workbook",
+                   side_effect=AssertionError("workbook should not be opened")):
+            db = _make_portfolio(stocks_dir)
+        assert "AAA" in db._file_map
+
+    def test_derived_symbol_not_persisted(self, stocks_dir):
+        (stocks_dir / "Mystery Co.xlsx").write_bytes(b"corrupt")
+        with patch("app.xlsx_database._sym_resolver") as mock_resolver:
+            mock_resolver.resolve_by_name.return_value = None
+            mock_resolver.derive_symbol.return_value = "MYSTERY"
+            from app.xlsx_database import XlsxPortfolio
+            db = XlsxPortfolio(stocks_dir)
+        assert "MYSTERY" in db._file_map
+        assert len(db._symbol_cache) == 0
+
+    def test_missing_dir_keeps_maps(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "A.xlsx", symbol="AAA")
+        db = _make_portfolio(stocks_dir)
+        db.stocks_dir = stocks_dir / "unmounted"
+        result = self._reindex(db)
+        assert "AAA" in db._file_map
+        assert result["total"] == 1
+
+
 # ---------------------------------------------------------------------------
 # XlsxPortfolio: _find_file_for_symbol
 # ---------------------------------------------------------------------------
@@ -912,6 +1071,197 @@ class TestCaching:
         assert len(portfolio._cache) == 0
 
 
+class TestPersistentParseCache:
+    def test_cache_file_written_next_to_stocks(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Stock.xlsx", symbol="PCACHE",
+                           buys=[{"date": "2025-01-01", "qty": 10, "price": 100.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+        cache_file = stocks_dir.parent / ".cache" / "Stocks.json"
+        assert cache_file.exists()
+        assert str(stocks_dir / "Stock.xlsx") in json.loads(cache_file.read_text())["entries"]
+
+    def test_cold_start_skips_openpyxl(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Stock.xlsx", symbol="COLD",
+                           buys=[{"date": "2025-01-01", "qty": 10, "price": 100.0}],
+                           sells=[{"date": "2025-02-01", "qty": 4, "price": 120.0}],
+                           divs=[{"date": "2025-03-01", "amount": 25.0}])
+        warm = _make_portfolio(stocks_dir)
+        h1, s1, d1 = warm.get_all_data()
+
+        with patch("app.xlsx_database.openpyxl.load_workbook",
+                   side_effect=AssertionError("workbook should not be opened")), \
+             patch("app.xlsx_reader.load_workbook",
+                   side_effect=AssertionError("workbook should not be opened")):
+            cold = _make_portfolio(stocks_dir)
+            h2, s2, d2 = cold.get_all_data()
+
+        assert "COLD" in cold._file_map
+        assert [h.model_dump() for h in h2] == [h.model_dump() for h in h1]
+        assert [s.model_dump() for s in s2] == [s.model_dump() for s in s1]
+        assert d2 == d1
+
+    def test_modified_file_reparsed(self, stocks_dir):
+        fp = stocks_dir / "Stock.xlsx"
+        _create_stock_xlsx(fp, symbol="MOD",
+                           buys=[{"date": "2025-01-01", "qty": 10, "price": 100.0}])
+        _make_portfolio(stocks_dir).get_all_data()
+
+        _create_stock_xlsx(fp, symbol="MOD",
+                           buys=[{"date": "2025-01-01", "qty": 10, "price": 100.0},
+                                 {"date": "2025-02-01", "qty": 5, "price": 90.0}])
+        db = _make_portfolio(stocks_dir)
+        h, _, _ = db.get_all_data()
+        assert sum(x.quantity for x in h) == 15
+
+    def test_removed_file_pruned(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Gone.xlsx", symbol="GONE")
+        _make_portfolio(stocks_dir)
+        (stocks_dir / "Gone.xlsx").unlink()
+        _make_portfolio(stocks_dir)
+        cache_file = stocks_dir.parent / ".cache" / "Stocks.json"
+        assert json.loads(cache_file.read_text())["entries"] == {}
+
+
+class TestParallelParse:
+    def _populate(self, stocks_dir, n=10):
+        for i in range(n):
+            _create_stock_xlsx(
+                stocks_dir / f"Stock{i}.xlsx", symbol=f"PAR{i}",
+                buys=[{"date": "2025-01-01", "qty": 10 + i, "price": 100.0 + i},
+                      {"date": "2025-02-01", "qty": 5, "price": 90.0}],
+                sells=[{"date": "2025-03-01", "qty": 7, "price": 120.0}],
+                divs=[{"date": "2025-04-01", "amount": 12.5}],
+            )
+
+    @staticmethod
+    def _dump(data):
+        h, s, d = data
+        return (sorted(x.model_dump_json() for x in h),
+                sorted(x.model_dump_json() for x in s), d)
+
+    def test_parallel_matches_serial(self, tmp_path):
+        serial_dir = tmp_path / "serial" / "Stocks"
+        parallel_dir = tmp_path / "parallel" / "Stocks"
+        serial_dir.mkdir(parents=True)
+        parallel_dir.mkdir(parents=True)
+        self._populate(serial_dir)
+        self._populate(parallel_dir)
+
+        serial = _make_portfolio(serial_dir, parse_workers=0).get_all_data()
+        db = _make_portfolio(parallel_dir, parse_workers=2)
+        assert len(db._parse_cache) == 10  # warmed by the pool during the scan
+        parallel = db.get_all_data()
+        assert self._dump(parallel) == self._dump(serial)
+
+    def test_prefetch_fills_symbol_cache(self, stocks_dir):
+        self._populate(stocks_dir)
+        db = _make_portfolio(stocks_dir, parse_workers=2)
+        db._parse_cache._entries.clear()
+        with patch.object(db, "_read_workbook", side_effect=AssertionError("serial parse")):
+            h, s, d = db.get_all_data()
+        assert len(d) == 10
+        assert len(db._cache) == 10
+        assert len(db._parse_cache) == 10
+        # Ledgers are built from the workers' payloads too
+        assert len(db._ledgers) == 10
+
+    def test_write_after_parallel_start_does_not_reparse(self, stocks_dir):
+        self._populate(stocks_dir)
+        db = _make_portfolio(stocks_dir, parse_workers=2)
+        db._parse_cache._entries.clear()
+        db.get_all_data()
+        symbol = next(iter(db._ledgers))
+        with patch("app.xlsx_database._sync_to_drive"):
+            db.add_dividend(symbol, "NSE", 5.0, "2026-01-01", "Interim")
+        with patch("app.xlsx_database._parse_workbook", side_effect=AssertionError("re-parsed")):
+            assert db._get_stock_data(symbol)[2]
+
+    def test_pool_never_forks(self):
+        from app.xlsx_database import _mp_context
+        assert _mp_context().get_start_method() in ("forkserver", "spawn")
+
+    def test_small_portfolio_stays_serial(self, stocks_dir):
+        self._populate(stocks_dir, n=3)
+        with patch("app.xlsx_database.ProcessPoolExecutor",
+                   side_effect=AssertionError("pool started")):
+            db = _make_portfolio(stocks_dir, parse_workers=4)
+            h, _, _ = db.get_all_data()
+        assert len(h) == 6
+
+    def test_pool_failure_falls_back_to_serial(self, stocks_dir):
+        self._populate(stocks_dir)
+        with patch("app.xlsx_database.ProcessPoolExecutor", side_effect=OSError("no shm")):
+            db = _make_portfolio(stocks_dir, parse_workers=4)
+            db._parse_cache._entries.clear()
+            h, s, d = db.get_all_data()
+        assert len(d) == 10
+
+    def test_env_parse_workers(self, monkeypatch):
+        from app.xlsx_database import _env_parse_workers
+        monkeypatch.setenv("XLSX_PARSE_WORKERS", "3")
+        assert _env_parse_workers() == 3
+        monkeypatch.setenv("XLSX_PARSE_WORKERS", "auto")
+        assert _env_parse_workers() >= 1
+        monkeypatch.setenv("XLSX_PARSE_WORKERS", "lots")
+        assert _env_parse_workers() == 0
+        monkeypatch.delenv("XLSX_PARSE_WORKERS")
+        assert _env_parse_workers() == 0
+
+
+# ---------------------------------------------------------------------------
+# Streaming reader on the read path
+# ---------------------------------------------------------------------------
+
+class TestStreamingRead:
+    def _stock(self, stocks_dir):
+        fp = stocks_dir / "Stock.xlsx"
+        _create_stock_xlsx(fp, symbol="STRM", current_price=150.0,
+                           buys=[{"date": "2025-01-01", "qty": 10, "price": 100.0,
+                                  "remarks": "CN#1"},
+                                 {"date": "2025-01-05", "qty": 5, "price": 90.0}],
+                           sells=[{"date": "2025-02-01", "qty": 4, "price": 120.0}],
+                           divs=[{"date": "2025-03-01", "amount": 25.0}])
+        return fp
+
+    def test_payload_matches_openpyxl(self, stocks_dir):
+        from app.xlsx_parse import _parse_workbook, _workbook_payload
+        fp = self._stock(stocks_dir)
+        wb = openpyxl.load_workbook(fp, data_only=True, read_only=True)
+        expected = _workbook_payload(wb)
+        wb.close()
+        with patch("app.xlsx_database.openpyxl.load_workbook",
+                   side_effect=AssertionError("openpyxl should not be used")):
+            assert _parse_workbook(fp) == expected
+
+    def test_falls_back_to_openpyxl(self, stocks_dir):
+        from app.xlsx_database import _parse_workbook
+        from app.xlsx_reader import XlsxReaderError
+        fp = self._stock(stocks_dir)
+        expected = _parse_workbook(fp)
+        with patch("app.xlsx_reader.load_workbook",
+                   side_effect=XlsxReaderError("unsupported")):
+            assert _parse_workbook(fp) == expected
+
+    def test_fingerprints_fallback_not_double_counted(self, stocks_dir):
+        """A streaming pass that dies mid-sheet must not leak partial counts."""
+        self._stock(stocks_dir)
+        db = _make_portfolio(stocks_dir)
+        expected = db.get_existing_transaction_fingerprints("STRM")
+
+        from app import xlsx_reader
+        real_rows = xlsx_reader.StreamingSheet._rows
+
+        def flaky_rows(self, min_row, max_row):
+            for i, row in enumerate(real_rows(self, min_row, max_row)):
+                if i == 3 and min_row > 1:
+                    raise xlsx_reader.XlsxReaderError("truncated")
+                yield row
+
+        with patch.object(xlsx_reader.StreamingSheet, "_rows", flaky_rows):
+            assert db.get_existing_transaction_fingerprints("STRM") == expected
+
+
 # ---------------------------------------------------------------------------
 # XlsxPortfolio: _parse_and_match_symbol
 # ---------------------------------------------------------------------------
@@ -1769,6 +2119,42 @@ class TestFingerprints:
         dfps = db.get_existing_dividend_fingerprints("NOTH")
         assert dfps == set()
 
+    def test_served_from_parse_cache(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Cached.xlsx", symbol="CACHED",
+                           buys=[{"date": "2025-01-15", "qty": 10, "price": 100.0, "remarks": "CN#1"}],
+                           divs=[{"date": "2025-06-15", "amount": 50.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+        with patch("app.xlsx_database._read_values", side_effect=AssertionError("opened")):
+            fps, remarks = db.get_existing_transaction_fingerprints("CACHED")
+            dfps = db.get_existing_dividend_fingerprints("CACHED")
+        assert fps[("2025-01-15", "Buy", 10, 100.0)] == 1
+        assert remarks == {"CN#1"}
+        assert dfps == {("2025-06-15", 50.0)}
+
+    def test_own_writes_update_without_reopen(self, stocks_dir):
+        from app.models import Transaction
+        _create_stock_xlsx(stocks_dir / "Incr.xlsx", symbol="INCR",
+                           buys=[{"date": "2025-01-15", "qty": 10, "price": 100.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+        with patch("app.xlsx_database._sync_to_drive"):
+            db.insert_transactions("INCR", [
+                Transaction(date="2025-02-01", exchange="NSE", action="Buy", quantity=10,
+                            price=100.0, remarks="CN#9"),
+                Transaction(date="2025-03-01", exchange="NSE", action="Sell", quantity=4,
+                            price=120.0, remarks="CN#9"),
+            ])
+            db.add_dividend("INCR", "NSE", 30.0, "2025-04-01")
+        with patch("app.xlsx_database._read_values", side_effect=AssertionError("opened")):
+            fps, remarks = db.get_existing_transaction_fingerprints("INCR")
+            dfps = db.get_existing_dividend_fingerprints("INCR")
+        assert fps[("2025-01-15", "Buy", 10, 100.0)] == 1
+        assert fps[("2025-02-01", "Buy", 10, 100.0)] == 1
+        assert fps[("2025-03-01", "Sell", 4, 120.0)] == 1
+        assert remarks == {"CN#9"}
+        assert dfps == {("2025-04-01", 30.0)}
+
 
 # ---------------------------------------------------------------------------
 # XlsxPortfolio: _convert_realised_formulas
@@ -1936,6 +2322,617 @@ class TestInsertTransaction:
         wb.close()
 
 
+class TestInsertTransactions:
+    def _txs(self):
+        from app.models import Transaction
+        from app.xlsx_database import dividend_transaction
+        return [
+            Transaction(date="2025-01-15", exchange="NSE", action="Buy",
+                        quantity=10, price=100.0, cost=1005.0, stt=1.0, remarks="CN#1"),
+            Transaction(date="2025-01-15", exchange="NSE", action="Buy",
+                        quantity=4, price=99.5, remarks="CN#1"),
+            Transaction(date="2025-02-01", exchange="BSE", action="Sell",
+                        quantity=6, price=120.0, add_chrg=2.0, remarks="CN#2"),
+            dividend_transaction(12.5, "2025-03-01", "Interim"),
+        ]
+
+    @staticmethod
+    def _rows(filepath):
+        wb = openpyxl.load_workbook(filepath)
+        rows = [tuple(c.value for c in row) for row in wb["Trading History"].iter_rows()]
+        wb.close()
+        return rows
+
+    def test_same_layout_as_single_inserts(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "One.xlsx", symbol="ONE",
+                           buys=[{"date": "2024-01-01", "qty": 1, "price": 10.0}],
+                           realised_section=True)
+        _create_stock_xlsx(stocks_dir / "Many.xlsx", symbol="MANY",
+                           buys=[{"date": "2024-01-01", "qty": 1, "price": 10.0}],
+                           realised_section=True)
+        db = _make_portfolio(stocks_dir)
+        with patch("app.xlsx_database._sync_to_drive"):
+            for tx in self._txs():
+                db._insert_transaction(stocks_dir / "One.xlsx", tx)
+            db.insert_transactions("MANY", self._txs())
+        assert self._rows(stocks_dir / "Many.xlsx") == self._rows(stocks_dir / "One.xlsx")
+
+    def test_one_load_and_save(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Batch.xlsx", symbol="BATCH")
+        db = _make_portfolio(stocks_dir)
+        real_load = openpyxl.load_workbook
+        with patch("app.xlsx_database._sync_to_drive"), \
+             patch("app.xlsx_database.openpyxl.load_workbook",
+                   side_effect=real_load) as load, \
+             patch("openpyxl.workbook.workbook.Workbook.save", autospec=True,
+                   side_effect=openpyxl.Workbook.save) as save:
+            db.insert_transactions("BATCH", self._txs())
+        # one data_only read in _convert_realised_formulas + one write load
+        assert load.call_count == 2
+        assert save.call_count == 1
+
+    def test_visible_after_insert(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Vis.xlsx", symbol="VIS")
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+        with patch("app.xlsx_database._sync_to_drive"):
+            db.insert_transactions("vis", self._txs())
+        holdings, sold, divs = db.get_all_data()
+        assert sum(h.quantity for h in holdings if h.symbol == "VIS") == 8
+        assert sum(s.quantity for s in sold if s.symbol == "VIS") == 6
+        assert divs["VIS"]["amount"] == 12.5
+
+    def test_missing_file_raises(self, portfolio):
+        with pytest.raises(FileNotFoundError):
+            portfolio.insert_transactions("NOSUCH", self._txs())
+
+    def test_empty_batch_is_noop(self, stocks_dir):
+        fp = stocks_dir / "Empty.xlsx"
+        _create_stock_xlsx(fp, symbol="EMPTY")
+        before = fp.stat().st_mtime_ns
+        db = _make_portfolio(stocks_dir)
+        assert db.insert_transactions("EMPTY", []) == fp
+        assert fp.stat().st_mtime_ns == before
+
+
+# ---------------------------------------------------------------------------
+# XlsxPortfolio: write-ahead journal
+# ---------------------------------------------------------------------------
+
+class TestWriteJournal:
+    @pytest.fixture(autouse=True)
+    def _no_background_flush(self):
+        # Tests flush explicitly; the timer would race them
+        with patch("app.xlsx_database._JOURNAL_FLUSH_DELAY", 3600), \
+             patch("app.xlsx_database._sync_to_drive"):
+            yield
+
+    @staticmethod
+    def _journaled(stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Jrnl.xlsx", symbol="JRNL",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+        db = _make_portfolio(stocks_dir, write_journal=True)
+        return db, stocks_dir / "Jrnl.xlsx"
+
+    @staticmethod
+    def _cancel(db):
+        if db._flush_timer is not None:
+            db._flush_timer.cancel()
+
+    def _write(self, db):
+        db.add_holding(_make_holding(symbol="JRNL", name="Jrnl", quantity=5,
+                                     buy_price=110.0, buy_date="2025-01-01"))
+        db.add_sell_transaction("JRNL", "NSE", 12, 120.0, "2025-02-01")
+        db.add_dividend("JRNL", "NSE", 40.0, "2025-03-01", "Final")
+
+    def test_write_visible_before_flush(self, stocks_dir):
+        db, fp = self._journaled(stocks_dir)
+        before = fp.stat().st_mtime_ns
+        db.get_all_data()
+        self._write(db)
+        holdings, sold, divs = db.get_all_data()
+        self._cancel(db)
+        assert fp.stat().st_mtime_ns == before
+        assert sum(h.quantity for h in holdings) == 3
+        assert sum(s.quantity for s in sold) == 12
+        assert divs["JRNL"]["amount"] == 40.0
+        assert len(db._journal) == 3
+
+    def test_flush_matches_write_through(self, stocks_dir):
+        db, fp = self._journaled(stocks_dir)
+        self._write(db)
+        ids_before = sorted(h.id for h in db.get_all_holdings())
+        self._cancel(db)
+        assert db.flush_journal() == 3
+        assert len(db._journal) == 0
+        assert sorted(h.id for h in db.get_all_holdings()) == ids_before
+
+        direct_dir = stocks_dir.parent / "Direct"
+        direct_dir.mkdir()
+        _create_stock_xlsx(direct_dir / "Jrnl.xlsx", symbol="JRNL",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+        direct = _make_portfolio(direct_dir, write_journal=False)
+        self._write(direct)
+        assert TestInsertTransactions._rows(fp) == TestInsertTransactions._rows(direct_dir / "Jrnl.xlsx")
+
+    def test_replayed_on_startup(self, stocks_dir):
+        db, fp = self._journaled(stocks_dir)
+        self._write(db)
+        self._cancel(db)
+        restarted = _make_portfolio(stocks_dir, write_journal=True)
+        assert len(restarted._journal) == 0
+        holdings, sold, _ = restarted.get_all_data()
+        assert sum(h.quantity for h in holdings) == 3
+        assert any(r[2] == "Sell" for r in TestInsertTransactions._rows(fp))
+
+    def test_replay_skips_rows_already_written(self, stocks_dir):
+        db, fp = self._journaled(stocks_dir)
+        self._write(db)
+        self._cancel(db)
+        entries = db._journal.entries()
+        db._journal.mark([e["seq"] for e in entries], flushing=True)
+        # Crash after the first batch (buy) reached the workbook
+        from app.xlsx_database import _entry_transaction
+        db._insert_transactions(fp, [_entry_transaction(entries[0])])
+        restarted = _make_portfolio(stocks_dir, write_journal=True)
+        buys = [r for r in TestInsertTransactions._rows(fp) if r[2] == "Buy" and r[1] == "NSE"]
+        assert len(buys) == 2
+        assert sum(h.quantity for h in restarted.get_all_holdings()) == 3
+
+    def test_oversell_rejected_without_journaling(self, stocks_dir):
+        db, _ = self._journaled(stocks_dir)
+        with pytest.raises(ValueError):
+            db.add_sell_transaction("JRNL", "NSE", 11, 120.0, "2025-02-01")
+        assert len(db._journal) == 0
+
+    def test_failed_sell_dead_lettered_not_dropped(self, stocks_dir):
+        db, _ = self._journaled(stocks_dir)
+        db.add_sell_transaction("JRNL", "NSE", 4, 120.0, "2025-02-01")
+        self._cancel(db)
+        with patch.object(db, "_write_sell", side_effect=ValueError("lots gone")):
+            assert db.flush_journal() == 0
+        status = db.journal_status()
+        assert status["pending"] == 0
+        assert [(d["op"], d["error"]) for d in status["dead_letters"]] == [("sell", "lots gone")]
+        assert status["dead_letters"][0]["tx"]["quantity"] == 4
+
+    def test_fingerprints_include_pending(self, stocks_dir):
+        db, _ = self._journaled(stocks_dir)
+        self._write(db)
+        self._cancel(db)
+        fps, _ = db.get_existing_transaction_fingerprints("JRNL")
+        assert fps[("2025-02-01", "Sell", 12, 120.0)] == 1
+        assert ("2025-03-01", 40.0) in db.get_existing_dividend_fingerprints("JRNL")
+
+    def test_write_through_mutators_flush_first(self, stocks_dir):
+        db, _ = self._journaled(stocks_dir)
+        self._write(db)
+        self._cancel(db)
+        target = next(h for h in db.get_all_holdings() if h.buy_date == "2025-01-01")
+        assert db.update_holding(target.id, {"quantity": 6}) is not None
+        assert len(db._journal) == 0
+
+
+# ---------------------------------------------------------------------------
+# XlsxPortfolio: per-file write locks
+# ---------------------------------------------------------------------------
+
+class TestConcurrentWrites:
+    SLOW = 0.3  # stand-in for the formula-conversion load/save cycle
+
+    @staticmethod
+    def _db(stocks_dir, n):
+        for i in range(n):
+            _create_stock_xlsx(stocks_dir / f"Stock{i}.xlsx", symbol=f"SYM{i}")
+        return _make_portfolio(stocks_dir)
+
+    def _timed_inserts(self, db, symbols):
+        import threading
+        import time
+        from app.models import Transaction
+        tx = Transaction(date="2025-01-15", exchange="NSE", action="Buy", quantity=1, price=10.0)
+        real = db._convert_realised_formulas
+
+        def slow_convert(fp):
+            time.sleep(self.SLOW)
+            real(fp)
+
+        threads = [threading.Thread(target=db.insert_transactions, args=(s, [tx])) for s in symbols]
+        with patch("app.xlsx_database._sync_to_drive"), \
+             patch.object(db, "_convert_realised_formulas", side_effect=slow_convert):
+            t0 = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            return time.perf_counter() - t0
+
+    def test_independent_symbols_scale(self, stocks_dir):
+        n = 4
+        db = self._db(stocks_dir, n)
+        same = self._timed_inserts(db, ["SYM0"] * n)
+        independent = self._timed_inserts(db, [f"SYM{i}" for i in range(n)])
+        # One stock serializes on its file lock; different stocks overlap
+        assert same >= n * self.SLOW
+        assert independent < same / 2
+        holdings = db.get_all_holdings()
+        assert sum(h.quantity for h in holdings if h.symbol == "SYM0") == n + 1
+        assert all(sum(h.quantity for h in holdings if h.symbol == f"SYM{i}") == 1
+                   for i in range(1, n))
+
+    def test_same_stock_writes_not_lost(self, stocks_dir):
+        import threading
+        db = self._db(stocks_dir, 1)
+        holdings = [_make_holding(symbol="SYM0", name="Stock0", quantity=q,
+                                  buy_price=100.0 + q, buy_date="2025-01-15")
+                    for q in range(1, 7)]
+        with patch("app.xlsx_database._sync_to_drive"):
+            threads = [threading.Thread(target=db.add_holding, args=(h,)) for h in holdings]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert sum(h.quantity for h in db.get_all_holdings()) == sum(range(1, 7))
+
+
+# ---------------------------------------------------------------------------
+# FifoLedger: incremental FIFO after our own writes
+# ---------------------------------------------------------------------------
+
+class TestIncrementalLedger:
+    @pytest.fixture(autouse=True)
+    def _no_drive(self):
+        with patch("app.xlsx_database._sync_to_drive"), \
+             patch("app.xlsx_database._JOURNAL_FLUSH_DELAY", 3600):
+            yield
+
+    @staticmethod
+    def _ledger_db(stocks_dir, **kwargs):
+        _create_stock_xlsx(stocks_dir / "Ledger.xlsx", symbol="LEDG",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0},
+                                 {"date": "2024-06-01", "qty": 10, "price": 120.0}],
+                           sells=[{"date": "2024-03-01", "qty": 4, "price": 130.0}],
+                           divs=[{"date": "2024-04-01", "amount": 25.0}])
+        db = _make_portfolio(stocks_dir, **kwargs)
+        db.get_all_data()
+        return db, stocks_dir / "Ledger.xlsx"
+
+    @staticmethod
+    def _rebuilt(fp):
+        """Full re-parse + FIFO of the workbook as it is on disk."""
+        from app.xlsx_database import _match_symbol, _parse_workbook
+        return _match_symbol("LEDG", [(fp.stem, _parse_workbook(fp))])
+
+    @staticmethod
+    def _dump(result):
+        holdings, sold, dividends = result
+        return [h.dict() for h in holdings], [s.dict() for s in sold], dividends
+
+    def test_apply_matches_rebuild(self):
+        from app.models import Transaction
+        from app.xlsx_database import FifoLedger, _overlay_pending
+        payload = {"index": {"exchange": "NSE"}, "header_row": 4, "sold": [], "dividends": [],
+                   "held": [{"date": "2024-01-01", "exchange": "NSE", "quantity": 10, "price": 100.0,
+                             "raw_price": 100.0, "cost": 1000.0, "row_idx": 6}],
+                   "sell_rows": [{"date": "2024-02-01", "quantity": 3, "price": 110.0,
+                                  "exchange": "NSE", "row_idx": 5}]}
+        txs = [Transaction(date="2024-05-01", exchange="NSE", action="Buy", quantity=5, price=90.0),
+               Transaction(date="2024-06-01", exchange="NSE", action="Sell", quantity=9, price=95.0),
+               Transaction(date="2024-07-01", exchange="DIV", action="Buy", quantity=3, price=12.0)]
+        ledger = FifoLedger("LEDG", [("Ledger", payload)])
+        assert ledger.apply("Ledger", txs) is True
+        rebuilt = FifoLedger("LEDG", [("Ledger", _overlay_pending(payload, txs))])
+        assert self._dump(ledger.result()) == self._dump(rebuilt.result())
+
+    def test_vectorized_build_matches_loop(self):
+        import random
+        from app.models import Transaction
+        from app.xlsx_database import FifoLedger
+        rng = random.Random(7)
+        held = [{"date": f"2020-{m:02d}-{d:02d}", "exchange": "NSE", "quantity": rng.randint(1, 50),
+                 "price": float(rng.randint(50, 150)), "raw_price": 100.0, "cost": 0, "row_idx": 500 - i}
+                for i, (m, d) in enumerate((m, d) for m in range(1, 13) for d in range(1, 15))]
+        sells = [{"date": f"2021-{m:02d}-{d:02d}", "quantity": rng.randint(1, 40),
+                  "price": float(rng.randint(50, 150)), "exchange": "NSE", "row_idx": 200 - i}
+                 for i, (m, d) in enumerate((m, d) for m in range(1, 13) for d in range(1, 10))]
+        payload = {"index": {"exchange": "NSE"}, "header_row": 4, "sold": [], "dividends": [],
+                   "held": held, "sell_rows": sells}
+        tx = [Transaction(date="2022-01-01", exchange="NSE", action="Sell", quantity=25, price=99.0)]
+        vector = FifoLedger("LEDG", [("Ledger", payload)])
+        with patch("app.fifo_engine.VECTOR_MIN_ROWS", 10 ** 9):
+            loop = FifoLedger("LEDG", [("Ledger", payload)])
+        assert self._dump(vector.result()) == self._dump(loop.result())
+        assert (vector._head, vector._unmatched, vector._sell_count, vector._last_sell_date) == \
+            (loop._head, loop._unmatched, loop._sell_count, loop._last_sell_date)
+        assert vector.apply("Ledger", tx) and loop.apply("Ledger", tx)
+        assert self._dump(vector.result()) == self._dump(loop.result())
+
+    def test_backdated_rows_rejected(self):
+        from app.models import Transaction
+        from app.xlsx_database import FifoLedger
+        payload = {"index": {}, "header_row": 4, "sold": [], "dividends": [],
+                   "held": [{"date": "2024-01-01", "exchange": "NSE", "quantity": 10, "price": 100.0,
+                             "raw_price": 100.0, "cost": 1000.0, "row_idx": 6}],
+                   "sell_rows": [{"date": "2024-02-01", "quantity": 3, "price": 110.0,
+                                  "exchange": "NSE", "row_idx": 5}]}
+        ledger = FifoLedger("LEDG", [("Ledger", payload)])
+        before = self._dump(ledger.result())
+        # Would be consumed ahead of the partly sold lot
+        assert not ledger.apply("Ledger", [Transaction(date="2023-12-01", exchange="NSE", action="Buy",
+                                                        quantity=1, price=1.0)])
+        # Same-day sell sorts ahead of the existing one on a full rebuild
+        assert not ledger.apply("Ledger", [Transaction(date="2024-02-01", exchange="NSE", action="Sell",
+                                                        quantity=1, price=1.0)])
+        assert self._dump(ledger.result()) == before
+
+    def test_own_writes_advance_without_reparse(self, stocks_dir):
+        db, fp = self._ledger_db(stocks_dir)
+        db.add_holding(_make_holding(symbol="LEDG", name="Ledger", quantity=5,
+                                     buy_price=140.0, buy_date="2025-01-01"))
+        db.add_sell_transaction("LEDG", "NSE", 12, 150.0, "2025-02-01")
+        db.add_dividend("LEDG", "NSE", 30.0, "2025-03-01", "Final")
+        assert "LEDG" in db._ledgers
+        with patch("app.xlsx_database._parse_workbook", side_effect=AssertionError("re-parsed")):
+            holdings, sold, dividends = db._get_stock_data("LEDG")
+            cached = db._parse_cache.get(fp)
+        assert self._dump((holdings, sold, dividends)) == self._dump(self._rebuilt(fp))
+        from app.xlsx_database import _parse_workbook
+        fresh = _parse_workbook(fp)
+        assert {k: cached[k] for k in ("held", "sell_rows", "dividends")} == \
+            {k: fresh[k] for k in ("held", "sell_rows", "dividends")}
+
+    def test_backdated_write_falls_back_to_rebuild(self, stocks_dir):
+        db, fp = self._ledger_db(stocks_dir)
+        with patch.object(db, "_build_ledger", wraps=db._build_ledger) as build:
+            # Sorts ahead of the partly sold 2024-01-01 lot
+            db.add_holding(_make_holding(symbol="LEDG", name="Ledger", quantity=3,
+                                         buy_price=90.0, buy_date="2023-06-01"))
+            assert build.call_count == 1
+            db.add_holding(_make_holding(symbol="LEDG", name="Ledger", quantity=3,
+                                         buy_price=90.0, buy_date="2025-06-01"))
+            assert build.call_count == 1
+        assert self._dump(db._get_stock_data("LEDG")) == self._dump(self._rebuilt(fp))
+
+    def test_external_change_rebuilds(self, stocks_dir):
+        import os
+        db, fp = self._ledger_db(stocks_dir)
+        _create_stock_xlsx(fp, symbol="LEDG", buys=[{"date": "2024-01-01", "qty": 7, "price": 100.0}])
+        st = fp.stat()
+        os.utime(fp, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        holdings, sold, _ = db._get_stock_data("LEDG")
+        assert [h.quantity for h in holdings] == [7] and sold == []
+
+    def test_journal_flush_keeps_ledger(self, stocks_dir):
+        db, fp = self._ledger_db(stocks_dir, write_journal=True)
+        db.add_holding(_make_holding(symbol="LEDG", name="Ledger", quantity=5,
+                                     buy_price=140.0, buy_date="2025-01-01"))
+        db.add_sell_transaction("LEDG", "NSE", 12, 150.0, "2025-02-01")
+        pending = self._dump(db._get_stock_data("LEDG"))
+        db.flush_journal()
+        assert "LEDG" in db._ledgers
+        with patch("app.xlsx_database._parse_workbook", side_effect=AssertionError("re-parsed")):
+            flushed = self._dump(db._get_stock_data("LEDG"))
+        assert flushed == pending == self._dump(self._rebuilt(fp))
+
+
+class TestFsWatch:
+    @pytest.fixture
+    def watched(self, stocks_dir):
+        from app.fs_watcher import DumpsWatcher
+        _create_stock_xlsx(stocks_dir / "Watched.xlsx", symbol="WTCH",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+        with patch("app.xlsx_database._sync_to_drive"):
+            # Not started: tests deliver events through _on_fs_change
+            db = _make_portfolio(stocks_dir, watcher=DumpsWatcher(stocks_dir.parent, "poll"))
+            db.get_all_data()
+            yield db, stocks_dir / "Watched.xlsx"
+
+    def test_cached_read_skips_stat(self, watched):
+        db, _ = watched
+        with patch.object(Path, "stat", side_effect=AssertionError("stat")):
+            holdings, _, _ = db._get_stock_data("WTCH")
+        assert [h.quantity for h in holdings] == [10]
+
+    def test_unwatched_read_still_stats(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Plain.xlsx", symbol="PLN",
+                           buys=[{"date": "2024-01-01", "qty": 1, "price": 1.0}])
+        db = _make_portfolio(stocks_dir)
+        db.get_all_data()
+        assert db._watcher is None and not db._fresh
+
+    def test_external_change_reparsed_on_event(self, watched):
+        import os
+        db, fp = watched
+        _create_stock_xlsx(fp, symbol="WTCH", buys=[{"date": "2024-01-01", "qty": 7, "price": 100.0}])
+        st = fp.stat()
+        os.utime(fp, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        # No event yet: the cached result is served
+        assert [h.quantity for h in db._get_stock_data("WTCH")[0]] == [10]
+        db._on_fs_change({fp})
+        assert "WTCH" in db._fresh
+        with patch.object(Path, "stat", side_effect=AssertionError("stat")):
+            assert [h.quantity for h in db._get_stock_data("WTCH")[0]] == [7]
+
+    def test_own_write_keeps_ledger(self, watched):
+        db, fp = watched
+        db.add_holding(_make_holding(symbol="WTCH", name="Watched", quantity=5,
+                                     buy_price=110.0, buy_date="2025-01-01"))
+        ledger = db._ledgers["WTCH"][1]
+        with patch("app.xlsx_database._parse_workbook", side_effect=AssertionError("re-parsed")):
+            db._on_fs_change({fp})
+        assert db._ledgers["WTCH"][1] is ledger
+        assert sorted(h.quantity for h in db._get_stock_data("WTCH")[0]) == [5, 10]
+
+    def test_new_and_removed_files(self, watched, stocks_dir):
+        db, fp = watched
+        new_fp = stocks_dir / "Fresh.xlsx"
+        _create_stock_xlsx(new_fp, symbol="FRSH", buys=[{"date": "2024-02-01", "qty": 3, "price": 50.0}])
+        with patch("app.xlsx_database._sym_resolver"):
+            db._on_fs_change({new_fp})
+        assert "FRSH" in db._file_map
+        new_fp.unlink()
+        db._on_fs_change({new_fp})
+        assert "FRSH" not in db._file_map and "WTCH" in db._file_map
+
+    def test_cache_and_lost_events_ignored_or_rescanned(self, watched, stocks_dir):
+        db, fp = watched
+        db._on_fs_change({stocks_dir / ".cache.json", stocks_dir / "~$Watched.xlsx"})
+        assert "WTCH" in db._fresh
+        db._on_fs_change({stocks_dir})
+        assert "WTCH" not in db._fresh
+        assert [h.quantity for h in db._get_stock_data("WTCH")[0]] == [10]
+
+
+class TestPortfolioSnapshot:
+    @pytest.fixture
+    def db(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Alpha.xlsx", symbol="ALPHA",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}],
+                           divs=[{"date": "2024-03-01", "amount": 20.0}])
+        _create_stock_xlsx(stocks_dir / "Beta.xlsx", symbol="BETA",
+                           buys=[{"date": "2024-02-01", "qty": 5, "price": 50.0}],
+                           sells=[{"date": "2024-04-01", "qty": 2, "price": 60.0}])
+        with patch("app.xlsx_database._sync_to_drive"):
+            yield _make_portfolio(stocks_dir)
+
+    def test_reused_until_something_changes(self, db):
+        first = db.snapshot()
+        holdings, sold, dividends = db.get_all_data()
+        assert db.snapshot() is first
+        assert holdings is first.holdings and sold is first.sold and dividends is first.dividends
+        assert set(first.by_symbol) == {"ALPHA", "BETA"}
+        assert dividends["ALPHA"]["amount"] == 20.0 and dividends["ALPHA"]["count"] == 1
+        assert {h.id for h in holdings} == set(first.index) == set(first.holding_file)
+
+    def test_write_swaps_in_new_version(self, db):
+        old = db.snapshot()
+        old_ids = set(old.index)
+        db.add_holding(_make_holding(symbol="ALPHA", name="Alpha", quantity=3,
+                                     buy_price=110.0, buy_date="2025-01-01"))
+        new = db.snapshot()
+        assert new is not old and new.version == old.version + 1
+        assert len(new.holdings) == len(old.holdings) + 1
+        # Readers still holding the old snapshot see it unchanged
+        assert set(old.index) == old_ids
+        assert db._holding_index is new.index
+        # Untouched symbols share their per-symbol lists
+        assert new.by_symbol["BETA"][0] is old.by_symbol["BETA"][0]
+
+    def test_get_holding_by_id_refreshes_snapshot(self, db):
+        db.snapshot()
+        db.add_holding(_make_holding(symbol="BETA", name="Beta", quantity=1,
+                                     buy_price=55.0, buy_date="2025-01-01"))
+        # Not looked up yet, so the index still has the pre-write holdings
+        new = [h for h in db._get_stock_data("BETA")[0] if h.id not in db._holding_index]
+        assert new
+        for h in new:
+            assert db.get_holding_by_id(h.id) is h
+
+    def test_data_version_follows_writes(self, db):
+        v = db.data_version
+        assert db.data_version == v
+        db.add_holding(_make_holding(symbol="BETA", name="Beta", quantity=1,
+                                     buy_price=55.0, buy_date="2025-01-01"))
+        assert db.data_version[0] == v[0] and db.data_version[1] > v[1]
+
+    def test_data_version_never_parses(self, db, stocks_dir):
+        v = db.data_version
+        with patch.object(db, "snapshot", side_effect=AssertionError("built snapshot")), \
+             patch("app.xlsx_database._parse_workbook", side_effect=AssertionError("parsed")):
+            assert db.data_version == v
+            # An outside edit shows up through stat alone
+            fp = stocks_dir / "Beta.xlsx"
+            st = fp.stat()
+            os.utime(fp, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+            assert db.data_version != v
+
+    def test_invalidate_all_resets(self, db):
+        snap = db.snapshot()
+        db._invalidate_all()
+        assert db._holding_index == {} and db._snapshot.version == snap.version + 1
+        rebuilt = db.snapshot()
+        assert rebuilt.version == snap.version + 2
+        assert [h.id for h in rebuilt.holdings] == [h.id for h in snap.holdings]
+
+
+
+class TestRequestMemo:
+    @pytest.fixture
+    def db(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Alpha.xlsx", symbol="ALPHA",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+        _create_stock_xlsx(stocks_dir / "Beta.xlsx", symbol="BETA",
+                           buys=[{"date": "2024-02-01", "qty": 5, "price": 50.0}])
+        with patch("app.xlsx_database._sync_to_drive"):
+            yield _make_portfolio(stocks_dir)
+
+    def test_accessors_validate_once_per_scope(self, db):
+        from app import request_memo
+        db.snapshot()
+        with patch.object(db, "_get_stock_data", wraps=db._get_stock_data) as spy:
+            with request_memo.request_scope():
+                db.get_all_holdings()
+                db.get_all_sold()
+                db.get_dividends_by_symbol()
+                db.get_all_data()
+            assert spy.call_count == 2
+            # Outside a scope every call validates again
+            db.get_all_holdings()
+            assert spy.call_count == 4
+
+    def test_write_in_scope_is_visible(self, db):
+        from app import request_memo
+        with request_memo.request_scope():
+            before = len(db.get_all_holdings())
+            db.add_holding(_make_holding(symbol="ALPHA", name="Alpha", quantity=3,
+                                         buy_price=110.0, buy_date="2025-01-01"))
+            assert len(db.get_all_holdings()) == before + 1
+
+class TestLifecycle:
+    def test_approx_size_grows_with_parsed_data(self, stocks_dir):
+        with patch("app.xlsx_database._sync_to_drive"):
+            for i in range(5):
+                _create_stock_xlsx(stocks_dir / f"Sz{i}.xlsx", symbol=f"SZ{i}",
+                                   buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+            db = _make_portfolio(stocks_dir)
+            before = db.approx_size()
+            db.get_all_data()
+            assert db.approx_size() > before > 0
+
+    def test_close_flushes_journal_and_unwatches(self, stocks_dir):
+        from app.fs_watcher import DumpsWatcher
+        _create_stock_xlsx(stocks_dir / "Cls.xlsx", symbol="CLS",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+        watcher = DumpsWatcher(stocks_dir.parent, "poll")
+        with patch("app.xlsx_database._sync_to_drive"), \
+             patch("app.xlsx_database._JOURNAL_FLUSH_DELAY", 3600):
+            db = _make_portfolio(stocks_dir, write_journal=True, watcher=watcher)
+            db.add_holding(_make_holding(symbol="CLS", name="Cls", quantity=5,
+                                         buy_price=110.0, buy_date="2025-01-01"))
+            db.close()
+            assert len(db._journal) == 0 and db._flush_timer is None
+            assert db._watcher is None and not watcher._subscribers
+            # Still readable afterwards (stat-validated)
+            assert sum(h.quantity for h in db.get_all_holdings()) == 15
+
+    def test_close_leaves_unflushed_journal_to_next_instance(self, stocks_dir):
+        _create_stock_xlsx(stocks_dir / "Cls.xlsx", symbol="CLS",
+                           buys=[{"date": "2024-01-01", "qty": 10, "price": 100.0}])
+        with patch("app.xlsx_database._sync_to_drive"), \
+             patch("app.xlsx_database._JOURNAL_FLUSH_DELAY", 3600):
+            db = _make_portfolio(stocks_dir, write_journal=True)
+            db.add_holding(_make_holding(symbol="CLS", name="Cls", quantity=5,
+                                         buy_price=110.0, buy_date="2025-01-01"))
+            assert db.has_pending_writes()
+            with patch.object(db, "_insert_transactions", side_effect=OSError("locked")):
+                db.close()
+            # No retry timer on the dropped instance — the next one replays
+            assert db._flush_timer is None and len(db._journal) == 1
+            successor = _make_portfolio(stocks_dir, write_journal=True)
+            assert not successor.has_pending_writes()
+            assert sum(h.quantity for h in successor.get_all_holdings()) == 15
+
+
 # ---------------------------------------------------------------------------
 # XlsxPortfolio: File structure validation
 # ---------------------------------------------------------------------------
@@ -0,0 +1,259 @@
+"""
+Unit tests for app.xlsx_reader — the streaming value-only xlsx reader.
+
+Every case is checked against openpyxl.load_workbook(data_only=True,
+read_only=True), which is what the reader replaces on the read path:
+  - workbooks written by openpyxl (stock layout, dates, padding, row ranges)
+  - hand-built parts openpyxl never writes: cached formula values, inline
+    strings, rich-text shared strings, booleans/errors, custom date formats,
+    1904 epoch, missing rows, cells without coordinates
+  - error handling for non-zip / missing sheets
+"""
+
+import zipfile
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from app import xlsx_reader
+from app.xlsx_reader import XlsxReaderError, _column_index, _dimension_bounds
+
+from tests.unit.test_xlsx_database import _create_stock_xlsx
+
+
+def _both(filepath, sheet, **kwargs):
+    """Rows from openpyxl and from the streaming reader for the same call."""
+    wb = openpyxl.load_workbook(filepath, data_only=True, read_only=True)
+    try:
+        expected = list(wb[sheet].iter_rows(values_only=True, **kwargs))
+    finally:
+        wb.close()
+    with xlsx_reader.load_workbook(filepath) as swb:
+        actual = list(swb[sheet].iter_rows(**kwargs))
+    return expected, actual
+
+
+# ---------------------------------------------------------------------------
+# Hand-built workbook
+# ---------------------------------------------------------------------------
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+          xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<workbookPr{pr}/>
+<sheets><sheet name="Trading History" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="/xl/worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+_SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="4" uniqueCount="4">
+<si><t>DATE</t></si>
+<si><t>ACTION</t></si>
+<si><r><t>Bu</t></r><r><rPr><b/></rPr><t>y</t></r><rPh sb="0" eb="1"><t>x</t></rPh></si>
+<si><t xml:space="preserve"> CN#42 </t></si>
+</sst>"""
+
+# xf 0 = General, 1 = builtin date (14), 2 = custom "dd-mmm-yy", 3 = custom "0.00"
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="2"><numFmt numFmtId="164" formatCode="dd\\-mmm\\-yy"/><numFmt numFmtId="165" formatCode="0.00"/></numFmts>
+<cellStyleXfs count="1"><xf numFmtId="0"/></cellStyleXfs>
+<cellXfs count="4"><xf numFmtId="0"/><xf numFmtId="14" applyNumberFormat="1"/><xf numFmtId="164" applyNumberFormat="1"/><xf numFmtId="165" applyNumberFormat="1"/></cellXfs>
+</styleSheet>"""
+
+_SHEET = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+{dim}<sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="C1" t="s"><v>1</v></c></row>
+<row r="3">
+  <c r="A3" s="1"><v>45306</v></c>
+  <c r="B3" t="inlineStr"><is><t>NSE</t></is></c>
+  <c r="C3" t="s"><v>2</v></c>
+  <c r="D3"><v>10</v></c>
+  <c r="E3" s="3"><v>101.5</v></c>
+  <c r="F3"><f>D3*E3</f><v>1015</v></c>
+  <c r="G3" t="s"><v>3</v></c>
+  <c r="H3" t="b"><v>1</v></c>
+  <c r="I3" t="e"><v>#N/A</v></c>
+</row>
+<row r="4">
+  <c r="A4" s="2"><v>45337.5</v></c>
+  <c r="C4" t="str"><f>"Se"&amp;"ll"</f><v>Sell</v></c>
+  <c r="D4"><f>1+1</f></c>
+  <c r="E4"><v>1.5E2</v></c>
+</row>
+<row r="6"><c t="inlineStr"><is><r><t>no</t></r><r><t>ref</t></r></is></c><c><v>7</v></c></row>
+</sheetData>
+</worksheet>"""
+
+
+def _write_handmade(filepath, date1904=False, dim="A1:I6"):
+    pr = ' date1904="1"' if date1904 else ""
+    with zipfile.ZipFile(filepath, "w") as z:
+        z.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        z.writestr("_rels/.rels", _ROOT_RELS)
+        z.writestr("xl/workbook.xml", _WORKBOOK.format(pr=pr))
+        z.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        z.writestr("xl/sharedStrings.xml", _SHARED_STRINGS)
+        z.writestr("xl/styles.xml", _STYLES)
+        dim_xml = f'<dimension ref="{dim}"/>\n' if dim else ""
+        z.writestr("xl/worksheets/sheet1.xml", _SHEET.format(dim=dim_xml))
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class TestHelpers:
+    def test_column_index(self):
+        assert _column_index("A1") == 1
+        assert _column_index("I5") == 9
+        assert _column_index("AB12") == 28
+        assert _column_index("$C$2") == 0  # absolute refs never appear on <c r=...>
+
+    def test_dimension_bounds(self):
+        assert _dimension_bounds("A1:N57") == (14, 57)
+        assert _dimension_bounds("A1") == (1, 1)
+        assert _dimension_bounds("") == (None, None)
+
+
+# ---------------------------------------------------------------------------
+# Parity on openpyxl-written workbooks
+# ---------------------------------------------------------------------------
+
+class TestOpenpyxlParity:
+    @pytest.fixture
+    def stock_file(self, tmp_path):
+        fp = tmp_path / "Stock.xlsx"
+        _create_stock_xlsx(
+            fp, symbol="PAR", current_price=12.5, w52_high=20, w52_low=5,
+            buys=[{"date": f"2024-01-{d:02d}", "qty": d, "price": 10.5 * d,
+                   "remarks": f"CN#{d}"} for d in range(1, 20)],
+            sells=[{"date": "2024-03-01", "qty": 4, "price": 50.25}],
+            divs=[{"date": "2024-05-01", "amount": 3.5}],
+            realised_section=True)
+        return fp
+
+    def test_sheetnames(self, stock_file):
+        wb = openpyxl.load_workbook(stock_file, read_only=True)
+        expected = wb.sheetnames
+        wb.close()
+        with xlsx_reader.load_workbook(stock_file) as swb:
+            assert swb.sheetnames == expected
+
+    @pytest.mark.parametrize("kwargs", [
+        {}, {"min_row": 1, "max_row": 15}, {"min_row": 5}, {"max_row": 3},
+        {"min_row": 3, "max_row": 200},
+    ])
+    @pytest.mark.parametrize("sheet", ["Trading History", "Index"])
+    def test_rows_match(self, stock_file, sheet, kwargs):
+        expected, actual = _both(stock_file, sheet, **kwargs)
+        assert actual == expected
+
+    def test_dates_are_datetimes(self, stock_file):
+        with xlsx_reader.load_workbook(stock_file) as wb:
+            rows = list(wb["Trading History"].iter_rows(min_row=5, max_row=5))
+        assert rows[0][0] == datetime(2024, 1, 1)
+
+    def test_unknown_sheet(self, stock_file):
+        with xlsx_reader.load_workbook(stock_file) as wb:
+            with pytest.raises(KeyError):
+                wb["Nope"]
+
+    def test_values_only_required(self, stock_file):
+        with xlsx_reader.load_workbook(stock_file) as wb:
+            with pytest.raises(NotImplementedError):
+                wb["Index"].iter_rows(values_only=False)
+
+
+# ---------------------------------------------------------------------------
+# Parts openpyxl doesn't write
+# ---------------------------------------------------------------------------
+
+class TestHandmadeWorkbook:
+    def test_matches_openpyxl(self, tmp_path):
+        fp = tmp_path / "hand.xlsx"
+        _write_handmade(fp)
+        expected, actual = _both(fp, "Trading History")
+        assert actual == expected
+
+    def test_cell_values(self, tmp_path):
+        fp = tmp_path / "hand.xlsx"
+        _write_handmade(fp)
+        with xlsx_reader.load_workbook(fp) as wb:
+            rows = list(wb["Trading History"].iter_rows())
+        assert rows[0][:3] == ("DATE", None, "ACTION")
+        assert rows[1] == (None,) * 9                       # missing row 2
+        assert rows[2] == (datetime(2024, 1, 15), "NSE", "Buy", 10, 101.5,
+                           1015, " CN#42 ", True, "#N/A")
+        assert rows[3][:5] == (datetime(2024, 2, 15, 12, 0), None, "Sell", None, 150.0)
+        assert rows[5][:2] == ("noref", 7)
+
+    def test_1904_epoch(self, tmp_path):
+        fp = tmp_path / "mac.xlsx"
+        _write_handmade(fp, date1904=True)
+        expected, actual = _both(fp, "Trading History")
+        assert actual == expected
+        assert actual[2][0] == datetime(2028, 1, 16)
+
+    def test_no_dimension(self, tmp_path):
+        """Without a <dimension> rows are as wide as their last cell."""
+        fp = tmp_path / "nodim.xlsx"
+        _write_handmade(fp, dim=None)
+        expected, actual = _both(fp, "Trading History")
+        # openpyxl fills missing rows with [] here; we always yield tuples
+        assert actual == [tuple(r) for r in expected]
+        assert len(actual[0]) == 3
+
+
+class TestErrors:
+    def test_not_a_zip(self, tmp_path):
+        fp = tmp_path / "bad.xlsx"
+        fp.write_bytes(b"corrupt")
+        with pytest.raises(XlsxReaderError):
+            xlsx_reader.load_workbook(fp)
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(XlsxReaderError):
+            xlsx_reader.load_workbook(tmp_path / "absent.xlsx")
+
+    def test_zip_without_workbook(self, tmp_path):
+        fp = tmp_path / "empty.xlsx"
+        with zipfile.ZipFile(fp, "w") as z:
+            z.writestr("hello.txt", "hi")
+        with pytest.raises(XlsxReaderError):
+            xlsx_reader.load_workbook(fp)
+
+    def test_missing_sheet_part(self, tmp_path):
+        fp = tmp_path / "hand.xlsx"
+        _write_handmade(fp)
+        broken = tmp_path / "broken.xlsx"
+        with zipfile.ZipFile(fp) as src, zipfile.ZipFile(broken, "w") as dst:
+            for item in src.infolist():
+                if item.filename != "xl/worksheets/sheet1.xml":
+                    dst.writestr(item, src.read(item.filename))
+        with xlsx_reader.load_workbook(broken) as wb:
+            with pytest.raises(XlsxReaderError):
+                list(wb["Trading History"].iter_rows())
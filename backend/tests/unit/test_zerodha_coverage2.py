@@ -34,7 +34,7 @@ class TestApiGet429:
         mock_resp = MagicMock()
         mock_resp.status_code = 429
         mock_resp.text = "Rate limited"
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             with patch("app.zerodha_service.time.sleep"):
                 result = zs._api_get("/test")
         assert result is None
@@ -54,7 +54,7 @@ class TestApiGet429:
         mock_resp = MagicMock()
         mock_resp.status_code = 403
         mock_resp.text = "Token expired"
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             with patch.object(zs, "_try_auto_login_and_retry", return_value=None):
                 result = zs._api_get("/test")
         assert result is None
@@ -429,14 +429,14 @@ class TestLoadInstrumentsEdgeCases:
         mock_resp = MagicMock()
         mock_resp.status_code = 500
         zs._instrument_names_loaded = False
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             zs._load_instruments()
 
     def test_load_instruments_exception(self):
         import app.zerodha_service as zs
         _reset()
         zs._instrument_names_loaded = False
-        with patch("app.zerodha_service.requests.get", side_effect=Exception("network error")):
+        with patch("app.zerodha_service.http_client.get", side_effect=Exception("network error")):
             zs._load_instruments()
 
     def test_load_instruments_invalid_token(self):
@@ -449,7 +449,7 @@ class TestLoadInstrumentsEdgeCases:
         mock_resp.text = csv_data
         zs._instrument_names_loaded = False
         zs._instrument_tokens_loaded = False
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             zs._load_instruments()
         # Should still load the name even with invalid token
         assert "RELIANCE.NSE" in zs._instrument_names
@@ -462,14 +462,14 @@ class TestLoadMFInstrumentsEdgeCases:
         mock_resp = MagicMock()
         mock_resp.status_code = 500
         zs._mf_instruments_loaded = False
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             zs._load_mf_instruments()
 
     def test_load_mf_instruments_exception(self):
         import app.zerodha_service as zs
         _reset()
         zs._mf_instruments_loaded = False
-        with patch("app.zerodha_service.requests.get", side_effect=Exception("fail")):
+        with patch("app.zerodha_service.http_client.get", side_effect=Exception("fail")):
             zs._load_mf_instruments()
 
 
@@ -606,7 +606,7 @@ class TestGenerateSession:
         mock_resp = MagicMock()
         mock_resp.status_code = 200
         mock_resp.json.return_value = {"data": {"access_token": "new_token_abc123"}}
-        with patch("app.zerodha_service.requests.post", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.post", return_value=mock_resp):
             with patch.object(zs, "_update_env"):
                 result = zs.generate_session("request_tok_123")
         assert result is True
@@ -617,14 +617,14 @@ class TestGenerateSession:
         mock_resp = MagicMock()
         mock_resp.status_code = 400
         mock_resp.text = "Bad request"
-        with patch("app.zerodha_service.requests.post", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.post", return_value=mock_resp):
             result = zs.generate_session("bad_token")
         assert result is False
 
     def test_exception(self):
         import app.zerodha_service as zs
         _reset()
-        with patch("app.zerodha_service.requests.post", side_effect=Exception("network")):
+        with patch("app.zerodha_service.http_client.post", side_effect=Exception("network")):
             result = zs.generate_session("tok")
         assert result is False
 
@@ -135,7 +135,7 @@ def test_api_get_success():
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.json.return_value = {"data": {"price": 2500}}
-    with patch("app.zerodha_service.requests.get", return_value=mock_resp), \
+    with patch("app.zerodha_service.http_client.get", return_value=mock_resp), \
          patch.object(zs, "can_auto_login", return_value=False):
         result = zs._api_get("/quote/ltp")
     assert result == {"data": {"price": 2500}}
@@ -147,7 +147,7 @@ def test_api_get_403_sets_auth_failed():
     mock_resp = MagicMock()
     mock_resp.status_code = 403
     mock_resp.text = "Invalid token"
-    with patch("app.zerodha_service.requests.get", return_value=mock_resp), \
+    with patch("app.zerodha_service.http_client.get", return_value=mock_resp), \
          patch.object(zs, "_try_auto_login_and_retry", return_value=None):
         result = zs._api_get("/quote/ltp")
     assert result is None
@@ -171,7 +171,7 @@ def test_api_get_429_rate_limited():
     _reset_globals()
     mock_resp = MagicMock()
     mock_resp.status_code = 429
-    with patch("app.zerodha_service.requests.get", return_value=mock_resp), \
+    with patch("app.zerodha_service.http_client.get", return_value=mock_resp), \
          patch("time.sleep"):
         result = zs._api_get("/quote/ltp")
     assert result is None
@@ -307,7 +307,7 @@ def test_generate_session_success():
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.json.return_value = {"data": {"access_token": "new_access_token_xyz"}}
-    with patch("app.zerodha_service.requests.post", return_value=mock_resp), \
+    with patch("app.zerodha_service.http_client.post", return_value=mock_resp), \
          patch.object(zs, "_update_env"):
         result = zs.generate_session("some_request_token")
     assert result is True
@@ -320,7 +320,7 @@ def test_generate_session_failure():
     mock_resp = MagicMock()
     mock_resp.status_code = 403
     mock_resp.text = "Invalid"
-    with patch("app.zerodha_service.requests.post", return_value=mock_resp):
+    with patch("app.zerodha_service.http_client.post", return_value=mock_resp):
         result = zs.generate_session("bad_token")
     assert result is False
 
@@ -60,7 +60,7 @@ class TestApiGet:
         import app.zerodha_service as zs
         import requests as req_lib
         _reset_globals()
-        with patch("app.zerodha_service.requests.get", side_effect=req_lib.exceptions.ConnectionError("refused")):
+        with patch("app.zerodha_service.http_client.get", side_effect=req_lib.exceptions.ConnectionError("refused")):
             with patch("app.zerodha_service.time.sleep"):
                 result = zs._api_get("/test")
         assert result is None
@@ -73,7 +73,7 @@ class TestApiGet:
         mock_resp = MagicMock()
         mock_resp.status_code = 500
         mock_resp.text = "Internal Server Error"
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             result = zs._api_get("/test")
         assert result is None
         assert "500" in zs._last_error
@@ -84,7 +84,7 @@ class TestApiGet:
         mock_403 = MagicMock()
         mock_403.status_code = 403
         mock_403.text = "Token expired"
-        with patch("app.zerodha_service.requests.get", return_value=mock_403):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_403):
             with patch.object(zs, "_try_auto_login_and_retry", return_value={"data": "ok"}):
                 result = zs._api_get("/test")
         assert result == {"data": "ok"}
@@ -127,7 +127,7 @@ class TestTryAutoLoginAndRetry:
         mock_resp.json.return_value = {"data": "retried"}
         with patch.object(zs, "can_auto_login", return_value=True):
             with patch.object(zs, "auto_login", return_value=True):
-                with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+                with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
                     result = zs._try_auto_login_and_retry("/test")
                     assert result == {"data": "retried"}
 
@@ -136,7 +136,7 @@ class TestTryAutoLoginAndRetry:
         _reset_globals()
         with patch.object(zs, "can_auto_login", return_value=True):
             with patch.object(zs, "auto_login", return_value=True):
-                with patch("app.zerodha_service.requests.get", side_effect=Exception("fail")):
+                with patch("app.zerodha_service.http_client.get", side_effect=Exception("fail")):
                     result = zs._try_auto_login_and_retry("/test")
                     assert result is None
 
@@ -317,7 +317,7 @@ class TestLoadInstruments:
         zs._instrument_names_loaded = False
         zs._instrument_tokens_loaded = False
 
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             zs._load_instruments()
 
         assert "RELIANCE.NSE" in zs._instrument_names
@@ -383,7 +383,7 @@ class TestMFInstruments:
         old_loaded = zs._mf_instruments_loaded
         zs._mf_instruments_loaded = False
 
-        with patch("app.zerodha_service.requests.get", return_value=mock_resp):
+        with patch("app.zerodha_service.http_client.get", return_value=mock_resp):
             zs._load_mf_instruments()
 
         assert len(zs._mf_instruments) >= 1
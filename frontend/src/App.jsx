@@ -1,6 +1,6 @@
 import React, { useState, useEffect, useCallback, useRef } from 'react';
 import toast, { Toaster } from 'react-hot-toast';
-import { getPortfolio, getDashboardSummary, getTransactions, addStock, sellStock, addDividend, getStockSummary, getMarketTicker, triggerPriceRefresh, triggerTickerRefresh, triggerMFNavRefresh, clearPriceCache, setRefreshInterval as apiSetRefreshInterval, getZerodhaStatus, setZerodhaToken, parseContractNote, confirmImportContractNote, parseDividendStatement, confirmDividendImport, getMFSummary, getMFDashboard, addMFHolding, redeemMFUnits, getSIPConfigs, addSIPConfig, deleteSIPConfig, executeSIP, parseCDSLCAS, confirmCDSLCASImport, getFDSummary, getFDDashboard, addFD, updateFD, deleteFD, getRDSummary, getRDDashboard, addRD, updateRD, deleteRD, addRDInstallment, getInsuranceSummary, getInsuranceDashboard, addInsurance, updateInsurance, deleteInsurance, getPPFSummary, getPPFDashboard, addPPF, updatePPF, deletePPF, addPPFContribution, withdrawPPF, getNPSSummary, getNPSDashboard, addNPS, updateNPS, deleteNPS, addNPSContribution, parseNPSStatement, confirmNPSImport, setMFSipFlag, getSISummary, getSIDashboard, addSI, updateSI, deleteSI, getVersion, getUsers, getUserSettings, saveUserSettings } from './services/api';
+import { getPortfolio, getDashboardSummary, getTransactions, addStock, sellStock, addDividend, getStockSummary, getMarketTicker, triggerPriceRefresh, triggerTickerRefresh, triggerMFNavRefresh, clearPriceCache, setRefreshInterval as apiSetRefreshInterval, getZerodhaStatus, setZerodhaToken, parseContractNote, confirmImportContractNote, parseDividendStatement, confirmDividendImport, getMFSummary, getMFDashboard, addMFHolding, redeemMFUnits, getSIPConfigs, addSIPConfig, deleteSIPConfig, executeSIP, parseCDSLCAS, confirmCDSLCASImport, getFDSummary, getFDDashboard, addFD, updateFD, deleteFD, getRDSummary, getRDDashboard, addRD, updateRD, deleteRD, addRDInstallment, getInsuranceSummary, getInsuranceDashboard, addInsurance, updateInsurance, deleteInsurance, getPPFSummary, getPPFDashboard, addPPF, updatePPF, deletePPF, addPPFContribution, withdrawPPF, getNPSSummary, getNPSDashboard, addNPS, updateNPS, deleteNPS, addNPSContribution, parseNPSStatement, confirmNPSImport, setMFSipFlag, getSISummary, getSIDashboard, addSI, updateSI, deleteSI, getVersion, getUsers, getUserSettings, saveUserSettings, subscribeLiveStream, loadBootstrap } from './services/api';
 import Dashboard from './components/Dashboard';
 import PortfolioTable from './components/PortfolioTable';
 import StockSummaryTable from './components/StockSummaryTable';
@@ -207,21 +207,24 @@ export default function App() {
     }
   }, []);
 
+  const applyMarketTicker = useCallback((resp) => {
+    setMarketTicker(resp.tickers || resp);
+    if (resp.last_updated) setTickerLastUpdated(resp.last_updated);
+  }, []);
+
+  const applyUserSettings = useCallback((settings) => {
+    setUserSettings(settings || {});
+    if (settings?.page_refresh_interval !== undefined) {
+      setPageRefreshInterval(settings.page_refresh_interval);
+    }
+  }, []);
+
   const loadGlobal = useCallback(async () => {
     const [tickR, zsR, settingsR] = await Promise.allSettled([getMarketTicker(), getZerodhaStatus(), getUserSettings()]);
-    if (tickR.status === 'fulfilled') {
-      const resp = tickR.value;
-      setMarketTicker(resp.tickers || resp);
-      if (resp.last_updated) setTickerLastUpdated(resp.last_updated);
-    }
+    if (tickR.status === 'fulfilled') applyMarketTicker(tickR.value);
     if (zsR.status === 'fulfilled') setZerodhaStatus(zsR.value);
-    if (settingsR.status === 'fulfilled') {
-      setUserSettings(settingsR.value || {});
-      if (settingsR.value.page_refresh_interval !== undefined) {
-        setPageRefreshInterval(settingsR.value.page_refresh_interval);
-      }
-    }
-  }, []);
+    if (settingsR.status === 'fulfilled') applyUserSettings(settingsR.value);
+  }, [applyMarketTicker, applyUserSettings]);
 
   const loadMutualFunds = useCallback(async () => {
     const [mfSumR, mfDashR, sipR] = await Promise.allSettled([
@@ -262,35 +265,60 @@ export default function App() {
     if (dashR.status === 'fulfilled') setNpsDashboard(dashR.value);
   }, []);
 
-  const loadSI = useCallback(async () => {
-    const [sumR, dashR] = await Promise.allSettled([getSISummary(), getSIDashboard()]);
-    if (sumR.status === 'fulfilled') {
-      setSiSummary(sumR.value);
-      for (const si of sumR.value) {
-        if (si.status === 'Active' && si.days_to_expiry > 0 && si.days_to_expiry <= si.alert_days && !siAlertedRef.current.has(si.id)) {
-          siAlertedRef.current.add(si.id);
-          toast(`SI "${si.beneficiary}" at ${si.bank} expires in ${si.days_to_expiry} days`, { icon: '\u26A0\uFE0F', duration: 6000 });
-        }
+  const applySISummary = useCallback((list) => {
+    setSiSummary(list);
+    for (const si of list) {
+      if (si.status === 'Active' && si.days_to_expiry > 0 && si.days_to_expiry <= si.alert_days && !siAlertedRef.current.has(si.id)) {
+        siAlertedRef.current.add(si.id);
+        toast(`SI "${si.beneficiary}" at ${si.bank} expires in ${si.days_to_expiry} days`, { icon: '\u26A0\uFE0F', duration: 6000 });
       }
     }
-    if (dashR.status === 'fulfilled') setSiDashboard(dashR.value);
   }, []);
 
-  // Fire ALL groups concurrently — each updates state independently as it resolves
+  const loadSI = useCallback(async () => {
+    const [sumR, dashR] = await Promise.allSettled([getSISummary(), getSIDashboard()]);
+    if (sumR.status === 'fulfilled') applySISummary(sumR.value);
+    if (dashR.status === 'fulfilled') setSiDashboard(dashR.value);
+  }, [applySISummary]);
+
+  // Bootstrap section → state setters for each of its parts
+  const bootstrapSetters = {
+    stocks: { portfolio: setPortfolio, summary: setSummary, transactions: setTransactions, stock_summary: setStockSummary },
+    global: { market_ticker: applyMarketTicker, zerodha_status: setZerodhaStatus, user_settings: applyUserSettings },
+    mutual_funds: { summary: setMfSummary, dashboard: setMfDashboard, sip_configs: setSipConfigs },
+    fd: { summary: setFdSummary, dashboard: setFdDashboard },
+    rd: { summary: setRdSummary, dashboard: setRdDashboard },
+    insurance: { summary: setInsurancePolicies, dashboard: setInsuranceDashboard },
+    ppf: { summary: setPpfAccounts, dashboard: setPpfDashboard },
+    nps: { summary: setNpsAccounts, dashboard: setNpsDashboard },
+    si: { summary: applySISummary, dashboard: setSiDashboard },
+  };
+
+  // One /api/bootstrap request streams every tab's data; each section updates
+  // state as it arrives. Sections that fail (or never arrive) fall back to
+  // their own loader, which also reports the error.
   const loadData = useCallback(async () => {
+    const loaders = {
+      stocks: loadStocks, global: loadGlobal, mutual_funds: loadMutualFunds, fd: loadFD, rd: loadRD,
+      insurance: loadInsurance, ppf: loadPPF, nps: loadNPS, si: loadSI,
+    };
+    const loaded = new Set();
     try {
-      // Load stocks first (default tab) — show page immediately
-      await Promise.allSettled([loadStocks(), loadGlobal()]);
-      setLoading(false);
-      // Load remaining tabs in background (MF can be slow due to mfapi.in)
-      Promise.allSettled([
-        loadMutualFunds(), loadFD(), loadRD(), loadInsurance(), loadPPF(), loadNPS(), loadSI(),
-      ]).catch(err => console.error('Background load error:', err));
+      await loadBootstrap((section, data, errors) => {
+        const setters = bootstrapSetters[section];
+        if (!setters) return;
+        for (const [part, value] of Object.entries(data)) setters[part]?.(value);
+        if (!errors) loaded.add(section);
+        // Stocks (default tab) + global are enough to show the page
+        if (loaded.has('stocks') && loaded.has('global')) setLoading(false);
+      });
     } catch (err) {
-      console.error('Failed to load data:', err);
-      setLoading(false);
+      console.error('Bootstrap failed, loading tabs separately:', err);
     }
-  }, [loadStocks, loadGlobal, loadMutualFunds, loadFD, loadRD, loadInsurance, loadPPF, loadNPS, loadSI]);
+    const missing = Object.keys(loaders).filter(k => !loaded.has(k));
+    await Promise.allSettled(missing.map(k => loaders[k]()));
+    setLoading(false);
+  }, [loadStocks, loadGlobal, loadMutualFunds, loadFD, loadRD, loadInsurance, loadPPF, loadNPS, loadSI]); // eslint-disable-line react-hooks/exhaustive-deps
 
   // Trigger ALL live refreshes in parallel, then reload only affected groups
   const liveRefresh = useCallback(async () => {
@@ -322,8 +350,12 @@ export default function App() {
   }, []); // eslint-disable-line react-hooks/exhaustive-deps
 
   // Auto-refresh: trigger live refresh at chosen interval
+  // (paused while the live stream is connected — the server refreshes then)
+  const liveConnectedRef = useRef(false);
   useEffect(() => {
-    const interval = setInterval(liveRefresh, refreshInterval * 1000);
+    const interval = setInterval(() => {
+      if (!liveConnectedRef.current) liveRefresh();
+    }, refreshInterval * 1000);
     return () => clearInterval(interval);
   }, [liveRefresh, refreshInterval]);
 
@@ -350,13 +382,48 @@ export default function App() {
     const handleVisibility = () => {
       if (document.visibilityState === 'visible') {
         getZerodhaStatus().then(zs => setZerodhaStatus(zs)).catch(() => {});
-        liveRefresh();
+        if (!liveConnectedRef.current) liveRefresh();
       }
     };
     document.addEventListener('visibilitychange', handleVisibility);
     return () => document.removeEventListener('visibilitychange', handleVisibility);
   }, [liveRefresh]);
 
+  // Server-pushed live updates: while connected, the server refreshes prices
+  // and NAVs once for every open tab and pushes per-key changes. Tickers are
+  // patched in place; price/NAV changes reload their group (batched 1s).
+  useEffect(() => {
+    const pending = { stocks: false, mf: false, timer: null };
+    const flush = () => {
+      pending.timer = null;
+      if (pending.stocks) loadStocks();
+      if (pending.mf) loadMutualFunds();
+      pending.stocks = false;
+      pending.mf = false;
+    };
+    const schedule = (group) => {
+      pending[group] = true;
+      if (!pending.timer) pending.timer = setTimeout(flush, 1000);
+    };
+    const unsubscribe = subscribeLiveStream((event, data) => {
+      if (event === 'ticker') {
+        setMarketTicker(prev => prev.map(t => (t.key === data.key ? { ...t, ...data } : t)));
+      } else if (event === 'price') {
+        schedule('stocks');
+      } else if (event === 'nav') {
+        schedule('mf');
+      } else if (event === 'reset') {
+        schedule('stocks');
+        schedule('mf');
+        loadGlobal();
+      }
+    }, (connected) => { liveConnectedRef.current = connected; });
+    return () => {
+      unsubscribe();
+      if (pending.timer) clearTimeout(pending.timer);
+    };
+  }, [loadStocks, loadMutualFunds, loadGlobal]);
+
   const handleAddStock = async (data) => {
     try {
       await addStock(data);
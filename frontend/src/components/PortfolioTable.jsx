@@ -1,4 +1,5 @@
 import React from 'react';
+import PriceAgeBadge from './PriceAgeBadge';
 
 const formatINR = (num) => {
   if (num === null || num === undefined) return '₹0';
@@ -103,7 +104,7 @@ export default function PortfolioTable({ portfolio, loading, onSell, onAddStock
                     <div className="stock-symbol">
                       {h.symbol}
                       <span className="stock-exchange">{h.exchange}</span>
-                      {live?.is_manual && <span className="manual-badge">Manual</span>}
+                      <PriceAgeBadge live={live} />
                     </div>
                     <div className="stock-name">{h.name}</div>
                   </td>
@@ -0,0 +1,30 @@
+import React from 'react';
+
+// "5m", "3h", "2d" — rough age of a price
+export function formatAge(seconds) {
+  const s = Math.max(0, Math.round(seconds));
+  if (s < 60) return `${s}s`;
+  if (s < 3600) return `${Math.floor(s / 60)}m`;
+  if (s < 86400) return `${Math.floor(s / 3600)}h`;
+  return `${Math.floor(s / 86400)}d`;
+}
+
+// Shows how old a price is once it is past its freshness window (or came
+// from a saved/offline source). Fresh live prices show nothing; prices
+// without a timestamp fall back to the plain "Manual" badge.
+export default function PriceAgeBadge({ live, now = Date.now() }) {
+  if (!live) return null;
+  const { fetched_at: fetchedAt, max_age: maxAge, source, is_manual: isManual } = live;
+  if (fetchedAt == null) {
+    return isManual ? <span className="manual-badge">Manual</span> : null;
+  }
+  const age = now / 1000 - fetchedAt;
+  const stale = maxAge != null && age >= maxAge;
+  if (!stale && !isManual) return null;
+  const when = new Date(fetchedAt * 1000).toLocaleString();
+  return (
+    <span className="manual-badge" title={`${source || 'cached'} price from ${when}`}>
+      {formatAge(age)} old
+    </span>
+  );
+}
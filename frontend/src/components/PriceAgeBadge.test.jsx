@@ -0,0 +1,38 @@
+import { describe, it, expect } from 'vitest';
+import { render, screen } from '@testing-library/react';
+import PriceAgeBadge, { formatAge } from './PriceAgeBadge';
+
+const NOW = 1_700_000_000_000;
+
+describe('PriceAgeBadge', () => {
+  it('renders nothing for a fresh live price', () => {
+    const live = { source: 'zerodha', fetched_at: NOW / 1000 - 30, max_age: 300, is_manual: false };
+    const { container } = render(<PriceAgeBadge live={live} now={NOW} />);
+    expect(container.firstChild).toBeNull();
+  });
+
+  it('shows the age of a stale price', () => {
+    const live = { source: 'zerodha', fetched_at: NOW / 1000 - 600, max_age: 300, is_manual: false };
+    render(<PriceAgeBadge live={live} now={NOW} />);
+    expect(screen.getByText('10m old')).toBeTruthy();
+  });
+
+  it('shows the age of a saved price', () => {
+    const live = { source: 'saved', fetched_at: NOW / 1000 - 7200, max_age: 0, is_manual: true };
+    render(<PriceAgeBadge live={live} now={NOW} />);
+    expect(screen.getByText('2h old')).toBeTruthy();
+  });
+
+  it('falls back to Manual without a timestamp', () => {
+    render(<PriceAgeBadge live={{ is_manual: true }} now={NOW} />);
+    expect(screen.getByText('Manual')).toBeTruthy();
+  });
+});
+
+describe('formatAge', () => {
+  it('picks a unit', () => {
+    expect(formatAge(5)).toBe('5s');
+    expect(formatAge(90)).toBe('1m');
+    expect(formatAge(3 * 86400)).toBe('3d');
+  });
+});
@@ -3,6 +3,7 @@ import { getStockHistory, updateHolding, updateSoldRow, renameStock, lookupStock
 import { AreaChart, Area, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
 import ExpiryAlertRules from './ExpiryAlertRules';
 import EditLotModal from './EditLotModal';
+import PriceAgeBadge from './PriceAgeBadge';
 
 const formatINR = (num) => {
   if (num === null || num === undefined) return '₹0';
@@ -2199,7 +2200,7 @@ export default function StockSummaryTable({ stocks, loading, onAddStock, portfol
                       <div className="stock-symbol">
                         {stock.symbol}
                         <span className="stock-exchange">{stock.exchange}</span>
-                        {live?.is_manual && <span className="manual-badge">Manual</span>}
+                        <PriceAgeBadge live={live} />
                         <button
                           onClick={(e) => { e.stopPropagation(); setRenamingStock({ symbol: stock.symbol, name: stock.name }); }}
                           style={{ background: 'rgba(255,255,255,0.06)', border: '1px solid rgba(255,255,255,0.1)', borderRadius: '3px', cursor: 'pointer', padding: '1px 4px', fontSize: '10px', color: 'var(--text-muted)', verticalAlign: 'middle', marginLeft: '4px' }}
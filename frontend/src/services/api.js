@@ -265,6 +265,100 @@ export async function setMFSipFlag(fundCode, hasSip) {
   return data;
 }
 
+// ── Streaming endpoints (fetch, not axios, so the body can be read as it arrives) ─────
+
+// Same X-User-Id / Authorization headers the axios interceptor adds
+function streamHeaders() {
+  const headers = {};
+  const userId = localStorage.getItem('selectedUserId');
+  if (userId) headers['X-User-Id'] = userId;
+  const sessionToken = localStorage.getItem('sessionToken');
+  if (sessionToken) headers['Authorization'] = `Bearer ${sessionToken}`;
+  return headers;
+}
+
+// Load every tab's initial data from /api/bootstrap in one request.
+// The server sends one NDJSON line per section as soon as it is ready;
+// onSection(section, data, errors) is called for each.
+export async function loadBootstrap(onSection) {
+  const resp = await fetch(`${API_BASE}/bootstrap`, { headers: streamHeaders() });
+  if (!resp.ok || !resp.body) throw new Error(`bootstrap ${resp.status}`);
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += decoder.decode(value, { stream: true });
+    let nl;
+    while ((nl = buf.indexOf('\n')) >= 0) {
+      const line = buf.slice(0, nl).trim();
+      buf = buf.slice(nl + 1);
+      if (!line) continue;
+      const msg = JSON.parse(line);
+      if (msg.section) onSection(msg.section, msg.data || {}, msg.errors || null);
+    }
+  }
+}
+
+// ── Live Stream (server-pushed price / NAV / ticker deltas) ─────
+
+// Subscribe to /api/stream (Server-Sent Events). Uses fetch rather than
+// EventSource so the X-User-Id / Authorization headers can be sent.
+// Reconnects with Last-Event-ID; onStatus(true|false) tracks the connection.
+// Returns an unsubscribe function.
+export function subscribeLiveStream(onEvent, onStatus = () => {}) {
+  let lastId = null;
+  let stopped = false;
+  let controller = null;
+  let retryMs = 3000;
+
+  const connect = async () => {
+    controller = new AbortController();
+    const headers = { ...streamHeaders(), Accept: 'text/event-stream' };
+    if (lastId !== null) headers['Last-Event-ID'] = lastId;
+    try {
+      const resp = await fetch(`${API_BASE}/stream`, { headers, signal: controller.signal });
+      if (!resp.ok || !resp.body) throw new Error(`stream ${resp.status}`);
+      onStatus(true);
+      const reader = resp.body.getReader();
+      const decoder = new TextDecoder();
+      let buf = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buf += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buf.indexOf('\n\n')) >= 0) {
+          const block = buf.slice(0, sep);
+          buf = buf.slice(sep + 2);
+          let event = 'message', data = '', id = null;
+          for (const line of block.split('\n')) {
+            if (line.startsWith('id: ')) id = line.slice(4);
+            else if (line.startsWith('event: ')) event = line.slice(7);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+            else if (line.startsWith('retry: ')) retryMs = parseInt(line.slice(7), 10) || retryMs;
+          }
+          if (id !== null) lastId = id;
+          if (data) {
+            try { onEvent(event, JSON.parse(data)); } catch (e) { console.error('Live stream event error:', e); }
+          }
+        }
+      }
+    } catch (err) {
+      if (stopped) return;
+    }
+    onStatus(false);
+    if (!stopped) setTimeout(connect, retryMs);
+  };
+
+  connect();
+  return () => {
+    stopped = true;
+    if (controller) controller.abort();
+  };
+}
+
 // ── Settings ────────────────────────────────────────
 
 export async function getRefreshInterval() {